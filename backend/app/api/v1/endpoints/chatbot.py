@@ -1,14 +1,60 @@
+import asyncio
+from typing import AsyncIterator
+
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 
+from app.core.config import settings
 from app.schemas.chat import ChatRequest, ChatResponse
 from app.util.chatbot import save_chat_log
 from app.util.dependencies import get_current_user
 from app.util.logger import logger
 from app.util.session_id import session_id_management
+from app.util.sse import format_sse_event
+
+CHAT_DISCONNECT_POLL_INTERVAL = settings.CHAT_DISCONNECT_POLL_INTERVAL
+
+# 첫 조각을 받기 전에 클라이언트 연결이 끊겼음을 나타냄
+DISCONNECTED = object()
 
 chatbot_router = APIRouter()
 
 
+async def wait_for_first_delta(
+    request: Request, stream: AsyncIterator[str]
+) -> str | None | object:
+    """
+    클라이언트 연결을 확인하면서 스트림의 첫 응답 조각을 기다림
+
+    검색과 첫 토큰 생성에는 시간이 걸리므로 기다리는 동안 주기적으로
+    연결을 확인하고, 연결이 끊기면 첫 조각을 기다리던 작업을 취소한다.
+
+    Args:
+        request (Request): 클라이언트 요청
+        stream (AsyncIterator[str]): 응답 조각 스트림
+
+    Returns:
+        str | None | object: 첫 조각, 스트림이 비어 있으면 None,
+            연결이 끊기면 DISCONNECTED
+    """
+    if await request.is_disconnected():
+        return DISCONNECTED
+    first = asyncio.ensure_future(anext(stream, None))
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {first}, timeout=CHAT_DISCONNECT_POLL_INTERVAL
+            )
+            if done:
+                return first.result()
+            if await request.is_disconnected():
+                return DISCONNECTED
+    finally:
+        if not first.done():
+            first.cancel()
+            await asyncio.gather(first, return_exceptions=True)
+
+
 @chatbot_router.post("/chat")
 async def chat(
     request: Request,
@@ -34,11 +80,13 @@ async def chat(
             f"Chat request from user: {current_user.get('email', 'unknown')}"
         )
 
-        session_id = await session_id_management(
-            current_user.get("email", "unknown")
-        )
+        # 세션 확인은 서비스에서 문서 검색과 동시에 실행된다
         response = await request.app.state.chat_service.get_answer(
-            user_query=chat_request.message, session_id=session_id
+            user_query=chat_request.message,
+            session_id=session_id_management(
+                current_user.get("email", "unknown")
+            ),
+            user_id=current_user.get("sub"),
         )
         answer = response.content
         logger.info(f"Chat answer: {answer}")
@@ -52,6 +100,101 @@ async def chat(
         )
 
         return ChatResponse(answer=answer)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in chat: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@chatbot_router.post("/chat/stream")
+async def chat_stream(
+    request: Request,
+    chat_request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+) -> Response:
+    """
+    챗봇의 응답을 생성되는 대로 Server-Sent Events로 전송
+
+    응답 조각마다 token 이벤트({"delta"})를, 생성이 끝나면 전체 응답이
+    담긴 done 이벤트({"answer"})를 보낸다. 첫 조각이 나오기 전의 오류는
+    HTTP 상태 코드로, 이후의 오류는 error 이벤트({"detail"})로 전달한다.
+    첫 조각을 기다리는 동안에도 클라이언트 연결을 확인하여 연결이 끊기면
+    생성을 취소하며, 채팅 로그는 생성이 끝난 경우에만 저장한다.
+
+    Args:
+        request (ChatRequest): 유저 메시지가 담긴 요청
+        current_user (dict): 인증된 사용자 정보
+
+    Returns:
+        Response: text/event-stream 응답, 첫 조각 전에 연결이 끊기면 499
+
+    Raises:
+        HTTPException: 첫 응답 조각 전에 오류가 발생한 경우
+    """
+    logger.info(
+        f"Chat stream request from user: "
+        f"{current_user.get('email', 'unknown')}"
+    )
+    stream = request.app.state.chat_service.astream_answer(
+        user_query=chat_request.message,
+        session_id=session_id_management(current_user.get("email", "unknown")),
+        user_id=current_user.get("sub"),
+    )
+    try:
+        # 검색 단계의 오류를 상태 코드로 반환하기 위해 첫 조각을 먼저 받는다
+        first_delta = await wait_for_first_delta(request, stream)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in chat stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if first_delta is DISCONNECTED:
+        logger.info("Chat stream client disconnected before first delta")
+        await stream.aclose()
+        # 클라이언트가 요청을 닫았음을 나타내는 비표준 상태 코드
+        return Response(status_code=499)
+
+    deltas = []
+    completed = False
+
+    async def event_stream():
+        nonlocal completed
+        try:
+            if first_delta is not None:
+                deltas.append(first_delta)
+                yield format_sse_event("token", {"delta": first_delta})
+                async for delta in stream:
+                    if await request.is_disconnected():
+                        logger.info("Chat stream client disconnected")
+                        return
+                    deltas.append(delta)
+                    yield format_sse_event("token", {"delta": delta})
+            completed = True
+            answer = "".join(deltas)
+            logger.info(f"Chat answer: {answer}")
+            yield format_sse_event("done", {"answer": answer})
+        except Exception as e:
+            logger.error(f"Error in chat stream: {e}")
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield format_sse_event("error", {"detail": detail})
+        finally:
+            await stream.aclose()
+
+    async def save_completed_chat_log():
+        if completed:
+            await save_chat_log(
+                email=current_user.get("email", "unknown"),
+                query=chat_request.message,
+                answer="".join(deltas),
+            )
+
+    # 스트림이 끝난 뒤 실행된다
+    background_tasks.add_task(save_completed_chat_log)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
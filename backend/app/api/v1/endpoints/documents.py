@@ -1,22 +1,70 @@
 import uuid
 
-from fastapi import APIRouter, Depends, File, HTTPException, Path, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 
+from app.core.config import settings
+from app.core.constants import IngestJobOperation, IngestJobStatus
+from app.core.exceptions import (
+    BulkUploadLimitError,
+    DocumentNotFoundError,
+    IngestJobNotFoundError,
+    InvalidCursorError,
+    ServiceBusyError,
+    UnsupportedDocumentFormatError,
+)
+from app.schemas.document import (
+    DocumentContentResponse,
+    DocumentListResponse,
+    DocumentResponse,
+)
+from app.schemas.ingest_job import IngestJobResponse
+from app.util.archive import (
+    ArchiveLimitError,
+    UploadBudget,
+    get_archive_type,
+)
 from app.util.dependencies import get_current_user
 from app.util.document import (
     delete_document_from_vector_store,
-    get_user_documents_from_vector_store,
-    insert_document_to_vector_store,
-    save_user_document_to_file,
+    delete_user_document_file,
+    document_exists_in_vector_store,
+    get_user_document_chunks_from_vector_store,
+    save_user_archive_to_files,
+    save_user_document_stream_to_file,
+    vector_executor,
 )
+from app.util.document_catalog import (
+    delete_document_record,
+    get_document_record,
+    list_document_records,
+)
+from app.util.etag import conditional_response, etag_matches, make_etag
+from app.util.extractor import UnsupportedDocumentError
+from app.util.ingest_job import get_ingest_job
 from app.util.logger import logger
+from app.util.vector_executor import VectorStoreBusyError
+
+BULK_UPLOAD_MAX_FILES = settings.BULK_UPLOAD_MAX_FILES
+DOCUMENT_PAGE_SIZE = settings.DOCUMENT_PAGE_SIZE
+DOCUMENT_PAGE_MAX_SIZE = settings.DOCUMENT_PAGE_MAX_SIZE
 
 documents_router = APIRouter()
 
 
 @documents_router.post("/user")
 async def upload_user_document(
+    request: Request,
     current_user: dict = Depends(get_current_user),
     document: UploadFile = File(...),
 ) -> JSONResponse:
@@ -24,41 +72,284 @@ async def upload_user_document(
         logger.info(f"Uploading user document: {document.filename}")
         user_id = current_user.get("sub")
         document_id = str(uuid.uuid4())
-        document_content = document.file.read().decode("utf-8")
-        save_user_document_to_file(user_id, document_id, document_content)
-        insert_document_to_vector_store(user_id, document_id, document.filename)
+        try:
+            await save_user_document_stream_to_file(
+                user_id, document_id, document
+            )
+            job_id = await request.app.state.ingest_service.submit(
+                user_id, document_id, document.filename
+            )
+        except Exception:
+            # 적재 작업이 가리키지 않는 원본 파일은 남기지 않는다
+            await run_in_threadpool(
+                delete_user_document_file, user_id, document_id
+            )
+            raise
         return JSONResponse(
-            content={"message": "Document uploaded successfully"}, status_code=200
+            content={
+                "message": "Document queued for ingestion",
+                "document_id": document_id,
+                "job_id": job_id,
+            },
+            status_code=202,
         )
+    except UnsupportedDocumentError as e:
+        raise UnsupportedDocumentFormatError(str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading user document: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@documents_router.post("/user/bulk")
+async def upload_user_documents_bulk(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    documents: list[UploadFile] = File(...),
+) -> JSONResponse:
+    try:
+        logger.info(f"Bulk uploading {len(documents)} user documents")
+        user_id = current_user.get("sub")
+        if len(documents) > BULK_UPLOAD_MAX_FILES:
+            raise BulkUploadLimitError(
+                f"Too many files: {len(documents)} > {BULK_UPLOAD_MAX_FILES}"
+            )
+
+        # 압축 파일은 멤버 단위로 풀어 각각 하나의 문서로 저장한다. 파일 수와
+        # 크기 한도는 요청의 모든 파일이 함께 사용한다.
+        budget = UploadBudget()
+        manifest = []
+        for document in documents:
+            try:
+                archive_type = await run_in_threadpool(
+                    get_archive_type, document.file
+                )
+                if archive_type is None:
+                    document_id = str(uuid.uuid4())
+                    try:
+                        size = await save_user_document_stream_to_file(
+                            user_id, document_id, document
+                        )
+                    except Exception:
+                        await run_in_threadpool(
+                            delete_user_document_file, user_id, document_id
+                        )
+                        raise
+                    manifest.append(
+                        {
+                            "filename": document.filename,
+                            "document_id": document_id,
+                        }
+                    )
+                    budget.charge(size)
+                else:
+                    manifest.extend(
+                        await run_in_threadpool(
+                            save_user_archive_to_files,
+                            user_id,
+                            document.file,
+                            archive_type,
+                            budget,
+                        )
+                    )
+            except ArchiveLimitError as e:
+                # 등록되지 않을 문서이므로 앞서 저장한 파일을 모두 지운다
+                for entry in manifest:
+                    if "document_id" in entry:
+                        await run_in_threadpool(
+                            delete_user_document_file,
+                            user_id,
+                            entry["document_id"],
+                        )
+                raise BulkUploadLimitError(str(e))
+            except Exception as e:
+                logger.error(f"Error saving {document.filename}: {e}")
+                manifest.append(
+                    {"filename": document.filename, "error": str(e)}
+                )
+
+        saved = [entry for entry in manifest if "document_id" in entry]
+        job_ids = await request.app.state.ingest_service.submit_bulk(
+            user_id,
+            [(entry["document_id"], entry["filename"]) for entry in saved],
+        )
+        for entry, job_id in zip(saved, job_ids):
+            entry["job_id"] = job_id
+        for entry in manifest:
+            entry["status"] = (
+                IngestJobStatus.QUEUED
+                if "job_id" in entry
+                else IngestJobStatus.FAILED
+            )
+
+        return JSONResponse(
+            content={
+                "message": f"{len(saved)} documents queued for ingestion",
+                "documents": manifest,
+            },
+            status_code=202,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error bulk uploading user documents: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @documents_router.get("/user")
 async def get_user_documents(
+    request: Request,
     current_user: dict = Depends(get_current_user),
-) -> JSONResponse:
+    limit: int = Query(DOCUMENT_PAGE_SIZE, gt=0, le=DOCUMENT_PAGE_MAX_SIZE),
+    cursor: str | None = Query(None),
+) -> Response:
     try:
         logger.info("Getting user documents")
         user_id = current_user.get("sub")
-        documents = get_user_documents_from_vector_store(user_id)
-        return JSONResponse(content={"documents": documents}, status_code=200)
+        try:
+            records, next_cursor = await list_document_records(
+                user_id, limit, cursor
+            )
+        except ValueError as e:
+            raise InvalidCursorError(str(e))
+        content = DocumentListResponse(
+            documents=[
+                DocumentResponse.model_validate(record) for record in records
+            ],
+            next_cursor=next_cursor,
+        ).model_dump_json()
+        return conditional_response(request, content, make_etag(content))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting user documents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@documents_router.get("/user/{document_id}")
+async def get_user_document_contents(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    document_id: str = Path(...),
+) -> Response:
+    try:
+        user_id = current_user.get("sub")
+        record = await get_document_record(user_id, document_id)
+        if record is None:
+            raise DocumentNotFoundError(document_id)
+        # 청크는 적재나 수정으로만 바뀌므로 vector store를 조회하기 전에
+        # 목록 항목으로 변경 여부를 확인한다
+        etag = make_etag(
+            record.id,
+            record.name,
+            record.content_hash,
+            str(record.chunk_count),
+            record.updated_at.isoformat(),
+        )
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return conditional_response(request, "", etag)
+        chunks = await vector_executor.run(
+            get_user_document_chunks_from_vector_store, user_id, document_id
+        )
+        content = DocumentContentResponse(
+            document_id=record.id,
+            document_name=record.name,
+            document_contents=chunks,
+        ).model_dump_json()
+        return conditional_response(request, content, etag)
+    except VectorStoreBusyError as e:
+        raise ServiceBusyError(str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting user document contents: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@documents_router.put("/{document_id}")
+async def update_user_document(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    document_id: str = Path(...),
+    document: UploadFile = File(...),
+) -> JSONResponse:
+    try:
+        logger.info(f"Updating user document: {document_id}")
+        user_id = current_user.get("sub")
+        if not await vector_executor.run(
+            document_exists_in_vector_store, user_id, document_id
+        ):
+            raise DocumentNotFoundError(document_id)
+        await save_user_document_stream_to_file(user_id, document_id, document)
+        job_id = await request.app.state.ingest_service.submit(
+            user_id,
+            document_id,
+            document.filename,
+            IngestJobOperation.UPDATE,
+        )
+        return JSONResponse(
+            content={
+                "message": "Document queued for ingestion",
+                "document_id": document_id,
+                "job_id": job_id,
+            },
+            status_code=202,
+        )
+    except UnsupportedDocumentError as e:
+        raise UnsupportedDocumentFormatError(str(e))
+    except VectorStoreBusyError as e:
+        raise ServiceBusyError(str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating user document: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@documents_router.get("/jobs/{job_id}")
+async def get_ingest_job_status(
+    current_user: dict = Depends(get_current_user),
+    job_id: str = Path(...),
+) -> IngestJobResponse:
+    try:
+        user_id = current_user.get("sub")
+        job = await get_ingest_job(job_id, user_id)
+        if job is None:
+            raise IngestJobNotFoundError(job_id)
+        return IngestJobResponse.model_validate(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting ingest job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @documents_router.delete("/{document_id}")
 async def delete_user_document(
+    request: Request,
     current_user: dict = Depends(get_current_user),
     document_id: str = Path(...),
 ) -> JSONResponse:
     try:
+        user_id = current_user.get("sub")
         logger.info(f"Deleting user document: {document_id}")
-        delete_document_from_vector_store(document_id)
+        # 적재 중인 작업이 삭제 후에 청크나 문서 목록을 다시 쓰지 않도록
+        # 작업이 멈춘 뒤에 삭제한다
+        await request.app.state.ingest_service.cancel(document_id)
+        await vector_executor.run(
+            delete_document_from_vector_store, user_id, document_id
+        )
+        await run_in_threadpool(
+            delete_user_document_file, user_id, document_id
+        )
+        await delete_document_record(user_id, document_id)
         return JSONResponse(
-            content={"message": "Document deleted successfully"}, status_code=200
+            content={"message": "Document deleted successfully"},
+            status_code=200,
         )
+    except VectorStoreBusyError as e:
+        raise ServiceBusyError(str(e))
     except Exception as e:
         logger.error(f"Error deleting user document: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import Field, SecretStr
 from pydantic_settings import BaseSettings
@@ -14,13 +14,61 @@ class Settings(BaseSettings):
     )
     OPENAI_API_KEY: SecretStr = Field(..., env="OPENAI_API_KEY")
     OPENAI_MODEL: str = Field(default="gpt-4", env="OPENAI_MODEL")
+    # openai, anthropic, google 또는 CHAT_MODELS를 함께 쓰는 router
+    CHAT_MODEL_TYPE: str = Field(default="openai", env="CHAT_MODEL_TYPE")
+    # router가 사용할 "제공자:모델" 목록, 모델을 생략하면 제공자 기본 모델
+    # anthropic은 langchain-anthropic, google은 langchain-google-genai
+    # 패키지를 추가로 설치해야 하므로 기본값은 openai만 사용한다
+    CHAT_MODELS: List[str] = Field(default=["openai"], env="CHAT_MODELS")
+    MODEL_ROUTER_MAX_ERROR_RATE: float = Field(
+        default=0.5, env="MODEL_ROUTER_MAX_ERROR_RATE", gt=0, le=1
+    )
+    MODEL_ROUTER_ERROR_WINDOW: float = Field(
+        default=60, env="MODEL_ROUTER_ERROR_WINDOW", gt=0
+    )
+    MODEL_ROUTER_MIN_SAMPLES: int = Field(
+        default=5, env="MODEL_ROUTER_MIN_SAMPLES", gt=0
+    )
+    MODEL_ROUTER_HEDGE_PERCENTILE: float = Field(
+        default=0.95, env="MODEL_ROUTER_HEDGE_PERCENTILE", gt=0, le=1
+    )
+    # 지연 시간 기록이 부족한 백엔드의 hedge 대기 시간(초)
+    MODEL_ROUTER_HEDGE_DELAY: float = Field(
+        default=10, env="MODEL_ROUTER_HEDGE_DELAY", gt=0
+    )
+    CHAT_PROMPT_PATH: str = Field(
+        default="app/prompts/chat_prompt.yaml", env="CHAT_PROMPT_PATH"
+    )
+    # 채팅 요청에서 답변 생성 전 단계별 제한 시간(초)
+    CHAT_SESSION_TIMEOUT: float = Field(
+        default=5, env="CHAT_SESSION_TIMEOUT", gt=0
+    )
+    CHAT_HISTORY_TIMEOUT: float = Field(
+        default=5, env="CHAT_HISTORY_TIMEOUT", gt=0
+    )
+    CHAT_RETRIEVAL_TIMEOUT: float = Field(
+        default=20, env="CHAT_RETRIEVAL_TIMEOUT", gt=0
+    )
+    # 스트리밍 응답의 첫 조각을 기다리는 동안 클라이언트 연결 확인 주기(초)
+    CHAT_DISCONNECT_POLL_INTERVAL: float = Field(
+        default=0.2, env="CHAT_DISCONNECT_POLL_INTERVAL", gt=0
+    )
+    # 채팅 프롬프트 파일 변경 확인 주기(초), 0이면 다시 읽지 않음
+    CHAT_PROMPT_RELOAD_INTERVAL: float = Field(
+        default=5, env="CHAT_PROMPT_RELOAD_INTERVAL", ge=0
+    )
     OPENAI_EMBEDDING_MODEL: str = Field(..., env="OPENAI_EMBEDDING_MODEL")
+    OPENAI_EMBEDDING_DIMENSIONS: Optional[int] = Field(
+        None, env="OPENAI_EMBEDDING_DIMENSIONS", gt=0
+    )
     ANTHROPIC_API_KEY: Optional[SecretStr] = Field(
         None, env="ANTHROPIC_API_KEY"
     )
-    ANTHROPIC_MODEL: Optional[str] = Field(None, env="ANTHROPIC_MODEL")
+    ANTHROPIC_MODEL: str = Field(
+        default="claude-3-5-sonnet-latest", env="ANTHROPIC_MODEL"
+    )
     GOOGLE_API_KEY: Optional[SecretStr] = Field(None, env="GOOGLE_API_KEY")
-    GOOGLE_MODEL: Optional[str] = Field(None, env="GOOGLE_MODEL")
+    GOOGLE_MODEL: str = Field(default="gemini-2.0-flash", env="GOOGLE_MODEL")
     GOOGLE_CLIENT_ID: Optional[str] = Field(None, env="GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET: Optional[SecretStr] = Field(
         None, env="GOOGLE_CLIENT_SECRET"
@@ -35,9 +83,206 @@ class Settings(BaseSettings):
     DB_NAME: str = Field(..., env="DB_NAME")
     CHROMA_DB_PATH: str = Field(..., env="CHROMA_DB_PATH")
     COLLECTION_NAME: str = Field(..., env="COLLECTION_NAME")
+    # vector store 샤딩: 0이면 사용자별, 1 이상이면 사용자 해시 버킷별 샤드
+    VECTOR_SHARD_BUCKETS: int = Field(
+        default=0, env="VECTOR_SHARD_BUCKETS", ge=0
+    )
+    VECTOR_SHARD_MAX_OPEN: int = Field(
+        default=64, env="VECTOR_SHARD_MAX_OPEN", gt=0
+    )
+    # 샤드를 나누어 둘 디렉터리 목록, 비어 있으면 CHROMA_DB_PATH
+    VECTOR_SHARD_PATHS: List[str] = Field(default=[], env="VECTOR_SHARD_PATHS")
+    # vector store 백엔드: chroma, hnsw(hnswlib 근사 검색), flat(전수 검색)
+    VECTOR_STORE_BACKEND: Literal["chroma", "hnsw", "flat"] = Field(
+        default="chroma", env="VECTOR_STORE_BACKEND"
+    )
+    HNSW_M: int = Field(default=16, env="HNSW_M", gt=0)
+    HNSW_EF_CONSTRUCTION: int = Field(
+        default=200, env="HNSW_EF_CONSTRUCTION", gt=0
+    )
+    HNSW_EF_SEARCH: int = Field(default=64, env="HNSW_EF_SEARCH", gt=0)
+    # hnsw/flat 후보 검색용 압축: 양자화 방식, 앞쪽 차원 수, 재점수 배수
+    VECTOR_QUANTIZATION: Literal["none", "int8", "binary"] = Field(
+        default="none", env="VECTOR_QUANTIZATION"
+    )
+    VECTOR_TRUNCATE_DIMENSIONS: Optional[int] = Field(
+        default=None, env="VECTOR_TRUNCATE_DIMENSIONS", gt=0
+    )
+    VECTOR_RESCORE_FACTOR: int = Field(
+        default=4, env="VECTOR_RESCORE_FACTOR", ge=1
+    )
+    # Chroma 호출 전용 스레드 수와 최대 대기 호출 수
+    VECTOR_STORE_WORKERS: int = Field(
+        default=8, env="VECTOR_STORE_WORKERS", gt=0
+    )
+    VECTOR_STORE_MAX_QUEUE: int = Field(
+        default=256, env="VECTOR_STORE_MAX_QUEUE", gt=0
+    )
     SESSION_SECRET_KEY: SecretStr = Field(..., env="SESSION_SECRET_KEY")
+    # CHUNK_SIZE/CHUNK_OVERLAP 단위는 CHUNK_MODE에 따라 문자 또는 토큰
+    CHUNK_MODE: Literal["character", "token"] = Field(
+        default="character", env="CHUNK_MODE"
+    )
     CHUNK_SIZE: int = Field(default=1000, env="CHUNK_SIZE", gt=0)
     CHUNK_OVERLAP: int = Field(default=200, env="CHUNK_OVERLAP", ge=0)
+    CHUNK_PROCESS_WORKERS: int = Field(
+        default=2, env="CHUNK_PROCESS_WORKERS", ge=0
+    )
+    CHUNK_PROCESS_POOL_THRESHOLD: int = Field(
+        default=4 * 1024 * 1024, env="CHUNK_PROCESS_POOL_THRESHOLD", gt=0
+    )
+    CHUNK_SEGMENT_SIZE: int = Field(
+        default=1024 * 1024, env="CHUNK_SEGMENT_SIZE", gt=0
+    )
+    # 텍스트 추출 프로세스 풀 워커 수, 워커별 메모리(bytes)와 문서당 시간(초)
+    # 제한
+    EXTRACT_PROCESS_WORKERS: int = Field(
+        default=2, env="EXTRACT_PROCESS_WORKERS", ge=0
+    )
+    EXTRACT_MEMORY_LIMIT: int = Field(
+        default=1024 * 1024 * 1024, env="EXTRACT_MEMORY_LIMIT", gt=0
+    )
+    EXTRACT_TIMEOUT: float = Field(default=120.0, env="EXTRACT_TIMEOUT", gt=0)
+    # 유사 중복 청크 제거 (SimHash 해밍 거리 기준, 0~3), 참조로 저장된
+    # 청크는 원본이 남아 있는 동안 원본 청크의 텍스트로 검색되므로 기본은
+    # 끄고, 켜더라도 기본 거리는 지문이 같은 청크만 묶는 0
+    DEDUP_ENABLED: bool = Field(default=False, env="DEDUP_ENABLED")
+    DEDUP_INDEX_PATH: Optional[str] = Field(
+        default=None, env="DEDUP_INDEX_PATH"
+    )
+    DEDUP_MAX_DISTANCE: int = Field(
+        default=0, env="DEDUP_MAX_DISTANCE", ge=0, le=3
+    )
+    # BM25 어휘 색인, 경로가 비어 있으면 CHROMA_DB_PATH/lexical_index
+    LEXICAL_INDEX_ENABLED: bool = Field(
+        default=True, env="LEXICAL_INDEX_ENABLED"
+    )
+    LEXICAL_INDEX_PATH: Optional[str] = Field(
+        default=None, env="LEXICAL_INDEX_PATH"
+    )
+    # 검색 방식: vector, lexical(BM25), hybrid(둘을 rank fusion으로 병합)
+    RETRIEVAL_MODE: Literal["vector", "lexical", "hybrid"] = Field(
+        default="vector", env="RETRIEVAL_MODE"
+    )
+    # 벡터 검색(질문 임베딩 포함)이 이 시간(초)을 넘으면 BM25 결과만 사용
+    RETRIEVAL_VECTOR_TIMEOUT: float = Field(
+        default=5.0, env="RETRIEVAL_VECTOR_TIMEOUT", gt=0
+    )
+    # 사용자별 문서 집합 버전, 경로가 비어 있으면
+    # CHROMA_DB_PATH/corpus_version.db
+    CORPUS_VERSION_PATH: Optional[str] = Field(
+        default=None, env="CORPUS_VERSION_PATH"
+    )
+    # 문서 집합이 같을 때 유사한 질문에는 LLM 호출 없이 이전 답변 사용
+    ANSWER_CACHE_ENABLED: bool = Field(
+        default=True, env="ANSWER_CACHE_ENABLED"
+    )
+    # 질문 임베딩의 코사인 유사도 기준
+    ANSWER_CACHE_THRESHOLD: float = Field(
+        default=0.95, env="ANSWER_CACHE_THRESHOLD", gt=0, le=1
+    )
+    ANSWER_CACHE_TTL: float = Field(default=3600, env="ANSWER_CACHE_TTL", gt=0)
+    ANSWER_CACHE_MAX_USERS: int = Field(
+        default=10000, env="ANSWER_CACHE_MAX_USERS", gt=0
+    )
+    ANSWER_CACHE_MAX_ENTRIES: int = Field(
+        default=64, env="ANSWER_CACHE_MAX_ENTRIES", gt=0
+    )
+    # 동시에 들어온 같은 질의 임베딩과 LLM 호출을 하나로 합침
+    SINGLE_FLIGHT_ENABLED: bool = Field(
+        default=True, env="SINGLE_FLIGHT_ENABLED"
+    )
+    # 검색할 후보 청크 수, 컨텍스트에는 토큰 예산 안에서 일부만 사용
+    RETRIEVAL_K: int = Field(default=12, env="RETRIEVAL_K", gt=0)
+    # 프롬프트에 넣을 검색 컨텍스트의 토큰 예산
+    CONTEXT_MAX_TOKENS: int = Field(
+        default=3000, env="CONTEXT_MAX_TOKENS", gt=0
+    )
+    # 벡터 검색 결과 중 코사인 유사도가 이보다 낮은 청크는 제외
+    CONTEXT_MIN_SCORE: float = Field(
+        default=0.2, env="CONTEXT_MIN_SCORE", ge=-1, le=1
+    )
+    CONTEXT_MAX_CHUNKS: int = Field(default=8, env="CONTEXT_MAX_CHUNKS", gt=0)
+    # 추출한 문서 텍스트 저장소 (zstd 압축 content-addressed blob)
+    BLOB_STORE_BACKEND: Literal["local", "s3"] = Field(
+        default="local", env="BLOB_STORE_BACKEND"
+    )
+    # 경로가 비어 있으면 CHROMA_DB_PATH/document_store
+    BLOB_STORE_PATH: Optional[str] = Field(default=None, env="BLOB_STORE_PATH")
+    BLOB_STORE_S3_BUCKET: Optional[str] = Field(
+        default=None, env="BLOB_STORE_S3_BUCKET"
+    )
+    BLOB_STORE_S3_PREFIX: str = Field(default="", env="BLOB_STORE_S3_PREFIX")
+    BLOB_STORE_S3_ENDPOINT_URL: Optional[str] = Field(
+        default=None, env="BLOB_STORE_S3_ENDPOINT_URL"
+    )
+    BLOB_FRAME_CHARS: int = Field(
+        default=64 * 1024, env="BLOB_FRAME_CHARS", gt=0
+    )
+    BLOB_COMPRESSION_LEVEL: int = Field(
+        default=3, env="BLOB_COMPRESSION_LEVEL", ge=1, le=22
+    )
+    UPLOAD_BLOCK_SIZE: int = Field(
+        default=1024 * 1024, env="UPLOAD_BLOCK_SIZE", gt=0
+    )
+    INGEST_BATCH_SIZE: int = Field(default=64, env="INGEST_BATCH_SIZE", gt=0)
+    EMBEDDING_BATCH_MAX_TOKENS: int = Field(
+        default=100000, env="EMBEDDING_BATCH_MAX_TOKENS", gt=0
+    )
+    EMBEDDING_BATCH_MAX_SIZE: int = Field(
+        default=2048, env="EMBEDDING_BATCH_MAX_SIZE", gt=0
+    )
+    EMBEDDING_BATCH_LINGER_MS: int = Field(
+        default=20, env="EMBEDDING_BATCH_LINGER_MS", ge=0
+    )
+    EMBEDDING_MAX_IN_FLIGHT: int = Field(
+        default=4, env="EMBEDDING_MAX_IN_FLIGHT", gt=0
+    )
+    EMBEDDING_CACHE_ENABLED: bool = Field(
+        default=True, env="EMBEDDING_CACHE_ENABLED"
+    )
+    EMBEDDING_CACHE_PATH: Optional[str] = Field(
+        None, env="EMBEDDING_CACHE_PATH"
+    )
+    EMBEDDING_CACHE_MAX_BYTES: int = Field(
+        default=1024 * 1024 * 1024, env="EMBEDDING_CACHE_MAX_BYTES", gt=0
+    )
+    QUERY_EMBEDDING_CACHE_ENABLED: bool = Field(
+        default=True, env="QUERY_EMBEDDING_CACHE_ENABLED"
+    )
+    QUERY_EMBEDDING_CACHE_SIZE: int = Field(
+        default=10000, env="QUERY_EMBEDDING_CACHE_SIZE", gt=0
+    )
+    QUERY_EMBEDDING_CACHE_TTL: float = Field(
+        default=3600, env="QUERY_EMBEDDING_CACHE_TTL", gt=0
+    )
+    # 여러 워커가 Postgres의 query_embedding 테이블을 함께 사용
+    QUERY_EMBEDDING_CACHE_SHARED: bool = Field(
+        default=False, env="QUERY_EMBEDDING_CACHE_SHARED"
+    )
+    INGEST_WORKER_COUNT: int = Field(
+        default=4, env="INGEST_WORKER_COUNT", gt=0
+    )
+    INGEST_MAX_JOBS_PER_USER: int = Field(
+        default=1, env="INGEST_MAX_JOBS_PER_USER", gt=0
+    )
+    # 일괄 업로드 한 건 안에서 동시에 적재하는 문서 수
+    INGEST_BULK_CONCURRENCY: int = Field(
+        default=4, env="INGEST_BULK_CONCURRENCY", gt=0
+    )
+    BULK_UPLOAD_MAX_FILES: int = Field(
+        default=5000, env="BULK_UPLOAD_MAX_FILES", gt=0
+    )
+    BULK_UPLOAD_MAX_EXTRACTED_BYTES: int = Field(
+        default=2 * 1024 * 1024 * 1024,
+        env="BULK_UPLOAD_MAX_EXTRACTED_BYTES",
+        gt=0,
+    )
+    # 문서 목록 페이지 크기
+    DOCUMENT_PAGE_SIZE: int = Field(default=50, env="DOCUMENT_PAGE_SIZE", gt=0)
+    DOCUMENT_PAGE_MAX_SIZE: int = Field(
+        default=500, env="DOCUMENT_PAGE_MAX_SIZE", gt=0
+    )
     ALLOWED_ORIGINS: List[str] = Field(
         default=["http://localhost:10002"], env="ALLOWED_ORIGINS"
     )
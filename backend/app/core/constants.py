@@ -14,8 +14,11 @@ class APIEndpoints:
     AUTH_LOGIN = "/api/v1/auth/login"
     AUTH_CALLBACK = "/api/v1/auth/login/callback"
     DOCUMENTS_UPLOAD = "/api/v1/documents/user"
+    DOCUMENTS_BULK_UPLOAD = "/api/v1/documents/user/bulk"
     DOCUMENTS_LIST = "/api/v1/documents/user"
     DOCUMENTS_DELETE = "/api/v1/documents/{document_id}"
+    DOCUMENTS_UPDATE = "/api/v1/documents/{document_id}"
+    DOCUMENTS_JOB = "/api/v1/documents/jobs/{job_id}"
 
 
 class LogMessages:
@@ -28,6 +31,7 @@ class LogMessages:
     TOKEN_REVOCATION_FAILED = "Token revocation failed"
     DOCUMENT_UPLOADED = "Document uploaded successfully"
     DOCUMENT_DELETED = "Document deleted successfully"
+    DOCUMENT_QUEUED = "Document queued for ingestion"
 
 
 class ErrorMessages:
@@ -42,6 +46,25 @@ class ErrorMessages:
     VECTOR_STORE_ERROR = "Vector store operation failed"
 
 
+class IngestJobStatus:
+    """Ingestion job states."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    UNFINISHED = (QUEUED, RUNNING)
+
+
+class IngestJobOperation:
+    """Ingestion job operations."""
+
+    INSERT = "insert"
+    UPDATE = "update"
+
+
 class GoogleOAuth:
     """Google OAuth related constants."""
 
@@ -15,6 +15,16 @@ class DocumentNotFoundError(HTTPException):
         )
 
 
+class IngestJobNotFoundError(HTTPException):
+    """Raised when an ingestion job is not found."""
+
+    def __init__(self, job_id: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ingest job with ID {job_id} not found",
+        )
+
+
 class AuthenticationError(HTTPException):
     """Raised when authentication fails."""
 
@@ -53,3 +63,53 @@ class VectorStoreError(HTTPException):
         super().__init__(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail
         )
+
+
+class BulkUploadLimitError(HTTPException):
+    """Raised when a bulk upload exceeds the file count or size limits."""
+
+    def __init__(self, detail: str = "Bulk upload limit exceeded"):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=detail,
+        )
+
+
+class UnsupportedDocumentFormatError(HTTPException):
+    """Raised when text cannot be extracted from an uploaded document."""
+
+    def __init__(self, detail: str = "Unsupported document format"):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=detail,
+        )
+
+
+class InvalidCursorError(HTTPException):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+        )
+
+
+class ServiceBusyError(HTTPException):
+    """Raised when a backend queue is full and the request is rejected."""
+
+    def __init__(self, detail: str = "Service is busy, try again later"):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+        )
+
+
+class ChatStageTimeoutError(HTTPException):
+    """Raised when a stage of a chat request does not finish in time."""
+
+    def __init__(self, stage: str):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Chat {stage} stage timed out",
+        )
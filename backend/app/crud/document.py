@@ -0,0 +1,135 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import DocumentRecord
+from app.util.logger import logger
+
+
+async def save_document_record(
+    db: AsyncSession,
+    document_id: str,
+    user_id: str,
+    name: str,
+    size: int,
+    chunk_count: int,
+    content_hash: str,
+) -> None:
+    """
+    문서 목록 항목 저장, 이미 있으면 생성 시각을 유지하고 갱신
+
+    Args:
+        db: 데이터베이스 세션
+        document_id: 문서 ID
+        user_id: 사용자 ID
+        name: 문서 이름
+        size: 추출한 텍스트 크기 (bytes)
+        chunk_count: 청크 수
+        content_hash: 추출한 텍스트의 SHA-256
+    """
+    try:
+        now = datetime.now()
+        values = {
+            "name": name,
+            "size": size,
+            "chunk_count": chunk_count,
+            "content_hash": content_hash,
+            "updated_at": now,
+        }
+        stmt = (
+            pg_insert(DocumentRecord)
+            .values(id=document_id, user_id=user_id, created_at=now, **values)
+            .on_conflict_do_update(index_elements=["id"], set_=values)
+        )
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error saving document record: {e}")
+        raise e
+
+
+async def get_document_record(
+    db: AsyncSession, user_id: str, document_id: str
+) -> Optional[DocumentRecord]:
+    """
+    사용자의 문서 목록 항목 조회
+
+    Args:
+        db: 데이터베이스 세션
+        user_id: 사용자 ID
+        document_id: 문서 ID
+
+    Returns:
+        DocumentRecord: 문서 목록 항목
+    """
+    try:
+        stmt = select(DocumentRecord).where(
+            DocumentRecord.id == document_id,
+            DocumentRecord.user_id == user_id,
+        )
+        return (await db.execute(stmt)).scalar_one_or_none()
+    except Exception as e:
+        logger.error(f"Error getting document record: {e}")
+        raise e
+
+
+async def list_document_records(
+    db: AsyncSession,
+    user_id: str,
+    limit: int,
+    after: Optional[tuple[datetime, str]] = None,
+) -> list[DocumentRecord]:
+    """
+    사용자의 문서 목록을 최신순으로 limit개 조회
+
+    Args:
+        db: 데이터베이스 세션
+        user_id: 사용자 ID
+        limit: 조회할 개수
+        after: 이전 페이지 마지막 항목의 (생성 시각, 문서 ID)
+
+    Returns:
+        list[DocumentRecord]: 문서 목록 항목 리스트
+    """
+    try:
+        stmt = select(DocumentRecord).where(DocumentRecord.user_id == user_id)
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(DocumentRecord.created_at, DocumentRecord.id)
+                < tuple_(*after)
+            )
+        stmt = stmt.order_by(
+            DocumentRecord.created_at.desc(), DocumentRecord.id.desc()
+        ).limit(limit)
+        return list((await db.execute(stmt)).scalars().all())
+    except Exception as e:
+        logger.error(f"Error listing document records: {e}")
+        raise e
+
+
+async def delete_document_record(
+    db: AsyncSession, user_id: str, document_id: str
+) -> None:
+    """
+    사용자의 문서 목록 항목 삭제
+
+    Args:
+        db: 데이터베이스 세션
+        user_id: 사용자 ID
+        document_id: 문서 ID
+    """
+    try:
+        stmt = delete(DocumentRecord).where(
+            DocumentRecord.id == document_id,
+            DocumentRecord.user_id == user_id,
+        )
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error deleting document record: {e}")
+        raise e
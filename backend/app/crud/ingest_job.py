@@ -0,0 +1,155 @@
+from typing import Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import IngestJobOperation, IngestJobStatus
+from app.models.ingest_job import IngestJob
+from app.util.logger import logger
+
+
+async def save_ingest_job(
+    db: AsyncSession,
+    job_id: str,
+    user_id: str,
+    document_id: str,
+    document_name: str,
+    operation: str = IngestJobOperation.INSERT,
+) -> None:
+    """
+    문서 적재 작업 저장
+
+    Args:
+        db: CRUD를 수행할 DB 세션
+        job_id: 작업 ID
+        user_id: 사용자 ID
+        document_id: 문서 ID
+        document_name: 문서 이름
+        operation: 작업 종류 (insert, update)
+
+    Returns:
+        None
+    """
+    try:
+        stmt = insert(IngestJob).values(
+            id=job_id,
+            user_id=user_id,
+            document_id=document_id,
+            document_name=document_name,
+            operation=operation,
+            status=IngestJobStatus.QUEUED,
+            chunks_done=0,
+            chunks_duplicate=0,
+        )
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error saving ingest job: {e}")
+        raise e
+
+
+async def save_ingest_jobs(
+    db: AsyncSession, user_id: str, jobs: list[tuple[str, str, str]]
+) -> None:
+    """
+    여러 문서 적재 작업을 한 번에 저장
+
+    Args:
+        db: CRUD를 수행할 DB 세션
+        user_id: 사용자 ID
+        jobs: (작업 ID, 문서 ID, 문서 이름) 리스트
+
+    Returns:
+        None
+    """
+    try:
+        stmt = insert(IngestJob).values(
+            [
+                {
+                    "id": job_id,
+                    "user_id": user_id,
+                    "document_id": document_id,
+                    "document_name": document_name,
+                    "operation": IngestJobOperation.INSERT,
+                    "status": IngestJobStatus.QUEUED,
+                    "chunks_done": 0,
+                    "chunks_duplicate": 0,
+                }
+                for job_id, document_id, document_name in jobs
+            ]
+        )
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error saving ingest jobs: {e}")
+        raise e
+
+
+async def update_ingest_job(db: AsyncSession, job_id: str, **values) -> None:
+    """
+    문서 적재 작업 상태 갱신
+
+    Args:
+        db: CRUD를 수행할 DB 세션
+        job_id: 작업 ID
+        values: 갱신할 컬럼 값
+
+    Returns:
+        None
+    """
+    try:
+        stmt = update(IngestJob).where(IngestJob.id == job_id).values(**values)
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error updating ingest job: {e}")
+        raise e
+
+
+async def get_ingest_job(
+    db: AsyncSession, job_id: str, user_id: str
+) -> Optional[IngestJob]:
+    """
+    사용자의 문서 적재 작업 조회
+
+    Args:
+        db: 데이터베이스 세션
+        job_id: 작업 ID
+        user_id: 사용자 ID
+
+    Returns:
+        IngestJob: 문서 적재 작업
+    """
+    try:
+        stmt = select(IngestJob).where(
+            IngestJob.id == job_id, IngestJob.user_id == user_id
+        )
+        return (await db.execute(stmt)).scalar_one_or_none()
+    except Exception as e:
+        logger.error(f"Error getting ingest job: {e}")
+        raise e
+
+
+async def get_unfinished_ingest_jobs(db: AsyncSession) -> list[IngestJob]:
+    """
+    완료되지 않은 문서 적재 작업 조회
+
+    Args:
+        db: 데이터베이스 세션
+
+    Returns:
+        list[IngestJob]: 생성 순으로 정렬된 작업 리스트
+    """
+    try:
+        stmt = (
+            select(IngestJob)
+            .where(IngestJob.status.in_(IngestJobStatus.UNFINISHED))
+            .order_by(IngestJob.created_at)
+        )
+        return list((await db.execute(stmt)).scalars().all())
+    except Exception as e:
+        logger.error(f"Error getting unfinished ingest jobs: {e}")
+        raise e
@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.query_embedding import QueryEmbedding
+from app.util.logger import logger
+
+
+async def get_query_embedding(db: AsyncSession, key: str) -> Optional[bytes]:
+    """
+    만료되지 않은 질의 임베딩 조회
+
+    Args:
+        db: 데이터베이스 세션
+        key: 캐시 키
+
+    Returns:
+        bytes: float32 임베딩, 없거나 만료되었으면 None
+    """
+    try:
+        stmt = select(QueryEmbedding.vector).where(
+            QueryEmbedding.key == key,
+            QueryEmbedding.expires_at > datetime.now(),
+        )
+        return (await db.execute(stmt)).scalar_one_or_none()
+    except Exception as e:
+        logger.error(f"Error getting query embedding: {e}")
+        raise e
+
+
+async def save_query_embedding(
+    db: AsyncSession, key: str, vector: bytes, expires_at: datetime
+) -> None:
+    """
+    질의 임베딩 저장, 같은 키가 있으면 덮어쓴다
+
+    Args:
+        db: 데이터베이스 세션
+        key: 캐시 키
+        vector: float32 임베딩
+        expires_at: 만료 시각
+    """
+    try:
+        stmt = (
+            pg_insert(QueryEmbedding)
+            .values(key=key, vector=vector, expires_at=expires_at)
+            .on_conflict_do_update(
+                index_elements=["key"],
+                set_={"vector": vector, "expires_at": expires_at},
+            )
+        )
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error saving query embedding: {e}")
+        raise e
+
+
+async def delete_expired_query_embeddings(db: AsyncSession) -> None:
+    """
+    만료된 질의 임베딩 삭제
+
+    Args:
+        db: 데이터베이스 세션
+    """
+    try:
+        stmt = delete(QueryEmbedding).where(
+            QueryEmbedding.expires_at <= datetime.now()
+        )
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error deleting expired query embeddings: {e}")
+        raise e
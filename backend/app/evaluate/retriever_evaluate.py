@@ -1,6 +1,7 @@
 from langchain.smith import RunEvalConfig, run_on_dataset
 
 from app.evaluate.langsmith_setting import client
+from app.util.vectorstore.base import VectorStore
 
 
 def retrieve_metrics(run, example):
@@ -16,8 +17,24 @@ def retrieve_metrics(run, example):
     """
     retrieved_docs = run.outputs.get("source_documents", [])
     retrieved_ids = [doc.metadata.get("doc_id") for doc in retrieved_docs]
+    return compute_retrieval_metrics(
+        retrieved_ids, set(example["relevant_doc_ids"])
+    )
+
+
+def compute_retrieval_metrics(
+    retrieved_ids: list[str], relevant_ids: set[str]
+) -> dict:
+    """
+    검색 결과 ID와 정답 ID로 Recall@k, Precision@k, MRR 계산
+
+    Args:
+        retrieved_ids (list[str]): 순위 순 검색 결과 ID
+        relevant_ids (set[str]): 정답 ID
 
-    relevant_ids = set(example["relevant_doc_ids"])
+    Returns:
+        dict: 리트리버 성능 측정 결과
+    """
     hits = relevant_ids.intersection(set(retrieved_ids))
 
     recall = len(hits) / len(relevant_ids) if relevant_ids else 0.0
@@ -54,3 +71,48 @@ def evaluate_retriever(model, dataset_name):
         evaluation=eval_config,
     )
     return results
+
+
+def evaluate_vector_store(
+    vector_store: VectorStore,
+    reference_store: VectorStore,
+    query_embeddings: list[list[float]],
+    k: int = 4,
+    where: dict | None = None,
+) -> dict:
+    """
+    압축 검색 설정의 성능 측정
+
+    같은 청크를 저장한 원본 정밀도 전수 검색(flat, 압축 없음) 결과를
+    정답으로 보고 양자화, 차원 축소 등을 적용한 vector store의 평균
+    Recall@k, Precision@k, MRR을 계산한다.
+
+    Args:
+        vector_store (VectorStore): 측정할 vector store
+        reference_store (VectorStore): 정답으로 사용할 vector store
+        query_embeddings (list[list[float]]): 질의 임베딩
+        k (int): 검색 결과 수
+        where (dict | None): 메타데이터 조건
+
+    Returns:
+        dict: 평균 리트리버 성능 측정 결과
+    """
+    results = vector_store.similarity_search_by_vectors(
+        query_embeddings, k=k, where=where
+    )
+    references = reference_store.similarity_search_by_vectors(
+        query_embeddings, k=k, where=where
+    )
+    metrics = [
+        compute_retrieval_metrics(
+            [document.id for document in result],
+            {document.id for document in reference},
+        )
+        for result, reference in zip(results, references)
+    ]
+    if not metrics:
+        return {}
+    return {
+        name: sum(metric[name] for metric in metrics) / len(metrics)
+        for name in metrics[0]
+    }
@@ -1,16 +1,29 @@
+import asyncio
 from contextlib import asynccontextmanager
 from time import perf_counter
 
 import uvicorn
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.api.v1.router import api_router
 from app.core.config import settings
-from app.services.chat_service import ChatService
+from app.services.chat_service import ChatService, answer_cache, llm_flight
+from app.services.ingest_service import IngestService
 from app.util.chat_history import close_chat_history, init_chat_history
+from app.util.dependencies import get_current_user
+from app.util.document import (
+    chunker,
+    document_extractor,
+    lexical_index,
+    query_embedding_cache,
+    query_embedding_flight,
+    vector_executor,
+    vector_shards,
+)
 from app.util.logger import logger, setup_logger
+from app.util.model_router import ModelRouter
 
 
 @asynccontextmanager
@@ -21,15 +34,34 @@ async def lifespan(app: FastAPI):
     Args:
         app (FastAPI): FastAPI 애플리케이션
     """
+    prompt_watcher = None
     try:
         setup_logger()
         logger.info("Server is starting...")
         await init_chat_history()
         app.state.chat_service = ChatService()
+        if settings.CHAT_PROMPT_RELOAD_INTERVAL:
+            prompt_watcher = asyncio.create_task(
+                app.state.chat_service.watch_chat_prompt(
+                    settings.CHAT_PROMPT_RELOAD_INTERVAL
+                )
+            )
+        app.state.ingest_service = IngestService()
+        await app.state.ingest_service.start()
         yield
     finally:
         if logger:
             logger.info("Server is stopping...")
+        if prompt_watcher is not None:
+            prompt_watcher.cancel()
+        if getattr(app.state, "ingest_service", None) is not None:
+            await app.state.ingest_service.stop()
+        chunker.close()
+        document_extractor.close()
+        vector_executor.close()
+        vector_shards.close()
+        if lexical_index is not None:
+            lexical_index.close()
         await close_chat_history()
 
 
@@ -56,6 +88,47 @@ def health_check():
     return {"message": "서버가 정상 실행중입니다."}
 
 
+# 내부 상태를 노출하는 진단 엔드포인트는 인증된 사용자만 조회할 수 있다
+@app.get("/health/vector-store", dependencies=[Depends(get_current_user)])
+def vector_store_health_check():
+    return vector_executor.stats()
+
+
+@app.get(
+    "/health/query-embedding-cache", dependencies=[Depends(get_current_user)]
+)
+def query_embedding_cache_health_check():
+    if query_embedding_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **query_embedding_cache.stats()}
+
+
+@app.get("/health/answer-cache", dependencies=[Depends(get_current_user)])
+def answer_cache_health_check():
+    if answer_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **answer_cache.stats()}
+
+
+@app.get("/health/single-flight", dependencies=[Depends(get_current_user)])
+def single_flight_health_check():
+    if llm_flight is None or query_embedding_flight is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "llm": llm_flight.stats(),
+        "query_embedding": query_embedding_flight.stats(),
+    }
+
+
+@app.get("/health/model-router", dependencies=[Depends(get_current_user)])
+def model_router_health_check(request: Request):
+    chat_model = request.app.state.chat_service.chat_model
+    if not isinstance(chat_model, ModelRouter):
+        return {"enabled": False}
+    return {"enabled": True, "backends": chat_model.stats()}
+
+
 @app.middleware("http")
 async def log_processing_time(request: Request, call_next):
     start_time = perf_counter()
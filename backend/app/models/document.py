@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+
+from app.db.database import Base
+
+
+class DocumentRecord(Base):
+    __tablename__ = "documents"
+    __table_args__ = (
+        # 목록 조회의 keyset 페이지네이션 순서
+        Index(
+            "documents_user_id_created_at_idx", "user_id", "created_at", "id"
+        ),
+    )
+    id = Column(String(36), primary_key=True)
+    user_id = Column(String(100), nullable=False)
+    name = Column(String(255), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    chunk_count = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.now, onupdate=datetime.now, nullable=False
+    )
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String, Text
+
+from app.db.database import Base
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_job"
+    id = Column(String(36), primary_key=True)
+    user_id = Column(String(100), index=True)
+    document_id = Column(String(36))
+    document_name = Column(String(255))
+    operation = Column(String(20), default="insert")
+    status = Column(String(20))
+    chunks_done = Column(Integer, default=0)
+    chunks_duplicate = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
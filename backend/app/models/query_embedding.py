@@ -0,0 +1,10 @@
+from sqlalchemy import Column, DateTime, LargeBinary, String
+
+from app.db.database import Base
+
+
+class QueryEmbedding(Base):
+    __tablename__ = "query_embedding"
+    key = Column(String(64), primary_key=True)
+    vector = Column(LargeBinary, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class DocumentResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    document_id: str = Field(validation_alias="id")
+    document_name: str = Field(validation_alias="name")
+    size: int
+    chunk_count: int
+    content_hash: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class DocumentListResponse(BaseModel):
+    documents: list[DocumentResponse]
+    next_cursor: Optional[str] = None
+
+
+class DocumentContentResponse(BaseModel):
+    document_id: str
+    document_name: str
+    document_contents: list[str]
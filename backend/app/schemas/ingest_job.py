@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+
+class IngestJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: str = Field(validation_alias="id")
+    document_id: str
+    document_name: str
+    operation: str
+    status: str
+    chunks_done: int
+    chunks_duplicate: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    @computed_field
+    @property
+    def dedup_ratio(self) -> float:
+        """처리한 청크 중 중복 참조로 저장된 비율"""
+        if not self.chunks_done:
+            return 0.0
+        return self.chunks_duplicate / self.chunks_done
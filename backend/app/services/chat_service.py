@@ -1,21 +1,70 @@
+import asyncio
 import logging
+import os
+from contextlib import aclosing
 from operator import itemgetter
+from typing import AsyncIterator, Awaitable, Callable
 
 import yaml
 from fastapi import HTTPException
-from langchain_core.messages import BaseMessage, trim_messages
+from langchain_core.documents import Document
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    trim_messages,
+)
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import Runnable, RunnablePassthrough
 
 from app.core.config import settings
+from app.core.exceptions import ChatStageTimeoutError, ServiceBusyError
+from app.util.answer_cache import SemanticAnswerCache
 from app.util.chat_history import get_chat_history
-from app.util.document import vector_store
+from app.util.context_packer import pack_context
+from app.util.document import (
+    aembed_query,
+    asearch_user_documents,
+    asearch_user_documents_lexical,
+    get_corpus_version,
+    merge_retrieved_chunks,
+)
+from app.util.model_router import ModelRouter, create_chat_model
+from app.util.rank_fusion import reciprocal_rank_fusion
+from app.util.single_flight import SingleFlight
 from app.util.tokenizer import OpenAiTokenizer
+from app.util.vector_executor import VectorStoreBusyError
+
+CHAT_MODEL_TYPE = settings.CHAT_MODEL_TYPE
+CHAT_MODELS = settings.CHAT_MODELS
+CHAT_PROMPT_PATH = settings.CHAT_PROMPT_PATH
+CHAT_SESSION_TIMEOUT = settings.CHAT_SESSION_TIMEOUT
+CHAT_HISTORY_TIMEOUT = settings.CHAT_HISTORY_TIMEOUT
+CHAT_RETRIEVAL_TIMEOUT = settings.CHAT_RETRIEVAL_TIMEOUT
+LEXICAL_INDEX_ENABLED = settings.LEXICAL_INDEX_ENABLED
+RETRIEVAL_MODE = settings.RETRIEVAL_MODE
+RETRIEVAL_VECTOR_TIMEOUT = settings.RETRIEVAL_VECTOR_TIMEOUT
+RETRIEVAL_K = settings.RETRIEVAL_K
+CONTEXT_MAX_TOKENS = settings.CONTEXT_MAX_TOKENS
+CONTEXT_MIN_SCORE = settings.CONTEXT_MIN_SCORE
+CONTEXT_MAX_CHUNKS = settings.CONTEXT_MAX_CHUNKS
+ANSWER_CACHE_ENABLED = settings.ANSWER_CACHE_ENABLED
+SINGLE_FLIGHT_ENABLED = settings.SINGLE_FLIGHT_ENABLED
 
-OPENAI_API_KEY = settings.OPENAI_API_KEY
-OPENAI_MODEL = settings.OPENAI_MODEL
+# 문서 집합이 바뀌지 않은 사용자의 유사한 질문은 이전 답변으로 응답
+answer_cache = (
+    SemanticAnswerCache(
+        threshold=settings.ANSWER_CACHE_THRESHOLD,
+        ttl=settings.ANSWER_CACHE_TTL,
+        max_users=settings.ANSWER_CACHE_MAX_USERS,
+        max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    )
+    if ANSWER_CACHE_ENABLED
+    else None
+)
+
+# 대화 기록이 없고 컨텍스트와 질문이 같은 동시 요청은 LLM을 한 번만 호출
+llm_flight = SingleFlight() if SINGLE_FLIGHT_ENABLED else None
 
 trimmer = trim_messages(
     strategy="last",
@@ -24,100 +73,608 @@ trimmer = trim_messages(
 )
 
 
+async def run_stage(stage: str, awaitable: Awaitable, timeout: float):
+    """
+    채팅 요청의 한 단계를 제한 시간 안에 실행
+
+    Args:
+        stage (str): 단계 이름
+        awaitable (Awaitable): 단계 작업
+        timeout (float): 제한 시간 (초)
+
+    Returns:
+        단계 작업의 결과
+
+    Raises:
+        ChatStageTimeoutError: 제한 시간을 넘은 경우
+    """
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except TimeoutError:
+        raise ChatStageTimeoutError(stage)
+
+
+def load_chat_prompt(path: str) -> ChatPromptTemplate:
+    """
+    YAML 파일에서 채팅 프롬프트 읽기
+
+    Args:
+        path (str): 프롬프트 YAML 파일 경로
+
+    Returns:
+        ChatPromptTemplate: 채팅 프롬프트
+    """
+    messages = []
+
+    with open(path, "r") as f:
+        cfg = yaml.safe_load(f)
+
+    for message in cfg["messages"]:
+        if message["type"] == "system":
+            messages.append(("system", message["content"]))
+        elif message["type"] == "user":
+            messages.append(("user", message["content"]))
+        elif message["type"] == "placeholder":
+            messages.append(MessagesPlaceholder(variable_name=message["name"]))
+    return ChatPromptTemplate.from_messages(messages)
+
+
+class ChatTurn:
+    """
+    답변을 생성하기 전 단계를 동시에 실행하는 채팅 요청 하나
+
+    생성할 때 (세션 확인 후 대화 기록 조회)와 문서 검색을 시작하고, 답변
+    캐시를 사용하면 문서 집합 버전도 함께 읽는다. 질문 임베딩은 처음
+    필요할 때 한 번 구하여 답변 캐시 키와 벡터 검색이 함께 사용하므로,
+    캐시 조회가 검색과 대화 기록 조회를 늦추지 않는다. 캐시된 답변을
+    사용하면 검색을 취소하고, 한 단계가 실패하면 나머지 단계를 취소한다.
+    """
+
+    def __init__(
+        self,
+        service: "ChatService",
+        user_query: str,
+        user_id: str,
+        session_id: str | Awaitable[str],
+    ):
+        self.user_query = user_query
+        self.user_id = user_id
+        self._embedding: asyncio.Task | None = None
+        self.session = asyncio.ensure_future(
+            service.resolve_session_id(session_id)
+        )
+        self.version = (
+            asyncio.ensure_future(
+                asyncio.to_thread(get_corpus_version, user_id)
+            )
+            if answer_cache is not None
+            else None
+        )
+        self.history = asyncio.ensure_future(self.load_history())
+        self.retrieval = asyncio.ensure_future(
+            run_stage(
+                "retrieval", self.retrieve(service), CHAT_RETRIEVAL_TIMEOUT
+            )
+        )
+
+    def embed_query(self) -> Awaitable[list[float]]:
+        """
+        질문 임베딩, 처음 호출할 때 시작하고 이후 호출은 결과를 공유
+
+        Returns:
+            Awaitable[list[float]]: 질문 임베딩
+        """
+        if self._embedding is None:
+            self._embedding = asyncio.ensure_future(
+                aembed_query(self.user_query)
+            )
+        # 기다리던 쪽이 취소되어도 다른 쪽이 기다리는 임베딩은 계속된다
+        return asyncio.shield(self._embedding)
+
+    async def load_history(self) -> tuple[str, list[BaseMessage]]:
+        """
+        세션 확인 후 대화 기록 조회
+
+        Returns:
+            tuple[str, list[BaseMessage]]: (세션 아이디, 대화 기록)
+        """
+        session_id = await self.session
+        chat_history = await run_stage(
+            "history",
+            get_chat_history(session_id).aget_messages(),
+            CHAT_HISTORY_TIMEOUT,
+        )
+        return session_id, chat_history
+
+    async def retrieve(self, service: "ChatService") -> dict:
+        """
+        문서 검색
+
+        버전을 검색 전에 읽어야 답변을 만드는 동안 바뀐 문서가 이전 버전의
+        답변으로 저장되므로, 버전 읽기가 끝난 뒤 검색한다.
+        """
+        if self.version is not None:
+            await asyncio.wait([self.version])
+        return await service.retrieve_context(
+            self.user_query, self.user_id, self.embed_query
+        )
+
+    async def get_cache_key(self) -> tuple[int, list[float]] | None:
+        """
+        답변 캐시 조회에 쓸 문서 집합 버전과 질문 임베딩
+
+        BM25 색인을 사용하면 벡터 검색과 같이 RETRIEVAL_VECTOR_TIMEOUT까지만
+        임베딩을 기다리므로, 임베딩 API가 느려도 캐시 조회가 BM25 결과로
+        답하는 검색보다 요청을 늦추지 않는다.
+
+        Returns:
+            tuple[int, list[float]] | None: (버전, 질문 임베딩), 캐시를 쓰지
+                않거나 임베딩에 실패하거나 제한 시간을 넘으면 None
+        """
+        if self.version is None:
+            return None
+        embedding = self.embed_query()
+        try:
+            version = await self.version
+            return version, await asyncio.wait_for(
+                embedding,
+                RETRIEVAL_VECTOR_TIMEOUT if LEXICAL_INDEX_ENABLED else None,
+            )
+        except Exception as e:
+            embedding.cancel()
+            logging.warning(f"Answer cache lookup failed: {e!r}")
+            return None
+
+    async def get_cached_answer(
+        self, cache_key: tuple[int, list[float]] | None
+    ) -> str | None:
+        """
+        대화 기록이 없는 질문이면 답변 캐시 조회
+
+        캐시 키에는 대화 기록이 없으므로, "왜?"처럼 앞의 대화에 따라 뜻이
+        달라지는 후속 질문은 캐시를 사용하지 않는다. 답변을 저장할 때도
+        대화 기록이 없는 질문만 저장한다.
+
+        Args:
+            cache_key (tuple[int, list[float]] | None): 답변 캐시 키
+
+        Returns:
+            str | None: 캐시된 답변, 없거나 대화 기록이 있으면 None
+        """
+        if cache_key is None:
+            return None
+        answer = answer_cache.get(self.user_id, *cache_key)
+        if answer is None:
+            return None
+        _, chat_history = await self.history
+        if chat_history:
+            return None
+        self.retrieval.cancel()
+        return answer
+
+    async def prepare(self) -> tuple[str, str, list[BaseMessage]]:
+        """
+        문서 검색과 대화 기록 조회 결과
+
+        asyncio.gather로 함께 기다리므로 전체 대기 시간이 두 경로 중 긴
+        쪽에 가깝다.
+
+        Returns:
+            tuple[str, str, list[BaseMessage]]: (세션 아이디, 컨텍스트,
+                대화 기록)
+
+        Raises:
+            ChatStageTimeoutError: 단계가 제한 시간 안에 끝나지 않은 경우
+        """
+        try:
+            contexts, (session_id, chat_history) = await asyncio.gather(
+                self.retrieval, self.history
+            )
+        except BaseException:
+            self.close()
+            raise
+
+        context = "\n".join([doc.page_content for doc in contexts["context"]])
+        return session_id, context, chat_history
+
+    def close(self) -> None:
+        """
+        끝나지 않은 단계 취소
+        """
+        for task in (
+            self.session,
+            self.version,
+            self._embedding,
+            self.history,
+            self.retrieval,
+        ):
+            if task is None:
+                continue
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # 사용하지 않은 단계의 예외는 이미 처리된 요청의 것이다
+                task.exception()
+
+
 class ChatService:
-    def __init__(self, model_type: str = "openai"):
+    """
+    채팅 응답 서비스
+
+    프롬프트와 체인은 생성할 때 한 번 만들어 모든 요청이 공유한다.
+    프롬프트 파일이 바뀌면 reload_chat_prompt가 새 체인을 만든 뒤 참조
+    하나를 바꾸므로, 진행 중인 요청은 시작할 때의 체인을 그대로 사용한다.
+    """
+
+    def __init__(
+        self,
+        model_type: str = CHAT_MODEL_TYPE,
+        prompt_path: str = CHAT_PROMPT_PATH,
+    ):
         self.chat_model = self.get_chat_model(model_type)
+        self.prompt_path = prompt_path
+        self.prompt_version = None
+        self.chain = None
+        self.reload_chat_prompt()
 
-    def get_chat_model(self, model_type: str) -> ChatOpenAI:
-        if model_type == "openai":
-            if not OPENAI_API_KEY.get_secret_value():
-                raise ValueError("OPENAI_API_KEY is not set.")
-            return ChatOpenAI(
-                api_key=OPENAI_API_KEY.get_secret_value(), model=OPENAI_MODEL
-            )
-        # elif model_type == "anthropic":
-        #     return Anthropic(api_key=SecretStr(ANTHROPIC_API_KEY), model=ANTHROPIC_MODEL)
-        # elif model_type == "google":
-        #     return Google(api_key=SecretStr(GOOGLE_API_KEY), model=GOOGLE_MODEL)
-        else:
-            raise ValueError(f"Invalid model type: {model_type}")
-
-    
-    def get_chat_prompt(self) -> ChatPromptTemplate:
-
-        messages = []
-
-        with open("app/prompts/chat_prompt.yaml", "r") as f:    
-            cfg = yaml.safe_load(f)
-
-        for message in cfg["messages"]:
-            if message["type"] == "system":
-                messages.append(("system", message["content"]))
-            elif message["type"] == "user":
-                messages.append(("user", message["content"]))
-            elif message["type"] == "placeholder":
-                messages.append(MessagesPlaceholder(variable_name=message["name"]))
-        return ChatPromptTemplate.from_messages(messages)
+    def get_chat_model(self, model_type: str) -> Runnable:
+        """
+        채팅 모델 생성
+
+        router는 CHAT_MODELS의 모델을 모두 만들어 지연 시간과 오류율에 따라
+        요청을 나누는 ModelRouter를 반환한다.
+
+        Args:
+            model_type (str): openai, anthropic, google, router
+
+        Returns:
+            Runnable: 채팅 모델
+        """
+        if model_type != "router":
+            return create_chat_model(model_type)
+        backends = []
+        for spec in CHAT_MODELS:
+            provider, _, model = spec.partition(":")
+            backends.append((spec, create_chat_model(provider, model or None)))
+        return ModelRouter(
+            backends,
+            error_window=settings.MODEL_ROUTER_ERROR_WINDOW,
+            max_error_rate=settings.MODEL_ROUTER_MAX_ERROR_RATE,
+            min_samples=settings.MODEL_ROUTER_MIN_SAMPLES,
+            hedge_percentile=settings.MODEL_ROUTER_HEDGE_PERCENTILE,
+            hedge_delay=settings.MODEL_ROUTER_HEDGE_DELAY,
+        )
+
+    def reload_chat_prompt(self) -> bool:
+        """
+        프롬프트 파일이 바뀌었으면 다시 읽어 체인 교체
+
+        파일을 읽거나 파싱하다 실패하면 예외를 그대로 전달하고 기존 체인을
+        유지한다.
+
+        Returns:
+            bool: 체인을 교체했는지 여부
+        """
+        stat = os.stat(self.prompt_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == self.prompt_version:
+            return False
+        chain = self.build_chain(load_chat_prompt(self.prompt_path))
+        self.chain = chain
+        self.prompt_version = version
+        return True
+
+    async def watch_chat_prompt(self, interval: float) -> None:
+        """
+        interval초마다 프롬프트 파일 변경을 확인하여 다시 읽기
+
+        Args:
+            interval (float): 확인 주기 (초)
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await asyncio.to_thread(self.reload_chat_prompt):
+                    logging.info(f"Reloaded chat prompt: {self.prompt_path}")
+            except Exception as e:
+                logging.error(f"Failed to reload chat prompt: {e!r}")
 
     async def get_answer(
-        self, user_query: str, session_id: str
+        self, user_query: str, session_id: str | Awaitable[str], user_id: str
     ) -> BaseMessage:
         """
         유저의 질문에 응답을 반환
 
+        답변 캐시 조회, 세션 확인과 대화 기록 조회, 문서 검색은 ChatTurn에서
+        동시에 실행한다. 대화 기록이 없으면 답변 캐시를 사용하고, 컨텍스트와
+        질문이 같은 진행 중인 LLM 호출의 결과를 함께 받는다.
+
         Args:
             user_query (str): 유저의 질문
-            session_id (str): 세션 아이디
+            session_id (str | Awaitable[str]): 세션 아이디 또는 세션 아이디를
+                구하는 작업
+            user_id (str): 유저 아이디
         Returns:
             BaseMessage: 응답
         """
+        turn = ChatTurn(self, user_query, user_id, session_id)
         try:
-            prompt = self.get_chat_prompt()
+            cache_key = await turn.get_cache_key()
+            answer = await turn.get_cached_answer(cache_key)
+            if answer is not None:
+                return await self.save_chat_turn(
+                    user_query, await turn.session, answer
+                )
 
-            contexts = self.retrieve_context(user_query)
-            context = "\n".join(
-                [doc.page_content for doc in contexts["context"]]
-            )
+            chain = self.chain
 
-            chain = prompt | self.chat_model
+            session_id, context, chat_history = await turn.prepare()
+            # 저장소에 따라 대화 기록 리스트가 저장 후 바뀌므로 미리 확인
+            first_turn = not chat_history
 
-            chain_with_trimmer = (
-                RunnablePassthrough.assign(
-                    chat_history=itemgetter("chat_history") | trimmer
+            inputs = {
+                "context": context,
+                "user_query": user_query,
+                "chat_history": chat_history,
+            }
+            if llm_flight is not None and first_turn:
+                result = await llm_flight.do(
+                    ("invoke", id(chain), context, user_query),
+                    lambda: chain.ainvoke(inputs),
                 )
-                | chain
-            )
+            else:
+                result = await chain.ainvoke(inputs)
+            await self.save_chat_turn(user_query, session_id, result.content)
 
-            chain_with_history = RunnableWithMessageHistory(
-                chain_with_trimmer,
-                get_chat_history,
-                input_messages_key="user_query",
-                history_messages_key="chat_history",
-            )
+            if cache_key is not None and first_turn:
+                answer_cache.put(user_id, *cache_key, result.content)
+            return result
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"Error in chat_service: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            turn.close()
 
-            result = await chain_with_history.ainvoke(
-                {"context": context, "user_query": user_query},
-                config={"configurable": {"session_id": session_id}},
-            )
+    async def astream_answer(
+        self, user_query: str, session_id: str | Awaitable[str], user_id: str
+    ) -> AsyncIterator[str]:
+        """
+        유저의 질문에 대한 응답을 생성되는 대로 조각 단위로 반환
 
-            return result
+        get_answer와 같은 체인을 astream으로 실행한다. 대화 기록과 답변
+        캐시는 생성이 끝난 뒤 한 번 저장하고, 중간에 스트림을 닫으면 모델
+        호출을 취소하고 저장하지 않는다. 캐시된 답변은 한 조각으로 반환한다.
+
+        Args:
+            user_query (str): 유저의 질문
+            session_id (str | Awaitable[str]): 세션 아이디 또는 세션 아이디를
+                구하는 작업
+            user_id (str): 유저 아이디
+
+        Yields:
+            str: 응답 조각
+        """
+        turn = ChatTurn(self, user_query, user_id, session_id)
+        try:
+            cache_key = await turn.get_cache_key()
+            answer = await turn.get_cached_answer(cache_key)
+            if answer is not None:
+                await self.save_chat_turn(
+                    user_query, await turn.session, answer
+                )
+                yield answer
+                return
+
+            chain = self.chain
+
+            session_id, context, chat_history = await turn.prepare()
+            # 저장소에 따라 대화 기록 리스트가 저장 후 바뀌므로 미리 확인
+            first_turn = not chat_history
+
+            inputs = {
+                "context": context,
+                "user_query": user_query,
+                "chat_history": chat_history,
+            }
+            if llm_flight is not None and first_turn:
+                # 같은 스트림을 받는 요청이 모두 닫히면 모델 호출도 취소된다
+                upstream = llm_flight.stream(
+                    ("stream", id(chain), context, user_query),
+                    lambda: chain.astream(inputs),
+                )
+            else:
+                upstream = chain.astream(inputs)
+
+            chunks = []
+            async with aclosing(upstream) as stream:
+                async for chunk in stream:
+                    if chunk.content:
+                        chunks.append(chunk.content)
+                        yield chunk.content
+
+            answer = "".join(chunks)
+            await self.save_chat_turn(user_query, session_id, answer)
+            if cache_key is not None and first_turn:
+                answer_cache.put(user_id, *cache_key, answer)
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Error in chat_service: {e}")
             raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            turn.close()
+
+    async def resolve_session_id(
+        self, session_id: str | Awaitable[str]
+    ) -> str:
+        """
+        세션 아이디 확인
+
+        Args:
+            session_id (str | Awaitable[str]): 세션 아이디 또는 세션 아이디를
+                구하는 작업
+
+        Returns:
+            str: 세션 아이디
+        """
+        if isinstance(session_id, str):
+            return session_id
+        return await run_stage("session", session_id, CHAT_SESSION_TIMEOUT)
+
+    def build_chain(self, prompt: ChatPromptTemplate) -> Runnable:
+        """
+        채팅 체인 생성
+
+        대화 기록은 ChatTurn에서 미리 불러와 입력으로 넣고, 답변 후
+        save_chat_turn에서 저장한다.
 
-    def retrieve_context(self, user_query: str) -> dict:
+        Args:
+            prompt (ChatPromptTemplate): 채팅 프롬프트
+
+        Returns:
+            Runnable: context, user_query, chat_history를 입력받는 체인
+        """
+        return (
+            RunnablePassthrough.assign(
+                chat_history=itemgetter("chat_history") | trimmer
+            )
+            | prompt
+            | self.chat_model
+        )
+
+    async def save_chat_turn(
+        self, user_query: str, session_id: str, answer: str
+    ) -> AIMessage:
         """
-        유저의 질문에 대해 유사도 높은 문서 반환
+        질문과 답변을 대화 기록에 추가하고 답변 반환
 
         Args:
             user_query (str): 유저의 질문
+            session_id (str): 세션 아이디
+            answer (str): 답변
+
+        Returns:
+            AIMessage: 응답
+        """
+        message = AIMessage(content=answer)
+        await get_chat_history(session_id).aadd_messages(
+            [HumanMessage(content=user_query), message]
+        )
+        return message
+
+    async def retrieve_context(
+        self,
+        user_query: str,
+        user_id: str,
+        embed_query: Callable[[], Awaitable[list[float]]] | None = None,
+    ) -> dict:
+        """
+        유저의 질문에 대해 유저의 문서 중 유사도 높은 문서 반환
+
+        RETRIEVAL_K개의 후보 중 CONTEXT_MAX_TOKENS 안에 들어가는 청크를 순위
+        순으로 고른다. 유사도 기준은 점수가 비교 가능한 vector 모드에서만
+        적용한다. 고른 청크 중 같은 문서에서 겹치거나 이어지는 청크는 원문
+        구간 하나로 병합한다.
+
+        Args:
+            user_query (str): 유저의 질문
+            user_id (str): 유저 아이디
+            embed_query (Callable[[], Awaitable[list[float]]] | None): 다른
+                단계와 공유하는 질문 임베딩, 없으면 검색에서 구한다
 
         Returns:
             dict
         """
         try:
-            retrieved_docs = vector_store.similarity_search(user_query)
-            return {"context": retrieved_docs}
+            retrieved_docs = await self.search_documents(
+                user_query, user_id, embed_query
+            )
+            packed_docs = pack_context(
+                retrieved_docs,
+                CONTEXT_MAX_TOKENS,
+                CONTEXT_MIN_SCORE if RETRIEVAL_MODE == "vector" else None,
+                CONTEXT_MAX_CHUNKS,
+            )
+            # 병합된 구간은 구성 청크의 합보다 짧으므로 예산을 넘지 않는다
+            return {
+                "context": await asyncio.to_thread(
+                    merge_retrieved_chunks, user_id, packed_docs
+                )
+            }
+        except VectorStoreBusyError as e:
+            raise ServiceBusyError(str(e))
         except Exception as e:
             logging.error(f"Error in retrieve_context: {e}")
             raise HTTPException(status_code=500, detail=str(e))
+
+    async def search_documents(
+        self,
+        user_query: str,
+        user_id: str,
+        embed_query: Callable[[], Awaitable[list[float]]] | None = None,
+    ) -> list[Document]:
+        """
+        RETRIEVAL_MODE에 따라 유저의 문서 검색
+
+        hybrid는 BM25 검색과 벡터 검색을 동시에 실행하여 reciprocal rank
+        fusion으로 병합한다. BM25 색인을 사용하면 vector와 hybrid 모두 벡터
+        검색(질문 임베딩 포함)이 RETRIEVAL_VECTOR_TIMEOUT을 넘거나 실패할 때
+        BM25 결과만 사용한다.
+
+        Args:
+            user_query (str): 유저의 질문
+            user_id (str): 유저 아이디
+            embed_query (Callable[[], Awaitable[list[float]]] | None): 다른
+                단계와 공유하는 질문 임베딩, 없으면 검색에서 구한다
+
+        Returns:
+            list[Document]: 검색된 청크
+        """
+        if RETRIEVAL_MODE == "lexical":
+            return await asearch_user_documents_lexical(
+                user_id, user_query, RETRIEVAL_K
+            )
+
+        lexical_search = None
+        if RETRIEVAL_MODE == "hybrid" and LEXICAL_INDEX_ENABLED:
+            lexical_search = asyncio.create_task(
+                asearch_user_documents_lexical(
+                    user_id, user_query, RETRIEVAL_K
+                )
+            )
+
+        async def search_by_vector() -> list[Document]:
+            embedding = None if embed_query is None else await embed_query()
+            return await asearch_user_documents(
+                user_id, user_query, RETRIEVAL_K, embedding
+            )
+
+        try:
+            # BM25 색인이 없으면 대신 쓸 결과가 없으므로 기다린다
+            vector_docs = await asyncio.wait_for(
+                search_by_vector(),
+                RETRIEVAL_VECTOR_TIMEOUT if LEXICAL_INDEX_ENABLED else None,
+            )
+        except VectorStoreBusyError:
+            if lexical_search is not None:
+                lexical_search.cancel()
+            raise
+        except Exception as e:
+            if not LEXICAL_INDEX_ENABLED:
+                raise
+            logging.warning(
+                f"Vector search failed, using lexical search only: {e!r}"
+            )
+            if lexical_search is None:
+                return await asearch_user_documents_lexical(
+                    user_id, user_query, RETRIEVAL_K
+                )
+            return await lexical_search
+
+        if lexical_search is None:
+            return vector_docs
+        return reciprocal_rank_fusion(
+            [vector_docs, await lexical_search], limit=RETRIEVAL_K
+        )
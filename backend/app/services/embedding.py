@@ -0,0 +1,356 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+import openai
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+from app.util.embedding_cache import EmbeddingCache
+from app.util.logger import logger
+from app.util.query_cache import QueryEmbeddingCache
+from app.util.tokenizer import Tokenizer
+
+OPENAI_EMBEDDING_MODEL = settings.OPENAI_EMBEDDING_MODEL
+EMBEDDING_BATCH_MAX_TOKENS = settings.EMBEDDING_BATCH_MAX_TOKENS
+EMBEDDING_BATCH_MAX_SIZE = settings.EMBEDDING_BATCH_MAX_SIZE
+EMBEDDING_BATCH_LINGER_MS = settings.EMBEDDING_BATCH_LINGER_MS
+EMBEDDING_MAX_IN_FLIGHT = settings.EMBEDDING_MAX_IN_FLIGHT
+
+# 429 응답 시 재시도 대기 시간 (초)
+RATE_LIMIT_BACKOFF_MIN = 1.0
+RATE_LIMIT_BACKOFF_MAX = 60.0
+# 429 응답 시 최대 재시도 횟수, 넘으면 배치의 요청을 모두 실패 처리
+RATE_LIMIT_MAX_RETRIES = 8
+
+
+@dataclass
+class _EmbeddingRequest:
+    text: str
+    token_count: int
+    future: Future = field(default_factory=Future)
+
+
+class EmbeddingBatcher(Embeddings):
+    """
+    여러 요청의 청크를 모아 배치 단위로 임베딩하는 스케줄러
+
+    embed_documents로 들어온 텍스트는 공용 큐에 쌓이고, 디스패처 스레드가
+    토큰 수 기준으로 최대한 큰 배치를 만들어 임베딩 모델에 전달한다.
+    동시에 실행되는 배치 수는 max_in_flight로 제한하며, 429 응답을 받으면
+    대기 시간을 늘려 RATE_LIMIT_MAX_RETRIES번까지 재시도하고 성공할 때마다
+    다시 줄인다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        token_counter: Callable[[str], int] | None = None,
+        max_batch_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        linger_ms: int = EMBEDDING_BATCH_LINGER_MS,
+        max_in_flight: int = EMBEDDING_MAX_IN_FLIGHT,
+    ):
+        self.embeddings = embeddings
+        self.token_counter = token_counter
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.linger = linger_ms / 1000
+        self.max_in_flight = max_in_flight
+
+        self._queue: queue.Queue[_EmbeddingRequest] = queue.Queue()
+        self._carry: _EmbeddingRequest | None = None
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="embedding-batch"
+        )
+        self._backoff = 0.0
+        self._backoff_until = 0.0
+        self._backoff_lock = threading.Lock()
+        self._dispatcher: threading.Thread | None = None
+        self._dispatcher_lock = threading.Lock()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        텍스트 리스트 임베딩
+
+        Args:
+            texts (list[str]): 임베딩할 텍스트 리스트
+
+        Returns:
+            list[list[float]]: 입력 순서와 같은 임베딩 리스트
+        """
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        futures = [asyncio.wrap_future(self.submit(text)) for text in texts]
+        return list(await asyncio.gather(*futures))
+
+    def embed_query(self, text: str) -> list[float]:
+        # 질의 임베딩은 지연 시간이 중요하므로 배치를 거치지 않는다
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.embeddings.aembed_query(text)
+
+    def submit(self, text: str) -> Future:
+        """
+        텍스트 하나를 임베딩 큐에 등록
+
+        Args:
+            text (str): 임베딩할 텍스트
+
+        Returns:
+            Future: 임베딩 결과를 받을 Future
+        """
+        self._ensure_dispatcher()
+        request = _EmbeddingRequest(
+            text=text, token_count=self._count_tokens(text)
+        )
+        self._queue.put(request)
+        return request.future
+
+    def _count_tokens(self, text: str) -> int:
+        if self.token_counter is None:
+            self.token_counter = Tokenizer(OPENAI_EMBEDDING_MODEL).count_tokens
+        return self.token_counter(text)
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is not None:
+            return
+        with self._dispatcher_lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch,
+                    name="embedding-dispatcher",
+                    daemon=True,
+                )
+                self._dispatcher.start()
+
+    def _dispatch(self) -> None:
+        while True:
+            batch = self._next_batch()
+            self._in_flight.acquire()
+            self._executor.submit(self._run_batch, batch)
+
+    def _next_batch(self) -> list[_EmbeddingRequest]:
+        """
+        큐에서 요청을 꺼내 토큰 수와 개수 제한 안에서 배치 구성
+
+        첫 요청이 들어온 뒤 linger 동안 추가 요청을 기다리며, 제한을 넘는
+        요청은 다음 배치의 첫 요청으로 남긴다.
+        """
+        first = self._carry or self._queue.get()
+        self._carry = None
+        batch = [first]
+        batch_tokens = first.token_count
+        deadline = time.monotonic() + self.linger
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    request = self._queue.get(timeout=timeout)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if batch_tokens + request.token_count > self.max_batch_tokens:
+                self._carry = request
+                break
+            batch.append(request)
+            batch_tokens += request.token_count
+        return batch
+
+    def _run_batch(self, batch: list[_EmbeddingRequest]) -> None:
+        try:
+            vectors = self._embed_with_backoff(
+                [request.text for request in batch]
+            )
+            for request, vector in zip(batch, vectors):
+                request.future.set_result(vector)
+        except Exception as e:
+            logger.error(f"Error embedding batch of {len(batch)}: {e}")
+            for request in batch:
+                request.future.set_exception(e)
+        finally:
+            self._in_flight.release()
+
+    def _embed_with_backoff(self, texts: list[str]) -> list[list[float]]:
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            self._wait_for_backoff()
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                self._increase_backoff(e)
+                if attempt == RATE_LIMIT_MAX_RETRIES:
+                    raise
+                continue
+            self._decrease_backoff()
+            return vectors
+
+    def _wait_for_backoff(self) -> None:
+        with self._backoff_lock:
+            delay = self._backoff_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _increase_backoff(self, error: Exception) -> None:
+        with self._backoff_lock:
+            retry_after = get_retry_after(error)
+            self._backoff = min(
+                max(self._backoff * 2, RATE_LIMIT_BACKOFF_MIN, retry_after),
+                RATE_LIMIT_BACKOFF_MAX,
+            )
+            self._backoff_until = max(
+                self._backoff_until, time.monotonic() + self._backoff
+            )
+            logger.warning(
+                f"Embedding rate limited, backing off {self._backoff:.1f}s"
+            )
+
+    def _decrease_backoff(self) -> None:
+        with self._backoff_lock:
+            self._backoff /= 2
+            if self._backoff < RATE_LIMIT_BACKOFF_MIN:
+                self._backoff = 0.0
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 캐시를 먼저 조회하고 없는 텍스트만 임베딩하는 래퍼
+
+    같은 요청 안에서 중복된 텍스트는 한 번만 임베딩한다.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.cache.get_many(texts)
+        missing = list(
+            dict.fromkeys(
+                text for text, vector in zip(texts, vectors) if vector is None
+            )
+        )
+        if missing:
+            embedded = dict(
+                zip(missing, self.embeddings.embed_documents(missing))
+            )
+            self.cache.put_many(missing, list(embedded.values()))
+            vectors = [
+                vector if vector is not None else embedded[text]
+                for text, vector in zip(texts, vectors)
+            ]
+        return vectors
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = await asyncio.to_thread(self.cache.get_many, texts)
+        missing = list(
+            dict.fromkeys(
+                text for text, vector in zip(texts, vectors) if vector is None
+            )
+        )
+        if missing:
+            embedded = dict(
+                zip(missing, await self.embeddings.aembed_documents(missing))
+            )
+            await asyncio.to_thread(
+                self.cache.put_many, missing, list(embedded.values())
+            )
+            vectors = [
+                vector if vector is not None else embedded[text]
+                for text, vector in zip(texts, vectors)
+            ]
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = self.cache.get_many([text])[0]
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put_many([text], [vector])
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        vector = (await asyncio.to_thread(self.cache.get_many, [text]))[0]
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await asyncio.to_thread(self.cache.put_many, [text], [vector])
+        return vector
+
+
+class QueryCachedEmbeddings(Embeddings):
+    """
+    질의 임베딩만 QueryEmbeddingCache로 캐시하는 래퍼
+
+    문서 임베딩은 그대로 전달한다. 캐시에 없는 질의는 원문으로 임베딩하고
+    정규화된 키로 저장한다.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: QueryEmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(text, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        vector = await self.cache.aget(text)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await self.cache.aput(text, vector)
+        return vector
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    임베딩 API의 rate limit(429) 에러 여부
+
+    Args:
+        error (Exception): 임베딩 호출 중 발생한 에러
+
+    Returns:
+        bool: 재시도할 rate limit 에러이면 True, 사용량 한도 초과
+            (insufficient_quota)는 기다려도 풀리지 않으므로 False
+    """
+    if getattr(error, "code", None) == "insufficient_quota":
+        return False
+    if isinstance(error, openai.RateLimitError):
+        return True
+    return getattr(error, "status_code", None) == 429
+
+
+def get_retry_after(error: Exception) -> float:
+    """
+    에러 응답의 Retry-After 헤더 값 (초)
+
+    Args:
+        error (Exception): 임베딩 호출 중 발생한 에러
+
+    Returns:
+        float: 대기 시간, 헤더가 없으면 0
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,406 @@
+import asyncio
+import uuid
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from functools import partial
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.constants import IngestJobOperation, IngestJobStatus
+from app.util.document import (
+    delete_document_from_vector_store,
+    get_user_document_info,
+    insert_document_to_vector_store,
+    update_document_in_vector_store,
+    vector_executor,
+)
+from app.util.document_catalog import save_document_record
+from app.util.ingest_job import (
+    get_unfinished_ingest_jobs,
+    save_ingest_job,
+    save_ingest_jobs,
+    update_ingest_job,
+)
+from app.util.logger import logger
+
+INGEST_WORKER_COUNT = settings.INGEST_WORKER_COUNT
+INGEST_MAX_JOBS_PER_USER = settings.INGEST_MAX_JOBS_PER_USER
+INGEST_BULK_CONCURRENCY = settings.INGEST_BULK_CONCURRENCY
+
+
+class IngestCancelledError(Exception):
+    """
+    문서가 삭제되어 적재 작업이 중단됨
+    """
+
+
+@dataclass
+class IngestTask:
+    job_id: str
+    user_id: str
+    document_id: str
+    document_name: str
+    operation: str = IngestJobOperation.INSERT
+    started: bool = False
+    cancelled: bool = False
+    finished: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass
+class IngestBatch:
+    """
+    일괄 업로드로 등록된 작업 묶음
+
+    사용자별 작업 수 제한에서는 작업 하나로 계산하고, 묶음 안의 문서는
+    bulk_concurrency개씩 동시에 적재한다.
+    """
+
+    user_id: str
+    tasks: list[IngestTask]
+
+
+class IngestService:
+    """
+    문서 적재 작업 큐
+
+    업로드 요청은 작업을 큐에 넣고 바로 반환하며, 워커가 청킹 → 임베딩 →
+    vector store 저장을 수행한다. 동시에 실행되는 작업 수는 워커 수로,
+    사용자별 작업 수는 max_jobs_per_user로 제한한다. 문서를 삭제할 때는
+    cancel로 그 문서의 작업을 먼저 멈춘다.
+    """
+
+    def __init__(
+        self,
+        worker_count: int = INGEST_WORKER_COUNT,
+        max_jobs_per_user: int = INGEST_MAX_JOBS_PER_USER,
+        bulk_concurrency: int = INGEST_BULK_CONCURRENCY,
+    ):
+        self.worker_count = worker_count
+        self.max_jobs_per_user = max_jobs_per_user
+        self.bulk_concurrency = bulk_concurrency
+        self._queue: asyncio.Queue[IngestTask | IngestBatch] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._running_per_user: dict[str, int] = defaultdict(int)
+        self._deferred_per_user: dict[str, deque[IngestTask | IngestBatch]] = (
+            defaultdict(deque)
+        )
+        self._tasks_per_document: dict[str, list[IngestTask]] = defaultdict(
+            list
+        )
+
+    async def start(self) -> None:
+        """
+        중단된 작업을 복구하고 워커 실행
+        """
+        await self.recover()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ingest-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self) -> None:
+        """
+        워커 종료
+
+        실행 중이던 작업은 DB에 running 상태로 남아 재시작 시 복구된다.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def recover(self) -> None:
+        """
+        서버 재시작 전에 끝나지 않은 작업을 다시 큐에 등록
+        """
+        for job in await get_unfinished_ingest_jobs():
+            if job.status == IngestJobStatus.RUNNING:
+                # 일부 청크만 저장된 상태일 수 있으므로 지우고 다시 적재한다.
+                # 수정 작업은 청크 비교로 재실행해도 결과가 같다.
+                if job.operation != IngestJobOperation.UPDATE:
+                    await vector_executor.run(
+                        delete_document_from_vector_store,
+                        job.user_id,
+                        job.document_id,
+                    )
+                await update_ingest_job(
+                    job.id, status=IngestJobStatus.QUEUED, chunks_done=0
+                )
+            self._queue.put_nowait(
+                self._track(
+                    IngestTask(
+                        job_id=job.id,
+                        user_id=job.user_id,
+                        document_id=job.document_id,
+                        document_name=job.document_name,
+                        operation=job.operation or IngestJobOperation.INSERT,
+                    )
+                )
+            )
+        if not self._queue.empty():
+            logger.info(f"Recovered {self._queue.qsize()} ingest jobs")
+
+    async def submit(
+        self,
+        user_id: str,
+        document_id: str,
+        document_name: str,
+        operation: str = IngestJobOperation.INSERT,
+    ) -> str:
+        """
+        문서 적재 작업 등록
+
+        Args:
+            user_id (str): 사용자 ID
+            document_id (str): 문서 ID
+            document_name (str): 문서 이름
+            operation (str): 작업 종류 (insert, update)
+
+        Returns:
+            str: 작업 ID
+        """
+        job_id = str(uuid.uuid4())
+        await save_ingest_job(
+            job_id, user_id, document_id, document_name, operation
+        )
+        self._queue.put_nowait(
+            self._track(
+                IngestTask(
+                    job_id=job_id,
+                    user_id=user_id,
+                    document_id=document_id,
+                    document_name=document_name,
+                    operation=operation,
+                )
+            )
+        )
+        return job_id
+
+    async def submit_bulk(
+        self, user_id: str, documents: list[tuple[str, str]]
+    ) -> list[str]:
+        """
+        여러 문서의 적재 작업을 한 번에 등록
+
+        문서마다 작업을 만들어 상태를 따로 조회할 수 있고, 실행은 하나의
+        묶음으로 처리되어 문서를 동시에 청킹하고 임베딩 배치를 공유한다.
+
+        Args:
+            user_id (str): 사용자 ID
+            documents (list[tuple[str, str]]): (문서 ID, 문서 이름) 리스트
+
+        Returns:
+            list[str]: 입력 순서와 같은 작업 ID 리스트
+        """
+        if not documents:
+            return []
+        job_ids = [str(uuid.uuid4()) for _ in documents]
+        await save_ingest_jobs(
+            user_id,
+            [
+                (job_id, document_id, document_name)
+                for job_id, (document_id, document_name) in zip(
+                    job_ids, documents
+                )
+            ],
+        )
+        self._queue.put_nowait(
+            IngestBatch(
+                user_id=user_id,
+                tasks=[
+                    self._track(
+                        IngestTask(
+                            job_id=job_id,
+                            user_id=user_id,
+                            document_id=document_id,
+                            document_name=document_name,
+                        )
+                    )
+                    for job_id, (document_id, document_name) in zip(
+                        job_ids, documents
+                    )
+                ],
+            )
+        )
+        return job_ids
+
+    async def cancel(self, document_id: str) -> None:
+        """
+        문서의 대기 중이거나 실행 중인 적재 작업 취소
+
+        대기 중인 작업은 실행되지 않고, 실행 중인 작업은 다음 배치를
+        저장하거나 문서 목록에 저장하기 전에 멈춘다. 실행 중인 작업이 멈출
+        때까지 기다리므로, 이후에 문서를 삭제하면 작업이 다시 쓰는 내용이
+        남지 않는다.
+
+        Args:
+            document_id (str): 문서 ID
+        """
+        tasks = self._tasks_per_document.pop(document_id, [])
+        for task in tasks:
+            task.cancelled = True
+            if not task.started:
+                task.finished.set()
+                await update_ingest_job(
+                    task.job_id, status=IngestJobStatus.CANCELLED
+                )
+        await asyncio.gather(*(task.finished.wait() for task in tasks))
+
+    def _track(self, task: IngestTask) -> IngestTask:
+        self._tasks_per_document[task.document_id].append(task)
+        return task
+
+    def _untrack(self, task: IngestTask) -> None:
+        tasks = self._tasks_per_document.get(task.document_id)
+        if tasks is None or task not in tasks:
+            return
+        tasks.remove(task)
+        if not tasks:
+            del self._tasks_per_document[task.document_id]
+
+    async def _worker(self) -> None:
+        while True:
+            task = await self._queue.get()
+            try:
+                if (
+                    self._running_per_user[task.user_id]
+                    >= self.max_jobs_per_user
+                ):
+                    # 해당 사용자의 작업이 끝나면 다시 큐에 넣는다
+                    self._deferred_per_user[task.user_id].append(task)
+                    continue
+
+                self._running_per_user[task.user_id] += 1
+                try:
+                    if isinstance(task, IngestBatch):
+                        await self._run_batch(task)
+                    else:
+                        await self._run(task)
+                finally:
+                    self._release(task.user_id)
+            finally:
+                self._queue.task_done()
+
+    def _release(self, user_id: str) -> None:
+        self._running_per_user[user_id] -= 1
+        if self._running_per_user[user_id] == 0:
+            del self._running_per_user[user_id]
+
+        deferred = self._deferred_per_user.get(user_id)
+        if deferred:
+            self._queue.put_nowait(deferred.popleft())
+            if not deferred:
+                del self._deferred_per_user[user_id]
+
+    async def _run_batch(self, batch: IngestBatch) -> None:
+        """
+        묶음 안의 문서를 bulk_concurrency개씩 동시에 적재
+
+        각 문서는 프로세스 풀에서 청킹하고, 임베딩은 공용 배처를 거치므로
+        여러 문서의 청크가 같은 배치로 묶인다.
+        """
+        semaphore = asyncio.Semaphore(self.bulk_concurrency)
+
+        async def run(task: IngestTask) -> None:
+            async with semaphore:
+                await self._run(task, parallel_chunking=True)
+
+        await asyncio.gather(*(run(task) for task in batch.tasks))
+
+    async def _run(
+        self, task: IngestTask, parallel_chunking: bool = False
+    ) -> None:
+        if task.cancelled:
+            return
+        task.started = True
+        try:
+            await self._ingest(task, parallel_chunking)
+        finally:
+            self._untrack(task)
+            task.finished.set()
+
+    async def _ingest(
+        self, task: IngestTask, parallel_chunking: bool = False
+    ) -> None:
+        loop = asyncio.get_running_loop()
+
+        def on_progress(chunks_done: int) -> None:
+            # 배치 사이에 확인하여 삭제된 문서의 나머지 청크를 쓰지 않는다
+            if task.cancelled:
+                raise IngestCancelledError(task.document_id)
+            asyncio.run_coroutine_threadsafe(
+                update_ingest_job(task.job_id, chunks_done=chunks_done), loop
+            ).result()
+
+        try:
+            logger.info(f"Ingest job started: {task.job_id}")
+            await update_ingest_job(
+                task.job_id, status=IngestJobStatus.RUNNING
+            )
+            if task.operation == IngestJobOperation.UPDATE:
+                ingest = update_document_in_vector_store
+            elif parallel_chunking:
+                ingest = partial(
+                    insert_document_to_vector_store, parallel_chunking=True
+                )
+            else:
+                ingest = insert_document_to_vector_store
+            result = await run_in_threadpool(
+                ingest,
+                task.user_id,
+                task.document_id,
+                task.document_name,
+                on_progress,
+            )
+            if task.cancelled:
+                raise IngestCancelledError(task.document_id)
+            await self._save_document_record(task, result)
+            await update_ingest_job(
+                task.job_id,
+                status=IngestJobStatus.DONE,
+                chunks_duplicate=result["duplicates"],
+            )
+            logger.info(f"Ingest job finished: {task.job_id}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if task.cancelled:
+                # 문서 삭제가 작업이 쓴 내용을 지운다
+                logger.info(f"Ingest job cancelled: {task.job_id}")
+                status, error = IngestJobStatus.CANCELLED, None
+            else:
+                logger.error(f"Ingest job failed: {task.job_id}: {e}")
+                status, error = IngestJobStatus.FAILED, str(e)
+            try:
+                await update_ingest_job(
+                    task.job_id, status=status, error=error
+                )
+            except Exception as update_error:
+                logger.error(
+                    f"Error marking ingest job as {status}: {update_error}"
+                )
+
+    async def _save_document_record(
+        self, task: IngestTask, result: dict
+    ) -> None:
+        """
+        적재가 끝난 문서를 문서 목록에 저장 (수정이면 갱신)
+        """
+        if task.operation == IngestJobOperation.UPDATE:
+            chunk_count = (
+                result["added"] + result["duplicates"] + result["unchanged"]
+            )
+        else:
+            chunk_count = result["chunks"]
+        info = await run_in_threadpool(
+            get_user_document_info, task.user_id, task.document_id
+        )
+        await save_document_record(
+            task.document_id,
+            task.user_id,
+            task.document_name,
+            info["size"],
+            chunk_count,
+            info["content_hash"],
+        )
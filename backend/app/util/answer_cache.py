@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+from cachetools import LRUCache
+
+
+@dataclass
+class _UserAnswers:
+    version: int
+    # (질의 임베딩, 답변, 저장 시각)
+    entries: deque = field(default_factory=deque)
+
+
+class SemanticAnswerCache:
+    """
+    질의 임베딩 유사도로 찾는 사용자별 답변 캐시
+
+    사용자의 문서 집합 버전이 같고, 코사인 유사도가 threshold 이상인 이전
+    질문이 있으면 그 답변을 반환한다. 버전이 바뀌면 그 사용자의 항목을
+    모두 버린다. 사용자는 최대 max_users명, 사용자마다 최근 max_entries개를
+    ttl초 동안 보관한다.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl: float = 3600,
+        max_users: int = 10000,
+        max_entries: int = 64,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._users: LRUCache[str, _UserAnswers] = LRUCache(max_users)
+        self._lock = threading.Lock()
+
+    def get(
+        self, user_id: str, version: int, embedding: list[float]
+    ) -> str | None:
+        """
+        유사한 이전 질문의 답변 조회
+
+        Args:
+            user_id (str): 사용자 ID
+            version (int): 사용자의 현재 문서 집합 버전
+            embedding (list[float]): 질의 임베딩
+
+        Returns:
+            str | None: 캐시된 답변, 없으면 None
+        """
+        query = normalize(embedding)
+        expired_before = time.monotonic() - self.ttl
+        with self._lock:
+            answers = self._users.get(user_id)
+            best_answer, best_score = None, self.threshold
+            if answers is not None and answers.version == version:
+                for vector, answer, stored_at in answers.entries:
+                    if stored_at < expired_before:
+                        continue
+                    score = float(vector @ query)
+                    if score >= best_score:
+                        best_answer, best_score = answer, score
+            if best_answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return best_answer
+
+    def put(
+        self, user_id: str, version: int, embedding: list[float], answer: str
+    ) -> None:
+        """
+        답변 저장
+
+        Args:
+            user_id (str): 사용자 ID
+            version (int): 답변을 만들 때 읽은 문서 집합 버전
+            embedding (list[float]): 질의 임베딩
+            answer (str): 답변
+        """
+        entry = (normalize(embedding), answer, time.monotonic())
+        with self._lock:
+            answers = self._users.get(user_id)
+            if answers is None or answers.version < version:
+                answers = _UserAnswers(version, deque(maxlen=self.max_entries))
+                self._users[user_id] = answers
+            elif answers.version > version:
+                # 답변을 만드는 동안 문서가 바뀌었다
+                return
+            answers.entries.append(entry)
+
+    def stats(self) -> dict:
+        """
+        캐시 적중 통계
+
+        Returns:
+            dict: hits, misses, hit_rate, users
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "users": len(self._users),
+            }
+
+
+def normalize(embedding: list[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,139 @@
+import os
+import tarfile
+import zipfile
+from typing import IO, Iterator
+
+from app.core.config import settings
+
+BULK_UPLOAD_MAX_FILES = settings.BULK_UPLOAD_MAX_FILES
+BULK_UPLOAD_MAX_EXTRACTED_BYTES = settings.BULK_UPLOAD_MAX_EXTRACTED_BYTES
+
+ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06")
+COMPRESSED_TAR_MAGIC = (b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")
+TAR_MAGIC_OFFSET = 257
+OOXML_CONTENT_TYPES = "[Content_Types].xml"
+
+
+class ArchiveLimitError(Exception):
+    """압축 파일이 파일 수 또는 해제 크기 제한을 넘은 경우"""
+
+
+class UploadBudget:
+    """
+    일괄 업로드 요청 하나에서 저장할 수 있는 파일 수와 크기
+
+    요청의 모든 파일과 압축 파일 멤버가 하나의 한도를 나누어 쓰므로,
+    압축 파일을 여러 개 올려도 요청 전체가 제한을 넘을 수 없다.
+    """
+
+    def __init__(
+        self, max_files: int | None = None, max_bytes: int | None = None
+    ):
+        self.max_files = max_files or BULK_UPLOAD_MAX_FILES
+        self.max_bytes = max_bytes or BULK_UPLOAD_MAX_EXTRACTED_BYTES
+        self.file_count = 0
+        self.total_bytes = 0
+
+    def charge(self, size: int) -> None:
+        """
+        파일 하나를 한도에서 차감
+
+        Args:
+            size (int): 파일 크기 (바이트)
+
+        Raises:
+            ArchiveLimitError: 파일 수 또는 크기 제한을 넘은 경우
+        """
+        self.file_count += 1
+        self.total_bytes += size
+        if self.file_count > self.max_files:
+            raise ArchiveLimitError(
+                f"Upload contains more than {self.max_files} files"
+            )
+        if self.total_bytes > self.max_bytes:
+            raise ArchiveLimitError(
+                f"Upload exceeds {self.max_bytes} extracted bytes"
+            )
+
+
+def get_archive_type(fileobj: IO[bytes]) -> str | None:
+    """
+    파일 앞부분으로 압축 형식 판별
+
+    Args:
+        fileobj (IO[bytes]): seek 가능한 파일 객체
+
+    Returns:
+        str | None: "zip", "tar" 또는 압축 파일이 아니면 None
+    """
+    header = fileobj.read(512)
+    fileobj.seek(0)
+    if header.startswith(ZIP_MAGIC):
+        # DOCX 등 OOXML 문서도 zip이므로 압축 파일로 취급하지 않는다
+        try:
+            with zipfile.ZipFile(fileobj) as archive:
+                names = archive.namelist()
+        except zipfile.BadZipFile:
+            return None
+        finally:
+            fileobj.seek(0)
+        return None if OOXML_CONTENT_TYPES in names else "zip"
+    if header.startswith(COMPRESSED_TAR_MAGIC):
+        return "tar"
+    if header[TAR_MAGIC_OFFSET : TAR_MAGIC_OFFSET + 5] == b"ustar":
+        return "tar"
+    return None
+
+
+def iter_archive_members(
+    fileobj: IO[bytes], archive_type: str, budget: UploadBudget | None = None
+) -> Iterator[tuple[str, IO[bytes]]]:
+    """
+    압축 파일의 일반 파일 멤버를 순서대로 스트리밍
+
+    멤버 내용은 전체를 메모리에 올리지 않고 파일 객체로 전달한다. tar는
+    스트림 모드로 읽으므로 반환된 파일 객체는 다음 멤버로 넘어가기 전에
+    모두 읽어야 한다.
+
+    Args:
+        fileobj (IO[bytes]): 압축 파일 객체
+        archive_type (str): "zip" 또는 "tar"
+        budget (UploadBudget | None): 요청 전체의 한도, 없으면 압축 파일
+            하나에 대한 한도
+
+    Yields:
+        tuple[str, IO[bytes]]: (압축 파일 내 경로, 멤버 파일 객체)
+
+    Raises:
+        ArchiveLimitError: 파일 수 또는 해제 크기 제한을 넘은 경우
+    """
+    if budget is None:
+        budget = UploadBudget()
+
+    if archive_type == "zip":
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or is_ignored_member(info.filename):
+                    continue
+                budget.charge(info.file_size)
+                with archive.open(info) as member:
+                    yield info.filename, member
+    elif archive_type == "tar":
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            for info in archive:
+                if not info.isfile() or is_ignored_member(info.name):
+                    continue
+                budget.charge(info.size)
+                member = archive.extractfile(info)
+                if member is not None:
+                    yield info.name, member
+    else:
+        raise ValueError(f"Invalid archive type: {archive_type}")
+
+
+def is_ignored_member(name: str) -> bool:
+    """
+    압축 파일에 함께 들어가는 메타데이터 파일 여부 (__MACOSX, 숨김 파일)
+    """
+    parts = name.replace("\\", "/").split("/")
+    return parts[0] == "__MACOSX" or os.path.basename(name).startswith(".")
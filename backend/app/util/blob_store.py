@@ -0,0 +1,573 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Iterable, Iterator
+
+import zstandard
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+# zstd skippable frame (0x184D2A50 ~ 0x184D2A5F)
+HEADER_MAGIC = 0x184D2A50
+SEEK_TABLE_MAGIC = 0x184D2A5E
+SEEKABLE_FOOTER_MAGIC = 0x8F92EAB1
+BLOB_FORMAT = b"DRB1"
+HEADER_SIZE = 16
+SEEK_TABLE_FOOTER_SIZE = 9
+SEEK_TABLE_ENTRY_SIZE = 8
+
+# 열어 둔 mmap / 읽어 둔 seek table 수
+OPEN_BLOB_CACHE_SIZE = 64
+# blob 저장/연결과 삭제를 직렬화하는 키별 lock 수
+BLOB_LOCK_STRIPES = 64
+
+
+class BlobNotFoundError(Exception):
+    """blob 또는 ref가 없는 경우"""
+
+
+class BlobBackend(ABC):
+    """
+    blob 저장소 백엔드
+
+    이름은 "/"로 구분된 경로 형태이며, blob은 한 번 쓰면 바뀌지 않는다.
+    """
+
+    @abstractmethod
+    def put_file(self, name: str, path: str) -> None:
+        """로컬 파일을 이름으로 저장"""
+
+    @abstractmethod
+    def put_bytes(self, name: str, data: bytes) -> None:
+        """바이트를 이름으로 저장"""
+
+    @abstractmethod
+    def get_bytes(self, name: str) -> bytes:
+        """전체 내용 읽기"""
+
+    @abstractmethod
+    def read_range(self, name: str, offset: int, length: int) -> bytes:
+        """offset부터 length 바이트 읽기"""
+
+    @abstractmethod
+    def size(self, name: str) -> int:
+        """저장된 크기 (bytes)"""
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        """저장 여부"""
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        """삭제, 없으면 무시"""
+
+    @abstractmethod
+    def list(self, prefix: str) -> list[str]:
+        """prefix로 시작하는 이름 목록"""
+
+
+class LocalBlobBackend(BlobBackend):
+    """
+    로컬 파일 시스템 백엔드
+
+    범위 읽기는 파일을 mmap으로 열어 필요한 부분만 페이지 캐시에서 읽는다.
+    최근 사용한 mmap은 OPEN_BLOB_CACHE_SIZE개까지 열어 둔다. 디렉터리는
+    처음 쓸 때 만든다.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._mmaps: OrderedDict[str, mmap.mmap] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put_file(self, name: str, path: str) -> None:
+        target = self._path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(path, "rb") as src, open(temp_path, "wb") as dst:
+            while block := src.read(1024 * 1024):
+                dst.write(block)
+        os.replace(temp_path, target)
+
+    def put_bytes(self, name: str, data: bytes) -> None:
+        target = self._path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, target)
+
+    def get_bytes(self, name: str) -> bytes:
+        try:
+            with open(self._path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFoundError(name)
+
+    def read_range(self, name: str, offset: int, length: int) -> bytes:
+        return self._mmap(name)[offset : offset + length]
+
+    def size(self, name: str) -> int:
+        try:
+            return os.path.getsize(self._path(name))
+        except FileNotFoundError:
+            raise BlobNotFoundError(name)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self._path(name))
+
+    def delete(self, name: str) -> None:
+        with self._lock:
+            mapped = self._mmaps.pop(name, None)
+        if mapped is not None:
+            mapped.close()
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix: str) -> list[str]:
+        directory = self._path(prefix)
+        if not os.path.isdir(directory):
+            return []
+        return [
+            f"{prefix.rstrip('/')}/{entry}"
+            for entry in os.listdir(directory)
+            if not entry.endswith(".tmp")
+        ]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, *name.split("/"))
+
+    def _mmap(self, name: str) -> mmap.mmap:
+        with self._lock:
+            mapped = self._mmaps.get(name)
+            if mapped is not None:
+                self._mmaps.move_to_end(name)
+                return mapped
+        try:
+            with open(self._path(name), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise BlobNotFoundError(name)
+        with self._lock:
+            self._mmaps[name] = mapped
+            while len(self._mmaps) > OPEN_BLOB_CACHE_SIZE:
+                # 다른 스레드가 읽는 중일 수 있으므로 닫지 않고 GC에 맡긴다
+                self._mmaps.popitem(last=False)
+        return mapped
+
+
+class S3BlobBackend(BlobBackend):
+    """
+    S3 호환 오브젝트 스토리지 백엔드
+
+    범위 읽기는 Range 요청을 사용한다. endpoint_url을 지정하면 MinIO 등
+    S3 호환 서버를 사용할 수 있고, client를 직접 넘길 수도 있다.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: str | None = None,
+        client=None,
+    ):
+        if client is None:
+            if boto3 is None:
+                raise ImportError("boto3 is required for the S3 blob store")
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def put_file(self, name: str, path: str) -> None:
+        with open(path, "rb") as f:
+            self.client.put_object(
+                Bucket=self.bucket, Key=self._key(name), Body=f
+            )
+
+    def put_bytes(self, name: str, data: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket, Key=self._key(name), Body=data
+        )
+
+    def get_bytes(self, name: str) -> bytes:
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self._key(name)
+            )
+        except self.client.exceptions.NoSuchKey:
+            raise BlobNotFoundError(name)
+        return response["Body"].read()
+
+    def read_range(self, name: str, offset: int, length: int) -> bytes:
+        if length <= 0:
+            return b""
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket,
+                Key=self._key(name),
+                Range=f"bytes={offset}-{offset + length - 1}",
+            )
+        except self.client.exceptions.NoSuchKey:
+            raise BlobNotFoundError(name)
+        return response["Body"].read()
+
+    def size(self, name: str) -> int:
+        try:
+            response = self.client.head_object(
+                Bucket=self.bucket, Key=self._key(name)
+            )
+        except self.client.exceptions.ClientError:
+            raise BlobNotFoundError(name)
+        return response["ContentLength"]
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.size(name)
+        except BlobNotFoundError:
+            return False
+        return True
+
+    def delete(self, name: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(name))
+
+    def list(self, prefix: str) -> list[str]:
+        names = []
+        base = len(self.prefix) + 1 if self.prefix else 0
+        request = {"Bucket": self.bucket, "Prefix": self._key(prefix)}
+        while True:
+            response = self.client.list_objects_v2(**request)
+            names.extend(
+                item["Key"][base:] for item in response.get("Contents", [])
+            )
+            if not response.get("IsTruncated"):
+                return names
+            request["ContinuationToken"] = response["NextContinuationToken"]
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+
+class SeekTable:
+    """
+    blob의 프레임 위치 정보
+
+    각 데이터 프레임은 frame_chars개의 문자(마지막 프레임은 나머지)를
+    담으므로 문자 오프셋으로 바로 프레임 번호를 계산할 수 있다.
+    """
+
+    def __init__(self, frame_chars: int, frames: list[tuple[int, int, int]]):
+        self.frame_chars = frame_chars
+        # (압축 데이터 오프셋, 압축 크기, 원본 크기)
+        self.frames = frames
+        self.size = sum(frame[2] for frame in frames)
+
+
+class BlobStore:
+    """
+    content-addressed 텍스트 blob 저장소
+
+    텍스트는 UTF-8 내용의 sha256을 키로 저장하므로 같은 내용은 한 번만
+    저장된다. blob은 frame_chars 문자 단위의 독립된 zstd 프레임과 끝의
+    seek table(zstd seekable 형식)로 구성되어, 문자 범위를 읽을 때 해당
+    프레임만 읽고 압축을 푼다. 문서는 ref(이름 → 키)로 blob을 가리키며
+    마지막 ref가 삭제되면 blob도 삭제된다.
+
+    blob 존재 확인, 저장, 연결과 마지막 연결 삭제는 같은 키의 lock 안에서
+    수행하므로 같은 내용을 저장하는 중에 blob이 삭제되지 않는다. lock은
+    프로세스 안에서만 유효하다.
+    """
+
+    def __init__(
+        self,
+        backend: BlobBackend,
+        frame_chars: int = 64 * 1024,
+        compression_level: int = 3,
+        temp_dir: str | None = None,
+    ):
+        self.backend = backend
+        self.frame_chars = frame_chars
+        self.compression_level = compression_level
+        self.temp_dir = temp_dir
+        self._seek_tables: OrderedDict[str, SeekTable] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = [threading.RLock() for _ in range(BLOB_LOCK_STRIPES)]
+
+    def write_text(self, blocks: Iterable[str], ref: str | None = None) -> str:
+        """
+        텍스트 블록 스트림을 압축하여 저장
+
+        Args:
+            blocks (Iterable[str]): 텍스트 블록
+            ref (str | None): 저장한 blob을 가리킬 ref, 같은 내용의 blob이
+                동시에 삭제되지 않도록 저장과 함께 연결한다
+
+        Returns:
+            str: blob 키
+        """
+        if self.temp_dir is not None:
+            os.makedirs(self.temp_dir, exist_ok=True)
+        compressor = zstandard.ZstdCompressor(level=self.compression_level)
+        digest = hashlib.sha256()
+        entries = []
+        fd, temp_path = tempfile.mkstemp(dir=self.temp_dir, suffix=".blob")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(
+                    struct.pack("<II", HEADER_MAGIC, HEADER_SIZE - 8)
+                    + BLOB_FORMAT
+                    + struct.pack("<I", self.frame_chars)
+                )
+
+                def write_frame(text: str) -> None:
+                    data = text.encode("utf-8")
+                    digest.update(data)
+                    frame = compressor.compress(data)
+                    f.write(frame)
+                    entries.append((len(frame), len(data)))
+
+                buffer = ""
+                for block in blocks:
+                    buffer += block
+                    while len(buffer) >= self.frame_chars:
+                        write_frame(buffer[: self.frame_chars])
+                        buffer = buffer[self.frame_chars :]
+                if buffer:
+                    write_frame(buffer)
+
+                f.write(build_seek_table(entries))
+
+            key = digest.hexdigest()
+            name = blob_name(key)
+            previous = None
+            with self._key_lock(key):
+                if not self.backend.exists(name):
+                    self.backend.put_file(name, temp_path)
+                if ref is not None:
+                    previous = self._set_ref(ref, key)
+        finally:
+            os.remove(temp_path)
+        if previous is not None and previous != key:
+            self._unlink_blob(ref, previous)
+        return key
+
+    def write_text_file(
+        self,
+        path: str,
+        block_size: int = 1024 * 1024,
+        ref: str | None = None,
+    ) -> str:
+        """
+        UTF-8 텍스트 파일을 압축하여 저장
+
+        Args:
+            path (str): 텍스트 파일 경로
+            block_size (int): 읽기 단위 (문자 수)
+            ref (str | None): 저장한 blob을 가리킬 ref
+
+        Returns:
+            str: blob 키
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return self.write_text(iter(lambda: f.read(block_size), ""), ref)
+
+    def read_text(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> str:
+        """
+        문자 범위 읽기
+
+        Args:
+            key (str): blob 키
+            start (int): 시작 문자 오프셋
+            end (int | None): 끝 문자 오프셋 (포함하지 않음), None이면 끝까지
+
+        Returns:
+            str: 텍스트
+        """
+        table = self.seek_table(key)
+        if not table.frames:
+            return ""
+        first = start // table.frame_chars
+        last = (
+            len(table.frames) - 1
+            if end is None
+            else min(
+                (max(end, 1) - 1) // table.frame_chars, len(table.frames) - 1
+            )
+        )
+        if first > last:
+            return ""
+        text = "".join(
+            self._read_frame(key, table, index)
+            for index in range(first, last + 1)
+        )
+        base = first * table.frame_chars
+        return text[start - base : None if end is None else end - base]
+
+    def iter_text(self, key: str) -> Iterator[str]:
+        """
+        프레임 단위로 전체 텍스트 읽기
+
+        Args:
+            key (str): blob 키
+
+        Yields:
+            str: 프레임 텍스트
+        """
+        table = self.seek_table(key)
+        for index in range(len(table.frames)):
+            yield self._read_frame(key, table, index)
+
+    def size(self, key: str) -> int:
+        """
+        압축 전 UTF-8 크기 (bytes)
+        """
+        return self.seek_table(key).size
+
+    def seek_table(self, key: str) -> SeekTable:
+        """
+        blob의 seek table 조회 (최근 사용한 항목은 캐시)
+        """
+        with self._lock:
+            table = self._seek_tables.get(key)
+            if table is not None:
+                self._seek_tables.move_to_end(key)
+                return table
+
+        name = blob_name(key)
+        blob_size = self.backend.size(name)
+        header = self.backend.read_range(name, 0, HEADER_SIZE)
+        magic, _, blob_format, frame_chars = struct.unpack("<II4sI", header)
+        if magic != HEADER_MAGIC or blob_format != BLOB_FORMAT:
+            raise ValueError(f"Invalid blob: {key}")
+
+        footer = self.backend.read_range(
+            name, blob_size - SEEK_TABLE_FOOTER_SIZE, SEEK_TABLE_FOOTER_SIZE
+        )
+        frame_count, _, footer_magic = struct.unpack("<IBI", footer)
+        if footer_magic != SEEKABLE_FOOTER_MAGIC:
+            raise ValueError(f"Invalid blob seek table: {key}")
+        entries_size = frame_count * SEEK_TABLE_ENTRY_SIZE
+        entries = self.backend.read_range(
+            name,
+            blob_size - SEEK_TABLE_FOOTER_SIZE - entries_size,
+            entries_size,
+        )
+
+        frames = []
+        offset = HEADER_SIZE
+        for compressed, decompressed in struct.iter_unpack("<II", entries):
+            frames.append((offset, compressed, decompressed))
+            offset += compressed
+        table = SeekTable(frame_chars, frames)
+
+        with self._lock:
+            self._seek_tables[key] = table
+            while len(self._seek_tables) > OPEN_BLOB_CACHE_SIZE:
+                self._seek_tables.popitem(last=False)
+        return table
+
+    def link(self, ref: str, key: str) -> None:
+        """
+        ref가 blob을 가리키도록 설정, 기존 blob은 참조가 없으면 삭제
+
+        Args:
+            ref (str): ref 이름 (예: "{user_id}/{document_id}")
+            key (str): blob 키
+
+        Raises:
+            BlobNotFoundError: blob이 없는 경우
+        """
+        with self._key_lock(key):
+            if not self.backend.exists(blob_name(key)):
+                raise BlobNotFoundError(key)
+            previous = self._set_ref(ref, key)
+        if previous is not None and previous != key:
+            self._unlink_blob(ref, previous)
+
+    def unlink(self, ref: str) -> None:
+        """
+        ref 삭제, blob을 가리키는 ref가 더 없으면 blob도 삭제
+
+        Args:
+            ref (str): ref 이름
+        """
+        key = self.resolve(ref)
+        if key is None:
+            return
+        self.backend.delete(ref_name(ref))
+        self._unlink_blob(ref, key)
+
+    def resolve(self, ref: str) -> str | None:
+        """
+        ref가 가리키는 blob 키, 없으면 None
+        """
+        try:
+            return self.backend.get_bytes(ref_name(ref)).decode("ascii")
+        except BlobNotFoundError:
+            return None
+
+    def _key_lock(self, key: str) -> threading.RLock:
+        return self._key_locks[int(key[:8], 16) % BLOB_LOCK_STRIPES]
+
+    def _set_ref(self, ref: str, key: str) -> str | None:
+        # 호출하는 쪽에서 key의 lock을 잡는다
+        previous = self.resolve(ref)
+        self.backend.put_bytes(link_name(key, ref), b"")
+        self.backend.put_bytes(ref_name(ref), key.encode("ascii"))
+        return previous
+
+    def _unlink_blob(self, ref: str, key: str) -> None:
+        with self._key_lock(key):
+            self.backend.delete(link_name(key, ref))
+            if not self.backend.list(f"links/{key}"):
+                self.backend.delete(blob_name(key))
+                with self._lock:
+                    self._seek_tables.pop(key, None)
+
+    def _read_frame(self, key: str, table: SeekTable, index: int) -> str:
+        offset, compressed, decompressed = table.frames[index]
+        data = self.backend.read_range(blob_name(key), offset, compressed)
+        return (
+            zstandard.ZstdDecompressor()
+            .decompress(data, max_output_size=decompressed)
+            .decode("utf-8")
+        )
+
+
+def build_seek_table(entries: list[tuple[int, int]]) -> bytes:
+    """
+    zstd seekable 형식의 seek table 프레임 생성
+
+    Args:
+        entries (list[tuple[int, int]]): 프레임별 (압축 크기, 원본 크기)
+
+    Returns:
+        bytes: skippable frame
+    """
+    body = b"".join(struct.pack("<II", *entry) for entry in entries)
+    body += struct.pack("<IBI", len(entries), 0, SEEKABLE_FOOTER_MAGIC)
+    return struct.pack("<II", SEEK_TABLE_MAGIC, len(body)) + body
+
+
+def blob_name(key: str) -> str:
+    return f"objects/{key[:2]}/{key[2:]}"
+
+
+def ref_name(ref: str) -> str:
+    return f"refs/{ref}"
+
+
+def link_name(key: str, ref: str) -> str:
+    return f"links/{key}/{ref.replace('/', ':')}"
@@ -0,0 +1,420 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
+from typing import Iterable, Iterator
+
+import tiktoken
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+CHARACTER_MODE = "character"
+TOKEN_MODE = "token"
+
+# 스트리밍 청킹 시 한 번에 분할할 버퍼 크기 (chunk_size 배수)
+WINDOW_CHUNKS = 16
+
+
+@dataclass(frozen=True)
+class Chunk:
+    text: str
+    seq: int
+    start_char: int
+    end_char: int
+    start_token: int | None = None
+    end_token: int | None = None
+
+
+class Chunker:
+    """
+    문서 청킹 엔진
+
+    서버 시작 시 한 번 구성하여 재사용한다. character 모드는 기존
+    RecursiveCharacterTextSplitter와 같은 기준으로, token 모드는 tiktoken
+    토큰 수 기준으로 청크를 나눈다. 입력은 텍스트 블록 스트림으로 받고
+    청크는 문자/토큰 오프셋과 함께 제너레이터로 반환한다.
+
+    process_workers가 1 이상이고 문서 크기가 process_pool_threshold 이상이면
+    문서를 segment_size 단위 구간으로 나누어 프로세스 풀에서 병렬로
+    청킹한다. 이때 구간 경계에서는 청크 overlap이 적용되지 않는다.
+    """
+
+    def __init__(
+        self,
+        mode: str = CHARACTER_MODE,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        encoding_model: str | None = None,
+        process_workers: int = 0,
+        process_pool_threshold: int = 4 * 1024 * 1024,
+        segment_size: int = 1024 * 1024,
+    ):
+        if mode not in (CHARACTER_MODE, TOKEN_MODE):
+            raise ValueError(f"Invalid chunk mode: {mode}")
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        if mode == TOKEN_MODE and encoding_model is None:
+            raise ValueError("encoding_model is required in token mode")
+
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding_model = encoding_model
+        self.process_workers = process_workers
+        self.process_pool_threshold = process_pool_threshold
+        self.segment_size = segment_size
+        self.window_size = chunk_size * WINDOW_CHUNKS
+
+        self._text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        )
+        self._encoding = (
+            tiktoken.encoding_for_model(encoding_model)
+            if encoding_model
+            else None
+        )
+        self._token_byte_lengths: dict[int, int] = {}
+        self._executor: ProcessPoolExecutor | None = None
+
+    def chunk_text(self, text: str) -> list[Chunk]:
+        """
+        문자열 하나를 청킹
+
+        Args:
+            text (str): 문서 content
+
+        Returns:
+            list[Chunk]: 청크 리스트
+        """
+        return list(self.iter_chunks([text], size_hint=len(text)))
+
+    def iter_chunks(
+        self,
+        blocks: Iterable[str],
+        size_hint: int | None = None,
+        parallel: bool = False,
+    ) -> Iterator[Chunk]:
+        """
+        텍스트 블록 스트림을 청킹
+
+        Args:
+            blocks (Iterable[str]): document content 블록
+            size_hint (int | None): 문서 크기, 프로세스 풀 사용 여부 판단에
+                사용
+            parallel (bool): 문서 크기와 관계없이 프로세스 풀 사용. 여러
+                문서를 동시에 청킹할 때 문서 단위로 워커에 분산된다.
+
+        Yields:
+            Chunk: 청크
+        """
+        if self.process_workers > 0 and (
+            parallel
+            or (
+                size_hint is not None
+                and size_hint >= self.process_pool_threshold
+            )
+        ):
+            yield from self._iter_chunks_parallel(blocks)
+        elif self.mode == TOKEN_MODE:
+            yield from self._iter_token_chunks(blocks)
+        else:
+            yield from self._iter_character_chunks(blocks)
+
+    def count_tokens(self, text: str) -> int | None:
+        """
+        청크의 토큰 수, 인코딩이 설정되지 않았으면 None
+        """
+        if self._encoding is None:
+            return None
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def close(self) -> None:
+        """
+        프로세스 풀 종료
+        """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _iter_character_chunks(
+        self, blocks: Iterable[str], base_char: int = 0
+    ) -> Iterator[Chunk]:
+        """
+        버퍼가 window_size를 넘을 때마다 분할하고, 마지막 청크는 다음 블록과
+        이어질 수 있으므로 원문 그대로 버퍼에 남겨 다음 분할에 포함한다.
+        """
+        buffer = ""
+        seq = 0
+
+        for block in blocks:
+            buffer += block
+            if len(buffer) < self.window_size:
+                continue
+
+            documents = self._text_splitter.create_documents([buffer])
+            if len(documents) < 2:
+                continue
+            for document in documents[:-1]:
+                start = base_char + document.metadata["start_index"]
+                yield Chunk(
+                    text=document.page_content,
+                    seq=seq,
+                    start_char=start,
+                    end_char=start + len(document.page_content),
+                )
+                seq += 1
+            carry_start = documents[-1].metadata["start_index"]
+            base_char += carry_start
+            buffer = buffer[carry_start:]
+
+        if buffer:
+            for document in self._text_splitter.create_documents([buffer]):
+                start = base_char + document.metadata["start_index"]
+                yield Chunk(
+                    text=document.page_content,
+                    seq=seq,
+                    start_char=start,
+                    end_char=start + len(document.page_content),
+                )
+                seq += 1
+
+    def _iter_token_chunks(
+        self, blocks: Iterable[str], base_char: int = 0, base_token: int = 0
+    ) -> Iterator[Chunk]:
+        """
+        chunk_size 토큰 윈도우를 (chunk_size - chunk_overlap) 간격으로
+        이동하며 청킹한다. 버퍼가 window_size를 넘으면 다음 윈도우 시작
+        위치 앞부분을 잘라내고 나머지만 남긴다.
+        """
+        stride = self.chunk_size - self.chunk_overlap
+        buffer = ""
+        seq = 0
+        final = False
+        blocks = iter(blocks)
+
+        while not final:
+            block = next(blocks, None)
+            if block is None:
+                final = True
+            else:
+                buffer += block
+                if len(buffer) < self.window_size:
+                    continue
+            if not buffer:
+                break
+
+            tokens = self._encoding.encode(buffer, disallowed_special=())
+            byte_offsets = self._token_byte_offsets(tokens)
+            buffer_bytes = buffer.encode("utf-8")
+            # 윈도우 시작/끝 위치는 각각 단조 증가하므로 커서를 따로 둔다
+            start_cursor = ByteCharCursor(buffer_bytes)
+            end_cursor = ByteCharCursor(buffer_bytes)
+            start = 0
+            while start < len(tokens):
+                end = min(start + self.chunk_size, len(tokens))
+                if not final and end == len(tokens):
+                    # 버퍼 끝의 윈도우는 다음 블록과 이어질 수 있다
+                    break
+                start_char = start_cursor.char_offset(byte_offsets[start])
+                end_char = end_cursor.char_offset(byte_offsets[end])
+                text = buffer[start_char:end_char]
+                if text.strip():
+                    yield Chunk(
+                        text=text,
+                        seq=seq,
+                        start_char=base_char + start_char,
+                        end_char=base_char + end_char,
+                        start_token=base_token + start,
+                        end_token=base_token + end,
+                    )
+                    seq += 1
+                if end == len(tokens):
+                    break
+                start += stride
+
+            if not final:
+                carry_start = start_cursor.char_offset(byte_offsets[start])
+                base_char += carry_start
+                base_token += start
+                buffer = buffer[carry_start:]
+
+    def _token_byte_offsets(self, tokens: list[int]) -> list[int]:
+        """
+        각 토큰의 시작 byte 오프셋 (마지막 원소는 전체 byte 길이)
+        """
+        lengths = self._token_byte_lengths
+        try:
+            return list(
+                accumulate(map(lengths.__getitem__, tokens), initial=0)
+            )
+        except KeyError:
+            for token in set(tokens).difference(lengths):
+                lengths[token] = len(
+                    self._encoding.decode_single_token_bytes(token)
+                )
+            return list(
+                accumulate(map(lengths.__getitem__, tokens), initial=0)
+            )
+
+    def _iter_chunks_parallel(self, blocks: Iterable[str]) -> Iterator[Chunk]:
+        """
+        segment_size 단위 구간을 프로세스 풀에서 청킹하고 순서대로 반환
+
+        동시에 처리 중인 구간 수를 워커 수의 두 배로 제한하여 메모리
+        사용량을 일정하게 유지한다.
+        """
+        executor = self._get_executor()
+        pending: deque[tuple[Future, int]] = deque()
+        position = (0, 0)
+
+        for segment, base_char in iter_segments(blocks, self.segment_size):
+            future = executor.submit(
+                chunk_segment,
+                self.mode,
+                self.chunk_size,
+                self.chunk_overlap,
+                self.encoding_model,
+                segment,
+            )
+            pending.append((future, base_char))
+            while len(pending) >= self.process_workers * 2:
+                position = yield from self._drain(*pending.popleft(), position)
+
+        while pending:
+            position = yield from self._drain(*pending.popleft(), position)
+
+    def _drain(
+        self, future: Future, base_char: int, position: tuple[int, int]
+    ) -> Iterator[Chunk]:
+        """
+        구간 청킹 결과를 문서 기준 순번과 오프셋으로 변환
+
+        Returns:
+            tuple[int, int]: 다음 구간의 (시작 순번, 시작 토큰 오프셋)
+        """
+        seq, base_token = position
+        end_token = base_token
+        for chunk in future.result():
+            start_token = end_token = None
+            if chunk.start_token is not None:
+                start_token = base_token + chunk.start_token
+                end_token = base_token + chunk.end_token
+            yield Chunk(
+                text=chunk.text,
+                seq=seq,
+                start_char=base_char + chunk.start_char,
+                end_char=base_char + chunk.end_char,
+                start_token=start_token,
+                end_token=end_token,
+            )
+            seq += 1
+        return seq, end_token if end_token is not None else base_token
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # 스레드를 사용하는 서버 프로세스를 fork하지 않도록 spawn 사용
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+
+class ByteCharCursor:
+    """
+    UTF-8 byte 오프셋을 문자 오프셋으로 변환하는 커서
+
+    조회 위치가 단조 증가한다고 가정하고 직전 위치부터 이어서 디코딩하므로
+    전체 변환 비용이 버퍼 길이에 비례한다. 멀티바이트 문자 중간을 가리키면
+    해당 문자의 시작 위치로 내린다.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.byte = 0
+        self.char = 0
+
+    def char_offset(self, byte_offset: int) -> int:
+        while (
+            0 < byte_offset < len(self.data)
+            and self.data[byte_offset] & 0xC0 == 0x80
+        ):
+            byte_offset -= 1
+        if byte_offset < self.byte:
+            raise ValueError("byte offsets must be non-decreasing")
+        self.char += len(self.data[self.byte : byte_offset].decode("utf-8"))
+        self.byte = byte_offset
+        return self.char
+
+
+def iter_segments(
+    blocks: Iterable[str], segment_size: int
+) -> Iterator[tuple[str, int]]:
+    """
+    텍스트 블록을 문단 경계 기준으로 segment_size 내외의 구간으로 묶기
+
+    Args:
+        blocks (Iterable[str]): document content 블록
+        segment_size (int): 구간 크기 (문자 수)
+
+    Yields:
+        tuple[str, int]: (구간 텍스트, 문서 내 시작 오프셋)
+    """
+    buffer = ""
+    base_char = 0
+    for block in blocks:
+        buffer += block
+        while len(buffer) >= segment_size:
+            cut = find_segment_boundary(buffer, segment_size)
+            yield buffer[:cut], base_char
+            base_char += cut
+            buffer = buffer[cut:]
+    if buffer:
+        yield buffer, base_char
+
+
+def find_segment_boundary(text: str, segment_size: int) -> int:
+    """
+    segment_size 이전의 마지막 문단/줄/공백 경계 위치
+    """
+    for separator in ("\n\n", "\n", " "):
+        position = text.rfind(separator, segment_size // 2, segment_size)
+        if position != -1:
+            return position + len(separator)
+    return segment_size
+
+
+@lru_cache(maxsize=4)
+def get_worker_chunker(
+    mode: str, chunk_size: int, chunk_overlap: int, encoding_model: str | None
+) -> Chunker:
+    return Chunker(
+        mode=mode,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        encoding_model=encoding_model,
+    )
+
+
+def chunk_segment(
+    mode: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    encoding_model: str | None,
+    segment: str,
+) -> list[Chunk]:
+    """
+    프로세스 풀 워커에서 구간 하나를 청킹
+
+    Returns:
+        list[Chunk]: 구간 기준 오프셋을 가진 청크 리스트
+    """
+    chunker = get_worker_chunker(
+        mode, chunk_size, chunk_overlap, encoding_model
+    )
+    if mode == TOKEN_MODE:
+        return list(chunker._iter_token_chunks([segment]))
+    return list(chunker._iter_character_chunks([segment]))
@@ -0,0 +1,158 @@
+from typing import Callable
+
+from langchain_core.documents import Document
+
+from app.util.logger import logger
+
+# 청크 사이 구분자("\n")의 토큰 수
+SEPARATOR_TOKENS = 1
+
+
+def get_token_count(document: Document) -> int:
+    """
+    청크의 프롬프트 토큰 수
+
+    적재할 때 저장한 token_count를 사용한다. 값이 없는 이전 청크는
+    토큰화하지 않고 문자 수를 상한으로 사용한다.
+
+    Args:
+        document (Document): 청크
+
+    Returns:
+        int: 토큰 수
+    """
+    token_count = document.metadata.get("token_count")
+    if token_count is None:
+        return len(document.page_content)
+    return int(token_count)
+
+
+def pack_context(
+    documents: list[Document],
+    max_tokens: int,
+    min_score: float | None = None,
+    max_chunks: int | None = None,
+) -> list[Document]:
+    """
+    검색된 청크를 토큰 예산 안에서 순위 순으로 선택
+
+    순위가 높은 청크부터 예산에 들어가는 청크를 담고, 들어가지 않는 긴
+    청크는 건너뛰어 다음 청크를 시도한다. 반환하는 청크 수는 예산, 유사도
+    기준, max_chunks에 따라 질문마다 달라진다.
+
+    Args:
+        documents (list[Document]): 순위 순 청크
+        max_tokens (int): 컨텍스트 토큰 예산
+        min_score (float | None): metadata["score"]가 이보다 낮은 청크 제외
+        max_chunks (int | None): 최대 청크 수
+
+    Returns:
+        list[Document]: 선택한 청크 (순위 순)
+    """
+    packed = []
+    used = 0
+    for document in documents:
+        if max_chunks is not None and len(packed) >= max_chunks:
+            break
+        score = document.metadata.get("score")
+        if min_score is not None and score is not None and score < min_score:
+            continue
+        tokens = get_token_count(document) + (
+            SEPARATOR_TOKENS if packed else 0
+        )
+        if used + tokens > max_tokens:
+            continue
+        packed.append(document)
+        used += tokens
+    return packed
+
+
+def has_span(document: Document) -> bool:
+    """
+    청크의 문서 내 위치가 메타데이터에 있는지 여부
+    """
+    return all(
+        key in document.metadata
+        for key in ("document_id", "seq", "start_char", "end_char")
+    )
+
+
+def merge_adjacent_chunks(
+    documents: list[Document], read_span: Callable[[str, int, int], str]
+) -> list[Document]:
+    """
+    같은 문서에서 겹치거나 이어지는 청크를 하나의 연속 구간으로 병합
+
+    청크 overlap 때문에 이웃 청크가 함께 검색되면 같은 텍스트가 프롬프트에
+    두 번 들어가므로, 문자 범위가 겹치거나 맞닿는 청크와 seq가 연속인
+    청크를 묶어 원문에서 한 번만 읽는다. 병합된 구간은 구성 청크 중 가장
+    순위가 높은 청크의 자리에 놓는다. 위치 정보가 없는 이전 청크와 구간을
+    읽지 못한 청크, 읽은 구간에 청크 내용이 없는(문서를 수정하는 중이라
+    위치와 원문이 맞지 않는) 청크는 그대로 둔다.
+
+    Args:
+        documents (list[Document]): 순위 순 청크
+        read_span (Callable[[str, int, int], str]): (문서 ID, 시작, 끝)으로
+            원문 구간을 읽는 함수
+
+    Returns:
+        list[Document]: 병합된 청크 (순위 순)
+    """
+    groups: dict[str, list[int]] = {}
+    for rank, document in enumerate(documents):
+        if has_span(document):
+            groups.setdefault(document.metadata["document_id"], []).append(
+                rank
+            )
+
+    merged: dict[int, Document] = {}
+    dropped: set[int] = set()
+    for document_id, ranks in groups.items():
+        ranks.sort(key=lambda rank: documents[rank].metadata["start_char"])
+        runs = [[ranks[0]]]
+        for rank in ranks[1:]:
+            previous = documents[runs[-1][-1]].metadata
+            current = documents[rank].metadata
+            end_char = max(documents[r].metadata["end_char"] for r in runs[-1])
+            if (
+                current["start_char"] <= end_char
+                or current["seq"] == previous["seq"] + 1
+            ):
+                runs[-1].append(rank)
+            else:
+                runs.append([rank])
+
+        for run in runs:
+            if len(run) == 1:
+                continue
+            start_char = min(documents[r].metadata["start_char"] for r in run)
+            end_char = max(documents[r].metadata["end_char"] for r in run)
+            try:
+                text = read_span(document_id, start_char, end_char)
+            except Exception as e:
+                logger.warning(f"Failed to read chunk span: {e!r}")
+                continue
+            if any(documents[r].page_content not in text for r in run):
+                continue
+            head = min(run)
+            metadata = {
+                key: value
+                for key, value in documents[head].metadata.items()
+                if key != "token_count"
+            }
+            metadata.update(
+                seq=min(documents[r].metadata["seq"] for r in run),
+                start_char=start_char,
+                end_char=end_char,
+                chunk_ids=[documents[r].id for r in run],
+            )
+            merged[head] = Document(
+                id=documents[head].id, page_content=text, metadata=metadata
+            )
+            dropped.update(r for r in run if r != head)
+
+    return [
+        merged.get(rank, document)
+        for rank, document in enumerate(documents)
+        if rank not in dropped
+    ]
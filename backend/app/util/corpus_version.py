@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import threading
+
+
+class CorpusVersions:
+    """
+    사용자별 문서 집합 버전 (SQLite)
+
+    문서를 추가, 수정, 삭제할 때마다 버전을 올린다. 같은 파일을 여러 워커
+    프로세스가 공유하므로 한 워커의 업로드가 다른 워커의 답변 캐시도
+    무효화한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS corpus_version ("
+            "user_id TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+        connection.commit()
+
+    def get(self, user_id: str) -> int:
+        """
+        사용자의 현재 문서 집합 버전
+
+        Args:
+            user_id (str): 사용자 ID
+
+        Returns:
+            int: 버전, 문서를 변경한 적이 없으면 0
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT version FROM corpus_version WHERE user_id = ?",
+                (user_id,),
+            )
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def bump(self, user_id: str) -> None:
+        """
+        사용자의 문서 집합 버전 올리기
+
+        Args:
+            user_id (str): 사용자 ID
+        """
+        connection = self._connection()
+        connection.execute(
+            "INSERT INTO corpus_version (user_id, version) VALUES (?, 1) "
+            "ON CONFLICT (user_id) DO UPDATE SET version = version + 1",
+            (user_id,),
+        )
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
@@ -0,0 +1,389 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+
+SIMHASH_BITS = 64
+# 해밍 거리 k 이하인 지문은 k+1개 밴드 중 하나 이상이 반드시 일치한다
+SIMHASH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+SHINGLE_SIZE = 3
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def simhash(text: str) -> int:
+    """
+    텍스트의 64bit SimHash 지문
+
+    소문자로 정규화한 단어 3-gram을 특성으로 사용하므로 공백, 줄바꿈,
+    구두점 차이는 무시되고 일부 단어만 다른 텍스트는 가까운 지문을 가진다.
+
+    Args:
+        text (str): 청크 텍스트
+
+    Returns:
+        int: 부호 없는 64bit 지문
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        features = [" ".join(tokens)]
+    else:
+        features = [
+            " ".join(tokens[i : i + SHINGLE_SIZE])
+            for i in range(len(tokens) - SHINGLE_SIZE + 1)
+        ]
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        value = int.from_bytes(
+            hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        )
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def split_bands(fingerprint: int) -> list[int]:
+    return [
+        fingerprint >> (band * BAND_BITS) & BAND_MASK
+        for band in range(SIMHASH_BANDS)
+    ]
+
+
+def to_signed(fingerprint: int) -> int:
+    # SQLite INTEGER는 부호 있는 64bit
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class NearDuplicateIndex:
+    """
+    사용자별 유사 중복 청크 인덱스 (SimHash + 밴드 LSH, SQLite)
+
+    vector store에 저장된 청크의 지문을 보관하고, 새 청크와 해밍 거리가
+    max_distance 이하인 기존 청크를 찾는다. 중복으로 판단된 청크는 벡터
+    대신 원본 청크를 가리키는 참조로 저장한다. 참조에는 청크의 문서 내
+    위치를 함께 저장하여, 원본이 삭제되면 자신의 원문으로 다시 저장한다.
+    """
+
+    def __init__(self, path: str, max_distance: int = 3):
+        if max_distance >= SIMHASH_BANDS:
+            raise ValueError(
+                f"max_distance must be smaller than {SIMHASH_BANDS}"
+            )
+        self.path = path
+        self.max_distance = max_distance
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        band_columns = ", ".join(
+            f"band{band} INTEGER NOT NULL" for band in range(SIMHASH_BANDS)
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_fingerprint ("
+            "chunk_id TEXT PRIMARY KEY, user_id TEXT NOT NULL, "
+            "document_id TEXT NOT NULL, fingerprint INTEGER NOT NULL, "
+            f"{band_columns})"
+        )
+        for band in range(SIMHASH_BANDS):
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS chunk_fingerprint_band{band}_idx "
+                f"ON chunk_fingerprint (user_id, band{band})"
+            )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS chunk_fingerprint_document_idx "
+            "ON chunk_fingerprint (document_id)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_reference ("
+            "chunk_id TEXT PRIMARY KEY, user_id TEXT NOT NULL, "
+            "document_id TEXT NOT NULL, document_name TEXT NOT NULL, "
+            "canonical_chunk_id TEXT NOT NULL, seq INTEGER, "
+            "start_char INTEGER, end_char INTEGER)"
+        )
+        # 위치 열이 없던 인덱스는 열을 추가하고, 기존 참조는 위치 없이 둔다
+        columns = {
+            row[1]
+            for row in connection.execute("PRAGMA table_info(chunk_reference)")
+        }
+        for column in ("seq", "start_char", "end_char"):
+            if column not in columns:
+                connection.execute(
+                    f"ALTER TABLE chunk_reference ADD COLUMN {column} INTEGER"
+                )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS chunk_reference_document_idx "
+            "ON chunk_reference (document_id)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS chunk_reference_canonical_idx "
+            "ON chunk_reference (canonical_chunk_id)"
+        )
+        connection.commit()
+
+    def find(self, user_id: str, fingerprint: int) -> str | None:
+        """
+        사용자의 청크 중 유사 중복 청크 검색
+
+        Args:
+            user_id (str): 사용자 ID
+            fingerprint (int): 새 청크의 SimHash 지문
+
+        Returns:
+            str | None: 가장 가까운 기존 청크 ID, 없으면 None
+        """
+        bands = split_bands(fingerprint)
+        condition = " OR ".join(
+            f"band{band} = ?" for band in range(SIMHASH_BANDS)
+        )
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT chunk_id, fingerprint FROM chunk_fingerprint "
+                f"WHERE user_id = ? AND ({condition})",
+                [user_id, *bands],
+            )
+            .fetchall()
+        )
+        best = None
+        best_distance = self.max_distance + 1
+        for chunk_id, candidate in rows:
+            distance = hamming_distance(fingerprint, to_unsigned(candidate))
+            if distance < best_distance:
+                best, best_distance = chunk_id, distance
+        return best
+
+    def add(
+        self,
+        user_id: str,
+        document_id: str,
+        fingerprints: list[tuple[str, int]],
+    ) -> None:
+        """
+        vector store에 저장한 청크의 지문 등록
+
+        Args:
+            user_id (str): 사용자 ID
+            document_id (str): 문서 ID
+            fingerprints (list[tuple[str, int]]): (청크 ID, 지문) 리스트
+        """
+        connection = self._connection()
+        placeholders = ", ".join("?" * (SIMHASH_BANDS + 4))
+        connection.executemany(
+            "INSERT OR REPLACE INTO chunk_fingerprint "
+            f"VALUES ({placeholders})",
+            [
+                (
+                    chunk_id,
+                    user_id,
+                    document_id,
+                    to_signed(fingerprint),
+                    *split_bands(fingerprint),
+                )
+                for chunk_id, fingerprint in fingerprints
+            ],
+        )
+        connection.commit()
+
+    def add_references(
+        self,
+        user_id: str,
+        document_id: str,
+        document_name: str,
+        references: list[tuple[str, str, int, int, int]],
+    ) -> None:
+        """
+        중복 청크를 원본 청크 참조로 저장
+
+        Args:
+            user_id (str): 사용자 ID
+            document_id (str): 문서 ID
+            document_name (str): 문서 이름
+            references (list[tuple[str, str, int, int, int]]): (청크 ID, 원본
+                청크 ID, 문서 내 순서, 시작 문자 오프셋, 끝 문자 오프셋)
+        """
+        connection = self._connection()
+        connection.executemany(
+            "INSERT OR REPLACE INTO chunk_reference (chunk_id, user_id, "
+            "document_id, document_name, canonical_chunk_id, seq, "
+            "start_char, end_char) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (chunk_id, user_id, document_id, document_name, *reference)
+                for chunk_id, *reference in references
+            ],
+        )
+        connection.commit()
+
+    def update_positions(
+        self, positions: list[tuple[str, int, int, int]]
+    ) -> None:
+        """
+        수정된 문서에서 유지된 참조의 위치 갱신
+
+        Args:
+            positions (list[tuple[str, int, int, int]]): (청크 ID, 문서 내
+                순서, 시작 문자 오프셋, 끝 문자 오프셋)
+        """
+        connection = self._connection()
+        connection.executemany(
+            "UPDATE chunk_reference SET seq = ?, start_char = ?, "
+            "end_char = ? WHERE chunk_id = ?",
+            [
+                (seq, start_char, end_char, chunk_id)
+                for chunk_id, seq, start_char, end_char in positions
+            ],
+        )
+        connection.commit()
+
+    def get_reference_ids(self, document_id: str) -> set[str]:
+        """
+        문서에서 참조로 저장된 청크 ID
+        """
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT chunk_id FROM chunk_reference WHERE document_id = ?",
+                (document_id,),
+            )
+            .fetchall()
+        )
+        return {row[0] for row in rows}
+
+    def get_referrers(self, canonical_chunk_ids: list[str]) -> list[tuple]:
+        """
+        원본 청크를 참조하는 다른 청크 조회
+
+        Returns:
+            list[tuple]: (원본 청크 ID, 청크 ID, 사용자 ID, 문서 ID, 문서
+                이름, 문서 내 순서, 시작 문자 오프셋, 끝 문자 오프셋), 원본
+                청크별로 등록 순서대로 정렬, 위치가 없는 이전 참조는 None
+        """
+        rows = []
+        connection = self._connection()
+        for start in range(0, len(canonical_chunk_ids), 500):
+            batch = canonical_chunk_ids[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(
+                connection.execute(
+                    "SELECT canonical_chunk_id, chunk_id, user_id, "
+                    "document_id, document_name, seq, start_char, end_char "
+                    "FROM chunk_reference "
+                    f"WHERE canonical_chunk_id IN ({placeholders}) "
+                    "ORDER BY canonical_chunk_id, rowid",
+                    batch,
+                ).fetchall()
+            )
+        return rows
+
+    def get_reference_documents(self, user_id: str) -> list[tuple[str, str]]:
+        """
+        참조로 저장된 청크가 있는 사용자 문서
+
+        Returns:
+            list[tuple[str, str]]: (문서 ID, 문서 이름) 리스트
+        """
+        return (
+            self._connection()
+            .execute(
+                "SELECT DISTINCT document_id, document_name "
+                "FROM chunk_reference WHERE user_id = ?",
+                (user_id,),
+            )
+            .fetchall()
+        )
+
+    def has_document(self, user_id: str, document_id: str) -> bool:
+        """
+        사용자 문서에 참조로 저장된 청크가 있는지 확인
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT 1 FROM chunk_reference "
+                "WHERE user_id = ? AND document_id = ? LIMIT 1",
+                (user_id, document_id),
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def rename_document(self, document_id: str, document_name: str) -> None:
+        """
+        참조로 저장된 청크의 문서 이름 변경
+        """
+        connection = self._connection()
+        connection.execute(
+            "UPDATE chunk_reference SET document_name = ? "
+            "WHERE document_id = ?",
+            (document_name, document_id),
+        )
+        connection.commit()
+
+    def repoint_references(
+        self, canonical_chunk_id: str, new_canonical_chunk_id: str
+    ) -> None:
+        """
+        원본 청크가 바뀐 참조를 새 원본으로 변경
+        """
+        connection = self._connection()
+        connection.execute(
+            "UPDATE chunk_reference SET canonical_chunk_id = ? "
+            "WHERE canonical_chunk_id = ?",
+            (new_canonical_chunk_id, canonical_chunk_id),
+        )
+        connection.commit()
+
+    def remove_chunks(self, chunk_ids: list[str]) -> None:
+        """
+        청크 ID의 지문과 참조 삭제
+        """
+        connection = self._connection()
+        connection.executemany(
+            "DELETE FROM chunk_fingerprint WHERE chunk_id = ?",
+            [(chunk_id,) for chunk_id in chunk_ids],
+        )
+        connection.executemany(
+            "DELETE FROM chunk_reference WHERE chunk_id = ?",
+            [(chunk_id,) for chunk_id in chunk_ids],
+        )
+        connection.commit()
+
+    def remove_document(self, document_id: str) -> None:
+        """
+        문서의 지문과 참조 삭제
+        """
+        connection = self._connection()
+        connection.execute(
+            "DELETE FROM chunk_fingerprint WHERE document_id = ?",
+            (document_id,),
+        )
+        connection.execute(
+            "DELETE FROM chunk_reference WHERE document_id = ?",
+            (document_id,),
+        )
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
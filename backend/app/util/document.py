@@ -1,27 +1,240 @@
+import asyncio
+import hashlib
 import os
+import uuid
+from typing import IO, Callable, Iterable, Iterator
 
-from langchain_chroma import Chroma
+from fastapi import UploadFile
 from langchain_core.documents import Document
 from langchain_openai import OpenAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from app.core.config import settings
+from app.services.embedding import (
+    CachedEmbeddings,
+    EmbeddingBatcher,
+    QueryCachedEmbeddings,
+)
+from app.util.archive import (
+    ArchiveLimitError,
+    UploadBudget,
+    iter_archive_members,
+)
+from app.util.blob_store import (
+    BlobNotFoundError,
+    BlobStore,
+    LocalBlobBackend,
+    S3BlobBackend,
+)
+from app.util.chunker import Chunk, Chunker
+from app.util.context_packer import merge_adjacent_chunks
+from app.util.corpus_version import CorpusVersions
+from app.util.dedup import NearDuplicateIndex, hamming_distance, simhash
+from app.util.embedding_cache import EmbeddingCache
+from app.util.extractor import (
+    DocumentExtractor,
+    UnsupportedDocumentError,
+    sniff_document_format,
+)
+from app.util.lexical_index import LexicalIndex
+from app.util.logger import logger
+from app.util.query_cache import (
+    PostgresQueryEmbeddingStore,
+    QueryEmbeddingCache,
+)
+from app.util.single_flight import SingleFlight
+from app.util.tokenizer import OpenAiTokenizer
+from app.util.vector_executor import VectorStoreExecutor
+from app.util.vector_shard import VectorStoreShards
+from app.util.vectorstore.base import VectorStore
 
 OPENAI_API_KEY = settings.OPENAI_API_KEY
 OPENAI_EMBEDDING_MODEL = settings.OPENAI_EMBEDDING_MODEL
+OPENAI_EMBEDDING_DIMENSIONS = settings.OPENAI_EMBEDDING_DIMENSIONS
+CHUNK_MODE = settings.CHUNK_MODE
 CHUNK_SIZE = settings.CHUNK_SIZE
 CHUNK_OVERLAP = settings.CHUNK_OVERLAP
+CHUNK_PROCESS_WORKERS = settings.CHUNK_PROCESS_WORKERS
+CHUNK_PROCESS_POOL_THRESHOLD = settings.CHUNK_PROCESS_POOL_THRESHOLD
+CHUNK_SEGMENT_SIZE = settings.CHUNK_SEGMENT_SIZE
 CHROMA_DB_PATH = settings.CHROMA_DB_PATH
 COLLECTION_NAME = settings.COLLECTION_NAME
+VECTOR_SHARD_BUCKETS = settings.VECTOR_SHARD_BUCKETS
+VECTOR_SHARD_MAX_OPEN = settings.VECTOR_SHARD_MAX_OPEN
+VECTOR_SHARD_PATHS = settings.VECTOR_SHARD_PATHS or [CHROMA_DB_PATH]
+VECTOR_STORE_WORKERS = settings.VECTOR_STORE_WORKERS
+VECTOR_STORE_MAX_QUEUE = settings.VECTOR_STORE_MAX_QUEUE
+VECTOR_STORE_BACKEND = settings.VECTOR_STORE_BACKEND
+HNSW_M = settings.HNSW_M
+HNSW_EF_CONSTRUCTION = settings.HNSW_EF_CONSTRUCTION
+HNSW_EF_SEARCH = settings.HNSW_EF_SEARCH
+VECTOR_QUANTIZATION = settings.VECTOR_QUANTIZATION
+VECTOR_TRUNCATE_DIMENSIONS = settings.VECTOR_TRUNCATE_DIMENSIONS
+VECTOR_RESCORE_FACTOR = settings.VECTOR_RESCORE_FACTOR
+EMBEDDING_CACHE_ENABLED = settings.EMBEDDING_CACHE_ENABLED
+EMBEDDING_CACHE_PATH = (
+    settings.EMBEDDING_CACHE_PATH or f"{CHROMA_DB_PATH}/embedding_cache.db"
+)
+EMBEDDING_CACHE_MAX_BYTES = settings.EMBEDDING_CACHE_MAX_BYTES
+QUERY_EMBEDDING_CACHE_ENABLED = settings.QUERY_EMBEDDING_CACHE_ENABLED
+QUERY_EMBEDDING_CACHE_SIZE = settings.QUERY_EMBEDDING_CACHE_SIZE
+QUERY_EMBEDDING_CACHE_TTL = settings.QUERY_EMBEDDING_CACHE_TTL
+QUERY_EMBEDDING_CACHE_SHARED = settings.QUERY_EMBEDDING_CACHE_SHARED
+UPLOAD_BLOCK_SIZE = settings.UPLOAD_BLOCK_SIZE
+INGEST_BATCH_SIZE = settings.INGEST_BATCH_SIZE
+EXTRACT_PROCESS_WORKERS = settings.EXTRACT_PROCESS_WORKERS
+EXTRACT_MEMORY_LIMIT = settings.EXTRACT_MEMORY_LIMIT
+EXTRACT_TIMEOUT = settings.EXTRACT_TIMEOUT
+DEDUP_ENABLED = settings.DEDUP_ENABLED
+DEDUP_INDEX_PATH = (
+    settings.DEDUP_INDEX_PATH or f"{CHROMA_DB_PATH}/dedup_index.db"
+)
+DEDUP_MAX_DISTANCE = settings.DEDUP_MAX_DISTANCE
+LEXICAL_INDEX_ENABLED = settings.LEXICAL_INDEX_ENABLED
+SINGLE_FLIGHT_ENABLED = settings.SINGLE_FLIGHT_ENABLED
+LEXICAL_INDEX_PATH = (
+    settings.LEXICAL_INDEX_PATH or f"{CHROMA_DB_PATH}/lexical_index"
+)
+CORPUS_VERSION_PATH = (
+    settings.CORPUS_VERSION_PATH or f"{CHROMA_DB_PATH}/corpus_version.db"
+)
+BLOB_STORE_BACKEND = settings.BLOB_STORE_BACKEND
+BLOB_STORE_PATH = (
+    settings.BLOB_STORE_PATH or f"{CHROMA_DB_PATH}/document_store"
+)
+BLOB_STORE_S3_BUCKET = settings.BLOB_STORE_S3_BUCKET
+BLOB_STORE_S3_PREFIX = settings.BLOB_STORE_S3_PREFIX
+BLOB_STORE_S3_ENDPOINT_URL = settings.BLOB_STORE_S3_ENDPOINT_URL
+BLOB_FRAME_CHARS = settings.BLOB_FRAME_CHARS
+BLOB_COMPRESSION_LEVEL = settings.BLOB_COMPRESSION_LEVEL
+
+chunker = Chunker(
+    mode=CHUNK_MODE,
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+    encoding_model=OPENAI_EMBEDDING_MODEL,
+    process_workers=CHUNK_PROCESS_WORKERS,
+    process_pool_threshold=CHUNK_PROCESS_POOL_THRESHOLD,
+    segment_size=CHUNK_SEGMENT_SIZE,
+)
+
+document_extractor = DocumentExtractor(
+    process_workers=EXTRACT_PROCESS_WORKERS,
+    memory_limit=EXTRACT_MEMORY_LIMIT,
+    timeout=EXTRACT_TIMEOUT,
+)
 
 embedding_model = OpenAIEmbeddings(
-    model=OPENAI_EMBEDDING_MODEL, api_key=OPENAI_API_KEY.get_secret_value()
+    model=OPENAI_EMBEDDING_MODEL,
+    api_key=OPENAI_API_KEY.get_secret_value(),
+    dimensions=OPENAI_EMBEDDING_DIMENSIONS,
+)
+
+# 청크의 프롬프트 토큰 수는 적재할 때 채팅 모델 기준으로 계산하여 저장
+prompt_tokenizer = OpenAiTokenizer()
+
+# 동시에 들어오는 업로드의 청크를 하나의 배치로 묶어 임베딩
+embedding_batcher = EmbeddingBatcher(embedding_model)
+
+# 청크와 질의 임베딩 모두 디스크 캐시를 먼저 조회
+if EMBEDDING_CACHE_ENABLED:
+    embedding_cache = EmbeddingCache(
+        EMBEDDING_CACHE_PATH,
+        model=OPENAI_EMBEDDING_MODEL,
+        dimensions=OPENAI_EMBEDDING_DIMENSIONS,
+        max_bytes=EMBEDDING_CACHE_MAX_BYTES,
+    )
+    document_embeddings = CachedEmbeddings(embedding_batcher, embedding_cache)
+else:
+    embedding_cache = None
+    document_embeddings = embedding_batcher
+
+# 반복되는 질문은 메모리(와 공유 저장소)에서 바로 임베딩을 가져온다
+if QUERY_EMBEDDING_CACHE_ENABLED:
+    query_embedding_cache = QueryEmbeddingCache(
+        model=OPENAI_EMBEDDING_MODEL,
+        dimensions=OPENAI_EMBEDDING_DIMENSIONS,
+        maxsize=QUERY_EMBEDDING_CACHE_SIZE,
+        ttl=QUERY_EMBEDDING_CACHE_TTL,
+        shared=(
+            PostgresQueryEmbeddingStore(
+                purge_interval=QUERY_EMBEDDING_CACHE_TTL
+            )
+            if QUERY_EMBEDDING_CACHE_SHARED
+            else None
+        ),
+    )
+    document_embeddings = QueryCachedEmbeddings(
+        document_embeddings, query_embedding_cache
+    )
+else:
+    query_embedding_cache = None
+
+# 같은 질문이 동시에 들어오면 임베딩 API는 한 번만 호출
+query_embedding_flight = SingleFlight() if SINGLE_FLIGHT_ENABLED else None
+
+# 머리글, 면책 조항 등 반복되는 청크는 벡터 대신 참조로 저장
+near_duplicate_index = (
+    NearDuplicateIndex(DEDUP_INDEX_PATH, max_distance=DEDUP_MAX_DISTANCE)
+    if DEDUP_ENABLED
+    else None
+)
+
+# 식별자, 오류 코드 등 정확한 단어 검색과 임베딩 없는 검색을 위한 BM25 색인
+lexical_index = (
+    LexicalIndex(LEXICAL_INDEX_PATH) if LEXICAL_INDEX_ENABLED else None
 )
 
-vector_store = Chroma(
+# 문서가 바뀔 때마다 올라가는 사용자별 버전, 답변 캐시 무효화에 사용
+corpus_versions = CorpusVersions(CORPUS_VERSION_PATH)
+
+# 추출한 텍스트는 vector DB와 분리된 blob 저장소에 압축하여 보관
+if BLOB_STORE_BACKEND == "s3":
+    blob_backend = S3BlobBackend(
+        bucket=BLOB_STORE_S3_BUCKET,
+        prefix=BLOB_STORE_S3_PREFIX,
+        endpoint_url=BLOB_STORE_S3_ENDPOINT_URL,
+    )
+else:
+    blob_backend = LocalBlobBackend(BLOB_STORE_PATH)
+blob_store = BlobStore(
+    blob_backend,
+    frame_chars=BLOB_FRAME_CHARS,
+    compression_level=BLOB_COMPRESSION_LEVEL,
+    temp_dir=f"{BLOB_STORE_PATH}/tmp",
+)
+
+
+# hnsw/flat 백엔드는 압축 벡터로 후보를 찾고 원본 벡터로 다시 점수 계산
+if VECTOR_STORE_BACKEND == "chroma":
+    vector_store_options = {}
+else:
+    vector_store_options = {
+        "quantization": VECTOR_QUANTIZATION,
+        "truncate_dimensions": VECTOR_TRUNCATE_DIMENSIONS,
+        "rescore_factor": VECTOR_RESCORE_FACTOR,
+    }
+if VECTOR_STORE_BACKEND == "hnsw":
+    vector_store_options.update(
+        m=HNSW_M,
+        ef_construction=HNSW_EF_CONSTRUCTION,
+        ef_search=HNSW_EF_SEARCH,
+    )
+
+# 사용자(또는 사용자 해시 버킷)마다 별도의 vector store 샤드를 사용
+vector_shards = VectorStoreShards(
     collection_name=COLLECTION_NAME,
-    embedding_function=embedding_model,
-    persist_directory=CHROMA_DB_PATH,
+    embedding_function=document_embeddings,
+    paths=VECTOR_SHARD_PATHS,
+    buckets=VECTOR_SHARD_BUCKETS,
+    max_open=VECTOR_SHARD_MAX_OPEN,
+    backend=VECTOR_STORE_BACKEND,
+    backend_options=vector_store_options,
+)
+
+# 요청 경로의 vector store 호출은 이벤트 루프를 막지 않도록 전용
+# 스레드에서 실행
+vector_executor = VectorStoreExecutor(
+    max_workers=VECTOR_STORE_WORKERS, max_queue=VECTOR_STORE_MAX_QUEUE
 )
 
 
@@ -29,7 +242,7 @@ def save_user_document_to_file(
     user_id: str, document_id: str, document_content: str
 ) -> None:
     """
-    파일 저장
+    문서 텍스트를 blob 저장소에 저장
 
     Args:
         user_id (str): 사용자 ID
@@ -37,131 +250,1076 @@ def save_user_document_to_file(
         document_content (str): 문서 내용
     """
     try:
-        file_path = f"{CHROMA_DB_PATH}/{user_id}/{document_id}.txt"
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(document_content)
+        blob_store.write_text(
+            [document_content], get_user_document_ref(user_id, document_id)
+        )
     except Exception as e:
         raise Exception(e)
 
 
-def read_user_document_from_file(user_id: str, document_id: str) -> str:
+async def save_user_document_stream_to_file(
+    user_id: str, document_id: str, document: UploadFile
+) -> int:
     """
-    파일 읽어오기
+    업로드 파일을 블록 단위로 읽어 원본 그대로 디스크에 저장
+
+    파일 쓰기는 이벤트 루프를 막지 않도록 스레드에서 실행한다. 텍스트
+    추출은 적재 작업에서 수행하며, 여기서는 내용으로 형식만 확인한다.
 
     Args:
         user_id (str): 사용자 ID
         document_id (str): 문서 ID
+        document (UploadFile): 업로드된 파일
 
     Returns:
-        str: 파일의 content
+        int: 저장한 바이트 수
+
+    Raises:
+        UnsupportedDocumentError: 텍스트를 추출할 수 없는 형식
     """
-    file_path = f"{CHROMA_DB_PATH}/{user_id}/{document_id}.txt"
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
+    file_path = get_user_document_source_path(user_id, document_id)
+    await asyncio.to_thread(
+        os.makedirs, os.path.dirname(file_path), exist_ok=True
+    )
+    total_size = 0
 
+    f = await asyncio.to_thread(open, file_path, "wb")
+    try:
+        while block := await document.read(UPLOAD_BLOCK_SIZE):
+            total_size += len(block)
+            await asyncio.to_thread(f.write, block)
+    except Exception as e:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.remove, file_path)
+        raise Exception(e)
+    await asyncio.to_thread(f.close)
+    await asyncio.to_thread(check_document_format, file_path)
+    return total_size
 
-def get_user_documents_from_vector_store(user_id: str) -> list[str]:
+
+def save_user_document_blocks_to_file(
+    user_id: str, document_id: str, document: IO[bytes]
+) -> int:
     """
-    사용자의 문서 목록 조회
+    바이너리 파일 객체를 블록 단위로 읽어 원본 그대로 디스크에 저장
+
+    압축 파일 멤버처럼 동기 스트림으로 받는 문서에 사용한다.
 
     Args:
         user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+        document (IO[bytes]): 문서 파일 객체
 
     Returns:
-        list[dict]: 문서 메타데이터 리스트
+        int: 저장한 바이트 수
+
+    Raises:
+        UnsupportedDocumentError: 텍스트를 추출할 수 없는 형식
     """
+    file_path = get_user_document_source_path(user_id, document_id)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    total_size = 0
+
     try:
-        documents = vector_store._collection.get(
-            where={"user_id": user_id}, include=["metadatas", "documents"]
+        with open(file_path, "wb") as f:
+            while block := document.read(UPLOAD_BLOCK_SIZE):
+                total_size += len(block)
+                f.write(block)
+    except Exception as e:
+        os.remove(file_path)
+        raise Exception(e)
+    check_document_format(file_path)
+    return total_size
+
+
+def check_document_format(file_path: str) -> str:
+    """
+    저장한 원본 파일의 형식 확인, 지원하지 않으면 파일 삭제
+
+    Args:
+        file_path (str): 원본 파일 경로
+
+    Returns:
+        str: 문서 형식
+
+    Raises:
+        UnsupportedDocumentError: 텍스트를 추출할 수 없는 형식
+    """
+    document_format = sniff_document_format(file_path)
+    if document_format is None:
+        os.remove(file_path)
+        raise UnsupportedDocumentError("Unsupported document format")
+    return document_format
+
+
+def extract_user_document(
+    user_id: str, document_id: str, ref: str | None = None
+) -> None:
+    """
+    원본 파일에서 텍스트를 추출하여 blob 저장소에 저장
+
+    추출은 프로세스 풀에서 페이지 단위로 임시 파일에 기록되며, 압축하여
+    blob 저장소에 올린 뒤 원본과 임시 파일을 삭제한다. 원본이 없으면 이미
+    추출된 것으로 보고 넘어간다.
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+        ref (str | None): blob을 연결할 ref, 없으면 문서의 ref
+    """
+    source_path = get_user_document_source_path(user_id, document_id)
+    if not os.path.exists(source_path):
+        return
+    text_path = get_user_document_path(user_id, document_id)
+    try:
+        document_extractor.extract(source_path, text_path)
+        blob_store.write_text_file(
+            text_path,
+            UPLOAD_BLOCK_SIZE,
+            ref or get_user_document_ref(user_id, document_id),
         )
+    finally:
+        if os.path.exists(text_path):
+            os.remove(text_path)
+    os.remove(source_path)
+
+
+def save_user_archive_to_files(
+    user_id: str,
+    archive: IO[bytes],
+    archive_type: str,
+    budget: UploadBudget | None = None,
+) -> list[dict]:
+    """
+    압축 파일의 문서를 하나씩 풀어 사용자 문서로 저장
+
+    멤버 단위로 스트리밍하여 저장하므로 압축 파일 전체를 메모리에 올리지
+    않는다. 지원하지 않는 형식의 멤버는 결과에 에러로 기록하고 계속
+    진행한다.
+
+    Args:
+        user_id (str): 사용자 ID
+        archive (IO[bytes]): 압축 파일 객체
+        archive_type (str): "zip" 또는 "tar"
+        budget (UploadBudget | None): 요청 전체의 파일 수와 크기 한도
+
+    Returns:
+        list[dict]: 멤버별 filename, document_id 또는 error
+
+    Raises:
+        ArchiveLimitError: 제한을 넘은 경우, 이미 저장한 문서는 삭제된다
+    """
+    results = []
+    try:
+        for member_name, member in iter_archive_members(
+            archive, archive_type, budget
+        ):
+            document_id = str(uuid.uuid4())
+            try:
+                save_user_document_blocks_to_file(user_id, document_id, member)
+                results.append(
+                    {"filename": member_name, "document_id": document_id}
+                )
+            except Exception as e:
+                results.append({"filename": member_name, "error": str(e)})
+    except ArchiveLimitError:
+        for result in results:
+            if "document_id" in result:
+                os.remove(
+                    get_user_document_source_path(
+                        user_id, result["document_id"]
+                    )
+                )
+        raise
+    return results
+
+
+def get_user_document_path(user_id: str, document_id: str) -> str:
+    """
+    blob 저장소에 올리기 전 추출한 텍스트의 임시 저장 경로 반환
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Returns:
+        str: 파일 경로
+    """
+    return f"{BLOB_STORE_PATH}/staging/{user_id}/{document_id}.txt"
+
+
+def get_user_document_source_path(user_id: str, document_id: str) -> str:
+    """
+    텍스트 추출 전 업로드 원본의 저장 경로 반환
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Returns:
+        str: 파일 경로
+    """
+    return f"{BLOB_STORE_PATH}/staging/{user_id}/{document_id}.src"
 
-        parsed_document_metadatas = parse_document_metadata(documents)
-        return parsed_document_metadatas
+
+def get_user_document_ref(user_id: str, document_id: str) -> str:
+    """
+    사용자 문서가 가리키는 blob의 ref 이름 반환
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Returns:
+        str: ref 이름
+    """
+    return f"{user_id}/{document_id}"
+
+
+def get_user_document_pending_ref(user_id: str, document_id: str) -> str:
+    """
+    수정 중인 문서의 새 내용이 가리키는 blob의 ref 이름 반환
+
+    청크 위치를 모두 갱신한 뒤에 문서의 ref로 옮긴다.
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Returns:
+        str: ref 이름
+    """
+    return f"{user_id}/{document_id}.pending"
+
+
+def get_user_document_blob_key(user_id: str, document_id: str) -> str:
+    """
+    사용자 문서의 blob 키 반환
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Returns:
+        str: blob 키
+
+    Raises:
+        BlobNotFoundError: 저장된 문서가 없는 경우
+    """
+    blob_key = blob_store.resolve(get_user_document_ref(user_id, document_id))
+    if blob_key is None:
+        raise BlobNotFoundError(f"{user_id}/{document_id}")
+    return blob_key
+
+
+def iter_user_document_from_file(
+    user_id: str, document_id: str
+) -> Iterator[str]:
+    """
+    문서를 blob 프레임 단위로 읽어오기
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Yields:
+        str: 문서 content 블록
+    """
+    yield from blob_store.iter_text(
+        get_user_document_blob_key(user_id, document_id)
+    )
+
+
+def get_user_document_size(user_id: str, document_id: str) -> int:
+    """
+    저장된 문서 크기 (압축 전)
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Returns:
+        int: 문서 크기 (bytes)
+    """
+    return blob_store.size(get_user_document_blob_key(user_id, document_id))
+
+
+def get_user_document_info(user_id: str, document_id: str) -> dict:
+    """
+    문서 목록에 저장할 문서 크기와 내용 해시
+
+    blob 키가 추출한 텍스트의 SHA-256이므로 문서를 다시 읽지 않는다.
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Returns:
+        dict: size (압축 전 bytes), content_hash
+    """
+    blob_key = get_user_document_blob_key(user_id, document_id)
+    return {"size": blob_store.size(blob_key), "content_hash": blob_key}
+
+
+def read_user_document_from_file(user_id: str, document_id: str) -> str:
+    """
+    문서 전체 읽어오기
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Returns:
+        str: 문서의 content
+    """
+    return blob_store.read_text(
+        get_user_document_blob_key(user_id, document_id)
+    )
+
+
+def read_user_document_span(
+    user_id: str, document_id: str, start_char: int, end_char: int
+) -> str:
+    """
+    문서의 문자 범위 읽어오기
+
+    해당 범위를 포함하는 blob 프레임만 읽어 압축을 풀므로 청크의 원문을
+    문서 전체를 읽지 않고 가져올 수 있다.
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+        start_char (int): 시작 문자 오프셋
+        end_char (int): 끝 문자 오프셋 (포함하지 않음)
+
+    Returns:
+        str: 범위의 content
+    """
+    return blob_store.read_text(
+        get_user_document_blob_key(user_id, document_id),
+        start_char,
+        end_char,
+    )
+
+
+def delete_user_document_file(user_id: str, document_id: str) -> None:
+    """
+    사용자 문서의 blob 참조와 임시 파일 삭제
+
+    같은 내용의 다른 문서가 없으면 blob도 삭제된다.
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+    """
+    blob_store.unlink(get_user_document_ref(user_id, document_id))
+    for path in (
+        get_user_document_source_path(user_id, document_id),
+        get_user_document_path(user_id, document_id),
+    ):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def get_user_document_chunks_from_vector_store(
+    user_id: str, document_id: str
+) -> list[str]:
+    """
+    문서 하나의 청크 내용 조회
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+
+    Returns:
+        list[str]: 청크 내용 리스트
+    """
+    with vector_shards.open(user_id) as vector_store:
+        documents = vector_store.get(
+            where={"user_id": user_id, "document_id": document_id}
+        )
+    documents.sort(key=lambda document: document.metadata.get("seq", 0))
+    return [document.page_content for document in documents]
+
+
+def delete_document_from_vector_store(user_id: str, document_id: str) -> None:
+    """
+    문서 삭제
+
+    다른 문서가 중복 참조하던 청크는 참조하던 문서의 청크로 다시 저장한다.
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+    """
+    try:
+        with vector_shards.open(user_id) as vector_store:
+            if near_duplicate_index is not None:
+                near_duplicate_index.remove_document(document_id)
+                chunk_ids = [
+                    document.id
+                    for document in vector_store.get(
+                        where={"document_id": document_id},
+                        include_documents=False,
+                    )
+                ]
+                rematerialize_references(user_id, vector_store, chunk_ids)
+            vector_store.delete(where={"document_id": document_id})
+        if lexical_index is not None:
+            lexical_index.delete_document(user_id, document_id)
+        corpus_versions.bump(user_id)
     except Exception as e:
         raise Exception(e)
 
 
-def parse_document_metadata(document_metadatas: list[dict]) -> list[dict]:
+def delete_chunks_from_vector_store(
+    user_id: str, chunk_ids: list[str]
+) -> None:
     """
-    문서 메타데이터 파싱
+    청크 삭제, 다른 문서가 중복 참조하던 청크는 참조하던 문서로 옮김
 
     Args:
-        document_metadatas (list[dict]): 문서 메타데이터 리스트
+        user_id (str): 사용자 ID
+        chunk_ids (list[str]): 삭제할 청크 ID
+    """
+    with vector_shards.open(user_id) as vector_store:
+        if near_duplicate_index is not None:
+            near_duplicate_index.remove_chunks(chunk_ids)
+            rematerialize_references(user_id, vector_store, chunk_ids)
+        vector_store.delete(ids=chunk_ids)
+    if lexical_index is not None:
+        lexical_index.delete_chunks(user_id, chunk_ids)
+    corpus_versions.bump(user_id)
 
-    Returns:
-        list[dict]: 파싱된 문서 메타데이터 리스트
+
+def rematerialize_references(
+    user_id: str, vector_store: VectorStore, canonical_chunk_ids: list[str]
+) -> None:
     """
-    document_dict = {}
+    삭제될 원본 청크를 참조하는 첫 번째 청크를 vector store에 저장하고
+    나머지 참조를 그 청크로 옮김
+
+    참조 청크는 원본과 일부 단어가 다를 수 있으므로 참조에 저장된 위치로
+    자신의 문서에서 원문을 읽어 저장한다. 위치가 없는 이전 참조나 원문을
+    읽지 못한 참조는 원본 청크의 텍스트로 저장한다. 중복 인덱스는
+    사용자별이므로 참조하는 청크도 같은 샤드에 있다.
 
-    for metadata, document in zip(
-        document_metadatas["metadatas"],
-        document_metadatas["documents"],
+    Args:
+        user_id (str): 사용자 ID
+        vector_store (VectorStore): 사용자의 샤드
+        canonical_chunk_ids (list[str]): 삭제될 원본 청크 ID
+    """
+    referrers = {}
+    for canonical_id, *referrer in near_duplicate_index.get_referrers(
+        canonical_chunk_ids
     ):
-        if metadata["document_name"] not in document_dict:
-            document_dict[metadata["document_name"]] = {
-                "document_id": metadata["document_id"],
-                "documents": [],
+        referrers.setdefault(canonical_id, referrer)
+    if not referrers:
+        return
+
+    documents = []
+    for canonical in vector_store.get(ids=list(referrers)):
+        chunk_id, _, document_id, document_name, *position = referrers[
+            canonical.id
+        ]
+        document = rematerialize_reference(
+            user_id, chunk_id, document_id, document_name, position
+        )
+        if document is None:
+            # 원본 청크의 위치는 다른 문서의 것이므로 병합 대상에서 제외한다
+            metadata = {
+                key: value
+                for key, value in canonical.metadata.items()
+                if key not in ("seq", "start_char", "end_char")
             }
-        document_dict[metadata["document_name"]]["documents"].append(document)
+            document = Document(
+                id=chunk_id,
+                page_content=canonical.page_content,
+                metadata={
+                    **metadata,
+                    "user_id": user_id,
+                    "document_id": document_id,
+                    "document_name": document_name,
+                },
+            )
+        documents.append(document)
+        near_duplicate_index.remove_chunks([chunk_id])
+        near_duplicate_index.repoint_references(canonical.id, chunk_id)
+        near_duplicate_index.add(
+            user_id, document_id, [(chunk_id, simhash(document.page_content))]
+        )
+    vector_store.add_documents(documents)
+    if lexical_index is not None:
+        lexical_index.add(user_id, documents)
 
-    parsed_document_metadatas = [
-        {
-            "document_name": document_name,
-            "document_contents": document_contents["documents"],
-            "document_id": document_contents["document_id"],
-        }
-        for document_name, document_contents in zip(
-            document_dict.keys(), document_dict.values()
+
+def rematerialize_reference(
+    user_id: str,
+    chunk_id: str,
+    document_id: str,
+    document_name: str,
+    position: list[int | None],
+) -> Document | None:
+    """
+    참조에 저장된 위치로 참조 청크의 원문을 읽어 Document로 변환
+
+    Args:
+        user_id (str): 사용자 ID
+        chunk_id (str): 참조 청크 ID
+        document_id (str): 참조 청크의 문서 ID
+        document_name (str): 문서 이름
+        position (list[int | None]): 문서 내 순서, 시작/끝 문자 오프셋
+
+    Returns:
+        Document | None: 청크 Document, 위치가 없거나 읽지 못하면 None
+    """
+    seq, start_char, end_char = position
+    if seq is None:
+        return None
+    try:
+        text = read_user_document_span(
+            user_id, document_id, start_char, end_char
         )
-    ]
-    return parsed_document_metadatas
+    except BlobNotFoundError as e:
+        logger.warning(f"Failed to read referenced chunk: {e!r}")
+        return None
+    return build_chunk_document(
+        chunk_id,
+        hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        Chunk(text, seq, start_char, end_char),
+        user_id,
+        document_id,
+        document_name,
+    )
 
 
-def delete_document_from_vector_store(document_id: str) -> None:
+def document_exists_in_vector_store(user_id: str, document_id: str) -> bool:
     """
-    문서 삭제
+    사용자의 문서가 vector store에 있는지 확인
 
     Args:
+        user_id (str): 사용자 ID
         document_id (str): 문서 ID
+
+    Returns:
+        bool: 문서가 있으면 True
     """
     try:
-        vector_store.delete(where={"document_id": document_id})
-        vector_store.persist()
+        with vector_shards.open(user_id) as vector_store:
+            documents = vector_store.get(
+                where={"user_id": user_id, "document_id": document_id},
+                limit=1,
+                include_documents=False,
+            )
+        if documents:
+            return True
+        return (
+            near_duplicate_index is not None
+            and near_duplicate_index.has_document(user_id, document_id)
+        )
     except Exception as e:
         raise Exception(e)
 
 
+def search_user_documents_by_vector(
+    user_id: str, embedding: list[float], k: int = 4
+) -> list[Document]:
+    """
+    사용자의 문서에서 질문 임베딩과 유사한 청크 검색
+
+    Args:
+        user_id (str): 사용자 ID
+        embedding (list[float]): 질문 임베딩
+        k (int): 반환할 청크 수
+
+    Returns:
+        list[Document]: 유사도 순 청크
+    """
+    with vector_shards.open(user_id) as vector_store:
+        # 해시 버킷 샤드에는 다른 사용자의 청크도 있으므로 항상 필터링
+        return vector_store.similarity_search_by_vector(
+            embedding, k=k, where={"user_id": user_id}
+        )
+
+
+def merge_retrieved_chunks(
+    user_id: str, documents: list[Document]
+) -> list[Document]:
+    """
+    검색된 청크 중 같은 문서에서 겹치거나 이어지는 청크를 원문 구간으로
+    병합
+
+    Args:
+        user_id (str): 사용자 ID
+        documents (list[Document]): 순위 순 청크
+
+    Returns:
+        list[Document]: 병합된 청크 (순위 순)
+    """
+    return merge_adjacent_chunks(
+        documents,
+        lambda document_id, start_char, end_char: read_user_document_span(
+            user_id, document_id, start_char, end_char
+        ),
+    )
+
+
+async def aembed_query(query: str) -> list[float]:
+    """
+    질문 임베딩 (질의 임베딩 캐시를 먼저 조회)
+
+    같은 질문의 임베딩이 진행 중이면 그 결과를 함께 받는다.
+
+    Args:
+        query (str): 질문
+
+    Returns:
+        list[float]: 질문 임베딩
+    """
+    if query_embedding_flight is None:
+        return await document_embeddings.aembed_query(query)
+    return await query_embedding_flight.do(
+        query, lambda: document_embeddings.aembed_query(query)
+    )
+
+
+def get_corpus_version(user_id: str) -> int:
+    """
+    사용자의 문서 집합 버전, 문서를 추가, 수정, 삭제할 때마다 올라간다
+
+    Args:
+        user_id (str): 사용자 ID
+
+    Returns:
+        int: 버전
+    """
+    return corpus_versions.get(user_id)
+
+
+async def asearch_user_documents(
+    user_id: str, query: str, k: int = 4, embedding: list[float] | None = None
+) -> list[Document]:
+    """
+    이벤트 루프를 막지 않고 사용자의 문서에서 질문과 유사한 청크 검색
+
+    질문 임베딩은 비동기 클라이언트로 구하고, vector store 검색은
+    vector_executor의 전용 스레드에서 실행한다.
+
+    Args:
+        user_id (str): 사용자 ID
+        query (str): 질문
+        k (int): 반환할 청크 수
+        embedding (list[float] | None): 이미 구한 질문 임베딩
+
+    Returns:
+        list[Document]: 유사도 순 청크
+
+    Raises:
+        VectorStoreBusyError: vector store 호출 대기열이 가득 찬 경우
+    """
+    if embedding is None:
+        embedding = await aembed_query(query)
+    return await vector_executor.run(
+        search_user_documents_by_vector, user_id, embedding, k
+    )
+
+
+def search_user_documents_lexical(
+    user_id: str, query: str, k: int = 4
+) -> list[Document]:
+    """
+    사용자의 문서에서 BM25 점수가 높은 청크 검색
+
+    임베딩을 구하지 않으므로 임베딩 API가 느리거나 실패할 때도 사용할 수
+    있다. 색인에는 청크 ID만 있으므로 텍스트와 메타데이터는 vector
+    store에서 가져온다.
+
+    Args:
+        user_id (str): 사용자 ID
+        query (str): 질문
+        k (int): 반환할 청크 수
+
+    Returns:
+        list[Document]: BM25 점수 순 청크, 색인을 사용하지 않으면 빈 리스트
+    """
+    if lexical_index is None:
+        return []
+    chunk_ids = [
+        chunk_id for chunk_id, _ in lexical_index.search(user_id, query, k)
+    ]
+    if not chunk_ids:
+        return []
+    with vector_shards.open(user_id) as vector_store:
+        documents = {
+            document.id: document
+            for document in vector_store.get(ids=chunk_ids)
+        }
+    return [
+        documents[chunk_id] for chunk_id in chunk_ids if chunk_id in documents
+    ]
+
+
+async def asearch_user_documents_lexical(
+    user_id: str, query: str, k: int = 4
+) -> list[Document]:
+    """
+    이벤트 루프를 막지 않고 사용자의 문서에서 BM25 검색
+
+    Args:
+        user_id (str): 사용자 ID
+        query (str): 질문
+        k (int): 반환할 청크 수
+
+    Returns:
+        list[Document]: BM25 점수 순 청크
+
+    Raises:
+        VectorStoreBusyError: vector store 호출 대기열이 가득 찬 경우
+    """
+    return await vector_executor.run(
+        search_user_documents_lexical, user_id, query, k
+    )
+
+
 def insert_document_to_vector_store(
-    user_id: str, document_id: str, document_name: str
-) -> None:
+    user_id: str,
+    document_id: str,
+    document_name: str,
+    on_progress: Callable[[int], None] | None = None,
+    parallel_chunking: bool = False,
+) -> dict:
     """
     Document content를 vector store에 저장
 
+    업로드 원본에서 텍스트를 추출한 뒤 파일을 스트리밍으로 읽어 청킹하고,
+    INGEST_BATCH_SIZE 단위로 나누어 저장하므로 문서 크기와 관계없이 메모리
+    사용량이 일정하다. 사용자의 기존 청크와 유사 중복인 청크는 임베딩하지
+    않고 참조로 저장한다.
+
     Args:
         user_id (str): 사용자 ID
         document_id (str): 문서 ID
         document_name (str): 문서 이름
+        on_progress (Callable[[int], None] | None): 배치 저장마다 누적 청크
+            수를 전달받는 콜백
+        parallel_chunking (bool): 문서 크기와 관계없이 프로세스 풀에서 청킹
+
+    Returns:
+        dict: 전체 청크 수와 참조로 저장된 중복 청크 수
     """
     try:
-        documents = []
-        document_content = read_user_document_from_file(user_id, document_id)
-        for chunk in chunk_document(document_content):
-            documents.append(
-                Document(
-                    page_content=chunk,
-                    metadata={
-                        "user_id": user_id,
-                        "document_id": document_id,
-                        "document_name": document_name,
-                    },
+        extract_user_document(user_id, document_id)
+        document_blocks = iter_user_document_from_file(user_id, document_id)
+        chunks, duplicates = store_chunk_records(
+            user_id,
+            document_id,
+            document_name,
+            iter_chunk_records(
+                document_id,
+                document_blocks,
+                get_user_document_size(user_id, document_id),
+                parallel=parallel_chunking,
+            ),
+            on_progress,
+        )
+        return {"chunks": chunks, "duplicates": duplicates}
+    except Exception as e:
+        raise Exception(e)
+
+
+def update_document_in_vector_store(
+    user_id: str,
+    document_id: str,
+    document_name: str,
+    on_progress: Callable[[int], None] | None = None,
+) -> dict:
+    """
+    수정된 문서를 청크 해시 기준으로 비교하여 vector store에 반영
+
+    새로 생기거나 바뀐 청크만 임베딩하여 추가하고, 사라진 청크만 삭제한다.
+    document_id는 그대로 유지된다. 새 내용은 별도의 ref로 저장하고, 유지된
+    청크의 위치를 갱신한 뒤에 문서의 ref를 옮기므로 작업 중에도 기존 청크의
+    위치로 이전 내용을 읽을 수 있다.
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+        document_name (str): 문서 이름
+        on_progress (Callable[[int], None] | None): 배치 저장마다 누적 청크
+            수를 전달받는 콜백
+
+    Returns:
+        dict: 추가/중복 참조/삭제/유지된 청크 수
+    """
+    try:
+        pending_ref = get_user_document_pending_ref(user_id, document_id)
+        extract_user_document(user_id, document_id, pending_ref)
+        # 이전 작업이 추출 후 실패했으면 남아 있는 새 내용을 사용한다
+        blob_key = blob_store.resolve(pending_ref)
+        if blob_key is None:
+            blob_key = get_user_document_blob_key(user_id, document_id)
+        with vector_shards.open(user_id) as vector_store:
+            existing = vector_store.get(
+                where={"document_id": document_id}, include_documents=False
+            )
+        existing_metadatas = {
+            document.id: document.metadata for document in existing
+        }
+        reference_ids = (
+            near_duplicate_index.get_reference_ids(document_id)
+            if near_duplicate_index is not None
+            else set()
+        )
+
+        current_positions = {}
+
+        def iter_new_chunk_records():
+            for record in iter_chunk_records(
+                document_id,
+                blob_store.iter_text(blob_key),
+                blob_store.size(blob_key),
+            ):
+                chunk = record[2]
+                current_positions[record[0]] = {
+                    "seq": chunk.seq,
+                    "start_char": chunk.start_char,
+                    "end_char": chunk.end_char,
+                }
+                if record[0] in existing_metadatas:
+                    continue
+                if record[0] in reference_ids:
+                    continue
+                yield record
+
+        chunks, duplicates = store_chunk_records(
+            user_id,
+            document_id,
+            document_name,
+            iter_new_chunk_records(),
+            on_progress,
+        )
+
+        # 사라진 참조를 먼저 지워야 삭제되는 원본 청크가 그 참조로 옮겨지지
+        # 않는다
+        removed_reference_ids = [
+            chunk_id
+            for chunk_id in reference_ids
+            if chunk_id not in current_positions
+        ]
+        if removed_reference_ids:
+            near_duplicate_index.remove_chunks(removed_reference_ids)
+        removed_ids = [
+            chunk_id
+            for chunk_id in existing_metadatas
+            if chunk_id not in current_positions
+        ]
+        if removed_ids:
+            delete_chunks_from_vector_store(user_id, removed_ids)
+
+        # 유지된 청크는 임베딩 없이 메타데이터의 문서 이름과 위치만 갱신
+        updated_metadatas = {}
+        for chunk_id, metadata in existing_metadatas.items():
+            if chunk_id not in current_positions:
+                continue
+            updated = {
+                **metadata,
+                **current_positions[chunk_id],
+                "document_name": document_name,
+            }
+            if updated != metadata:
+                updated_metadatas[chunk_id] = updated
+        if updated_metadatas:
+            with vector_shards.open(user_id) as vector_store:
+                vector_store.update_metadatas(
+                    list(updated_metadatas), list(updated_metadatas.values())
                 )
+            corpus_versions.bump(user_id)
+        # 유지된 참조의 위치도 새 내용 기준으로 갱신
+        kept_reference_positions = [
+            (
+                chunk_id,
+                current_positions[chunk_id]["seq"],
+                current_positions[chunk_id]["start_char"],
+                current_positions[chunk_id]["end_char"],
             )
-        vector_store.add_documents(documents)
+            for chunk_id in reference_ids
+            if chunk_id in current_positions
+        ]
+        if kept_reference_positions:
+            near_duplicate_index.update_positions(kept_reference_positions)
+        # 청크 위치가 새 내용 기준이 된 뒤에 문서를 새 blob으로 옮기고,
+        # 이전 blob은 다른 ref가 없으면 삭제된다
+        blob_store.link(get_user_document_ref(user_id, document_id), blob_key)
+        blob_store.unlink(pending_ref)
+        if near_duplicate_index is not None:
+            near_duplicate_index.rename_document(document_id, document_name)
+
+        return {
+            "added": chunks - duplicates,
+            "duplicates": duplicates,
+            "removed": len(removed_ids) + len(removed_reference_ids),
+            "unchanged": len(current_positions) - chunks,
+        }
     except Exception as e:
         raise Exception(e)
 
 
+def build_chunk_document(
+    chunk_id: str,
+    chunk_hash: str,
+    chunk: Chunk,
+    user_id: str,
+    document_id: str,
+    document_name: str,
+) -> Document:
+    """
+    청크를 vector store에 저장할 Document로 변환
+
+    요청마다 토큰화하지 않도록 채팅 모델 기준 토큰 수를, 검색된 이웃
+    청크를 병합할 수 있도록 문서 내 순서와 문자 범위를 메타데이터에
+    저장한다.
+
+    Args:
+        chunk_id (str): 청크 ID
+        chunk_hash (str): 청크 내용 해시
+        chunk (Chunk): 청크
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+        document_name (str): 문서 이름
+
+    Returns:
+        Document: 청크 Document
+    """
+    return Document(
+        id=chunk_id,
+        page_content=chunk.text,
+        metadata={
+            "user_id": user_id,
+            "document_id": document_id,
+            "document_name": document_name,
+            "chunk_hash": chunk_hash,
+            "token_count": prompt_tokenizer.count_tokens(chunk.text),
+            "seq": chunk.seq,
+            "start_char": chunk.start_char,
+            "end_char": chunk.end_char,
+        },
+    )
+
+
+def store_chunk_records(
+    user_id: str,
+    document_id: str,
+    document_name: str,
+    chunk_records: Iterable[tuple[str, str, Chunk]],
+    on_progress: Callable[[int], None] | None = None,
+) -> tuple[int, int]:
+    """
+    청크를 INGEST_BATCH_SIZE 단위로 vector store에 저장
+
+    유사 중복 인덱스가 켜져 있으면 사용자의 기존 청크나 같은 문서의 앞선
+    청크와 유사 중복인 청크는 벡터 대신 원본 청크 참조로 저장한다.
+
+    Args:
+        user_id (str): 사용자 ID
+        document_id (str): 문서 ID
+        document_name (str): 문서 이름
+        chunk_records (Iterable[tuple[str, str, Chunk]]): iter_chunk_records
+            결과
+        on_progress (Callable[[int], None] | None): 배치 저장마다 누적 청크
+            수를 전달받는 콜백
+
+    Returns:
+        tuple[int, int]: (처리한 청크 수, 참조로 저장한 중복 청크 수)
+    """
+    documents = []
+    fingerprints: list[tuple[str, int]] = []
+    references: list[tuple[str, str, int, int, int]] = []
+    chunks_done = 0
+    duplicates = 0
+
+    def flush() -> None:
+        nonlocal chunks_done, duplicates
+        if documents:
+            vector_store.add_documents(documents)
+            if lexical_index is not None:
+                lexical_index.add(user_id, documents)
+        if near_duplicate_index is not None:
+            # 벡터 저장 후 지문을 등록해야 참조가 없는 청크를 가리키지 않는다
+            near_duplicate_index.add(user_id, document_id, fingerprints)
+            near_duplicate_index.add_references(
+                user_id, document_id, document_name, references
+            )
+        corpus_versions.bump(user_id)
+        chunks_done += len(documents) + len(references)
+        duplicates += len(references)
+        documents.clear()
+        fingerprints.clear()
+        references.clear()
+        if on_progress is not None:
+            on_progress(chunks_done)
+
+    with vector_shards.open(user_id) as vector_store:
+        for chunk_id, chunk_hash, chunk in chunk_records:
+            if near_duplicate_index is not None:
+                fingerprint = simhash(chunk.text)
+                canonical_id = find_near_duplicate(
+                    user_id, fingerprint, fingerprints
+                )
+                if canonical_id is not None:
+                    references.append(
+                        (
+                            chunk_id,
+                            canonical_id,
+                            chunk.seq,
+                            chunk.start_char,
+                            chunk.end_char,
+                        )
+                    )
+                    continue
+                fingerprints.append((chunk_id, fingerprint))
+            documents.append(
+                build_chunk_document(
+                    chunk_id,
+                    chunk_hash,
+                    chunk,
+                    user_id,
+                    document_id,
+                    document_name,
+                )
+            )
+            if len(documents) + len(references) >= INGEST_BATCH_SIZE:
+                flush()
+        if documents or references:
+            flush()
+    return chunks_done, duplicates
+
+
+def find_near_duplicate(
+    user_id: str, fingerprint: int, pending: list[tuple[str, int]]
+) -> str | None:
+    """
+    유사 중복 청크 검색
+
+    인덱스에 등록된 청크와 아직 저장하지 않은 현재 배치의 청크를 모두
+    확인한다.
+
+    Args:
+        user_id (str): 사용자 ID
+        fingerprint (int): 청크 지문
+        pending (list[tuple[str, int]]): 현재 배치의 (청크 ID, 지문)
+
+    Returns:
+        str | None: 원본 청크 ID, 없으면 None
+    """
+    for chunk_id, candidate in pending:
+        if (
+            hamming_distance(fingerprint, candidate)
+            <= near_duplicate_index.max_distance
+        ):
+            return chunk_id
+    return near_duplicate_index.find(user_id, fingerprint)
+
+
 def chunk_document(document_content: str) -> list[str]:
     """
     Document content를 청킹하여 반환
@@ -172,7 +1330,35 @@ def chunk_document(document_content: str) -> list[str]:
     Returns:
         list[str]: 청킹된 문서 리스트
     """
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
-    )
-    return text_splitter.split_text(document_content)
+    return [chunk.text for chunk in chunker.chunk_text(document_content)]
+
+
+def iter_chunk_records(
+    document_id: str,
+    document_blocks: Iterable[str],
+    size_hint: int | None,
+    parallel: bool = False,
+) -> Iterator[tuple[str, str, Chunk]]:
+    """
+    청크와 함께 내용 기반 청크 ID 생성
+
+    청크 ID는 (문서 ID, 청크 해시, 문서 내 같은 해시의 등장 순서)로 만들어
+    문서를 수정해도 내용이 같은 청크는 같은 ID를 가진다.
+
+    Args:
+        document_id (str): 문서 ID
+        document_blocks (Iterable[str]): document content 블록
+        size_hint (int | None): 문서 크기
+        parallel (bool): 문서 크기와 관계없이 프로세스 풀에서 청킹
+
+    Yields:
+        tuple[str, str, Chunk]: (청크 ID, 청크 해시, 청크)
+    """
+    occurrences: dict[str, int] = {}
+    for chunk in chunker.iter_chunks(
+        document_blocks, size_hint=size_hint, parallel=parallel
+    ):
+        chunk_hash = hashlib.sha256(chunk.text.encode("utf-8")).hexdigest()
+        occurrence = occurrences.get(chunk_hash, 0)
+        occurrences[chunk_hash] = occurrence + 1
+        yield f"{document_id}:{chunk_hash}:{occurrence}", chunk_hash, chunk
@@ -0,0 +1,116 @@
+import base64
+import json
+from datetime import datetime
+
+from app.crud import document as document_crud
+from app.db.database import get_async_db_session
+from app.models.document import DocumentRecord
+
+
+async def save_document_record(
+    document_id: str,
+    user_id: str,
+    name: str,
+    size: int,
+    chunk_count: int,
+    content_hash: str,
+) -> None:
+    """
+    적재가 끝난 문서를 문서 목록에 저장
+
+    Args:
+        document_id: 문서 ID
+        user_id: 사용자 ID
+        name: 문서 이름
+        size: 추출한 텍스트 크기 (bytes)
+        chunk_count: 청크 수
+        content_hash: 추출한 텍스트의 SHA-256
+    """
+    async with get_async_db_session() as db:
+        await document_crud.save_document_record(
+            db, document_id, user_id, name, size, chunk_count, content_hash
+        )
+
+
+async def get_document_record(
+    user_id: str, document_id: str
+) -> DocumentRecord | None:
+    """
+    사용자의 문서 목록 항목 조회
+
+    Args:
+        user_id: 사용자 ID
+        document_id: 문서 ID
+
+    Returns:
+        DocumentRecord | None: 문서 목록 항목, 없으면 None
+    """
+    async with get_async_db_session() as db:
+        return await document_crud.get_document_record(
+            db, user_id, document_id
+        )
+
+
+async def list_document_records(
+    user_id: str, limit: int, cursor: str | None = None
+) -> tuple[list[DocumentRecord], str | None]:
+    """
+    사용자의 문서 목록 한 페이지 조회 (최신순)
+
+    Args:
+        user_id: 사용자 ID
+        limit: 페이지 크기
+        cursor: 이전 페이지의 next_cursor, 첫 페이지는 None
+
+    Returns:
+        tuple[list[DocumentRecord], str | None]: (문서 목록 항목, 다음
+            페이지 cursor), 마지막 페이지이면 cursor는 None
+
+    Raises:
+        ValueError: cursor 형식이 잘못된 경우
+    """
+    after = decode_cursor(cursor) if cursor else None
+    async with get_async_db_session() as db:
+        records = await document_crud.list_document_records(
+            db, user_id, limit + 1, after
+        )
+    if len(records) <= limit:
+        return records, None
+    records = records[:limit]
+    return records, encode_cursor(records[-1])
+
+
+async def delete_document_record(user_id: str, document_id: str) -> None:
+    """
+    사용자의 문서 목록 항목 삭제
+
+    Args:
+        user_id: 사용자 ID
+        document_id: 문서 ID
+    """
+    async with get_async_db_session() as db:
+        await document_crud.delete_document_record(db, user_id, document_id)
+
+
+def encode_cursor(record: DocumentRecord) -> str:
+    """
+    문서 목록 항목의 keyset cursor
+    """
+    data = json.dumps([record.created_at.isoformat(), record.id])
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    keyset cursor를 (생성 시각, 문서 ID)로 변환
+
+    Raises:
+        ValueError: cursor 형식이 잘못된 경우
+    """
+    try:
+        created_at, document_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+        return datetime.fromisoformat(created_at), str(document_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+# 캐시 용량 초과 시 이 비율까지 줄인다
+EVICTION_TARGET_RATIO = 0.9
+
+
+class EmbeddingCache:
+    """
+    SQLite(WAL) 기반 content-addressed 임베딩 캐시
+
+    키는 (청크 텍스트, 임베딩 모델, 차원 수)의 해시이고, 값은 float32
+    벡터다. 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터
+    삭제한다. 여러 워커 프로세스가 같은 파일을 공유할 수 있다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        model: str,
+        dimensions: int | None = None,
+        max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self.path = path
+        self.namespace = f"{model}\0{dimensions or ''}\0"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS embedding ("
+            "key BLOB PRIMARY KEY, vector BLOB NOT NULL, "
+            "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS embedding_last_access_idx "
+            "ON embedding (last_access)"
+        )
+        connection.commit()
+        self._total_bytes = self._compute_total_bytes()
+
+    def get_many(self, texts: list[str]) -> list[list[float] | None]:
+        """
+        캐시에서 임베딩 조회
+
+        Args:
+            texts (list[str]): 조회할 텍스트 리스트
+
+        Returns:
+            list[list[float] | None]: 입력 순서와 같은 임베딩, 없으면 None
+        """
+        keys = [self._key(text) for text in texts]
+        found = {}
+        connection = self._connection()
+        for start in range(0, len(keys), 500):
+            batch = list(set(keys[start : start + 500]))
+            rows = connection.execute(
+                "SELECT key, vector FROM embedding WHERE key IN "
+                f"({','.join('?' * len(batch))})",
+                batch,
+            ).fetchall()
+            found.update({key: decode_vector(vector) for key, vector in rows})
+
+        if found:
+            now = time.time()
+            connection.executemany(
+                "UPDATE embedding SET last_access = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+            connection.commit()
+
+        vectors = [found.get(key) for key in keys]
+        hits = sum(vector is not None for vector in vectors)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, texts: list[str], vectors: list[list[float]]) -> None:
+        """
+        임베딩을 캐시에 저장
+
+        Args:
+            texts (list[str]): 텍스트 리스트
+            vectors (list[list[float]]): 텍스트별 임베딩
+        """
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            encoded = encode_vector(vector)
+            rows.append((self._key(text), encoded, len(encoded), now))
+
+        connection = self._connection()
+        connection.executemany(
+            "INSERT OR REPLACE INTO embedding "
+            "(key, vector, size, last_access) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        connection.commit()
+
+        with self._lock:
+            self._total_bytes += sum(row[2] for row in rows)
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        전체 크기가 목표치 이하가 될 때까지 LRU 순서로 삭제
+        """
+        connection = self._connection()
+        target = int(self.max_bytes * EVICTION_TARGET_RATIO)
+        total = self._compute_total_bytes()
+        if total > target:
+            excess = total - target
+            keys = []
+            for key, size in connection.execute(
+                "SELECT key, size FROM embedding ORDER BY last_access"
+            ):
+                keys.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            connection.executemany("DELETE FROM embedding WHERE key = ?", keys)
+            connection.commit()
+            total = self._compute_total_bytes()
+        with self._lock:
+            self._total_bytes = total
+
+    def stats(self) -> dict:
+        """
+        캐시 적중 통계
+
+        Returns:
+            dict: hits, misses, hit_rate, size_bytes
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "size_bytes": self._total_bytes,
+            }
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256((self.namespace + text).encode("utf-8")).digest()
+
+    def _compute_total_bytes(self) -> int:
+        return (
+            self._connection()
+            .execute("SELECT COALESCE(SUM(size), 0) FROM embedding")
+            .fetchone()[0]
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+
+def encode_vector(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def decode_vector(data: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
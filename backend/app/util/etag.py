@@ -0,0 +1,65 @@
+import hashlib
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def make_etag(*parts: str | bytes) -> str:
+    """
+    응답 내용으로 만든 약한 ETag
+
+    Args:
+        parts (str | bytes): ETag에 반영할 값
+
+    Returns:
+        str: W/"..." 형식의 ETag
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Match 헤더가 ETag와 일치하는지 확인 (약한 비교)
+
+    Args:
+        if_none_match (str | None): If-None-Match 헤더 값
+        etag (str): 현재 ETag
+
+    Returns:
+        bool: 일치하면 True
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_response(
+    request: Request, content: str, etag: str
+) -> Response:
+    """
+    If-None-Match가 ETag와 같으면 본문 없이 304, 아니면 JSON 응답
+
+    Args:
+        request (Request): 요청
+        content (str): JSON 본문
+        etag (str): 본문의 ETag
+
+    Returns:
+        Response: 응답
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=content, media_type="application/json", headers=headers
+    )
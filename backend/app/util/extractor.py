@@ -0,0 +1,412 @@
+import multiprocessing
+import os
+import signal
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Callable, Iterator
+from xml.etree import ElementTree
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# content sniffing에 사용하는 파일 앞부분 크기
+SNIFF_SIZE = 4096
+EXTRACT_BLOCK_SIZE = 1024 * 1024
+
+# 워커가 시간 제한을 지키지 못했을 때 프로세스를 종료하기 전 대기 시간 (초)
+TIMEOUT_GRACE = 5.0
+
+WORD_NAMESPACE = (
+    "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+)
+
+
+class UnsupportedDocumentError(Exception):
+    """텍스트를 추출할 수 없는 문서 형식"""
+
+
+class ExtractionTimeoutError(Exception):
+    """문서 하나의 텍스트 추출이 시간 제한을 넘은 경우"""
+
+
+@dataclass(frozen=True)
+class Extractor:
+    """
+    문서 형식별 텍스트 추출기
+
+    sniff는 (파일 앞부분, 파일 경로)로 형식 일치 여부를 판단하고, extract는
+    파일 경로를 받아 페이지(또는 블록) 단위 텍스트를 순서대로 반환한다.
+    """
+
+    name: str
+    sniff: Callable[[bytes, str], bool]
+    extract: Callable[[str], Iterator[str]]
+
+
+EXTRACTORS: dict[str, Extractor] = {}
+
+
+def register_extractor(
+    name: str,
+    sniff: Callable[[bytes, str], bool],
+    extract: Callable[[str], Iterator[str]],
+) -> None:
+    """
+    추출기 등록
+
+    sniffing은 등록 순서대로 수행하므로 구체적인 형식을 먼저 등록한다.
+    프로세스 풀 워커는 이 모듈을 새로 import하므로 추출기는 모듈 import
+    시점에 등록되어야 한다.
+
+    Args:
+        name (str): 형식 이름
+        sniff (Callable[[bytes, str], bool]): 형식 판별 함수
+        extract (Callable[[str], Iterator[str]]): 텍스트 추출 함수
+    """
+    EXTRACTORS[name] = Extractor(name=name, sniff=sniff, extract=extract)
+
+
+def sniff_document_format(path: str) -> str | None:
+    """
+    파일 내용으로 문서 형식 판별 (확장자는 사용하지 않음)
+
+    Args:
+        path (str): 파일 경로
+
+    Returns:
+        str | None: 형식 이름, 지원하지 않는 형식이면 None
+    """
+    with open(path, "rb") as f:
+        header = f.read(SNIFF_SIZE)
+    for extractor in EXTRACTORS.values():
+        if extractor.sniff(header, path):
+            return extractor.name
+    return None
+
+
+def iter_document_pages(path: str, document_format: str) -> Iterator[str]:
+    """
+    문서에서 페이지 단위로 텍스트 추출
+
+    Args:
+        path (str): 파일 경로
+        document_format (str): sniff_document_format으로 판별한 형식
+
+    Yields:
+        str: 페이지 텍스트
+    """
+    extractor = EXTRACTORS.get(document_format)
+    if extractor is None:
+        raise UnsupportedDocumentError(
+            f"Unsupported document format: {document_format}"
+        )
+    yield from extractor.extract(path)
+
+
+def extract_document_to_file(
+    source_path: str,
+    target_path: str,
+    document_format: str,
+    timeout: float | None = None,
+) -> int:
+    """
+    문서 텍스트를 페이지 단위로 추출하여 UTF-8 텍스트 파일로 저장
+
+    전체 텍스트를 메모리에 모으지 않고 페이지마다 파일에 쓴다. 임시 파일에
+    쓴 뒤 교체하므로 실패해도 기존 파일은 유지된다. timeout은 메인
+    스레드에서 호출할 때만 적용된다.
+
+    Args:
+        source_path (str): 원본 파일 경로
+        target_path (str): 텍스트 파일 경로
+        document_format (str): 문서 형식
+        timeout (float | None): 시간 제한 (초)
+
+    Returns:
+        int: 추출한 페이지 수
+    """
+    temp_path = f"{target_path}.part"
+    use_timer = timeout is not None and hasattr(signal, "setitimer")
+    if use_timer:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        pages = 0
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for page in iter_document_pages(source_path, document_format):
+                f.write(page)
+                pages += 1
+        os.replace(temp_path, target_path)
+        return pages
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class DocumentExtractor:
+    """
+    텍스트 추출 단계
+
+    PDF 등의 파싱은 CPU와 메모리를 많이 쓰고 입력에 따라 오래 걸릴 수
+    있으므로 프로세스 풀에서 실행한다. 각 워커는 한 번에 문서 하나만
+    처리하며 주소 공간을 memory_limit으로, 문서당 처리 시간을 timeout으로
+    제한한다. process_workers가 0이면 호출한 스레드에서 제한 없이 실행한다.
+    """
+
+    def __init__(
+        self,
+        process_workers: int = 0,
+        memory_limit: int | None = None,
+        timeout: float | None = None,
+    ):
+        self.process_workers = process_workers
+        self.memory_limit = memory_limit
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        # 대기열에 있는 시간이 시간 제한에 포함되지 않도록 빈 워커가 있을
+        # 때만 제출한다
+        self._idle_workers = threading.BoundedSemaphore(
+            max(process_workers, 1)
+        )
+
+    def extract(self, source_path: str, target_path: str) -> int:
+        """
+        원본 파일의 형식을 판별하고 텍스트 파일로 추출
+
+        Args:
+            source_path (str): 원본 파일 경로
+            target_path (str): 텍스트 파일 경로
+
+        Returns:
+            int: 추출한 페이지 수
+
+        Raises:
+            UnsupportedDocumentError: 지원하지 않는 형식
+            ExtractionTimeoutError: 시간 제한 초과
+        """
+        document_format = sniff_document_format(source_path)
+        if document_format is None:
+            raise UnsupportedDocumentError("Unsupported document format")
+        if self.process_workers <= 0:
+            return extract_document_to_file(
+                source_path, target_path, document_format
+            )
+
+        with self._idle_workers:
+            future = self._get_executor().submit(
+                extract_document_to_file,
+                source_path,
+                target_path,
+                document_format,
+                self.timeout,
+            )
+            try:
+                return future.result(
+                    timeout=self.timeout + TIMEOUT_GRACE
+                    if self.timeout
+                    else None
+                )
+            except FutureTimeoutError:
+                # 워커가 시그널에 응답하지 않으면 (C 확장 내부 등) 풀을
+                # 종료하고 다음 요청에서 새로 만든다
+                self._terminate()
+                raise ExtractionTimeoutError(
+                    f"Extraction exceeded {self.timeout}s"
+                )
+
+    def close(self) -> None:
+        """
+        프로세스 풀 종료
+        """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=limit_worker_memory,
+                    initargs=(self.memory_limit,),
+                )
+            return self._executor
+
+    def _terminate(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        for process in list(executor._processes.values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def limit_worker_memory(memory_limit: int | None) -> None:
+    """
+    프로세스 풀 워커의 주소 공간 제한 (initializer)
+    """
+    if memory_limit is None or resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        memory_limit = min(memory_limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def _raise_timeout(signum, frame) -> None:
+    raise ExtractionTimeoutError("Extraction time limit exceeded")
+
+
+def is_pdf(header: bytes, path: str) -> bool:
+    return header.startswith(b"%PDF-")
+
+
+def extract_pdf(path: str) -> Iterator[str]:
+    """
+    PDF 페이지별 텍스트 추출
+
+    PdfReader는 페이지 객체를 접근 시점에 파싱하므로 페이지 수와 관계없이
+    한 번에 한 페이지의 내용만 메모리에 올린다.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    for page in reader.pages:
+        yield (page.extract_text() or "") + "\n\n"
+
+
+def is_docx(header: bytes, path: str) -> bool:
+    if not header.startswith(b"PK\x03\x04"):
+        return False
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return "word/document.xml" in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+
+def extract_docx(path: str) -> Iterator[str]:
+    """
+    DOCX 본문을 문단 단위로 추출
+
+    document.xml을 iterparse로 읽고 처리한 문단은 바로 해제한다.
+    """
+    with zipfile.ZipFile(path) as archive:
+        with archive.open("word/document.xml") as document:
+            for _, element in ElementTree.iterparse(document):
+                if element.tag != f"{WORD_NAMESPACE}p":
+                    continue
+                parts = []
+                for node in element.iter():
+                    if node.tag == f"{WORD_NAMESPACE}t" and node.text:
+                        parts.append(node.text)
+                    elif node.tag == f"{WORD_NAMESPACE}tab":
+                        parts.append("\t")
+                    elif node.tag in (
+                        f"{WORD_NAMESPACE}br",
+                        f"{WORD_NAMESPACE}cr",
+                    ):
+                        parts.append("\n")
+                element.clear()
+                yield "".join(parts) + "\n"
+
+
+def is_html(header: bytes, path: str) -> bool:
+    head = header.removeprefix(b"\xef\xbb\xbf").lstrip().lower()
+    if head.startswith((b"<!doctype html", b"<html")):
+        return True
+    return head.startswith(b"<") and b"<html" in head
+
+
+class HTMLTextParser(HTMLParser):
+    """
+    HTML에서 본문 텍스트만 모으는 파서
+
+    script, style 등 화면에 보이지 않는 요소는 건너뛰고 블록 요소 경계에서
+    줄을 바꾼다.
+    """
+
+    SKIP_TAGS = {"script", "style", "noscript", "template", "head"}
+    BLOCK_TAGS = {
+        "p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+        "section", "article", "pre", "blockquote", "table", "ul", "ol",
+    }  # fmt: skip
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def pop_text(self) -> str:
+        text = "".join(self.parts)
+        self.parts = []
+        return text
+
+
+def extract_html(path: str) -> Iterator[str]:
+    """
+    HTML을 블록 단위로 읽으며 본문 텍스트 추출
+    """
+    parser = HTMLTextParser()
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        while block := f.read(EXTRACT_BLOCK_SIZE):
+            parser.feed(block)
+            if text := parser.pop_text():
+                yield text
+    parser.close()
+    if text := parser.pop_text():
+        yield text
+
+
+def is_text(header: bytes, path: str) -> bool:
+    if b"\x00" in header:
+        return False
+    try:
+        header.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # 앞부분 끝에서 잘린 멀티바이트 문자는 허용
+        return e.start >= len(header) - 3 and len(header) == SNIFF_SIZE
+    return True
+
+
+def extract_text(path: str) -> Iterator[str]:
+    """
+    UTF-8 텍스트(Markdown 포함)를 블록 단위로 읽기
+    """
+    with open(path, "r", encoding="utf-8-sig") as f:
+        while block := f.read(EXTRACT_BLOCK_SIZE):
+            yield block
+
+
+register_extractor("pdf", is_pdf, extract_pdf)
+register_extractor("docx", is_docx, extract_docx)
+register_extractor("html", is_html, extract_html)
+register_extractor("text", is_text, extract_text)
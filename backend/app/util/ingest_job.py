@@ -0,0 +1,103 @@
+from app.core.constants import IngestJobOperation
+from app.crud import ingest_job as ingest_job_crud
+from app.db.database import get_async_db_session
+from app.models.ingest_job import IngestJob
+
+
+async def save_ingest_job(
+    job_id: str,
+    user_id: str,
+    document_id: str,
+    document_name: str,
+    operation: str = IngestJobOperation.INSERT,
+) -> None:
+    """
+    문서 적재 작업 저장
+
+    Args:
+        job_id: 작업 ID
+        user_id: 사용자 ID
+        document_id: 문서 ID
+        document_name: 문서 이름
+        operation: 작업 종류 (insert, update)
+
+    Returns:
+        None
+    """
+    try:
+        async with get_async_db_session() as db:
+            await ingest_job_crud.save_ingest_job(
+                db, job_id, user_id, document_id, document_name, operation
+            )
+    except Exception as e:
+        raise e
+
+
+async def save_ingest_jobs(
+    user_id: str, jobs: list[tuple[str, str, str]]
+) -> None:
+    """
+    여러 문서 적재 작업을 한 번에 저장
+
+    Args:
+        user_id: 사용자 ID
+        jobs: (작업 ID, 문서 ID, 문서 이름) 리스트
+
+    Returns:
+        None
+    """
+    try:
+        async with get_async_db_session() as db:
+            await ingest_job_crud.save_ingest_jobs(db, user_id, jobs)
+    except Exception as e:
+        raise e
+
+
+async def update_ingest_job(job_id: str, **values) -> None:
+    """
+    문서 적재 작업 상태 갱신
+
+    Args:
+        job_id: 작업 ID
+        values: 갱신할 컬럼 값
+
+    Returns:
+        None
+    """
+    try:
+        async with get_async_db_session() as db:
+            await ingest_job_crud.update_ingest_job(db, job_id, **values)
+    except Exception as e:
+        raise e
+
+
+async def get_ingest_job(job_id: str, user_id: str) -> IngestJob | None:
+    """
+    사용자의 문서 적재 작업 조회
+
+    Args:
+        job_id: 작업 ID
+        user_id: 사용자 ID
+
+    Returns:
+        IngestJob | None: 문서 적재 작업, 없으면 None
+    """
+    try:
+        async with get_async_db_session() as db:
+            return await ingest_job_crud.get_ingest_job(db, job_id, user_id)
+    except Exception as e:
+        raise e
+
+
+async def get_unfinished_ingest_jobs() -> list[IngestJob]:
+    """
+    완료되지 않은 문서 적재 작업 조회
+
+    Returns:
+        list[IngestJob]: 문서 적재 작업 리스트
+    """
+    try:
+        async with get_async_db_session() as db:
+            return await ingest_job_crud.get_unfinished_ingest_jobs(db)
+    except Exception as e:
+        raise e
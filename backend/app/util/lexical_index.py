@@ -0,0 +1,501 @@
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.documents import Document
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 세그먼트가 MAX_SEGMENTS개를 넘으면 작은 세그먼트 MERGE_SEGMENTS개를 병합
+MAX_SEGMENTS = 16
+MERGE_SEGMENTS = 8
+MANIFEST_NAME = "manifest.json"
+SEGMENT_FILES = (
+    "terms",
+    "offsets",
+    "postings",
+    "frequencies",
+    "lengths",
+    "chunk_ids",
+    "document_ids",
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    BM25 색인용 토큰 분리
+
+    소문자로 정규화한 단어(\\w+)를 사용하므로 오류 코드, 식별자, 이름도
+    그대로 검색된다. 한국어는 조사가 붙은 어절 단위로 나뉘므로 한글
+    단어는 글자 bigram도 함께 색인한다.
+
+    Args:
+        text (str): 청크 텍스트 또는 질의
+
+    Returns:
+        list[str]: 토큰
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if len(token) > 2 and HANGUL_PATTERN.search(token):
+            tokens.extend(token[i : i + 2] for i in range(len(token) - 1))
+    return tokens
+
+
+def hash_terms(tokens: list[str]) -> np.ndarray:
+    """
+    토큰을 64bit 해시로 변환, 용어 사전에는 문자열 대신 해시만 저장
+    """
+    return np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            )
+            for token in tokens
+        ],
+        dtype=np.uint64,
+    )
+
+
+class Segment:
+    """
+    변경하지 않는 색인 조각 (메모리 맵 .npy 파일)
+
+    - terms: 정렬된 용어 해시 (uint64)
+    - offsets: 용어별 postings 시작 위치 (int64, 용어 수 + 1)
+    - postings, frequencies: 용어별 세그먼트 내 청크 번호와 등장 횟수
+    - lengths: 청크별 토큰 수
+    - chunk_ids, document_ids: 청크별 ID (고정 길이 bytes)
+    """
+
+    def __init__(self, path: str, deleted: list[int] | None = None):
+        self.path = path
+        self.name = os.path.basename(path)
+        for name in SEGMENT_FILES:
+            setattr(self, name, np.load(f"{path}/{name}.npy", mmap_mode="r"))
+        self.deleted = np.zeros(len(self.lengths), dtype=bool)
+        if deleted:
+            self.deleted[deleted] = True
+        self.total_length = int(self.lengths.sum())
+
+    def close(self) -> None:
+        """
+        메모리 맵 해제, 이후에는 세그먼트를 읽을 수 없다
+        """
+        for name in SEGMENT_FILES:
+            mapped = getattr(getattr(self, name), "_mmap", None)
+            if mapped is not None:
+                mapped.close()
+
+    @property
+    def live_count(self) -> int:
+        return len(self.lengths) - int(self.deleted.sum())
+
+    def find_terms(self, terms: np.ndarray) -> list[tuple[int, int]]:
+        """
+        용어별 postings 범위, 없는 용어는 (0, 0)
+        """
+        positions = np.searchsorted(self.terms, terms)
+        ranges = []
+        for term, position in zip(terms, positions):
+            if position < len(self.terms) and self.terms[position] == term:
+                ranges.append(
+                    (
+                        int(self.offsets[position]),
+                        int(self.offsets[position + 1]),
+                    )
+                )
+            else:
+                ranges.append((0, 0))
+        return ranges
+
+    def to_manifest(self) -> dict:
+        return {
+            "name": self.name,
+            "deleted": np.flatnonzero(self.deleted).tolist(),
+        }
+
+
+def write_segment(
+    path: str,
+    chunk_ids: list[str],
+    document_ids: list[str],
+    lengths: np.ndarray,
+    terms: np.ndarray,
+    postings: np.ndarray,
+    frequencies: np.ndarray,
+) -> None:
+    """
+    (용어, 청크 번호, 등장 횟수) 배열로 세그먼트 파일 작성
+
+    임시 디렉터리에 쓴 뒤 이름을 바꾸므로 중간에 실패해도 읽던 세그먼트가
+    깨지지 않는다.
+    """
+    order = np.lexsort((postings, terms))
+    terms = terms[order]
+    unique_terms, starts = np.unique(terms, return_index=True)
+    arrays = {
+        "terms": unique_terms,
+        "offsets": np.append(starts, len(terms)).astype(np.int64),
+        "postings": postings[order].astype(np.uint32),
+        "frequencies": frequencies[order].astype(np.uint16),
+        "lengths": lengths.astype(np.uint32),
+        "chunk_ids": np.array(
+            [chunk_id.encode("utf-8") for chunk_id in chunk_ids]
+        ),
+        "document_ids": np.array(
+            [document_id.encode("utf-8") for document_id in document_ids]
+        ),
+    }
+    temp_path = f"{path}.tmp"
+    os.makedirs(temp_path, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(f"{temp_path}/{name}.npy", array)
+    os.rename(temp_path, path)
+
+
+class UserLexicalIndex:
+    """
+    한 사용자의 BM25 역색인
+
+    청크를 추가할 때마다 새 세그먼트를 쓰고, 삭제는 세그먼트별 삭제 표시로
+    처리한다. 세그먼트가 많아지면 작은 세그먼트를 병합하면서 삭제된
+    청크를 제거한다. 세그먼트 목록과 삭제 표시는 manifest.json에 저장한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        # 검색은 lock 밖에서 세그먼트를 읽으므로, 닫을 때 읽는 중인 검색이
+        # 끝난 뒤에 메모리 맵을 해제한다
+        self._readers = 0
+        self._closed = False
+        os.makedirs(path, exist_ok=True)
+        manifest_path = f"{path}/{MANIFEST_NAME}"
+        manifest = {"segments": []}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        self.segments = [
+            Segment(f"{path}/{segment['name']}", segment["deleted"])
+            for segment in manifest["segments"]
+        ]
+        # manifest에 없는 세그먼트는 기록 전에 중단된 작업의 잔여물
+        names = {segment.name for segment in self.segments}
+        for name in os.listdir(path):
+            if name != MANIFEST_NAME and name not in names:
+                shutil.rmtree(f"{path}/{name}", ignore_errors=True)
+
+    def add(self, documents: list[Document]) -> None:
+        chunk_ids, document_ids, lengths = [], [], []
+        terms, postings, frequencies = [], [], []
+        for document in documents:
+            tokens = tokenize(document.page_content)
+            if not tokens:
+                continue
+            unique, counts = np.unique(hash_terms(tokens), return_counts=True)
+            postings.append(np.full(len(unique), len(chunk_ids)))
+            terms.append(unique)
+            frequencies.append(np.minimum(counts, np.iinfo(np.uint16).max))
+            chunk_ids.append(document.id)
+            document_ids.append(document.metadata["document_id"])
+            lengths.append(len(tokens))
+        if not chunk_ids:
+            return
+        with self._lock:
+            self._check_open()
+            path = f"{self.path}/{uuid.uuid4().hex}"
+            write_segment(
+                path,
+                chunk_ids,
+                document_ids,
+                np.array(lengths),
+                np.concatenate(terms),
+                np.concatenate(postings),
+                np.concatenate(frequencies),
+            )
+            self.segments.append(Segment(path))
+            if len(self.segments) > MAX_SEGMENTS:
+                self._merge(
+                    sorted(self.segments, key=lambda s: s.live_count)[
+                        :MERGE_SEGMENTS
+                    ]
+                )
+            self._save_manifest()
+
+    def delete_document(self, document_id: str) -> None:
+        with self._lock:
+            self._check_open()
+            self._delete(
+                lambda segment: (
+                    segment.document_ids == document_id.encode("utf-8")
+                )
+            )
+
+    def delete_chunks(self, chunk_ids: list[str]) -> None:
+        encoded = np.array(
+            [chunk_id.encode("utf-8") for chunk_id in chunk_ids]
+        )
+        with self._lock:
+            self._check_open()
+            self._delete(lambda segment: np.isin(segment.chunk_ids, encoded))
+
+    def search(self, query: str, k: int) -> list[tuple[str, float]]:
+        """
+        BM25 점수 상위 k개 청크
+
+        Returns:
+            list[tuple[str, float]]: 점수 순 (청크 ID, 점수)
+        """
+        terms = np.unique(hash_terms(tokenize(query)))
+        if not terms.size or k <= 0:
+            return []
+        with self._lock:
+            self._check_open()
+            segments = list(self.segments)
+            if not segments:
+                return []
+            self._readers += 1
+        try:
+            return self._score(segments, terms, k)
+        finally:
+            with self._lock:
+                self._readers -= 1
+                if self._closed and not self._readers:
+                    self._close_segments()
+
+    def close(self) -> None:
+        """
+        색인을 닫고 세그먼트 메모리 맵 해제
+
+        읽는 중인 검색이 있으면 마지막 검색이 끝날 때 해제한다.
+        """
+        with self._lock:
+            self._closed = True
+            if not self._readers:
+                self._close_segments()
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError(f"Lexical index is closed: {self.path}")
+
+    def _close_segments(self) -> None:
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+    def _score(
+        self, segments: list[Segment], terms: np.ndarray, k: int
+    ) -> list[tuple[str, float]]:
+        # 삭제 표시된 청크도 병합 전까지 문서 빈도와 평균 길이에 포함된다
+        document_count = sum(len(segment.lengths) for segment in segments)
+        average_length = (
+            sum(segment.total_length for segment in segments) / document_count
+        )
+        ranges = [segment.find_terms(terms) for segment in segments]
+        document_frequencies = [
+            sum(end - start for start, end in column)
+            for column in zip(*ranges)
+        ]
+        idfs = [
+            math.log(1 + (document_count - df + 0.5) / (df + 0.5))
+            for df in document_frequencies
+        ]
+
+        candidates = []
+        for segment, segment_ranges in zip(segments, ranges):
+            scores = np.zeros(len(segment.lengths), dtype=np.float32)
+            for idf, (start, end) in zip(idfs, segment_ranges):
+                if start == end:
+                    continue
+                postings = segment.postings[start:end]
+                frequencies = segment.frequencies[start:end].astype(np.float32)
+                norms = BM25_K1 * (
+                    1
+                    - BM25_B
+                    + BM25_B * segment.lengths[postings] / average_length
+                )
+                scores[postings] += (
+                    idf * frequencies * (BM25_K1 + 1) / (frequencies + norms)
+                )
+            scores[segment.deleted] = 0
+            matched = np.flatnonzero(scores)
+            if matched.size > k:
+                matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+            candidates.extend(
+                (float(scores[i]), segment.chunk_ids[i].decode("utf-8"))
+                for i in matched
+            )
+        candidates.sort(key=lambda candidate: -candidate[0])
+        return [(chunk_id, score) for score, chunk_id in candidates[:k]]
+
+    def _delete(self, select) -> None:
+        changed = False
+        for segment in list(self.segments):
+            mask = select(segment) & ~segment.deleted
+            if not mask.any():
+                continue
+            segment.deleted |= mask
+            changed = True
+            if segment.live_count == 0:
+                self.segments.remove(segment)
+        if changed:
+            self._save_manifest()
+
+    def _merge(self, segments: list[Segment]) -> None:
+        chunk_ids, document_ids, lengths = [], [], []
+        terms, postings, frequencies = [], [], []
+        for segment in segments:
+            live = np.flatnonzero(~segment.deleted)
+            # 세그먼트 내 번호를 병합 세그먼트 번호로 변환, 삭제된 청크는 -1
+            remap = np.full(len(segment.lengths), -1, dtype=np.int64)
+            remap[live] = np.arange(len(live)) + len(chunk_ids)
+            term_counts = np.diff(segment.offsets)
+            segment_postings = remap[segment.postings]
+            keep = segment_postings >= 0
+            terms.append(np.repeat(segment.terms, term_counts)[keep])
+            postings.append(segment_postings[keep])
+            frequencies.append(np.asarray(segment.frequencies)[keep])
+            chunk_ids.extend(
+                segment.chunk_ids[i].decode("utf-8") for i in live
+            )
+            document_ids.extend(
+                segment.document_ids[i].decode("utf-8") for i in live
+            )
+            lengths.append(np.asarray(segment.lengths)[live])
+
+        for segment in segments:
+            self.segments.remove(segment)
+        if chunk_ids:
+            path = f"{self.path}/{uuid.uuid4().hex}"
+            write_segment(
+                path,
+                chunk_ids,
+                document_ids,
+                np.concatenate(lengths),
+                np.concatenate(terms),
+                np.concatenate(postings),
+                np.concatenate(frequencies),
+            )
+            self.segments.append(Segment(path))
+
+    def _save_manifest(self) -> None:
+        manifest_path = f"{self.path}/{MANIFEST_NAME}"
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "segments": [
+                        segment.to_manifest() for segment in self.segments
+                    ]
+                },
+                f,
+            )
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+        # manifest에서 빠진 세그먼트 파일 정리
+        names = {segment.name for segment in self.segments}
+        for name in os.listdir(self.path):
+            if name != MANIFEST_NAME and name not in names:
+                if not name.endswith(".tmp"):
+                    shutil.rmtree(f"{self.path}/{name}", ignore_errors=True)
+
+
+class LexicalIndex:
+    """
+    사용자별 BM25 역색인 (청크 텍스트)
+
+    정확한 식별자, 오류 코드, 이름을 찾는 질문은 임베딩 검색보다 어휘
+    검색이 정확하고, 임베딩 API 호출 없이 검색할 수 있다. 사용자마다
+    디렉터리를 나누고 처음 사용할 때 열며, 색인은 메모리 맵 파일이므로
+    시작 시 읽어 들이는 비용이 거의 없다. 열린 사용자 색인이 max_open개를
+    넘으면 가장 오래 사용하지 않은 색인을 닫는다. 아직 사용 중인 색인은
+    다시 요청되면 그대로 사용하여 같은 디렉터리를 두 번 열지 않는다.
+    """
+
+    def __init__(self, path: str, max_open: int = 64):
+        self.path = path
+        self.max_open = max_open
+        self._indexes: OrderedDict[str, UserLexicalIndex] = OrderedDict()
+        self._live: weakref.WeakValueDictionary[str, UserLexicalIndex] = (
+            weakref.WeakValueDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def add(self, user_id: str, documents: list[Document]) -> None:
+        """
+        청크 색인, document_id 메타데이터가 있는 청크 Document
+
+        Args:
+            user_id (str): 사용자 ID
+            documents (list[Document]): vector store에 저장한 청크
+        """
+        if documents:
+            self._open(user_id).add(documents)
+
+    def delete_document(self, user_id: str, document_id: str) -> None:
+        """
+        문서의 모든 청크를 색인에서 삭제
+        """
+        self._open(user_id).delete_document(document_id)
+
+    def delete_chunks(self, user_id: str, chunk_ids: list[str]) -> None:
+        """
+        청크를 색인에서 삭제
+        """
+        if chunk_ids:
+            self._open(user_id).delete_chunks(chunk_ids)
+
+    def search(
+        self, user_id: str, query: str, k: int = 4
+    ) -> list[tuple[str, float]]:
+        """
+        사용자의 청크에서 BM25 점수 상위 k개 검색
+
+        Args:
+            user_id (str): 사용자 ID
+            query (str): 질의
+            k (int): 반환할 청크 수
+
+        Returns:
+            list[tuple[str, float]]: 점수 순 (청크 ID, 점수)
+        """
+        return self._open(user_id).search(query, k)
+
+    def close(self) -> None:
+        """
+        열린 사용자 색인을 모두 닫고 메모리 맵 해제
+        """
+        with self._lock:
+            indexes = list(self._live.values())
+            self._indexes.clear()
+            self._live.clear()
+        for index in indexes:
+            index.close()
+
+    def _open(self, user_id: str) -> UserLexicalIndex:
+        digest = hashlib.blake2b(
+            user_id.encode("utf-8"), digest_size=16
+        ).hexdigest()
+        with self._lock:
+            index = self._indexes.get(digest)
+            if index is None:
+                index = self._live.get(digest)
+                if index is None:
+                    index = UserLexicalIndex(f"{self.path}/{digest}")
+                    self._live[digest] = index
+                self._indexes[digest] = index
+                while len(self._indexes) > self.max_open:
+                    self._indexes.popitem(last=False)
+            else:
+                self._indexes.move_to_end(digest)
+            return index
@@ -0,0 +1,384 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator
+
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import BaseMessage, BaseMessageChunk
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_openai import ChatOpenAI
+
+from app.core.config import settings
+from app.util.logger import logger
+
+try:
+    from langchain_anthropic import ChatAnthropic
+except ImportError:
+    ChatAnthropic = None
+
+try:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+except ImportError:
+    ChatGoogleGenerativeAI = None
+
+
+def create_chat_model(
+    provider: str, model: str | None = None
+) -> BaseChatModel:
+    """
+    제공자의 채팅 모델 생성
+
+    Args:
+        provider (str): openai, anthropic, google
+        model (str | None): 모델 이름, 없으면 제공자의 기본 모델 설정
+
+    Returns:
+        BaseChatModel: 채팅 모델
+    """
+    if provider == "openai":
+        if not settings.OPENAI_API_KEY.get_secret_value():
+            raise ValueError("OPENAI_API_KEY is not set.")
+        return ChatOpenAI(
+            api_key=settings.OPENAI_API_KEY.get_secret_value(),
+            model=model or settings.OPENAI_MODEL,
+        )
+    if provider == "anthropic":
+        if ChatAnthropic is None:
+            raise ImportError(
+                "langchain-anthropic is required for Anthropic chat models"
+            )
+        if settings.ANTHROPIC_API_KEY is None:
+            raise ValueError("ANTHROPIC_API_KEY is not set.")
+        return ChatAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY.get_secret_value(),
+            model=model or settings.ANTHROPIC_MODEL,
+        )
+    if provider == "google":
+        if ChatGoogleGenerativeAI is None:
+            raise ImportError(
+                "langchain-google-genai is required for Google chat models"
+            )
+        if settings.GOOGLE_API_KEY is None:
+            raise ValueError("GOOGLE_API_KEY is not set.")
+        return ChatGoogleGenerativeAI(
+            google_api_key=settings.GOOGLE_API_KEY.get_secret_value(),
+            model=model or settings.GOOGLE_MODEL,
+        )
+    raise ValueError(f"Invalid model type: {provider}")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    값 목록의 q 분위수 (0 <= q <= 1, 최근접 순위)
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class BackendStats:
+    """
+    백엔드 하나의 최근 지연 시간과 오류율
+
+    지연 시간은 호출 종류(invoke는 전체 응답, stream은 첫 조각까지)별로
+    최근 window개를 보관한다. 오류율은 최근 error_window초 동안의 결과로
+    계산하므로, 오류로 제외된 백엔드도 시간이 지나면 다시 시도된다.
+    """
+
+    def __init__(self, window: int = 100, error_window: float = 60):
+        self.window = window
+        self.error_window = error_window
+        self._latencies: dict[str, deque[float]] = {}
+        self._outcomes: deque[tuple[float, bool]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, latency: float | None) -> None:
+        """
+        호출 결과 기록
+
+        Args:
+            kind (str): invoke 또는 stream
+            latency (float | None): 지연 시간(초), 실패하면 None
+        """
+        with self._lock:
+            self._outcomes.append((time.monotonic(), latency is not None))
+            if latency is not None:
+                self._latencies.setdefault(
+                    kind, deque(maxlen=self.window)
+                ).append(latency)
+
+    def samples(self, kind: str) -> int:
+        """
+        기록된 지연 시간 수
+        """
+        with self._lock:
+            return len(self._latencies.get(kind, ()))
+
+    def latency(self, kind: str, q: float) -> float | None:
+        """
+        최근 지연 시간의 q 분위수, 기록이 없으면 None
+        """
+        with self._lock:
+            latencies = list(self._latencies.get(kind, ()))
+        return percentile(latencies, q) if latencies else None
+
+    def error_rate(self) -> tuple[float, int]:
+        """
+        최근 error_window초 동안의 (오류율, 호출 수)
+        """
+        since = time.monotonic() - self.error_window
+        with self._lock:
+            outcomes = [ok for at, ok in self._outcomes if at >= since]
+        if not outcomes:
+            return 0.0, 0
+        return outcomes.count(False) / len(outcomes), len(outcomes)
+
+
+class ModelBackend:
+    """
+    라우터가 선택하는 채팅 모델과 그 통계
+    """
+
+    def __init__(self, name: str, model: Runnable, stats: BackendStats):
+        self.name = name
+        self.model = model
+        self.stats = stats
+
+
+class ModelRouter(Runnable[LanguageModelInput, BaseMessage]):
+    """
+    여러 채팅 모델 중 가장 빠른 정상 백엔드로 요청을 보내는 라우터
+
+    - 최근 오류율이 max_error_rate 이상인(호출 min_samples회 이상)
+      백엔드는 뒤로 미루고, 나머지는 최근 중앙값 지연 시간 순으로 시도한다.
+      기록이 없는 백엔드는 측정을 위해 먼저 시도하며, 같으면 등록 순서를
+      따른다.
+    - 요청이 백엔드의 hedge_percentile 지연 시간 안에 끝나지 않으면 다음
+      백엔드에도 같은 요청을 보내고(hedge) 먼저 끝난 응답을 사용한다.
+      기록이 min_samples개보다 적으면 hedge_delay를 기다린다.
+    - 오류가 나면 바로 다음 백엔드로 넘어간다.
+
+    stream은 첫 조각까지의 시간으로 hedge하고, 첫 조각을 받은 스트림으로
+    확정한 뒤에는 다른 백엔드로 넘어가지 않는다. 사용하지 않게 된 요청은
+    취소한다.
+    """
+
+    def __init__(
+        self,
+        backends: list[tuple[str, Runnable]],
+        window: int = 100,
+        error_window: float = 60,
+        max_error_rate: float = 0.5,
+        min_samples: int = 5,
+        hedge_percentile: float = 0.95,
+        hedge_delay: float | None = 10.0,
+        max_hedges: int = 1,
+    ):
+        if not backends:
+            raise ValueError("At least one chat model is required")
+        self.backends = [
+            ModelBackend(name, model, BackendStats(window, error_window))
+            for name, model in backends
+        ]
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.max_hedges = max_hedges
+
+    def is_healthy(self, backend: ModelBackend) -> bool:
+        """
+        백엔드의 최근 오류율이 기준 미만인지 여부
+        """
+        error_rate, samples = backend.stats.error_rate()
+        return samples < self.min_samples or error_rate < self.max_error_rate
+
+    def rank(self, kind: str) -> list[ModelBackend]:
+        """
+        요청을 보낼 순서로 정렬한 백엔드
+
+        Args:
+            kind (str): invoke 또는 stream
+
+        Returns:
+            list[ModelBackend]: 백엔드
+        """
+        return sorted(
+            self.backends,
+            key=lambda backend: (
+                not self.is_healthy(backend),
+                backend.stats.latency(kind, 0.5) or 0.0,
+            ),
+        )
+
+    def get_hedge_delay(
+        self, backend: ModelBackend, kind: str
+    ) -> float | None:
+        """
+        다음 백엔드에 hedge 요청을 보내기 전 기다릴 시간 (초), None이면
+        hedge하지 않음
+        """
+        if backend.stats.samples(kind) < self.min_samples:
+            return self.hedge_delay
+        return backend.stats.latency(kind, self.hedge_percentile)
+
+    def stats(self) -> list[dict]:
+        """
+        백엔드별 지연 시간과 오류율
+
+        Returns:
+            list[dict]: name, healthy, error_rate, invoke/stream p50, p95
+        """
+        stats = []
+        for backend in self.backends:
+            error_rate, samples = backend.stats.error_rate()
+            item = {
+                "name": backend.name,
+                "healthy": self.is_healthy(backend),
+                "error_rate": error_rate,
+                "recent_calls": samples,
+            }
+            for kind in ("invoke", "stream"):
+                item[f"{kind}_p50"] = backend.stats.latency(kind, 0.5)
+                item[f"{kind}_p95"] = backend.stats.latency(kind, 0.95)
+            stats.append(item)
+        return stats
+
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: RunnableConfig | None = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        """
+        동기 호출은 hedge 없이 순서대로 시도한다
+        """
+        error = None
+        for backend in self.rank("invoke"):
+            start = time.perf_counter()
+            try:
+                result = backend.model.invoke(input, config, **kwargs)
+            except Exception as e:
+                backend.stats.record("invoke", None)
+                logger.warning(f"Chat model {backend.name} failed: {e!r}")
+                error = e
+                continue
+            backend.stats.record("invoke", time.perf_counter() - start)
+            return result
+        raise error or RuntimeError("No chat model backend is available")
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: RunnableConfig | None = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        async def call(backend: ModelBackend) -> BaseMessage:
+            start = time.perf_counter()
+            try:
+                result = await backend.model.ainvoke(input, config, **kwargs)
+            except Exception:
+                backend.stats.record("invoke", None)
+                raise
+            backend.stats.record("invoke", time.perf_counter() - start)
+            return result
+
+        _, result = await self._race("invoke", call)
+        return result
+
+    async def astream(
+        self,
+        input: LanguageModelInput,
+        config: RunnableConfig | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[BaseMessageChunk]:
+        async def first_chunk(
+            backend: ModelBackend,
+        ) -> tuple[AsyncIterator, BaseMessageChunk | None]:
+            start = time.perf_counter()
+            stream = backend.model.astream(input, config, **kwargs)
+            try:
+                chunk = await anext(stream, None)
+            except BaseException as e:
+                await stream.aclose()
+                if isinstance(e, Exception):
+                    backend.stats.record("stream", None)
+                raise
+            backend.stats.record("stream", time.perf_counter() - start)
+            return stream, chunk
+
+        backend, (stream, chunk) = await self._race(
+            "stream", first_chunk, cleanup=lambda result: result[0].aclose()
+        )
+        try:
+            if chunk is not None:
+                yield chunk
+            async for chunk in stream:
+                yield chunk
+        except Exception:
+            backend.stats.record("stream", None)
+            raise
+        finally:
+            await stream.aclose()
+
+    async def _race(self, kind: str, call, cleanup=None):
+        """
+        순위대로 call(backend)을 실행하며 hedge와 failover를 적용
+
+        Args:
+            kind (str): invoke 또는 stream
+            call: 백엔드 하나를 호출하는 코루틴 함수
+            cleanup: 이긴 결과가 아닌 성공 결과를 정리하는 코루틴 함수
+
+        Returns:
+            tuple[ModelBackend, Any]: (응답한 백엔드, call 결과)
+        """
+        candidates = iter(self.rank(kind))
+        pending: dict[asyncio.Task, ModelBackend] = {}
+        hedges = 0
+        error = None
+
+        def launch() -> float | None:
+            backend = next(candidates, None)
+            if backend is None:
+                return None
+            pending[asyncio.ensure_future(call(backend))] = backend
+            delay = self.get_hedge_delay(backend, kind)
+            return None if delay is None else time.monotonic() + delay
+
+        deadline = launch()
+        try:
+            while pending:
+                timeout = None
+                if deadline is not None and hedges < self.max_hedges:
+                    timeout = max(0.0, deadline - time.monotonic())
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    hedges += 1
+                    logger.info(f"Hedging slow chat model {kind} request")
+                    deadline = launch()
+                    continue
+                winner = None
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        logger.warning(
+                            f"Chat model {backend.name} failed: {error!r}"
+                        )
+                    elif winner is None:
+                        winner = backend, task.result()
+                    elif cleanup is not None:
+                        await cleanup(task.result())
+                if winner is not None:
+                    return winner
+                if not pending:
+                    deadline = launch()
+            raise error or RuntimeError("No chat model backend is available")
+        finally:
+            for task in pending:
+                task.cancel()
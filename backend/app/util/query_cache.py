@@ -0,0 +1,194 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta
+
+from cachetools import TTLCache
+
+from app.crud import query_embedding as query_embedding_crud
+from app.db.database import get_async_db_session
+from app.util.embedding_cache import decode_vector, encode_vector
+from app.util.logger import logger
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    캐시 키로 쓸 질의 정규화
+
+    유니코드 정규화(NFKC), 대소문자 통일, 공백 정리만 하므로 표기만 다른
+    같은 질문이 같은 키가 된다.
+
+    Args:
+        text (str): 질의
+
+    Returns:
+        str: 정규화된 질의
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class PostgresQueryEmbeddingStore:
+    """
+    여러 워커 프로세스가 공유하는 Postgres 질의 임베딩 저장소
+
+    만료된 행은 조회에서 제외하고, purge_interval마다 한 번씩 삭제한다.
+    """
+
+    def __init__(self, purge_interval: float = 3600):
+        self.purge_interval = purge_interval
+        self._next_purge = time.monotonic() + purge_interval
+
+    async def get(self, key: str) -> list[float] | None:
+        async with get_async_db_session() as db:
+            vector = await query_embedding_crud.get_query_embedding(db, key)
+        return decode_vector(vector) if vector is not None else None
+
+    async def put(self, key: str, vector: list[float], ttl: float) -> None:
+        expires_at = datetime.now() + timedelta(seconds=ttl)
+        async with get_async_db_session() as db:
+            await query_embedding_crud.save_query_embedding(
+                db, key, encode_vector(vector), expires_at
+            )
+            if time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + self.purge_interval
+                await query_embedding_crud.delete_expired_query_embeddings(db)
+
+
+class QueryEmbeddingCache:
+    """
+    질의 임베딩 캐시
+
+    키는 (정규화된 질의, 임베딩 모델, 차원 수)의 해시다. 프로세스 안에서는
+    최대 maxsize개를 ttl초 동안 보관하는 LRU 캐시를 쓰고, shared 저장소가
+    있으면 프로세스 캐시에 없을 때 조회하여 다른 워커가 구한 임베딩도
+    재사용한다. 공유 저장소 오류는 캐시 미스로 처리한다.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        dimensions: int | None = None,
+        maxsize: int = 10000,
+        ttl: float = 3600,
+        shared: PostgresQueryEmbeddingStore | None = None,
+    ):
+        self.namespace = f"{model}\0{dimensions or ''}\0"
+        self.ttl = ttl
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+        self._cache: TTLCache[str, list[float]] = TTLCache(maxsize, ttl)
+        self._lock = threading.Lock()
+
+    def key(self, text: str) -> str:
+        """
+        질의의 캐시 키
+        """
+        return hashlib.sha256(
+            (self.namespace + normalize_query(text)).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, text: str) -> list[float] | None:
+        """
+        프로세스 캐시에서 질의 임베딩 조회
+
+        Args:
+            text (str): 질의
+
+        Returns:
+            list[float] | None: 임베딩, 없으면 None
+        """
+        key = self.key(text)
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return vector
+
+    def put(self, text: str, vector: list[float]) -> None:
+        """
+        프로세스 캐시에 질의 임베딩 저장
+
+        Args:
+            text (str): 질의
+            vector (list[float]): 임베딩
+        """
+        key = self.key(text)
+        with self._lock:
+            self._cache[key] = vector
+
+    async def aget(self, text: str) -> list[float] | None:
+        """
+        프로세스 캐시, 공유 저장소 순으로 질의 임베딩 조회
+
+        Args:
+            text (str): 질의
+
+        Returns:
+            list[float] | None: 임베딩, 없으면 None
+        """
+        key = self.key(text)
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self.hits += 1
+                return vector
+        if self.shared is not None:
+            try:
+                vector = await self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared query embedding cache failed: {e}")
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.shared_hits += 1
+                self._cache[key] = vector
+        return vector
+
+    async def aput(self, text: str, vector: list[float]) -> None:
+        """
+        프로세스 캐시와 공유 저장소에 질의 임베딩 저장
+
+        Args:
+            text (str): 질의
+            vector (list[float]): 임베딩
+        """
+        key = self.key(text)
+        with self._lock:
+            self._cache[key] = vector
+        if self.shared is not None:
+            try:
+                await self.shared.put(key, vector, self.ttl)
+            except Exception as e:
+                logger.warning(f"Shared query embedding cache failed: {e}")
+
+    def stats(self) -> dict:
+        """
+        캐시 적중 통계
+
+        Returns:
+            dict: hits, shared_hits, misses, hit_rate, size
+        """
+        with self._lock:
+            requests = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": (
+                    (self.hits + self.shared_hits) / requests
+                    if requests
+                    else 0.0
+                ),
+                "size": len(self._cache),
+            }
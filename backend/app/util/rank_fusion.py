@@ -0,0 +1,31 @@
+from langchain_core.documents import Document
+
+# 상위 순위 간 점수 차이를 완만하게 하는 상수 (Cormack et al. 기본값)
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[Document]], limit: int, k: int = RRF_K
+) -> list[Document]:
+    """
+    여러 검색 결과를 reciprocal rank fusion으로 병합
+
+    각 결과에서 순위 r인 청크에 1 / (k + r)점을 주고 청크 ID별로 합산한다.
+    점수 척도가 다른 BM25와 임베딩 유사도를 정규화 없이 합칠 수 있다.
+
+    Args:
+        rankings (list[list[Document]]): 검색 방식별 순위 순 청크
+        limit (int): 반환할 청크 수
+        k (int): 순위 상수
+
+    Returns:
+        list[Document]: 병합 점수 순 청크
+    """
+    scores: dict[str, float] = {}
+    documents: dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, start=1):
+            scores[document.id] = scores.get(document.id, 0.0) + 1 / (k + rank)
+            documents.setdefault(document.id, document)
+    ranked = sorted(scores, key=lambda chunk_id: -scores[chunk_id])
+    return [documents[chunk_id] for chunk_id in ranked[:limit]]
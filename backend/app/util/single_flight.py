@@ -0,0 +1,135 @@
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """
+    진행 중인 호출과 그 결과를 기다리는 요청 수
+    """
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        # stream 호출에서 지금까지 받은 조각
+        self.items: list = []
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나의 upstream 호출로 합침
+
+    먼저 들어온 요청이 호출을 시작하고, 호출이 끝나기 전에 들어온 같은
+    키의 요청은 그 결과를 함께 받는다. 결과는 저장하지 않으므로 호출이
+    끝난 뒤의 요청은 새로 호출한다. 기다리는 요청이 모두 취소되면 upstream
+    호출도 취소한다.
+
+    같은 이벤트 루프 안에서만 사용한다.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        키가 같은 진행 중인 호출이 있으면 그 결과를, 없으면 fn()의 결과를
+        반환
+
+        Args:
+            key (Hashable): 호출 키
+            fn (Callable[[], Awaitable[T]]): upstream 호출
+
+        Returns:
+            T: 호출 결과
+        """
+        flight = self._join(key, lambda: asyncio.ensure_future(fn()))
+        try:
+            # 요청 하나가 취소되어도 다른 요청이 기다리는 호출은 계속된다
+            return await asyncio.shield(flight.task)
+        finally:
+            self._leave(key, flight)
+
+    async def stream(
+        self, key: Hashable, fn: Callable[[], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        """
+        키가 같은 진행 중인 스트림이 있으면 그 조각을, 없으면 fn()의 조각을
+        반환
+
+        나중에 합류한 요청도 처음 조각부터 받는다.
+
+        Args:
+            key (Hashable): 호출 키
+            fn (Callable[[], AsyncIterator[T]]): upstream 스트림
+
+        Yields:
+            T: 스트림 조각
+        """
+        flight = None
+
+        async def produce() -> None:
+            async with aclosing(fn()) as upstream:
+                async for item in upstream:
+                    flight.items.append(item)
+                    flight.changed.set()
+
+        flight = self._join(key, lambda: asyncio.ensure_future(produce()))
+        flight.task.add_done_callback(lambda _: flight.changed.set())
+        try:
+            index = 0
+            while True:
+                if index < len(flight.items):
+                    yield flight.items[index]
+                    index += 1
+                    continue
+                if flight.task.done():
+                    # 예외로 끝났으면 다시 발생시킨다
+                    flight.task.result()
+                    return
+                flight.changed.clear()
+                await flight.changed.wait()
+        finally:
+            self._leave(key, flight)
+
+    def stats(self) -> dict:
+        """
+        합쳐진 호출 통계
+
+        Returns:
+            dict: calls (upstream 호출 수), shared (다른 요청의 호출을 함께
+                받은 요청 수), in_flight
+        """
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._flights),
+        }
+
+    def _join(
+        self, key: Hashable, start: Callable[[], asyncio.Task]
+    ) -> _Flight:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(start())
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.calls += 1
+        else:
+            self.shared += 1
+        flight.waiters += 1
+        return flight
+
+    def _leave(self, key: Hashable, flight: _Flight) -> None:
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.task.done():
+            self._forget(key, flight)
+            flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,15 @@
+import json
+
+
+def format_sse_event(event: str, data: dict) -> str:
+    """
+    Server-Sent Events 형식의 이벤트 문자열 생성
+
+    Args:
+        event (str): 이벤트 이름
+        data (dict): JSON으로 보낼 데이터
+
+    Returns:
+        str: 이벤트 문자열
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class VectorStoreBusyError(Exception):
+    """대기 중인 vector store 호출이 max_queue를 넘은 경우"""
+
+
+class VectorStoreExecutor:
+    """
+    동기 vector store(Chroma) 호출 전용 스레드 풀
+
+    이벤트 루프에서 Chroma를 직접 호출하면 검색하는 동안 모든 요청이
+    멈추므로, 고정된 수의 전용 스레드에서 실행하고 결과를 기다린다.
+    기본 스레드 풀과 분리되어 파일 I/O 등 다른 작업과 스레드를 다투지
+    않는다. 대기열이 max_queue를 넘으면 더 쌓지 않고 거절한다.
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 256):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vector-store"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        함수를 전용 스레드에서 실행하고 결과 반환
+
+        Args:
+            func (Callable[..., T]): 실행할 동기 함수
+            *args: 위치 인자
+            **kwargs: 키워드 인자
+
+        Returns:
+            T: 함수 반환값
+
+        Raises:
+            VectorStoreBusyError: 대기열이 가득 찬 경우
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise VectorStoreBusyError(
+                    f"Vector store queue is full ({self.max_queue})"
+                )
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        submitted = time.perf_counter()
+
+        def call() -> T:
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_seconds += time.perf_counter() - submitted
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        return await asyncio.wrap_future(self._executor.submit(call))
+
+    def stats(self) -> dict:
+        """
+        대기열 상태
+
+        Returns:
+            dict: 워커 수, 실행 중/대기 중 호출 수, 최대 대기 수, 완료/거절
+                수, 평균 대기 시간(초)
+        """
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "running": self._running,
+                "queued": self._queued,
+                "max_queued": self._max_queued,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "average_wait_seconds": (
+                    self._wait_seconds / self._completed
+                    if self._completed
+                    else 0.0
+                ),
+            }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,209 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Iterator
+
+from langchain_core.embeddings import Embeddings
+
+from app.util.vectorstore.base import VectorStore
+from app.util.vectorstore.factory import create_vector_store
+
+
+class VectorShard:
+    """
+    열려 있는 샤드와 사용 중인 요청 수
+    """
+
+    def __init__(self, shard_id: str, store: VectorStore):
+        self.shard_id = shard_id
+        self.store = store
+        self.leases = 0
+        self.evicted = False
+
+
+class VectorStoreShards:
+    """
+    사용자별 vector store 샤드 관리
+
+    buckets가 0이면 사용자마다, 1 이상이면 사용자 ID 해시 버킷마다 별도의
+    vector store(디렉터리)를 사용하므로 검색과 목록 조회 비용이
+    전체 설치가 아닌 샤드의 데이터 크기에 비례한다. 샤드는 처음 사용할 때
+    열고, 열린 샤드가 max_open개를 넘으면 가장 오래 사용하지 않은 샤드를
+    닫는다. 사용 중인 샤드는 요청이 끝난 뒤 닫는다. 샤드 디렉터리는 paths
+    중 하나에 해시로 배치되어 여러 디스크에 나눌 수 있다. 샤드를 여는
+    동안에는 다른 샤드의 요청을 막지 않는다.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        embedding_function: Embeddings,
+        paths: list[str],
+        buckets: int = 0,
+        max_open: int = 64,
+        backend: str = "chroma",
+        backend_options: dict | None = None,
+    ):
+        if not paths:
+            raise ValueError("At least one shard path is required")
+        self.collection_name = collection_name
+        self.embedding_function = embedding_function
+        self.paths = paths
+        self.buckets = buckets
+        self.max_open = max_open
+        self.backend = backend
+        self.backend_options = backend_options or {}
+        self._shards: OrderedDict[str, VectorShard] = OrderedDict()
+        # 밀려났지만 아직 사용 중인 샤드, 같은 디렉터리를 두 번 열지 않도록
+        # 다시 요청되면 그대로 사용한다
+        self._evicted: dict[str, VectorShard] = {}
+        # 여는 중인 샤드, 같은 샤드를 동시에 열면 한 번만 만든다
+        self._opening: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_shard_id(self, user_id: str) -> str:
+        """
+        사용자의 샤드 ID
+
+        Args:
+            user_id (str): 사용자 ID
+
+        Returns:
+            str: 샤드 ID
+        """
+        digest = hashlib.blake2b(user_id.encode("utf-8"), digest_size=16)
+        if self.buckets:
+            return f"bucket-{int(digest.hexdigest(), 16) % self.buckets:05d}"
+        return f"user-{digest.hexdigest()}"
+
+    def get_shard_path(self, shard_id: str) -> str:
+        """
+        샤드의 persist directory
+        """
+        digest = hashlib.blake2b(shard_id.encode("utf-8"), digest_size=8)
+        path = self.paths[int(digest.hexdigest(), 16) % len(self.paths)]
+        return f"{path}/shards/{shard_id}"
+
+    @contextmanager
+    def open(self, user_id: str) -> Iterator[VectorStore]:
+        """
+        사용자의 샤드를 열어 사용
+
+        Args:
+            user_id (str): 사용자 ID
+
+        Yields:
+            VectorStore: 사용자의 샤드 vector store
+        """
+        shard = self._acquire(self.get_shard_id(user_id))
+        try:
+            yield shard.store
+        finally:
+            with self._lock:
+                shard.leases -= 1
+                release = shard.evicted and shard.leases == 0
+                if release:
+                    self._evicted.pop(shard.shard_id, None)
+            if release:
+                shard.store.close()
+
+    def _acquire(self, shard_id: str) -> VectorShard:
+        """
+        샤드를 열고 사용 중인 요청 수를 늘림
+
+        store를 만드는 동안(클라이언트 시작, 인덱스 복구 등)에는 전체 lock을
+        잡지 않으므로 다른 샤드의 요청이 기다리지 않는다. 같은 샤드를 동시에
+        열면 먼저 시작한 요청만 store를 만들고 나머지는 끝나기를 기다린다.
+        """
+        while True:
+            creating = False
+            with self._lock:
+                shard = self._shards.get(shard_id)
+                if shard is None:
+                    shard = self._evicted.pop(shard_id, None)
+                    if shard is not None:
+                        shard.evicted = False
+                if shard is not None:
+                    evicted = self._insert(shard)
+                    break
+                opening = self._opening.get(shard_id)
+                if opening is None:
+                    opening = self._opening[shard_id] = Future()
+                    creating = True
+            if creating:
+                shard, evicted = self._create(shard_id, opening)
+                break
+            # 다른 요청이 여는 중이면 끝난 뒤 다시 조회한다
+            opening.result()
+
+        for oldest in evicted:
+            oldest.store.close()
+        return shard
+
+    def _create(
+        self, shard_id: str, opening: Future
+    ) -> tuple[VectorShard, list[VectorShard]]:
+        try:
+            store = create_vector_store(
+                self.backend,
+                self.get_shard_path(shard_id),
+                self.collection_name,
+                self.embedding_function,
+                **self.backend_options,
+            )
+        except BaseException as e:
+            with self._lock:
+                del self._opening[shard_id]
+            opening.set_exception(e)
+            raise
+        shard = VectorShard(shard_id, store)
+        with self._lock:
+            del self._opening[shard_id]
+            evicted = self._insert(shard)
+        opening.set_result(None)
+        return shard, evicted
+
+    def _insert(self, shard: VectorShard) -> list[VectorShard]:
+        """
+        샤드를 가장 최근에 사용한 샤드로 두고 사용 중인 요청 수를 늘림
+
+        호출하는 쪽에서 lock을 잡으며, 반환된 밀려난 샤드는 lock 밖에서
+        닫는다.
+
+        Returns:
+            list[VectorShard]: 밀려났고 사용 중이 아닌 샤드
+        """
+        self._shards[shard.shard_id] = shard
+        self._shards.move_to_end(shard.shard_id)
+        evicted = []
+        while len(self._shards) > self.max_open:
+            _, oldest = self._shards.popitem(last=False)
+            oldest.evicted = True
+            if oldest.leases == 0:
+                evicted.append(oldest)
+            else:
+                self._evicted[oldest.shard_id] = oldest
+        shard.leases += 1
+        return evicted
+
+    def open_shard_ids(self) -> list[str]:
+        """
+        열려 있는 샤드 ID (오래 사용하지 않은 순)
+        """
+        with self._lock:
+            return list(self._shards)
+
+    def close(self) -> None:
+        """
+        열려 있는 모든 샤드 닫기
+        """
+        with self._lock:
+            shards = list(self._shards.values())
+            self._shards.clear()
+            for shard in shards:
+                shard.evicted = True
+        for shard in shards:
+            if shard.leases == 0:
+                shard.store.close()
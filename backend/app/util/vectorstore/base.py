@@ -0,0 +1,119 @@
+from abc import ABC, abstractmethod
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+
+class VectorStore(ABC):
+    """
+    청크 vector store 인터페이스
+
+    document 유틸과 채팅 검색은 이 인터페이스만 사용하므로 백엔드(Chroma,
+    HNSW, 전수 검색)를 배포마다 바꿀 수 있다. where는 메타데이터 키와 값이
+    모두 일치하는 조건(AND)이다. 유사도 검색 결과의 metadata["score"]는
+    질의와의 코사인 유사도이다.
+    """
+
+    embedding_function: Embeddings
+
+    def add_documents(self, documents: list[Document]) -> None:
+        """
+        청크를 임베딩하여 저장, 같은 ID가 있으면 덮어쓴다
+
+        Args:
+            documents (list[Document]): ID가 있는 청크 Document
+        """
+        if not documents:
+            return
+        embeddings = self.embedding_function.embed_documents(
+            [document.page_content for document in documents]
+        )
+        self.add_embeddings(documents, embeddings)
+
+    @abstractmethod
+    def add_embeddings(
+        self, documents: list[Document], embeddings: list[list[float]]
+    ) -> None:
+        """
+        이미 계산한 임베딩과 함께 청크 저장
+        """
+
+    @abstractmethod
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        limit: int | None = None,
+        include_documents: bool = True,
+    ) -> list[Document]:
+        """
+        ID 또는 메타데이터 조건으로 청크 조회
+
+        Args:
+            ids (list[str] | None): 청크 ID
+            where (dict | None): 메타데이터 조건
+            limit (int | None): 최대 개수
+            include_documents (bool): False이면 page_content를 비워 반환
+
+        Returns:
+            list[Document]: 청크 Document
+        """
+
+    @abstractmethod
+    def update_metadatas(self, ids: list[str], metadatas: list[dict]) -> None:
+        """
+        임베딩은 그대로 두고 메타데이터만 변경
+        """
+
+    @abstractmethod
+    def delete(
+        self, ids: list[str] | None = None, where: dict | None = None
+    ) -> None:
+        """
+        ID 또는 메타데이터 조건으로 청크 삭제
+        """
+
+    @abstractmethod
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, where: dict | None = None
+    ) -> list[Document]:
+        """
+        임베딩과 유사한 청크 검색
+
+        Args:
+            embedding (list[float]): 질의 임베딩
+            k (int): 반환할 청크 수
+            where (dict | None): 메타데이터 조건
+
+        Returns:
+            list[Document]: 유사도 순 청크, metadata["score"]에 코사인 유사도
+        """
+
+    def similarity_search_by_vectors(
+        self,
+        embeddings: list[list[float]],
+        k: int = 4,
+        where: dict | None = None,
+    ) -> list[list[Document]]:
+        """
+        여러 질의 임베딩을 한 번에 검색
+        """
+        return [
+            self.similarity_search_by_vector(embedding, k=k, where=where)
+            for embedding in embeddings
+        ]
+
+    def similarity_search(
+        self, query: str, k: int = 4, where: dict | None = None
+    ) -> list[Document]:
+        """
+        질의와 유사한 청크 검색
+        """
+        return self.similarity_search_by_vector(
+            self.embedding_function.embed_query(query), k=k, where=where
+        )
+
+    def close(self) -> None:
+        """
+        열린 파일과 연결 정리
+        """
@@ -0,0 +1,128 @@
+import uuid
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.util.vectorstore.base import VectorStore
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    Chroma 백엔드
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        embedding_function: Embeddings,
+        persist_directory: str,
+    ):
+        self.embedding_function = embedding_function
+        self._store = Chroma(
+            collection_name=collection_name,
+            embedding_function=embedding_function,
+            persist_directory=persist_directory,
+        )
+
+    def add_documents(self, documents: list[Document]) -> None:
+        if documents:
+            self._store.add_documents(documents)
+
+    def add_embeddings(
+        self, documents: list[Document], embeddings: list[list[float]]
+    ) -> None:
+        if not documents:
+            return
+        self._store._collection.upsert(
+            ids=[document.id or str(uuid.uuid4()) for document in documents],
+            embeddings=embeddings,
+            documents=[document.page_content for document in documents],
+            metadatas=[document.metadata for document in documents],
+        )
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        limit: int | None = None,
+        include_documents: bool = True,
+    ) -> list[Document]:
+        if ids is not None and not ids:
+            return []
+        result = self._store.get(
+            ids=ids,
+            where=to_chroma_where(where),
+            limit=limit,
+            include=(
+                ["documents", "metadatas"]
+                if include_documents
+                else ["metadatas"]
+            ),
+        )
+        documents = result.get("documents") or [""] * len(result["ids"])
+        return [
+            Document(id=chunk_id, page_content=text or "", metadata=metadata)
+            for chunk_id, text, metadata in zip(
+                result["ids"], documents, result["metadatas"]
+            )
+        ]
+
+    def update_metadatas(self, ids: list[str], metadatas: list[dict]) -> None:
+        if ids:
+            self._store._collection.update(ids=ids, metadatas=metadatas)
+
+    def delete(
+        self, ids: list[str] | None = None, where: dict | None = None
+    ) -> None:
+        if ids is not None:
+            if ids:
+                self._store.delete(ids=ids)
+        elif where:
+            self._store.delete(where=to_chroma_where(where))
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, where: dict | None = None
+    ) -> list[Document]:
+        # 컬렉션의 거리 함수와 관계없이 코사인 유사도를 점수로 반환
+        result = self._store._collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            where=to_chroma_where(where),
+            include=["documents", "metadatas", "embeddings"],
+        )
+        if not result["ids"][0]:
+            return []
+        vectors = np.asarray(result["embeddings"][0], dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        scores = vectors @ query / np.where(norms == 0, 1, norms)
+        return [
+            Document(
+                id=chunk_id,
+                page_content=text or "",
+                metadata={**(metadata or {}), "score": float(score)},
+            )
+            for chunk_id, text, metadata, score in zip(
+                result["ids"][0],
+                result["documents"][0],
+                result["metadatas"][0],
+                scores,
+            )
+        ]
+
+    def close(self) -> None:
+        # 같은 디렉터리를 다시 연 인스턴스가 있으면 Chroma가 참조 수로 관리한다
+        self._store._client.close()
+
+
+def to_chroma_where(where: dict | None) -> dict | None:
+    """
+    AND 조건 dict를 Chroma where 형식으로 변환
+    """
+    if not where:
+        return None
+    if len(where) == 1:
+        return where
+    return {"$and": [{key: value} for key, value in where.items()]}
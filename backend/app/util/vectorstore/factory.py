@@ -0,0 +1,60 @@
+from langchain_core.embeddings import Embeddings
+
+from app.util.vectorstore.base import VectorStore
+from app.util.vectorstore.chroma import ChromaVectorStore
+from app.util.vectorstore.flat import FlatVectorStore
+from app.util.vectorstore.hnsw import HnswVectorStore
+from app.util.vectorstore.quantization import VectorCodec
+
+
+def create_vector_store(
+    backend: str,
+    path: str,
+    collection_name: str,
+    embedding_function: Embeddings,
+    quantization: str = "none",
+    truncate_dimensions: int | None = None,
+    rescore_factor: int = 4,
+    **options,
+) -> VectorStore:
+    """
+    설정한 백엔드의 vector store 생성
+
+    Args:
+        backend (str): "chroma", "hnsw" 또는 "flat"
+        path (str): 저장 디렉터리
+        collection_name (str): 컬렉션 이름
+        embedding_function (Embeddings): 임베딩 모델
+        quantization (str): 후보 검색용 압축 방식 ("none", "int8",
+            "binary"), hnsw는 "none"만 지원
+        truncate_dimensions (int | None): 후보 검색에 사용할 앞쪽 차원 수
+        rescore_factor (int): 압축 검색 시 k의 몇 배를 후보로 다시 점수
+            계산할지
+        **options: 백엔드별 옵션 (hnsw: m, ef_construction, ef_search)
+
+    Returns:
+        VectorStore: vector store
+    """
+    codec = None
+    if quantization != "none" or truncate_dimensions is not None:
+        codec = VectorCodec(quantization, truncate_dimensions)
+    if backend == "chroma":
+        if codec is not None:
+            raise ValueError("The Chroma vector store does not support codecs")
+        return ChromaVectorStore(collection_name, embedding_function, path)
+    if backend == "hnsw":
+        return HnswVectorStore(
+            f"{path}/{collection_name}",
+            embedding_function,
+            codec=codec,
+            rescore_factor=rescore_factor,
+            **options,
+        )
+    if backend == "flat":
+        return FlatVectorStore(
+            f"{path}/{collection_name}",
+            embedding_function,
+            codec=codec,
+            rescore_factor=rescore_factor,
+        )
+    raise ValueError(f"Invalid vector store backend: {backend}")
@@ -0,0 +1,80 @@
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.util.vectorstore.local import (
+    EXACT_SEARCH_BLOCK_ROWS,
+    LocalVectorStore,
+    blocked_search,
+    exact_search,
+)
+from app.util.vectorstore.quantization import VectorCodec
+
+
+class FlatVectorStore(LocalVectorStore):
+    """
+    전수 검색 백엔드
+
+    메모리 맵 float32 행렬 전체와 질의의 내적을 블록 단위 행렬 곱으로
+    계산하므로 결과가 정확하고 인덱스 구축 비용이 없다. 청크 수가 수십만
+    이하인 배포에 적합하다.
+
+    codec이 있으면 압축 벡터만 메모리에 두고 전수 검색한 뒤 후보만 원본
+    벡터로 다시 점수를 계산한다. 압축 벡터는 파일로 저장하지 않고 열 때
+    원본 벡터에서 다시 만들므로 codec 설정을 바꿔도 데이터를 다시 넣을
+    필요가 없다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        embedding_function: Embeddings,
+        codec: VectorCodec | None = None,
+        rescore_factor: int = 4,
+    ):
+        super().__init__(path, embedding_function, codec, rescore_factor)
+        self.codes: np.ndarray | None = None
+        if codec is not None and len(self.live):
+            self.codes = np.concatenate(
+                [
+                    codec.encode(np.asarray(self.vectors.matrix[start:end]))
+                    for start, end in iter_blocks(len(self.live))
+                ]
+            )
+
+    def _index_add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if self.codec is None:
+            return
+        codes = self.codec.encode(vectors)
+        if self.codes is None:
+            self.codes = np.zeros((0, codes.shape[1]), dtype=codes.dtype)
+        if len(self.codes) < len(self.live):
+            grown = np.zeros(
+                (max(len(self.live), len(self.codes) * 2), codes.shape[1]),
+                dtype=codes.dtype,
+            )
+            grown[: len(self.codes)] = self.codes
+            self.codes = grown
+        self.codes[rows] = codes
+
+    def _search(
+        self, queries: np.ndarray, k: int, rows: np.ndarray | None
+    ) -> list[list[int]]:
+        if self.codec is None:
+            return exact_search(
+                self.vectors.matrix, self.live, queries, k, rows
+            )
+        if self.codes is None:
+            return [[] for _ in queries]
+        return blocked_search(
+            self.codes,
+            self.live,
+            self.codec.encode_queries(queries),
+            k,
+            rows,
+            self.codec.scores,
+        )
+
+
+def iter_blocks(rows: int):
+    for start in range(0, rows, EXACT_SEARCH_BLOCK_ROWS):
+        yield start, min(start + EXACT_SEARCH_BLOCK_ROWS, rows)
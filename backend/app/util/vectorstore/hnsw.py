@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.util.vectorstore.local import LocalVectorStore, exact_search
+from app.util.vectorstore.quantization import VectorCodec
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# 조건에 맞는 행이 이 수 이하이면 그래프 대신 전수 검색
+EXACT_SEARCH_MAX_ROWS = 2048
+
+
+class HnswVectorStore(LocalVectorStore):
+    """
+    HNSW 근사 검색 백엔드 (hnswlib)
+
+    벡터는 FlatVectorStore와 같은 메모리 맵 파일에 저장하고, 그래프는
+    close 시 hnsw.bin으로 저장한다. 저장된 그래프가 최신 데이터와 맞지
+    않으면(비정상 종료 등) 열 때 메모리 맵 벡터로 다시 구축한다. 조건
+    검색은 조건에 맞는 행이 적으면 전수 검색, 많으면 그래프 탐색에 필터를
+    적용한다.
+
+    hnswlib은 float32 벡터만 저장하므로 codec은 차원 축소만 지원한다.
+    그래프는 축소한 벡터로 만들고 후보는 원본 벡터로 다시 점수를 계산한다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        embedding_function: Embeddings,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        codec: VectorCodec | None = None,
+        rescore_factor: int = 4,
+    ):
+        if hnswlib is None:
+            raise ImportError("hnswlib is required for the HNSW vector store")
+        if codec is not None and codec.quantization != "none":
+            raise ValueError(
+                "The HNSW vector store only supports dimension truncation"
+            )
+        super().__init__(path, embedding_function, codec, rescore_factor)
+        self.index_path = f"{path}/hnsw.bin"
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._index = None
+        self._dirty = False
+        if self.vectors.dimensions is not None:
+            self._load_index()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._index is not None and self._dirty:
+                self._index.save_index(self.index_path)
+                self.records.set_meta(
+                    "hnsw_generation", self.records.get_meta("generation")
+                )
+                self.records.set_meta("hnsw_dimensions", str(self._index.dim))
+                self._dirty = False
+        super().close()
+
+    def _load_index(self) -> None:
+        dimensions = self.vectors.dimensions
+        if self.codec is not None:
+            dimensions = self.codec.code_dimensions(dimensions)
+        index = hnswlib.Index(space="ip", dim=dimensions)
+        capacity = max(self.vectors.capacity, 1)
+        generation = self.records.get_meta("generation")
+        if (
+            os.path.exists(self.index_path)
+            and generation == self.records.get_meta("hnsw_generation")
+            and str(dimensions) == self.records.get_meta("hnsw_dimensions")
+        ):
+            index.load_index(self.index_path, max_elements=capacity)
+        else:
+            index.init_index(
+                max_elements=capacity,
+                ef_construction=self.ef_construction,
+                M=self.m,
+            )
+            rows = np.flatnonzero(self.live)
+            if rows.size:
+                index.add_items(self._encode(self.vectors.matrix[rows]), rows)
+            self._dirty = True
+        index.set_ef(self.ef_search)
+        self._index = index
+
+    def _index_add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if self._index is None:
+            # 첫 저장에서 차원이 정해지므로 저장된 벡터로 그래프 구축
+            self._load_index()
+            return
+        if self._index.get_max_elements() < self.vectors.capacity:
+            self._index.resize_index(self.vectors.capacity)
+        # 삭제 표시된 행 번호를 재사용하면 hnswlib이 표시를 해제하고 갱신한다
+        self._index.add_items(self._encode(vectors), rows)
+        self._dirty = True
+
+    def _index_delete(self, rows: np.ndarray) -> None:
+        if self._index is None:
+            return
+        for row in rows.tolist():
+            self._index.mark_deleted(row)
+        self._dirty = True
+
+    def _search(
+        self, queries: np.ndarray, k: int, rows: np.ndarray | None
+    ) -> list[list[int]]:
+        if self._index is None:
+            return [[] for _ in queries]
+        if rows is not None and rows.size <= EXACT_SEARCH_MAX_ROWS:
+            return exact_search(
+                self.vectors.matrix, self.live, queries, k, rows
+            )
+        k = min(k, int(self.live.sum()) if rows is None else rows.size)
+        if k <= 0:
+            return [[] for _ in queries]
+
+        self._index.set_ef(max(self.ef_search, k))
+        encoded = self._encode(queries)
+        try:
+            if rows is None:
+                labels, _ = self._index.knn_query(encoded, k=k)
+            else:
+                allowed = set(rows.tolist())
+                labels, _ = self._index.knn_query(
+                    encoded,
+                    k=k,
+                    num_threads=1,
+                    filter=lambda label: label in allowed,
+                )
+        except RuntimeError:
+            # 필터 때문에 k개를 찾지 못하면 hnswlib이 에러를 낸다
+            return exact_search(
+                self.vectors.matrix, self.live, queries, k, rows
+            )
+        return labels.astype(np.int64).tolist()
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        if self.codec is None:
+            return vectors
+        return self.codec.encode(np.asarray(vectors))
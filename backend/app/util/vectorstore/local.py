@@ -0,0 +1,589 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from typing import Callable
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.util.vectorstore.base import VectorStore
+from app.util.vectorstore.quantization import VectorCodec
+
+SQLITE_BATCH_SIZE = 500
+# 전수 검색 시 한 번에 행렬 곱을 계산하는 행 수
+EXACT_SEARCH_BLOCK_ROWS = 65536
+MIN_VECTOR_CAPACITY = 1024
+METADATA_KEY_PATTERN = re.compile(r"^\w+$")
+
+
+class RecordStore:
+    """
+    로컬 vector store의 청크 ID, 텍스트, 메타데이터 (SQLite)
+
+    청크는 벡터 행렬의 행 번호(row)로 연결되며, 삭제된 행 번호는
+    free_row에 보관했다가 새 청크에 재사용한다.
+    """
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS record ("
+            "row INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, "
+            "document TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        for key in ("user_id", "document_id"):
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS record_{key}_idx "
+                f"ON record (json_extract(metadata, '$.{key}'))"
+            )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS free_row (row INTEGER PRIMARY KEY)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta "
+            "(key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._connection.commit()
+
+    def get_meta(self, key: str) -> str | None:
+        row = self._connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value)
+        )
+        self._connection.commit()
+
+    def row_count(self) -> int:
+        """
+        지금까지 할당한 행 수 (삭제된 행 포함)
+        """
+        return int(self.get_meta("row_count") or 0)
+
+    def live_rows(self) -> np.ndarray:
+        rows = self._connection.execute("SELECT row FROM record").fetchall()
+        return np.fromiter((row[0] for row in rows), dtype=np.int64)
+
+    def allocate_rows(self, ids: list[str]) -> list[int]:
+        """
+        청크 ID의 행 번호, 없는 ID는 빈 행을 재사용하거나 새로 할당
+        """
+        existing = self.get_rows(ids)
+        missing = [chunk_id for chunk_id in ids if chunk_id not in existing]
+        free = [
+            row[0]
+            for row in self._connection.execute(
+                "SELECT row FROM free_row ORDER BY row LIMIT ?",
+                (len(missing),),
+            ).fetchall()
+        ]
+        self._connection.executemany(
+            "DELETE FROM free_row WHERE row = ?", [(row,) for row in free]
+        )
+        row_count = self.row_count()
+        for chunk_id in missing:
+            if free:
+                existing[chunk_id] = free.pop(0)
+            else:
+                existing[chunk_id] = row_count
+                row_count += 1
+        self.set_meta("row_count", str(row_count))
+        return [existing[chunk_id] for chunk_id in ids]
+
+    def get_rows(self, ids: list[str]) -> dict[str, int]:
+        rows = {}
+        for start in range(0, len(ids), SQLITE_BATCH_SIZE):
+            batch = ids[start : start + SQLITE_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows.update(
+                self._connection.execute(
+                    f"SELECT id, row FROM record WHERE id IN ({placeholders})",
+                    batch,
+                ).fetchall()
+            )
+        return rows
+
+    def find_rows(self, where: dict) -> np.ndarray:
+        condition, params = build_where(where)
+        rows = self._connection.execute(
+            f"SELECT row FROM record WHERE {condition}", params
+        ).fetchall()
+        return np.fromiter((row[0] for row in rows), dtype=np.int64)
+
+    def upsert(self, records: list[tuple[int, str, str, dict]]) -> None:
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO record VALUES (?, ?, ?, ?)",
+            [
+                (row, chunk_id, text, json.dumps(metadata))
+                for row, chunk_id, text, metadata in records
+            ],
+        )
+        self._connection.commit()
+
+    def update_metadatas(self, ids: list[str], metadatas: list[dict]) -> None:
+        self._connection.executemany(
+            "UPDATE record SET metadata = ? WHERE id = ?",
+            [
+                (json.dumps(metadata), chunk_id)
+                for chunk_id, metadata in zip(ids, metadatas)
+            ],
+        )
+        self._connection.commit()
+
+    def select(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        rows: list[int] | None = None,
+        limit: int | None = None,
+    ) -> list[tuple[int, str, str, str]]:
+        """
+        조건에 맞는 (행 번호, 청크 ID, 텍스트, 메타데이터 JSON)
+        """
+        conditions, params = [], []
+        if where:
+            condition, where_params = build_where(where)
+            conditions.append(condition)
+            params.extend(where_params)
+        keys = ids if ids is not None else rows
+        column = "id" if ids is not None else "row"
+        if keys is None:
+            keys = [None]
+        records = []
+        for start in range(0, len(keys), SQLITE_BATCH_SIZE):
+            batch = keys[start : start + SQLITE_BATCH_SIZE]
+            batch_conditions = list(conditions)
+            batch_params = list(params)
+            if batch != [None]:
+                batch_conditions.append(
+                    f"{column} IN ({','.join('?' * len(batch))})"
+                )
+                batch_params.extend(batch)
+            query = "SELECT row, id, document, metadata FROM record"
+            if batch_conditions:
+                query += f" WHERE {' AND '.join(batch_conditions)}"
+            query += " ORDER BY row"
+            if limit is not None:
+                query += f" LIMIT {int(limit) - len(records)}"
+            records.extend(self._connection.execute(query, batch_params))
+            if limit is not None and len(records) >= limit:
+                break
+        return records
+
+    def delete_rows(self, rows: list[int]) -> None:
+        self._connection.executemany(
+            "DELETE FROM record WHERE row = ?", [(row,) for row in rows]
+        )
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO free_row VALUES (?)",
+            [(row,) for row in rows],
+        )
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class VectorMatrix:
+    """
+    정규화한 float32 임베딩을 행 단위로 저장하는 메모리 맵 파일
+
+    용량이 부족하면 파일을 두 배로 늘리고 다시 매핑한다.
+    """
+
+    def __init__(self, path: str, dimensions: int | None = None):
+        self.path = path
+        self.dimensions = dimensions
+        self.matrix: np.memmap | None = None
+        if dimensions is not None and os.path.exists(path):
+            self._map()
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self.matrix is None else self.matrix.shape[0]
+
+    def reserve(self, dimensions: int, rows: int) -> None:
+        """
+        rows개의 행을 쓸 수 있도록 파일 크기 확보
+        """
+        if self.dimensions is None:
+            self.dimensions = dimensions
+        elif dimensions != self.dimensions:
+            raise ValueError(
+                f"Expected {self.dimensions} dimensions, got {dimensions}"
+            )
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, self.capacity * 2, MIN_VECTOR_CAPACITY)
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+        with open(self.path, "ab") as f:
+            f.truncate(capacity * self.dimensions * 4)
+        self._map()
+
+    def flush(self) -> None:
+        if self.matrix is not None:
+            self.matrix.flush()
+
+    def _map(self) -> None:
+        rows = os.path.getsize(self.path) // (self.dimensions * 4)
+        self.matrix = np.memmap(
+            self.path,
+            dtype=np.float32,
+            mode="r+",
+            shape=(rows, self.dimensions),
+        )
+
+
+class LocalVectorStore(VectorStore):
+    """
+    메모리 맵 벡터 파일과 SQLite 메타데이터를 사용하는 로컬 vector store
+
+    검색 방식은 하위 클래스가 _search로 구현한다. 임베딩은 정규화하여
+    저장하므로 내적이 코사인 유사도이다. codec이 있으면 _search는 압축
+    벡터로 k * rescore_factor개의 후보를 찾고, 후보만 디스크의 원본 float32
+    벡터로 다시 점수를 계산하여 k개를 고른다. 모든 작업은 인스턴스 잠금으로
+    직렬화한다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        embedding_function: Embeddings,
+        codec: VectorCodec | None = None,
+        rescore_factor: int = 4,
+    ):
+        if rescore_factor < 1:
+            raise ValueError("rescore_factor must be at least 1")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.embedding_function = embedding_function
+        self.codec = codec
+        self.rescore_factor = rescore_factor
+        self.records = RecordStore(f"{path}/records.db")
+        dimensions = self.records.get_meta("dimensions")
+        self.vectors = VectorMatrix(
+            f"{path}/vectors.f32", int(dimensions) if dimensions else None
+        )
+        self.live = np.zeros(self.records.row_count(), dtype=bool)
+        self.live[self.records.live_rows()] = True
+        self._lock = threading.RLock()
+
+    def add_embeddings(
+        self, documents: list[Document], embeddings: list[list[float]]
+    ) -> None:
+        # 같은 ID가 여러 번 있으면 마지막 것을 사용, ID가 없으면 생성
+        unique = {
+            document.id or str(uuid.uuid4()): (document, embedding)
+            for document, embedding in zip(documents, embeddings)
+        }
+        if not unique:
+            return
+        ids = list(unique)
+        vectors = normalize(
+            np.asarray([unique[i][1] for i in ids], dtype=np.float32)
+        )
+        with self._lock:
+            rows = self.records.allocate_rows(ids)
+            if self.vectors.dimensions is None:
+                self.records.set_meta("dimensions", str(vectors.shape[1]))
+            self.vectors.reserve(vectors.shape[1], max(rows) + 1)
+            self.vectors.matrix[rows] = vectors
+            self.vectors.flush()
+            self.records.upsert(
+                [
+                    (
+                        row,
+                        chunk_id,
+                        unique[chunk_id][0].page_content,
+                        unique[chunk_id][0].metadata,
+                    )
+                    for row, chunk_id in zip(rows, ids)
+                ]
+            )
+            if len(self.live) < self.records.row_count():
+                live = np.zeros(self.records.row_count(), dtype=bool)
+                live[: len(self.live)] = self.live
+                self.live = live
+            self.live[rows] = True
+            self._bump_generation()
+            self._index_add(np.asarray(rows, dtype=np.int64), vectors)
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        limit: int | None = None,
+        include_documents: bool = True,
+    ) -> list[Document]:
+        if ids is not None and not ids:
+            return []
+        with self._lock:
+            records = self.records.select(ids=ids, where=where, limit=limit)
+        return [to_document(record, include_documents) for record in records]
+
+    def update_metadatas(self, ids: list[str], metadatas: list[dict]) -> None:
+        with self._lock:
+            self.records.update_metadatas(ids, metadatas)
+
+    def delete(
+        self, ids: list[str] | None = None, where: dict | None = None
+    ) -> None:
+        if ids is None and not where:
+            return
+        with self._lock:
+            if ids is not None:
+                rows = list(self.records.get_rows(ids).values())
+            else:
+                rows = self.records.find_rows(where).tolist()
+            if not rows:
+                return
+            self.records.delete_rows(rows)
+            self.live[rows] = False
+            self._bump_generation()
+            self._index_delete(np.asarray(rows, dtype=np.int64))
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, where: dict | None = None
+    ) -> list[Document]:
+        return self.similarity_search_by_vectors([embedding], k, where)[0]
+
+    def similarity_search_by_vectors(
+        self,
+        embeddings: list[list[float]],
+        k: int = 4,
+        where: dict | None = None,
+    ) -> list[list[Document]]:
+        queries = normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            if self.vectors.matrix is None:
+                return [[] for _ in embeddings]
+            rows = self.records.find_rows(where) if where else None
+            if self.codec is None:
+                results = self._search(queries, k, rows)
+            else:
+                results = rescore(
+                    self.vectors.matrix,
+                    queries,
+                    self._search(queries, k * self.rescore_factor, rows),
+                    k,
+                )
+            records = {
+                record[0]: record
+                for record in self.records.select(
+                    rows=sorted({row for result in results for row in result})
+                )
+            }
+            scores = [
+                self.vectors.matrix[result] @ query if result else []
+                for query, result in zip(queries, results)
+            ]
+        return [
+            [
+                to_document(records[row], score=float(score))
+                for row, score in zip(result, result_scores)
+                if row in records
+            ]
+            for result, result_scores in zip(results, scores)
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self.vectors.flush()
+            self.records.close()
+
+    def _search(
+        self, queries: np.ndarray, k: int, rows: np.ndarray | None
+    ) -> list[list[int]]:
+        """
+        질의별 유사도 순 행 번호, rows가 있으면 그 행에서만 검색
+
+        codec이 있으면 압축 벡터로 찾은 후보를 반환한다.
+        """
+        raise NotImplementedError
+
+    def _index_add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        저장된 벡터를 검색 인덱스에 반영
+        """
+
+    def _index_delete(self, rows: np.ndarray) -> None:
+        """
+        삭제된 행을 검색 인덱스에서 제외
+        """
+
+    def _bump_generation(self) -> None:
+        generation = int(self.records.get_meta("generation") or 0) + 1
+        self.records.set_meta("generation", str(generation))
+
+
+def exact_search(
+    matrix: np.ndarray,
+    live: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    rows: np.ndarray | None = None,
+) -> list[list[int]]:
+    """
+    행렬 곱으로 모든 행과의 내적을 계산하는 정확한 검색
+
+    전체 검색은 EXACT_SEARCH_BLOCK_ROWS 행씩 나누어 계산하여 질의 수와
+    관계없이 중간 결과의 메모리 사용량을 제한한다.
+
+    Args:
+        matrix (np.ndarray): (행 수, 차원) 정규화된 임베딩
+        live (np.ndarray): 행별 사용 여부
+        queries (np.ndarray): (질의 수, 차원) 정규화된 질의 임베딩
+        k (int): 질의별 결과 수
+        rows (np.ndarray | None): 검색할 행, None이면 사용 중인 모든 행
+
+    Returns:
+        list[list[int]]: 질의별 유사도 순 행 번호
+    """
+    return blocked_search(matrix, live, queries, k, rows, inner_product)
+
+
+def blocked_search(
+    matrix: np.ndarray,
+    live: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    rows: np.ndarray | None,
+    score: Callable[[np.ndarray, np.ndarray], np.ndarray],
+) -> list[list[int]]:
+    """
+    score 함수로 행렬의 모든 행을 블록 단위로 비교하는 전수 검색
+
+    Args:
+        matrix (np.ndarray): 행별 벡터 (원본 또는 압축 벡터)
+        live (np.ndarray): 행별 사용 여부
+        queries (np.ndarray): score에 넣을 질의
+        k (int): 질의별 결과 수
+        rows (np.ndarray | None): 검색할 행, None이면 사용 중인 모든 행
+        score (Callable): (질의, 행 블록) -> (질의 수, 행 수) 점수
+
+    Returns:
+        list[list[int]]: 질의별 점수 순 행 번호
+    """
+    if k <= 0:
+        return [[] for _ in queries]
+    if rows is not None:
+        if rows.size == 0:
+            return [[] for _ in queries]
+        return top_k(score(queries, matrix[rows]), rows, k)
+
+    candidate_scores, candidate_rows = [], []
+    for start in range(0, len(live), EXACT_SEARCH_BLOCK_ROWS):
+        mask = live[start : start + EXACT_SEARCH_BLOCK_ROWS]
+        if not mask.any():
+            continue
+        block_rows = start + np.flatnonzero(mask)
+        scores = score(queries, matrix[start : start + len(mask)])
+        scores = scores[:, mask]
+        count = min(k, scores.shape[1])
+        best = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+        candidate_scores.append(np.take_along_axis(scores, best, axis=1))
+        candidate_rows.append(block_rows[best])
+    if not candidate_scores:
+        return [[] for _ in queries]
+    scores = np.concatenate(candidate_scores, axis=1)
+    block_rows = np.concatenate(candidate_rows, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(block_rows, order, axis=1).tolist()
+
+
+def rescore(
+    matrix: np.ndarray,
+    queries: np.ndarray,
+    candidates: list[list[int]],
+    k: int,
+) -> list[list[int]]:
+    """
+    후보 행을 원본 벡터로 다시 점수 계산하여 질의별 상위 k개 선택
+
+    후보 행만 메모리 맵에서 읽으므로 원본 벡터 전체를 메모리에 올리지
+    않는다.
+
+    Args:
+        matrix (np.ndarray): (행 수, 차원) 정규화된 원본 임베딩
+        queries (np.ndarray): (질의 수, 차원) 정규화된 질의 임베딩
+        candidates (list[list[int]]): 질의별 후보 행 번호
+        k (int): 질의별 결과 수
+
+    Returns:
+        list[list[int]]: 질의별 유사도 순 행 번호
+    """
+    unique_rows = sorted({row for rows in candidates for row in rows})
+    if not unique_rows or k <= 0:
+        return [[] for _ in queries]
+    positions = {row: i for i, row in enumerate(unique_rows)}
+    vectors = np.asarray(matrix[unique_rows])
+    results = []
+    for query, rows in zip(queries, candidates):
+        if not rows:
+            results.append([])
+            continue
+        rows = np.asarray(rows, dtype=np.int64)
+        scores = vectors[[positions[row] for row in rows.tolist()]] @ query
+        results.extend(top_k(scores[np.newaxis, :], rows, k))
+    return results
+
+
+def inner_product(queries: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    return queries @ vectors.T
+
+
+def top_k(scores: np.ndarray, rows: np.ndarray, k: int) -> list[list[int]]:
+    count = min(k, scores.shape[1])
+    best = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+    order = np.argsort(
+        -np.take_along_axis(scores, best, axis=1), axis=1, kind="stable"
+    )
+    return rows[np.take_along_axis(best, order, axis=1)].tolist()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms, dtype=np.float32)
+
+
+def build_where(where: dict) -> tuple[str, list]:
+    """
+    메타데이터 AND 조건을 SQL 조건으로 변환
+    """
+    conditions, params = [], []
+    for key, value in where.items():
+        if not METADATA_KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid metadata key: {key}")
+        conditions.append(f"json_extract(metadata, '$.{key}') = ?")
+        params.append(value)
+    return " AND ".join(conditions), params
+
+
+def to_document(
+    record: tuple[int, str, str, str],
+    include_document: bool = True,
+    score: float | None = None,
+) -> Document:
+    _, chunk_id, text, metadata = record
+    metadata = json.loads(metadata)
+    if score is not None:
+        metadata["score"] = score
+    return Document(
+        id=chunk_id,
+        page_content=text if include_document else "",
+        metadata=metadata,
+    )
@@ -0,0 +1,116 @@
+import numpy as np
+
+# int8 코드 뒤에 붙이는 벡터별 float32 배율의 크기
+INT8_SCALE_BYTES = 4
+
+
+class VectorCodec:
+    """
+    후보 검색용 압축 벡터 변환
+
+    정규화된 임베딩의 앞쪽 dimensions개 차원만 남겨 다시 정규화한 뒤
+    (text-embedding-3 계열의 Matryoshka 방식 차원 축소) quantization에 따라
+    변환한다.
+
+    - none: float32 그대로 (차원 축소만 적용)
+    - int8: 벡터마다 절댓값 최대 성분을 127에 맞춘 부호 있는 8비트 정수와
+      그 배율(float32). 데이터 전체로 보정하지 않으므로 코드를 벡터
+      하나만으로 언제든 다시 만들 수 있다.
+    - binary: 부호만 남긴 1비트
+
+    압축 벡터의 점수는 순위를 정하는 용도로만 쓰고, 최종 순위는 원본
+    float32 벡터로 다시 계산한다.
+    """
+
+    def __init__(
+        self, quantization: str = "none", dimensions: int | None = None
+    ):
+        if quantization not in ("none", "int8", "binary"):
+            raise ValueError(f"Invalid quantization: {quantization}")
+        if dimensions is not None and dimensions <= 0:
+            raise ValueError("dimensions must be positive")
+        self.quantization = quantization
+        self.dimensions = dimensions
+
+    def code_dimensions(self, dimensions: int) -> int:
+        """
+        원본 차원에 대한 차원 축소 후 차원
+        """
+        if self.dimensions is None:
+            return dimensions
+        return min(self.dimensions, dimensions)
+
+    def code_size(self, dimensions: int) -> int:
+        """
+        벡터 하나의 압축 크기 (bytes)
+        """
+        code_dimensions = self.code_dimensions(dimensions)
+        if self.quantization == "int8":
+            return code_dimensions + INT8_SCALE_BYTES
+        if self.quantization == "binary":
+            return (code_dimensions + 7) // 8
+        return code_dimensions * 4
+
+    def truncate(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        앞쪽 차원만 남기고 다시 정규화
+        """
+        code_dimensions = self.code_dimensions(vectors.shape[1])
+        if code_dimensions == vectors.shape[1]:
+            return np.ascontiguousarray(vectors, dtype=np.float32)
+        truncated = vectors[:, :code_dimensions]
+        norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(truncated / norms, dtype=np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        정규화된 임베딩을 압축 벡터로 변환
+
+        Args:
+            vectors (np.ndarray): (개수, 원본 차원) 정규화된 임베딩
+
+        Returns:
+            np.ndarray: (개수, 압축 크기) float32, int8 또는 uint8
+        """
+        truncated = self.truncate(vectors)
+        if self.quantization == "int8":
+            scales = np.abs(truncated).max(axis=1, keepdims=True) / 127
+            scales[scales == 0] = 1.0
+            codes = np.rint(truncated / scales).astype(np.int8)
+            return np.concatenate(
+                [codes, scales.astype(np.float32).view(np.int8)], axis=1
+            )
+        if self.quantization == "binary":
+            return np.packbits(truncated > 0, axis=1)
+        return truncated
+
+    def encode_queries(self, queries: np.ndarray) -> np.ndarray:
+        """
+        질의를 scores에 넣을 형태로 변환
+
+        질의는 압축하지 않고 float32로 두어(비대칭) 양자화 오차를 한쪽에만
+        둔다.
+        """
+        return self.truncate(queries)
+
+    def scores(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        질의와 압축 벡터의 유사도 점수 (클수록 유사)
+
+        Args:
+            queries (np.ndarray): encode_queries 결과
+            codes (np.ndarray): encode 결과
+
+        Returns:
+            np.ndarray: (질의 수, 벡터 수) 점수
+        """
+        if self.quantization == "binary":
+            bits = np.unpackbits(codes, axis=1, count=queries.shape[1])
+            return queries @ (bits.astype(np.float32) * 2 - 1).T
+        if self.quantization == "int8":
+            scales = np.ascontiguousarray(codes[:, -INT8_SCALE_BYTES:])
+            return (
+                queries @ codes[:, :-INT8_SCALE_BYTES].astype(np.float32).T
+            ) * scales.view(np.float32).T
+        return queries @ codes.T
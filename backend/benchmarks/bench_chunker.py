@@ -0,0 +1,151 @@
+"""
+청킹 엔진 벤치마크
+
+기존 RecursiveCharacterTextSplitter 전체 분할과 Chunker의 각 모드를 같은
+입력으로 비교한다. backend 디렉토리에서 실행한다.
+
+    python -m benchmarks.bench_chunker --size-mb 8
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.util.chunker import Chunker
+
+BLOCK_SIZE = 1024 * 1024
+
+
+def make_document(size: int, seed: int = 0) -> str:
+    """
+    문단과 문장 구조를 가진 size 문자 내외의 합성 문서 생성
+    """
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 9)))
+        for _ in range(5000)
+    ]
+    paragraphs = []
+    length = 0
+    while length < size:
+        sentences = [
+            " ".join(rng.choices(vocabulary, k=rng.randint(6, 20))) + "."
+            for _ in range(rng.randint(2, 8))
+        ]
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def iter_blocks(text: str):
+    for start in range(0, len(text), BLOCK_SIZE):
+        yield text[start : start + BLOCK_SIZE]
+
+
+def measure(name: str, run) -> None:
+    """
+    실행 시간과 최대 메모리 측정
+
+    tracemalloc은 실행 속도를 크게 떨어뜨리므로 시간과 메모리는 각각
+    따로 실행하여 측정한다.
+    """
+    started = time.perf_counter()
+    chunk_count = run()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<28} {elapsed:>8.2f}s {chunk_count:>9} chunks "
+        f"{peak / 1024 / 1024:>9.1f} MB peak"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--token-chunk-size", type=int, default=256)
+    parser.add_argument("--token-chunk-overlap", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--encoding-model", default="text-embedding-3-small")
+    args = parser.parse_args()
+
+    text = make_document(int(args.size_mb * 1024 * 1024))
+    print(f"document: {len(text) / 1024 / 1024:.1f}M characters")
+
+    def baseline() -> int:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap
+        )
+        return len(splitter.split_text(text))
+
+    character = Chunker(
+        chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap
+    )
+    parallel = Chunker(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        process_workers=args.workers,
+        process_pool_threshold=1,
+    )
+    token = Chunker(
+        mode="token",
+        chunk_size=args.token_chunk_size,
+        chunk_overlap=args.token_chunk_overlap,
+        encoding_model=args.encoding_model,
+    )
+    token_parallel = Chunker(
+        mode="token",
+        chunk_size=args.token_chunk_size,
+        chunk_overlap=args.token_chunk_overlap,
+        encoding_model=args.encoding_model,
+        process_workers=args.workers,
+        process_pool_threshold=1,
+    )
+    # 프로세스 풀 기동 비용은 측정에서 제외
+    parallel.chunk_text("warm up")
+    token_parallel.chunk_text("warm up")
+
+    try:
+        measure("splitter (whole text)", baseline)
+        measure(
+            "chunker character",
+            lambda: sum(1 for _ in character.iter_chunks(iter_blocks(text))),
+        )
+        measure(
+            f"chunker character x{args.workers}",
+            lambda: sum(
+                1
+                for _ in parallel.iter_chunks(
+                    iter_blocks(text), size_hint=len(text)
+                )
+            ),
+        )
+        measure(
+            "chunker token",
+            lambda: sum(1 for _ in token.iter_chunks(iter_blocks(text))),
+        )
+        measure(
+            f"chunker token x{args.workers}",
+            lambda: sum(
+                1
+                for _ in token_parallel.iter_chunks(
+                    iter_blocks(text), size_hint=len(text)
+                )
+            ),
+        )
+    finally:
+        parallel.close()
+        token_parallel.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+vector store 백엔드 벤치마크
+
+같은 합성 코퍼스(정규화된 임의 벡터)로 flat, hnsw, chroma 백엔드의 구축
+시간, 질의 지연 시간, 처리량을 비교하고 flat 결과 대비 recall@k를
+측정한다. --codecs를 주면 flat(과 차원 축소만 쓰는 경우 hnsw)을 압축
+후보 검색 + 원본 재점수 방식으로도 측정하며, 검색 시 메모리에 두는 벡터당
+크기를 함께 출력한다. backend 디렉토리에서 실행한다.
+
+    python -m benchmarks.bench_vector_store --vectors 100000
+    python -m benchmarks.bench_vector_store --codecs int8 binary none@128
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.util.vectorstore.base import VectorStore
+from app.util.vectorstore.factory import create_vector_store
+from app.util.vectorstore.local import normalize
+from app.util.vectorstore.quantization import VectorCodec
+
+ADD_BATCH_SIZE = 5000
+
+
+class UnusedEmbeddings(Embeddings):
+    """
+    벤치마크는 임베딩을 직접 넣으므로 호출되지 않는다
+    """
+
+    def embed_documents(self, texts):
+        raise NotImplementedError
+
+    def embed_query(self, text):
+        raise NotImplementedError
+
+
+def make_corpus(
+    count: int, dimensions: int, clusters: int = 256, seed: int = 0
+) -> np.ndarray:
+    """
+    정규화된 float32 합성 임베딩 생성
+
+    실제 임베딩처럼 군집 구조를 두고, Matryoshka 방식 모델처럼 앞쪽
+    차원일수록 분산이 크도록 차원별 크기를 줄여 나간다.
+    """
+    rng = np.random.default_rng(0)
+    decay = 1 / np.sqrt(np.arange(1, dimensions + 1, dtype=np.float32))
+    centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+    rng = np.random.default_rng(seed)
+    vectors = centers[rng.integers(0, clusters, count)]
+    vectors += 0.5 * rng.standard_normal((count, dimensions)).astype(
+        np.float32
+    )
+    return normalize(vectors * decay)
+
+
+def build(store: VectorStore, corpus: np.ndarray, users: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(corpus), ADD_BATCH_SIZE):
+        vectors = corpus[start : start + ADD_BATCH_SIZE]
+        store.add_embeddings(
+            [
+                Document(
+                    id=str(start + i),
+                    page_content="",
+                    metadata={"user_id": f"user-{(start + i) % users}"},
+                )
+                for i in range(len(vectors))
+            ],
+            vectors.tolist(),
+        )
+    return time.perf_counter() - started
+
+
+def query(
+    store: VectorStore,
+    queries: np.ndarray,
+    k: int,
+    batch_size: int,
+    where: dict | None,
+) -> tuple[list[list[str]], list[float], float]:
+    """
+    질의를 batch_size씩 묶어 검색
+
+    Returns:
+        tuple[list[list[str]], list[float], float]: (질의별 결과 ID,
+            배치별 지연 시간, 전체 시간)
+    """
+    results = []
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start : start + batch_size].tolist()
+        batch_started = time.perf_counter()
+        found = store.similarity_search_by_vectors(batch, k=k, where=where)
+        latencies.append(time.perf_counter() - batch_started)
+        results.extend([document.id for document in docs] for docs in found)
+    return results, latencies, time.perf_counter() - started
+
+
+def recall(results: list[list[str]], expected: list[list[str]]) -> float:
+    return statistics.fmean(
+        len(set(found) & set(truth)) / max(len(truth), 1)
+        for found, truth in zip(results, expected)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument(
+        "--backends", nargs="+", default=["flat", "hnsw", "chroma"]
+    )
+    parser.add_argument("--hnsw-m", type=int, default=16)
+    parser.add_argument("--hnsw-ef-construction", type=int, default=200)
+    parser.add_argument("--hnsw-ef-search", type=int, default=64)
+    # 양자화[@차원 수], 예: int8, binary@512, none@128
+    parser.add_argument("--codecs", nargs="*", default=[])
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    args = parser.parse_args()
+
+    hnsw_options = {
+        "m": args.hnsw_m,
+        "ef_construction": args.hnsw_ef_construction,
+        "ef_search": args.hnsw_ef_search,
+    }
+    variants = [
+        (backend, backend, hnsw_options if backend == "hnsw" else {})
+        for backend in args.backends
+    ]
+    for spec in args.codecs:
+        quantization, _, dimensions = spec.partition("@")
+        codec_options = {
+            "quantization": quantization,
+            "truncate_dimensions": int(dimensions) if dimensions else None,
+            "rescore_factor": args.rescore_factor,
+        }
+        variants.append((f"flat/{spec}", "flat", codec_options))
+        if quantization == "none" and "hnsw" in args.backends:
+            variants.append(
+                (f"hnsw/{spec}", "hnsw", {**hnsw_options, **codec_options})
+            )
+
+    corpus = make_corpus(args.vectors, args.dimensions)
+    queries = make_corpus(args.queries, args.dimensions, seed=1)
+    # 사용자가 여럿이면 버킷 샤드처럼 user_id 조건으로 검색
+    where = {"user_id": "user-0"} if args.users > 1 else None
+    print(
+        f"corpus: {args.vectors} x {args.dimensions}, "
+        f"queries: {args.queries}, k: {args.k}, "
+        f"batch: {args.batch_size}, users: {args.users}"
+    )
+
+    expected = None
+    with tempfile.TemporaryDirectory() as path:
+        for index, (name, backend, options) in enumerate(variants):
+            store = create_vector_store(
+                backend,
+                f"{path}/{index}",
+                "bench",
+                UnusedEmbeddings(),
+                **options,
+            )
+            try:
+                build_time = build(store, corpus, args.users)
+                results, latencies, elapsed = query(
+                    store, queries, args.k, args.batch_size, where
+                )
+            finally:
+                store.close()
+
+            if expected is None and name == "flat":
+                expected = results
+            codec = VectorCodec(
+                options.get("quantization", "none"),
+                options.get("truncate_dimensions"),
+            )
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            line = (
+                f"{name:<16} build {build_time:>8.2f}s "
+                f"{codec.code_size(args.dimensions):>6} B/vec "
+                f"p50 {p50:>8.2f}ms p99 {p99:>8.2f}ms "
+                f"{len(queries) / elapsed:>9.0f} qps"
+            )
+            if expected is not None:
+                line += f" recall@{args.k} {recall(results, expected):.3f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,23 @@
+import asyncio
+import json
+import threading
+import time
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from fastapi import HTTPException
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import (
+    FakeListChatModel,
+)
 from langchain_core.messages import BaseMessage
 
 from app.main import app
+from app.services.chat_service import ChatService
+from app.util import document as document_util
+from app.util.vector_executor import VectorStoreExecutor
 
 
 @pytest.mark.asyncio
@@ -38,8 +52,13 @@ async def test_chatbot_chat_success(authenticated_client):
         assert response.status_code == 200
         assert response.json() == {"answer": "This is a test response"}
 
-        mock_session_id_management.assert_awaited_once()
         mock_get_answer.assert_awaited_once()
+        kwargs = mock_get_answer.await_args.kwargs
+        assert kwargs["user_query"] == "Hello, chatbot!"
+        assert kwargs["user_id"] == "1234567890"
+        # 세션 확인은 서비스가 검색과 함께 기다린다
+        assert await kwargs["session_id"] == "test_session_id"
+        mock_session_id_management.assert_awaited_once()
         mock_save_log.assert_awaited_once()
 
 
@@ -88,3 +107,243 @@ async def test_chatbot_chat_error_handling(authenticated_client):
         )
 
         assert response.status_code == 500
+
+
+class QueryEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        raise AssertionError("sync embedding must not be used")
+
+    def embed_query(self, text):
+        raise AssertionError("sync embedding must not be used")
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(0.01)
+        return [1.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_chatbot_chat_requests_overlap(
+    authenticated_client, monkeypatch, tmp_path
+):
+    """Concurrent chat requests retrieve context without blocking the loop"""
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+
+    def slow_search(user_id, embedding, k=4):
+        nonlocal active, max_active
+        with lock:
+            active += 1
+            max_active = max(max_active, active)
+        time.sleep(0.2)
+        with lock:
+            active -= 1
+        return [Document(page_content=f"context for {user_id}")]
+
+    monkeypatch.setattr(
+        document_util, "search_user_documents_by_vector", slow_search
+    )
+    monkeypatch.setattr(
+        document_util, "document_embeddings", QueryEmbeddings()
+    )
+    monkeypatch.setattr(
+        document_util, "vector_executor", VectorStoreExecutor(max_workers=4)
+    )
+    monkeypatch.setattr(
+        "app.services.chat_service.get_chat_history",
+        lambda session_id: InMemoryChatMessageHistory(),
+    )
+    monkeypatch.setattr(
+        ChatService,
+        "get_chat_model",
+        lambda self, model_type: FakeListChatModel(responses=["answer"] * 4),
+    )
+    prompt_path = tmp_path / "chat_prompt.yaml"
+    prompt_path.write_text(
+        "messages:\n"
+        "  - type: system\n"
+        "    content: '{context}'\n"
+        "  - type: placeholder\n"
+        "    name: chat_history\n"
+        "  - type: user\n"
+        "    content: '{user_query}'\n"
+    )
+    service = ChatService(prompt_path=str(prompt_path))
+    monkeypatch.setattr(app.state, "chat_service", service)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    with (
+        patch(
+            "app.api.v1.endpoints.chatbot.session_id_management",
+            new_callable=AsyncMock,
+            return_value="test_session_id",
+        ),
+        patch("app.api.v1.endpoints.chatbot.save_chat_log"),
+    ):
+        ticker_task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *[
+                authenticated_client.post(
+                    "/api/v1/chatbot/chat", json={"message": f"question {i}"}
+                )
+                for i in range(4)
+            ]
+        )
+        elapsed = time.perf_counter() - start
+        ticker_task.cancel()
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert max_active > 1
+    assert elapsed < 0.6
+    # 검색하는 동안에도 이벤트 루프가 다른 작업을 처리한다
+    assert ticks >= 10
+
+
+def parse_sse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_chatbot_chat_stream_sends_deltas(authenticated_client):
+    """Streaming chat sends token events, then done, then saves the log"""
+
+    async def fake_stream(user_query, session_id, user_id):
+        assert await session_id == "test_session_id"
+        for delta in ["Hel", "lo", " 세계"]:
+            yield delta
+
+    with (
+        patch(
+            "app.api.v1.endpoints.chatbot.session_id_management",
+            new_callable=AsyncMock,
+            return_value="test_session_id",
+        ),
+        patch(
+            "app.api.v1.endpoints.chatbot.save_chat_log",
+            new_callable=AsyncMock,
+        ) as mock_save_log,
+        patch.object(app.state.chat_service, "astream_answer", fake_stream),
+    ):
+        response = await authenticated_client.post(
+            "/api/v1/chatbot/chat/stream", json={"message": "Hello"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_sse_events(response.text) == [
+        ("token", {"delta": "Hel"}),
+        ("token", {"delta": "lo"}),
+        ("token", {"delta": " 세계"}),
+        ("done", {"answer": "Hello 세계"}),
+    ]
+    mock_save_log.assert_awaited_once_with(
+        email="test@example.com", query="Hello", answer="Hello 세계"
+    )
+
+
+@pytest.mark.asyncio
+async def test_chatbot_chat_stream_errors(authenticated_client):
+    """Errors before the first delta are status codes, later ones events"""
+
+    async def failing_stream(user_query, session_id, user_id):
+        await session_id
+        raise HTTPException(status_code=503, detail="busy")
+        yield
+
+    async def interrupted_stream(user_query, session_id, user_id):
+        await session_id
+        yield "partial"
+        raise HTTPException(status_code=500, detail="model failed")
+
+    with (
+        patch(
+            "app.api.v1.endpoints.chatbot.session_id_management",
+            new_callable=AsyncMock,
+            return_value="test_session_id",
+        ),
+        patch(
+            "app.api.v1.endpoints.chatbot.save_chat_log",
+            new_callable=AsyncMock,
+        ) as mock_save_log,
+    ):
+        app.state.chat_service.astream_answer = failing_stream
+        response = await authenticated_client.post(
+            "/api/v1/chatbot/chat/stream", json={"message": "Hello"}
+        )
+        assert response.status_code == 503
+
+        app.state.chat_service.astream_answer = interrupted_stream
+        response = await authenticated_client.post(
+            "/api/v1/chatbot/chat/stream", json={"message": "Hello"}
+        )
+
+    assert response.status_code == 200
+    assert parse_sse_events(response.text) == [
+        ("token", {"delta": "partial"}),
+        ("error", {"detail": "model failed"}),
+    ]
+    mock_save_log.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_chatbot_chat_stream_cancels_before_first_delta(
+    authenticated_client,
+):
+    """A client disconnect during retrieval cancels the stream"""
+    cancelled = asyncio.Event()
+    checks = 0
+
+    async def slow_stream(user_query, session_id, user_id):
+        await session_id
+        try:
+            # 검색과 첫 토큰 생성이 오래 걸린다
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        yield "late"
+
+    async def is_disconnected(self):
+        nonlocal checks
+        checks += 1
+        return checks >= 3
+
+    with (
+        patch(
+            "app.api.v1.endpoints.chatbot.session_id_management",
+            new_callable=AsyncMock,
+            return_value="test_session_id",
+        ),
+        patch(
+            "app.api.v1.endpoints.chatbot.save_chat_log",
+            new_callable=AsyncMock,
+        ) as mock_save_log,
+        patch(
+            "app.api.v1.endpoints.chatbot.CHAT_DISCONNECT_POLL_INTERVAL",
+            0.01,
+        ),
+        patch("starlette.requests.Request.is_disconnected", is_disconnected),
+        patch.object(app.state.chat_service, "astream_answer", slow_stream),
+    ):
+        start = time.perf_counter()
+        response = await authenticated_client.post(
+            "/api/v1/chatbot/chat/stream", json={"message": "Hello"}
+        )
+        elapsed = time.perf_counter() - start
+
+    assert response.status_code == 499
+    assert cancelled.is_set()
+    assert elapsed < 1
+    mock_save_log.assert_not_awaited()
@@ -1,6 +1,15 @@
-from unittest.mock import patch
+import io
+import zipfile
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
 import pytest
+from fastapi import HTTPException
+
+from app.main import app
+from app.util import document as document_util
+from app.util.extractor import UnsupportedDocumentError
 
 
 @pytest.mark.asyncio
@@ -8,12 +17,16 @@ async def test_documents_upload_success(authenticated_client):
     """Test document upload endpoint"""
     with (
         patch(
-            "app.api.v1.endpoints.documents.save_user_document_to_file"
+            "app.api.v1.endpoints.documents.save_user_document_stream_to_file",
+            new_callable=AsyncMock,
         ) as mock_save,
-        patch(
-            "app.api.v1.endpoints.documents.insert_document_to_vector_store"
-        ) as mock_insert,
+        patch.object(
+            app.state.ingest_service,
+            "submit",
+            new_callable=AsyncMock,
+        ) as mock_submit,
     ):
+        mock_submit.return_value = "test-job-id"
         file_content = "This is a test document"
         files = {"document": ("test.txt", file_content, "text/plain")}
 
@@ -23,10 +36,58 @@ async def test_documents_upload_success(authenticated_client):
             headers={"Authorization": "Bearer valid_token"},
         )
 
-        assert response.status_code == 200
+        assert response.status_code == 202
         assert "message" in response.json()
-        mock_save.assert_called_once()
-        mock_insert.assert_called_once()
+        assert response.json()["job_id"] == "test-job-id"
+        mock_save.assert_awaited_once()
+        mock_submit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_documents_upload_unsupported_format(authenticated_client):
+    """Test document upload endpoint with a format that has no extractor"""
+    with patch(
+        "app.api.v1.endpoints.documents.save_user_document_stream_to_file",
+        new_callable=AsyncMock,
+        side_effect=UnsupportedDocumentError("Unsupported document format"),
+    ):
+        files = {"document": ("image.txt", b"\x89PNG\x00", "text/plain")}
+
+        response = await authenticated_client.post(
+            "/api/v1/documents/user",
+            files=files,
+            headers={"Authorization": "Bearer valid_token"},
+        )
+
+        assert response.status_code == 415
+        app.state.ingest_service.submit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_documents_upload_submit_failure_removes_source(
+    authenticated_client, tmp_path, monkeypatch
+):
+    """A failed job submission keeps its status and removes the saved file"""
+    monkeypatch.setattr(document_util, "BLOB_STORE_PATH", str(tmp_path))
+    with patch.object(
+        app.state.ingest_service,
+        "submit",
+        new_callable=AsyncMock,
+        side_effect=HTTPException(status_code=503, detail="db unavailable"),
+    ):
+        files = {"document": ("test.txt", "Document A", "text/plain")}
+
+        response = await authenticated_client.post(
+            "/api/v1/documents/user",
+            files=files,
+            headers={"Authorization": "Bearer valid_token"},
+        )
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "db unavailable"
+    # 원본은 저장되었다가 삭제된다
+    assert (tmp_path / "staging" / "1234567890").is_dir()
+    assert not list(tmp_path.rglob("*.src"))
 
 
 @pytest.mark.asyncio
@@ -37,25 +98,113 @@ async def test_documents_upload_unauthenticated(client):
     assert response.status_code == 401
 
 
+def make_document_record(document_id, name, chunk_count=2):
+    return SimpleNamespace(
+        id=document_id,
+        name=name,
+        size=100,
+        chunk_count=chunk_count,
+        content_hash="a" * 64,
+        created_at=datetime(2025, 1, 1),
+        updated_at=datetime(2025, 1, 2),
+    )
+
+
 @pytest.mark.asyncio
 async def test_documents_get_success(authenticated_client):
     """Test get user documents endpoint"""
     with patch(
-        "app.api.v1.endpoints.documents.get_user_documents_from_vector_store"
-    ) as mock_get:
-        mock_get.return_value = [
-            {"id": "doc1", "name": "document1.txt"},
-            {"id": "doc2", "name": "document2.txt"},
-        ]
+        "app.api.v1.endpoints.documents.list_document_records",
+        new_callable=AsyncMock,
+    ) as mock_list:
+        mock_list.return_value = (
+            [
+                make_document_record("doc1", "document1.txt"),
+                make_document_record("doc2", "document2.txt"),
+            ],
+            "next-page",
+        )
 
         response = await authenticated_client.get(
-            "/api/v1/documents/user",
+            "/api/v1/documents/user?limit=2",
             headers={"Authorization": "Bearer valid_token"},
         )
 
         assert response.status_code == 200
-        assert "documents" in response.json()
         assert len(response.json()["documents"]) == 2
+        assert response.json()["documents"][0]["document_id"] == "doc1"
+        assert response.json()["documents"][0]["chunk_count"] == 2
+        assert "document_contents" not in response.json()["documents"][0]
+        assert response.json()["next_cursor"] == "next-page"
+        mock_list.assert_awaited_once_with("1234567890", 2, None)
+
+        # 목록이 바뀌지 않았으면 본문 없이 304
+        response = await authenticated_client.get(
+            "/api/v1/documents/user?limit=2",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_documents_get_invalid_cursor(authenticated_client):
+    """An undecodable cursor is rejected"""
+    response = await authenticated_client.get(
+        "/api/v1/documents/user?cursor=not-a-cursor"
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_documents_get_contents_success(authenticated_client):
+    """Chunk contents are returned only by the per-document endpoint"""
+    with (
+        patch(
+            "app.api.v1.endpoints.documents.get_document_record",
+            new_callable=AsyncMock,
+            return_value=make_document_record("doc1", "document1.txt"),
+        ),
+        patch(
+            "app.api.v1.endpoints.documents."
+            "get_user_document_chunks_from_vector_store",
+            return_value=["chunk 1", "chunk 2"],
+        ) as mock_chunks,
+    ):
+        response = await authenticated_client.get(
+            "/api/v1/documents/user/doc1"
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "document_id": "doc1",
+            "document_name": "document1.txt",
+            "document_contents": ["chunk 1", "chunk 2"],
+        }
+
+        # 변경되지 않은 문서는 vector store를 조회하지 않는다
+        response = await authenticated_client.get(
+            "/api/v1/documents/user/doc1",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        assert response.status_code == 304
+        mock_chunks.assert_called_once_with("1234567890", "doc1")
+
+
+@pytest.mark.asyncio
+async def test_documents_get_contents_not_found(authenticated_client):
+    """Test per-document endpoint for a document not in the catalog"""
+    with patch(
+        "app.api.v1.endpoints.documents.get_document_record",
+        new_callable=AsyncMock,
+        return_value=None,
+    ):
+        response = await authenticated_client.get(
+            "/api/v1/documents/user/missing"
+        )
+
+        assert response.status_code == 404
 
 
 @pytest.mark.asyncio
@@ -65,12 +214,229 @@ async def test_documents_get_unauthenticated(client):
     assert response.status_code == 401
 
 
+@pytest.mark.asyncio
+async def test_documents_bulk_upload_success(
+    authenticated_client, tmp_path, monkeypatch
+):
+    """Test bulk upload with plain files and a zip archive"""
+    monkeypatch.setattr(document_util, "BLOB_STORE_PATH", str(tmp_path))
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("docs/b.txt", "문서 B")
+        zf.writestr("docs/c.md", "# Document C")
+        zf.writestr("docs/binary.bin", b"\xff\xfe\x00")
+        zf.writestr("__MACOSX/docs/._b.txt", "metadata")
+    files = [
+        ("documents", ("a.txt", "Document A", "text/plain")),
+        ("documents", ("docs.zip", archive.getvalue(), "application/zip")),
+    ]
+
+    response = await authenticated_client.post(
+        "/api/v1/documents/user/bulk",
+        files=files,
+        headers={"Authorization": "Bearer valid_token"},
+    )
+
+    assert response.status_code == 202
+    manifest = response.json()["documents"]
+    assert [entry["filename"] for entry in manifest] == [
+        "a.txt",
+        "docs/b.txt",
+        "docs/c.md",
+        "docs/binary.bin",
+    ]
+    assert [entry["status"] for entry in manifest] == [
+        "queued",
+        "queued",
+        "queued",
+        "failed",
+    ]
+    assert "error" in manifest[3]
+    assert [entry["job_id"] for entry in manifest[:3]] == [
+        "test-job-0",
+        "test-job-1",
+        "test-job-2",
+    ]
+    source_path = document_util.get_user_document_source_path(
+        "1234567890", manifest[1]["document_id"]
+    )
+    with open(source_path, "rb") as f:
+        assert f.read() == "문서 B".encode("utf-8")
+    app.state.ingest_service.submit_bulk.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_documents_bulk_upload_limits_the_whole_request(
+    authenticated_client, tmp_path, monkeypatch
+):
+    """Archives share one limit and saved files are removed when it is hit"""
+    monkeypatch.setattr(document_util, "BLOB_STORE_PATH", str(tmp_path))
+    monkeypatch.setattr("app.util.archive.BULK_UPLOAD_MAX_FILES", 3)
+    archives = []
+    for names in (["a.txt", "b.txt"], ["c.txt", "d.txt"]):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            for name in names:
+                zf.writestr(name, f"Document {name}")
+        archives.append(archive.getvalue())
+    files = [
+        ("documents", ("plain.txt", "Plain document", "text/plain")),
+        ("documents", ("one.zip", archives[0], "application/zip")),
+        ("documents", ("two.zip", archives[1], "application/zip")),
+    ]
+
+    response = await authenticated_client.post(
+        "/api/v1/documents/user/bulk",
+        files=files,
+        headers={"Authorization": "Bearer valid_token"},
+    )
+
+    assert response.status_code == 413
+    assert not list(tmp_path.rglob("*.src"))
+    app.state.ingest_service.submit_bulk.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_documents_bulk_upload_too_many_files(
+    authenticated_client, monkeypatch
+):
+    """Test bulk upload rejects requests over the file limit"""
+    monkeypatch.setattr(
+        "app.api.v1.endpoints.documents.BULK_UPLOAD_MAX_FILES", 1
+    )
+    files = [
+        ("documents", ("a.txt", "A", "text/plain")),
+        ("documents", ("b.txt", "B", "text/plain")),
+    ]
+
+    response = await authenticated_client.post(
+        "/api/v1/documents/user/bulk",
+        files=files,
+        headers={"Authorization": "Bearer valid_token"},
+    )
+
+    assert response.status_code == 413
+    app.state.ingest_service.submit_bulk.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_documents_update_success(authenticated_client):
+    """Test document update endpoint queues a diff-based update job"""
+    with (
+        patch(
+            "app.api.v1.endpoints.documents.document_exists_in_vector_store",
+            return_value=True,
+        ),
+        patch(
+            "app.api.v1.endpoints.documents.save_user_document_stream_to_file",
+            new_callable=AsyncMock,
+        ) as mock_save,
+        patch.object(
+            app.state.ingest_service,
+            "submit",
+            new_callable=AsyncMock,
+        ) as mock_submit,
+    ):
+        mock_submit.return_value = "test-job-id"
+        files = {"document": ("test.txt", "Updated content", "text/plain")}
+
+        response = await authenticated_client.put(
+            "/api/v1/documents/test-document-id",
+            files=files,
+            headers={"Authorization": "Bearer valid_token"},
+        )
+
+        assert response.status_code == 202
+        assert response.json()["document_id"] == "test-document-id"
+        mock_save.assert_awaited_once()
+        mock_submit.assert_awaited_once_with(
+            "1234567890", "test-document-id", "test.txt", "update"
+        )
+
+
+@pytest.mark.asyncio
+async def test_documents_update_not_found(authenticated_client):
+    """Test document update endpoint with a document the user does not own"""
+    with patch(
+        "app.api.v1.endpoints.documents.document_exists_in_vector_store",
+        return_value=False,
+    ):
+        files = {"document": ("test.txt", "Updated content", "text/plain")}
+
+        response = await authenticated_client.put(
+            "/api/v1/documents/unknown-document-id",
+            files=files,
+            headers={"Authorization": "Bearer valid_token"},
+        )
+
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_documents_get_ingest_job_success(authenticated_client):
+    """Test ingest job status endpoint"""
+    with patch(
+        "app.api.v1.endpoints.documents.get_ingest_job",
+        new_callable=AsyncMock,
+    ) as mock_get_job:
+        mock_get_job.return_value = SimpleNamespace(
+            id="test-job-id",
+            document_id="test-document-id",
+            document_name="test.txt",
+            operation="insert",
+            status="running",
+            chunks_done=128,
+            chunks_duplicate=32,
+            error=None,
+            created_at=datetime(2025, 1, 1),
+            updated_at=datetime(2025, 1, 1),
+        )
+
+        response = await authenticated_client.get(
+            "/api/v1/documents/jobs/test-job-id",
+            headers={"Authorization": "Bearer valid_token"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["job_id"] == "test-job-id"
+        assert response.json()["status"] == "running"
+        assert response.json()["chunks_done"] == 128
+        assert response.json()["dedup_ratio"] == 0.25
+        mock_get_job.assert_awaited_once_with("test-job-id", "1234567890")
+
+
+@pytest.mark.asyncio
+async def test_documents_get_ingest_job_not_found(authenticated_client):
+    """Test ingest job status endpoint with unknown job"""
+    with patch(
+        "app.api.v1.endpoints.documents.get_ingest_job",
+        new_callable=AsyncMock,
+    ) as mock_get_job:
+        mock_get_job.return_value = None
+
+        response = await authenticated_client.get(
+            "/api/v1/documents/jobs/unknown-job-id",
+            headers={"Authorization": "Bearer valid_token"},
+        )
+
+        assert response.status_code == 404
+
+
 @pytest.mark.asyncio
 async def test_documents_delete_success(authenticated_client):
     """Test delete document endpoint"""
-    with patch(
-        "app.api.v1.endpoints.documents.delete_document_from_vector_store"
-    ) as mock_delete:
+    with (
+        patch(
+            "app.api.v1.endpoints.documents.delete_document_from_vector_store"
+        ) as mock_delete,
+        patch(
+            "app.api.v1.endpoints.documents.delete_user_document_file"
+        ) as mock_delete_file,
+        patch(
+            "app.api.v1.endpoints.documents.delete_document_record",
+            new_callable=AsyncMock,
+        ) as mock_delete_record,
+    ):
         document_id = "test-document-id"
         response = await authenticated_client.delete(
             f"/api/v1/documents/{document_id}",
@@ -79,7 +445,10 @@ async def test_documents_delete_success(authenticated_client):
 
         assert response.status_code == 200
         assert "message" in response.json()
-        mock_delete.assert_called_once_with(document_id)
+        app.state.ingest_service.cancel.assert_awaited_once_with(document_id)
+        mock_delete.assert_called_once_with("1234567890", document_id)
+        mock_delete_file.assert_called_once_with("1234567890", document_id)
+        mock_delete_record.assert_awaited_once_with("1234567890", document_id)
 
 
 @pytest.mark.asyncio
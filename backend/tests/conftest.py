@@ -21,6 +21,16 @@ async def client():
         mock_chat_service.get_answer = AsyncMock()
         app.state.chat_service = mock_chat_service
 
+        mock_ingest_service = MagicMock()
+        mock_ingest_service.submit = AsyncMock(return_value="test-job-id")
+        mock_ingest_service.submit_bulk = AsyncMock(
+            side_effect=lambda user_id, documents: [
+                f"test-job-{i}" for i in range(len(documents))
+            ]
+        )
+        mock_ingest_service.cancel = AsyncMock()
+        app.state.ingest_service = mock_ingest_service
+
         async with AsyncClient(
             transport=ASGITransport(app=app), base_url="http://test"
         ) as ac:
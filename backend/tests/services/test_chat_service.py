@@ -0,0 +1,489 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+from app.services.chat_service import ChatService
+from app.util import document as document_util
+from app.util.answer_cache import SemanticAnswerCache
+from app.util.corpus_version import CorpusVersions
+from app.util.single_flight import SingleFlight
+
+
+def make_documents(ids):
+    return [Document(id=i, page_content=i) for i in ids]
+
+
+TEST_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        MessagesPlaceholder(variable_name="chat_history"),
+        ("user", "{context}\n{user_query}"),
+    ]
+)
+
+
+def make_service():
+    # 검색만 확인하므로 채팅 모델은 만들지 않는다
+    return ChatService.__new__(ChatService)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_fuses_vector_and_lexical_results():
+    async def fake_vector(user_id, query, k, embedding=None):
+        return make_documents(["a", "b", "c"])
+
+    async def fake_lexical(user_id, query, k):
+        return make_documents(["c", "d"])
+
+    with (
+        patch("app.services.chat_service.RETRIEVAL_MODE", "hybrid"),
+        patch("app.services.chat_service.LEXICAL_INDEX_ENABLED", True),
+        patch("app.services.chat_service.RETRIEVAL_K", 3),
+        patch("app.services.chat_service.asearch_user_documents", fake_vector),
+        patch(
+            "app.services.chat_service.asearch_user_documents_lexical",
+            fake_lexical,
+        ),
+    ):
+        documents = await make_service().search_documents("query", "user")
+
+    assert [document.id for document in documents] == ["c", "a", "b"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["vector", "hybrid"])
+@pytest.mark.parametrize("failure", ["timeout", "error"])
+async def test_search_falls_back_to_lexical_results(mode, failure):
+    async def fake_vector(user_id, query, k, embedding=None):
+        if failure == "timeout":
+            await asyncio.sleep(10)
+        raise ConnectionError("embedding api unavailable")
+
+    async def fake_lexical(user_id, query, k):
+        return make_documents(["d"])
+
+    with (
+        patch("app.services.chat_service.RETRIEVAL_MODE", mode),
+        patch("app.services.chat_service.LEXICAL_INDEX_ENABLED", True),
+        patch("app.services.chat_service.RETRIEVAL_VECTOR_TIMEOUT", 0.05),
+        patch("app.services.chat_service.asearch_user_documents", fake_vector),
+        patch(
+            "app.services.chat_service.asearch_user_documents_lexical",
+            fake_lexical,
+        ),
+    ):
+        documents = await make_service().search_documents("query", "user")
+
+    assert [document.id for document in documents] == ["d"]
+
+
+@pytest.mark.asyncio
+async def test_vector_search_errors_without_lexical_index():
+    async def fake_vector(user_id, query, k, embedding=None):
+        raise ConnectionError("embedding api unavailable")
+
+    with (
+        patch("app.services.chat_service.RETRIEVAL_MODE", "hybrid"),
+        patch("app.services.chat_service.LEXICAL_INDEX_ENABLED", False),
+        patch("app.services.chat_service.asearch_user_documents", fake_vector),
+        pytest.raises(ConnectionError),
+    ):
+        await make_service().search_documents("query", "user")
+
+
+@pytest.mark.asyncio
+async def test_similar_question_is_answered_from_cache(tmp_path):
+    histories = {}
+    versions = CorpusVersions(str(tmp_path / "corpus_version.db"))
+    service = make_service()
+    service.chat_model = FakeListChatModel(responses=["first", "second"])
+
+    class FakeEmbeddings:
+        async def aembed_query(self, text):
+            return [1.0, float(len(text) > 20)]
+
+    async def fake_search(user_query, user_id, embed_query=None):
+        return make_documents(["a"])
+
+    def get_history(session_id):
+        return histories.setdefault(session_id, InMemoryChatMessageHistory())
+
+    with (
+        patch("app.services.chat_service.answer_cache", SemanticAnswerCache()),
+        patch.object(document_util, "corpus_versions", versions),
+        patch.object(document_util, "document_embeddings", FakeEmbeddings()),
+        patch("app.services.chat_service.get_chat_history", get_history),
+        patch.object(service, "search_documents", fake_search),
+    ):
+        service.chain = service.build_chain(TEST_PROMPT)
+        answers = [
+            (await service.get_answer("hello", "s1", "user")).content,
+            (await service.get_answer("Hello!", "s2", "user")).content,
+            (
+                await service.get_answer(
+                    "a much longer question", "s2", "user"
+                )
+            ).content,
+        ]
+        versions.bump("user")
+        answers.append(
+            (await service.get_answer("hello", "s3", "user")).content
+        )
+
+    assert answers == ["first", "first", "second", "first"]
+    assert service.chat_model.i == 1
+    # 캐시된 답변도 대화 기록에 남는다
+    assert [message.content for message in histories["s2"].messages] == [
+        "Hello!",
+        "first",
+        "a much longer question",
+        "second",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_follow_up_questions_are_not_answered_from_cache(tmp_path):
+    histories = {
+        "s1": InMemoryChatMessageHistory(),
+        "s2": InMemoryChatMessageHistory(),
+    }
+    histories["s1"].add_messages(
+        [HumanMessage(content="Is the API rate limited?"), AIMessage("Yes.")]
+    )
+    histories["s2"].add_messages(
+        [HumanMessage(content="Can I export reports?"), AIMessage("No.")]
+    )
+    service = make_service()
+    service.chat_model = FakeListChatModel(
+        responses=["because of abuse", "because of licensing"]
+    )
+    cache = SemanticAnswerCache()
+
+    class FakeEmbeddings:
+        async def aembed_query(self, text):
+            return [1.0, 0.0]
+
+    async def fake_search(user_query, user_id, embed_query=None):
+        return make_documents(["a"])
+
+    with (
+        patch("app.services.chat_service.answer_cache", cache),
+        patch.object(
+            document_util,
+            "corpus_versions",
+            CorpusVersions(str(tmp_path / "corpus_version.db")),
+        ),
+        patch.object(document_util, "document_embeddings", FakeEmbeddings()),
+        patch(
+            "app.services.chat_service.get_chat_history",
+            lambda session_id: histories[session_id],
+        ),
+        patch.object(service, "search_documents", fake_search),
+    ):
+        service.chain = service.build_chain(TEST_PROMPT)
+        first = await service.get_answer("why?", "s1", "user")
+        deltas = [
+            delta
+            async for delta in service.astream_answer("why?", "s2", "user")
+        ]
+
+    # 같은 후속 질문이라도 대화마다 모델이 답한다
+    assert first.content == "because of abuse"
+    assert "".join(deltas) == "because of licensing"
+    assert service.chat_model.i == 0
+    assert histories["s2"].messages[-1].content == "because of licensing"
+    assert cache.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_streamed_answer_saves_history_only_when_completed():
+    histories = {}
+    service = make_service()
+    service.chat_model = FakeListChatModel(responses=["streamed answer"])
+
+    async def fake_search(user_query, user_id, embed_query=None):
+        return make_documents(["a"])
+
+    def get_history(session_id):
+        return histories.setdefault(session_id, InMemoryChatMessageHistory())
+
+    with (
+        patch("app.services.chat_service.answer_cache", None),
+        patch("app.services.chat_service.get_chat_history", get_history),
+        patch.object(service, "search_documents", fake_search),
+    ):
+        service.chain = service.build_chain(TEST_PROMPT)
+        deltas = [
+            delta async for delta in service.astream_answer("q", "s1", "user")
+        ]
+
+        # 중간에 닫힌 스트림은 대화 기록에 남지 않는다
+        stream = service.astream_answer("q", "s2", "user")
+        assert await anext(stream) == "s"
+        await stream.aclose()
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == "streamed answer"
+    assert [m.content for m in histories["s1"].messages] == [
+        "q",
+        "streamed answer",
+    ]
+    assert histories.get("s2") is None or histories["s2"].messages == []
+
+
+def test_chat_prompt_is_reloaded_when_the_file_changes(tmp_path):
+    path = tmp_path / "chat_prompt.yaml"
+    path.write_text(
+        "messages:\n"
+        "  - type: system\n"
+        "    content: 'v1 {context}'\n"
+        "  - type: placeholder\n"
+        "    name: chat_history\n"
+        "  - type: user\n"
+        "    content: '{user_query}'\n"
+    )
+    with patch.object(
+        ChatService,
+        "get_chat_model",
+        lambda self, model_type: FakeListChatModel(responses=["a"]),
+    ):
+        service = ChatService(prompt_path=str(path))
+    chain = service.chain
+
+    assert service.reload_chat_prompt() is False
+    assert service.chain is chain
+
+    path.write_text(path.read_text().replace("v1", "version 2"))
+    assert service.reload_chat_prompt() is True
+    assert service.chain is not chain
+
+    # 잘못된 파일은 기존 체인을 유지한다
+    chain = service.chain
+    path.write_text("messages: [")
+    with pytest.raises(Exception):
+        service.reload_chat_prompt()
+    assert service.chain is chain
+
+
+class SlowHistory(InMemoryChatMessageHistory):
+    delay: float = 0.0
+
+    async def aget_messages(self):
+        await asyncio.sleep(self.delay)
+        return await super().aget_messages()
+
+
+@pytest.mark.asyncio
+async def test_pre_llm_stages_run_concurrently():
+    service = make_service()
+    service.chat_model = FakeListChatModel(responses=["answer"])
+    history = SlowHistory(delay=0.1)
+    finished = {}
+
+    async def resolve_session():
+        await asyncio.sleep(0.1)
+        finished["session"] = time.perf_counter()
+        return "s1"
+
+    async def slow_search(user_query, user_id, embed_query=None):
+        started = time.perf_counter()
+        await asyncio.sleep(0.2)
+        finished["retrieval_started"] = started
+        return make_documents(["a"])
+
+    with (
+        patch("app.services.chat_service.answer_cache", None),
+        patch(
+            "app.services.chat_service.get_chat_history",
+            lambda session_id: history,
+        ),
+        patch.object(service, "search_documents", slow_search),
+    ):
+        service.chain = service.build_chain(TEST_PROMPT)
+        start = time.perf_counter()
+        result = await service.get_answer("q", resolve_session(), "user")
+        elapsed = time.perf_counter() - start
+
+    assert result.content == "answer"
+    # 검색은 세션 확인이 끝나기 전에 시작되고, 전체 시간은 가장 긴 경로
+    # (검색 0.2초)에 가깝다. 순서대로 실행하면 0.4초가 걸린다.
+    assert finished["retrieval_started"] < finished["session"]
+    assert elapsed < 0.3
+    assert [m.content for m in history.messages] == ["q", "answer"]
+
+
+@pytest.mark.asyncio
+async def test_answer_cache_lookup_overlaps_history_and_retrieval(tmp_path):
+    service = make_service()
+    service.chat_model = FakeListChatModel(responses=["answer"])
+    history = SlowHistory(delay=0.2)
+    embedded = []
+    searched = []
+
+    class SlowEmbeddings:
+        async def aembed_query(self, text):
+            embedded.append(text)
+            await asyncio.sleep(0.2)
+            return [1.0, 0.0]
+
+    async def fake_search(user_query, user_id, embed_query=None):
+        searched.append(await embed_query())
+        return make_documents(["a"])
+
+    with (
+        patch("app.services.chat_service.answer_cache", SemanticAnswerCache()),
+        patch.object(
+            document_util,
+            "corpus_versions",
+            CorpusVersions(str(tmp_path / "corpus_version.db")),
+        ),
+        patch.object(document_util, "document_embeddings", SlowEmbeddings()),
+        patch.object(document_util, "query_embedding_flight", None),
+        patch(
+            "app.services.chat_service.get_chat_history",
+            lambda session_id: history,
+        ),
+        patch.object(service, "search_documents", fake_search),
+    ):
+        service.chain = service.build_chain(TEST_PROMPT)
+        start = time.perf_counter()
+        result = await service.get_answer("q", "s1", "user")
+        elapsed = time.perf_counter() - start
+
+    assert result.content == "answer"
+    # 캐시 키와 검색이 같은 임베딩을 쓰고, 임베딩(0.2초)과 대화 기록
+    # 조회(0.2초)가 겹친다. 순서대로 실행하면 0.4초가 걸린다.
+    assert embedded == ["q"]
+    assert searched == [[1.0, 0.0]]
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_slow_embedding_skips_the_answer_cache(tmp_path):
+    service = make_service()
+    service.chat_model = FakeListChatModel(responses=["answer"])
+
+    class SlowEmbeddings:
+        async def aembed_query(self, text):
+            await asyncio.sleep(3)
+            return [1.0, 0.0]
+
+    async def fake_lexical(user_id, query, k):
+        return make_documents(["d"])
+
+    with (
+        patch("app.services.chat_service.answer_cache", SemanticAnswerCache()),
+        patch("app.services.chat_service.RETRIEVAL_MODE", "hybrid"),
+        patch("app.services.chat_service.LEXICAL_INDEX_ENABLED", True),
+        patch("app.services.chat_service.RETRIEVAL_VECTOR_TIMEOUT", 0.05),
+        patch(
+            "app.services.chat_service.asearch_user_documents_lexical",
+            fake_lexical,
+        ),
+        patch.object(
+            document_util,
+            "corpus_versions",
+            CorpusVersions(str(tmp_path / "corpus_version.db")),
+        ),
+        patch.object(document_util, "document_embeddings", SlowEmbeddings()),
+        patch.object(document_util, "query_embedding_flight", None),
+        patch(
+            "app.services.chat_service.get_chat_history",
+            lambda session_id: SlowHistory(delay=0),
+        ),
+    ):
+        service.chain = service.build_chain(TEST_PROMPT)
+        start = time.perf_counter()
+        result = await service.get_answer("q", "s1", "user")
+        elapsed = time.perf_counter() - start
+
+    # 임베딩을 기다리지 않고 BM25 결과로 답한다
+    assert result.content == "answer"
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_stage_timeout_cancels_the_other_stages():
+    service = make_service()
+    service.chat_model = FakeListChatModel(responses=["answer"])
+    cancelled = asyncio.Event()
+
+    async def resolve_session():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "s1"
+
+    async def slow_search(user_query, user_id, embed_query=None):
+        await asyncio.sleep(1)
+
+    with (
+        patch("app.services.chat_service.answer_cache", None),
+        patch("app.services.chat_service.CHAT_RETRIEVAL_TIMEOUT", 0.05),
+        patch.object(service, "search_documents", slow_search),
+    ):
+        service.chain = service.build_chain(TEST_PROMPT)
+        with pytest.raises(HTTPException) as exc_info:
+            await service.get_answer("q", resolve_session(), "user")
+
+    assert exc_info.value.status_code == 504
+    assert "retrieval" in exc_info.value.detail
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+
+@pytest.mark.asyncio
+async def test_identical_first_turns_share_one_llm_call():
+    service = make_service()
+    service.chat_model = FakeListChatModel(
+        responses=["shared", "other", "unused"], sleep=0.01
+    )
+    histories = {}
+
+    async def fake_search(user_query, user_id, embed_query=None):
+        return make_documents(["announcement"])
+
+    def get_history(session_id):
+        return histories.setdefault(session_id, InMemoryChatMessageHistory())
+
+    with (
+        patch("app.services.chat_service.answer_cache", None),
+        patch("app.services.chat_service.llm_flight", SingleFlight()),
+        patch("app.services.chat_service.get_chat_history", get_history),
+        patch.object(service, "search_documents", fake_search),
+    ):
+        service.chain = service.build_chain(TEST_PROMPT)
+        answers = await asyncio.gather(
+            service.get_answer("what changed?", "s1", "u1"),
+            service.get_answer("what changed?", "s2", "u2"),
+        )
+        deltas = await asyncio.gather(
+            *[
+                collect_stream(service.astream_answer("what?", s, "u"))
+                for s in ["s3", "s4"]
+            ]
+        )
+
+    assert [answer.content for answer in answers] == ["shared", "shared"]
+    assert deltas[0] == deltas[1]
+    assert "".join(deltas[0]) == "other"
+    # 네 요청에 LLM 호출은 두 번
+    assert service.chat_model.i == 2
+    # 요청마다 자기 대화 기록에 저장된다
+    assert [m.content for m in histories["s2"].messages] == [
+        "what changed?",
+        "shared",
+    ]
+    assert [m.content for m in histories["s4"].messages] == ["what?", "other"]
+
+
+async def collect_stream(stream):
+    return [delta async for delta in stream]
@@ -0,0 +1,140 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from app.services.embedding import EmbeddingBatcher, QueryCachedEmbeddings
+from app.util.query_cache import QueryEmbeddingCache
+
+
+class FakeEmbeddings(Embeddings):
+    """Records every upstream batch and embeds text as [len(text)]"""
+
+    def __init__(self, rate_limited_calls: int = 0, code: str | None = None):
+        self.batches = []
+        self.rate_limited_calls = rate_limited_calls
+        self.code = code
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        if self.rate_limited_calls > 0:
+            self.rate_limited_calls -= 1
+            error = Exception("Too Many Requests")
+            error.status_code = 429
+            error.code = self.code
+            raise error
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text))]
+
+
+def test_embedding_batcher_coalesces_concurrent_callers():
+    fake = FakeEmbeddings()
+    batcher = EmbeddingBatcher(
+        fake,
+        token_counter=len,
+        max_batch_tokens=1000,
+        linger_ms=200,
+    )
+    results = {}
+
+    def embed(name, texts):
+        results[name] = batcher.embed_documents(texts)
+
+    threads = [
+        threading.Thread(target=embed, args=("a", ["a", "aa"])),
+        threading.Thread(target=embed, args=("b", ["bbb", "bbbb", "bbbbb"])),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results["a"] == [[1.0], [2.0]]
+    assert results["b"] == [[3.0], [4.0], [5.0]]
+    assert len(fake.batches) == 1
+
+
+def test_embedding_batcher_splits_batches_by_token_count():
+    fake = FakeEmbeddings()
+    batcher = EmbeddingBatcher(
+        fake, token_counter=len, max_batch_tokens=10, linger_ms=50
+    )
+
+    vectors = batcher.embed_documents(["aaaa", "bbbb", "cccc", "dddd"])
+
+    assert vectors == [[4.0], [4.0], [4.0], [4.0]]
+    assert all(sum(map(len, batch)) <= 10 for batch in fake.batches)
+    assert len(fake.batches) == 2
+
+
+def test_embedding_batcher_retries_after_rate_limit():
+    fake = FakeEmbeddings(rate_limited_calls=1)
+    batcher = EmbeddingBatcher(fake, token_counter=len, linger_ms=0)
+
+    with patch("app.services.embedding.RATE_LIMIT_BACKOFF_MIN", 0.01):
+        vectors = batcher.embed_documents(["hello"])
+
+    assert vectors == [[5.0]]
+    assert len(fake.batches) == 2
+
+
+def test_embedding_batcher_gives_up_after_max_rate_limit_retries():
+    fake = FakeEmbeddings(rate_limited_calls=10)
+    batcher = EmbeddingBatcher(fake, token_counter=len, linger_ms=0)
+
+    with (
+        patch("app.services.embedding.RATE_LIMIT_BACKOFF_MIN", 0.01),
+        patch("app.services.embedding.RATE_LIMIT_BACKOFF_MAX", 0.01),
+        patch("app.services.embedding.RATE_LIMIT_MAX_RETRIES", 2),
+    ):
+        with pytest.raises(Exception, match="Too Many Requests"):
+            batcher.embed_documents(["hello"])
+
+    assert len(fake.batches) == 3
+
+
+def test_embedding_batcher_does_not_retry_insufficient_quota():
+    fake = FakeEmbeddings(rate_limited_calls=1, code="insufficient_quota")
+    batcher = EmbeddingBatcher(fake, token_counter=len, linger_ms=0)
+
+    with pytest.raises(Exception, match="Too Many Requests"):
+        batcher.embed_documents(["hello"])
+
+    assert len(fake.batches) == 1
+
+
+def test_embedding_batcher_propagates_errors_to_callers():
+    class FailingEmbeddings(FakeEmbeddings):
+        def embed_documents(self, texts):
+            raise ValueError("upstream failure")
+
+    batcher = EmbeddingBatcher(
+        FailingEmbeddings(), token_counter=len, linger_ms=0
+    )
+
+    with pytest.raises(ValueError):
+        batcher.embed_documents(["hello"])
+
+
+@pytest.mark.asyncio
+async def test_query_cached_embeddings_reuse_normalized_queries():
+    class CountingEmbeddings(FakeEmbeddings):
+        def __init__(self):
+            super().__init__()
+            self.queries = []
+
+        def embed_query(self, text):
+            self.queries.append(text)
+            return super().embed_query(text)
+
+    fake = CountingEmbeddings()
+    embeddings = QueryCachedEmbeddings(fake, QueryEmbeddingCache("model"))
+
+    assert await embeddings.aembed_query("Hello") == [5.0]
+    assert await embeddings.aembed_query("  hello ") == [5.0]
+    assert embeddings.embed_query("HELLO") == [5.0]
+    assert fake.queries == ["Hello"]
+    assert embeddings.embed_documents(["ab"]) == [[2.0]]
@@ -0,0 +1,263 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.ingest_service import IngestService
+from app.util.vector_executor import VectorStoreExecutor
+
+
+@pytest.mark.asyncio
+async def test_ingest_service_limits_jobs_per_user():
+    """A user's jobs run one at a time while other users keep progressing"""
+    running = []
+    max_running = {"user-a": 0, "user-b": 0}
+    lock = threading.Lock()
+    finished = asyncio.Event()
+    done = []
+
+    def fake_insert(user_id, document_id, document_name, on_progress):
+        with lock:
+            running.append(user_id)
+            max_running[user_id] = max(
+                max_running[user_id], running.count(user_id)
+            )
+        threading.Event().wait(0.05)
+        with lock:
+            running.remove(user_id)
+            done.append(document_id)
+        return {"chunks": 1, "duplicates": 0}
+
+    async def fake_update(job_id, **values):
+        if values.get("status") == "done" and len(done) == 3:
+            finished.set()
+
+    with (
+        patch(
+            "app.services.ingest_service.save_ingest_job",
+            new_callable=AsyncMock,
+        ),
+        patch(
+            "app.services.ingest_service.get_unfinished_ingest_jobs",
+            new_callable=AsyncMock,
+            return_value=[],
+        ),
+        patch(
+            "app.services.ingest_service.update_ingest_job",
+            side_effect=fake_update,
+        ),
+        patch(
+            "app.services.ingest_service.insert_document_to_vector_store",
+            side_effect=fake_insert,
+        ),
+        patch(
+            "app.services.ingest_service.get_user_document_info",
+            return_value={"size": 10, "content_hash": "hash"},
+        ),
+        patch(
+            "app.services.ingest_service.save_document_record",
+            new_callable=AsyncMock,
+        ),
+    ):
+        service = IngestService(worker_count=3, max_jobs_per_user=1)
+        await service.start()
+        try:
+            await service.submit("user-a", "doc-1", "a1.txt")
+            await service.submit("user-a", "doc-2", "a2.txt")
+            await service.submit("user-b", "doc-3", "b1.txt")
+            await asyncio.wait_for(finished.wait(), timeout=5)
+        finally:
+            await service.stop()
+
+    assert sorted(done) == ["doc-1", "doc-2", "doc-3"]
+    assert max_running == {"user-a": 1, "user-b": 1}
+
+
+@pytest.mark.asyncio
+async def test_ingest_service_runs_bulk_documents_concurrently():
+    """Bulk documents run concurrently with process pool chunking"""
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+    calls = []
+
+    def fake_insert(
+        user_id, document_id, document_name, on_progress, parallel_chunking
+    ):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+            calls.append((document_id, parallel_chunking))
+        threading.Event().wait(0.05)
+        with lock:
+            running -= 1
+        return {"chunks": 1, "duplicates": 0}
+
+    update_mock = AsyncMock()
+    with (
+        patch(
+            "app.services.ingest_service.save_ingest_jobs",
+            new_callable=AsyncMock,
+        ) as save_mock,
+        patch(
+            "app.services.ingest_service.get_unfinished_ingest_jobs",
+            new_callable=AsyncMock,
+            return_value=[],
+        ),
+        patch("app.services.ingest_service.update_ingest_job", update_mock),
+        patch(
+            "app.services.ingest_service.insert_document_to_vector_store",
+            side_effect=fake_insert,
+        ),
+        patch(
+            "app.services.ingest_service.get_user_document_info",
+            return_value={"size": 10, "content_hash": "hash"},
+        ),
+        patch(
+            "app.services.ingest_service.save_document_record",
+            new_callable=AsyncMock,
+        ) as save_record_mock,
+    ):
+        service = IngestService(
+            worker_count=1, max_jobs_per_user=1, bulk_concurrency=2
+        )
+        await service.start()
+        try:
+            job_ids = await service.submit_bulk(
+                "user-a",
+                [(f"doc-{i}", f"{i}.txt") for i in range(4)],
+            )
+            await asyncio.wait_for(service._queue.join(), timeout=5)
+        finally:
+            await service.stop()
+
+    assert len(job_ids) == 4
+    assert len(save_mock.await_args.args[1]) == 4
+    # 적재가 끝난 문서는 문서 목록에 저장된다
+    assert sorted(call.args for call in save_record_mock.await_args_list) == [
+        (f"doc-{i}", "user-a", f"{i}.txt", 10, 1, "hash") for i in range(4)
+    ]
+    assert sorted(calls) == [(f"doc-{i}", True) for i in range(4)]
+    assert max_running == 2
+    done = [
+        call.args[0]
+        for call in update_mock.await_args_list
+        if call.kwargs.get("status") == "done"
+    ]
+    assert sorted(done) == sorted(job_ids)
+
+
+@pytest.mark.asyncio
+async def test_ingest_service_recovery_uses_the_vector_executor():
+    """Recovery deletes partial chunks through the bounded vector executor"""
+    executor = VectorStoreExecutor(max_workers=1)
+    deleted = []
+    job = SimpleNamespace(
+        id="job-1",
+        user_id="user-a",
+        document_id="doc-1",
+        document_name="a.txt",
+        operation="insert",
+        status="running",
+    )
+
+    with (
+        patch(
+            "app.services.ingest_service.get_unfinished_ingest_jobs",
+            new_callable=AsyncMock,
+            return_value=[job],
+        ),
+        patch(
+            "app.services.ingest_service.update_ingest_job",
+            new_callable=AsyncMock,
+        ) as update_mock,
+        patch(
+            "app.services.ingest_service.delete_document_from_vector_store",
+            side_effect=lambda user_id, document_id: deleted.append(
+                (user_id, document_id, threading.current_thread().name)
+            ),
+        ),
+        patch("app.services.ingest_service.vector_executor", executor),
+    ):
+        service = IngestService()
+        await service.recover()
+
+    executor.close()
+    assert [(user_id, document_id) for user_id, document_id, _ in deleted] == [
+        ("user-a", "doc-1")
+    ]
+    assert deleted[0][2].startswith("vector-store")
+    assert executor.stats()["completed"] == 1
+    update_mock.assert_awaited_once_with(
+        "job-1", status="queued", chunks_done=0
+    )
+    assert service._queue.qsize() == 1
+
+
+@pytest.mark.asyncio
+async def test_ingest_service_cancel_stops_jobs_for_a_document():
+    """Cancelling stops a running job between batches and skips queued jobs"""
+    first_batch_stored = threading.Event()
+    resume = threading.Event()
+    batches = []
+
+    def fake_insert(user_id, document_id, document_name, on_progress):
+        for chunks_done in (1, 2):
+            batches.append((document_id, chunks_done))
+            on_progress(chunks_done)
+            first_batch_stored.set()
+            resume.wait(5)
+        return {"chunks": 2, "duplicates": 0}
+
+    update_mock = AsyncMock()
+    with (
+        patch(
+            "app.services.ingest_service.save_ingest_job",
+            new_callable=AsyncMock,
+        ),
+        patch(
+            "app.services.ingest_service.get_unfinished_ingest_jobs",
+            new_callable=AsyncMock,
+            return_value=[],
+        ),
+        patch("app.services.ingest_service.update_ingest_job", update_mock),
+        patch(
+            "app.services.ingest_service.insert_document_to_vector_store",
+            side_effect=fake_insert,
+        ),
+        patch(
+            "app.services.ingest_service.save_document_record",
+            new_callable=AsyncMock,
+        ) as save_record_mock,
+    ):
+        service = IngestService(worker_count=1, max_jobs_per_user=1)
+        await service.start()
+        try:
+            running_job = await service.submit("user-a", "doc-1", "a.txt")
+            queued_job = await service.submit("user-a", "doc-1", "a.txt")
+            await asyncio.to_thread(first_batch_stored.wait, 5)
+
+            cancel = asyncio.create_task(service.cancel("doc-1"))
+            await asyncio.sleep(0.05)
+            # 실행 중인 작업이 멈출 때까지 기다린다
+            assert not cancel.done()
+            resume.set()
+            await asyncio.wait_for(cancel, timeout=5)
+            await asyncio.wait_for(service._queue.join(), timeout=5)
+        finally:
+            await service.stop()
+
+    assert batches == [("doc-1", 1), ("doc-1", 2)]
+    save_record_mock.assert_not_awaited()
+    statuses = [
+        (call.args[0], call.kwargs.get("status"))
+        for call in update_mock.await_args_list
+        if "status" in call.kwargs
+    ]
+    assert (queued_job, "cancelled") in statuses
+    assert (running_job, "cancelled") in statuses
+    assert (queued_job, "running") not in statuses
+    assert not service._tasks_per_document
@@ -8,3 +8,28 @@ async def test_health_check(client):
     assert response.status_code == 200
     assert "message" in response.json()
     assert "서버가 정상 실행중입니다" in response.json()["message"]
+
+
+@pytest.mark.asyncio
+async def test_vector_store_health_check(authenticated_client):
+    """Test the vector store executor metrics endpoint"""
+    response = await authenticated_client.get("/health/vector-store")
+    assert response.status_code == 200
+    assert {"workers", "running", "queued"} <= response.json().keys()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/health/vector-store",
+        "/health/query-embedding-cache",
+        "/health/answer-cache",
+        "/health/single-flight",
+        "/health/model-router",
+    ],
+)
+async def test_diagnostics_require_authentication(client, path):
+    """Diagnostics endpoints reject unauthenticated requests"""
+    response = await client.get(path)
+    assert response.status_code == 401
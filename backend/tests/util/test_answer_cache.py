@@ -0,0 +1,52 @@
+import time
+
+from app.util.answer_cache import SemanticAnswerCache
+from app.util.corpus_version import CorpusVersions
+
+
+def test_answer_cache_matches_similar_questions_above_threshold():
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.put("user", 1, [1.0, 0.0], "first")
+    cache.put("user", 1, [0.0, 1.0], "second")
+
+    assert cache.get("user", 1, [2.0, 0.1]) == "first"
+    assert cache.get("user", 1, [1.0, 1.0]) is None
+    assert cache.get("other", 1, [1.0, 0.0]) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_answer_cache_is_scoped_to_corpus_version():
+    cache = SemanticAnswerCache()
+    cache.put("user", 1, [1.0, 0.0], "old")
+
+    assert cache.get("user", 2, [1.0, 0.0]) is None
+    cache.put("user", 2, [0.0, 1.0], "new")
+    # 이전 버전으로 만든 답변은 저장하지 않는다
+    cache.put("user", 1, [1.0, 0.0], "stale")
+
+    assert cache.get("user", 2, [1.0, 0.0]) is None
+    assert cache.get("user", 2, [0.0, 1.0]) == "new"
+
+
+def test_answer_cache_entries_expire_and_are_bounded():
+    cache = SemanticAnswerCache(ttl=0.05, max_entries=2)
+    for i in range(3):
+        cache.put("user", 0, [1.0, float(i)], str(i))
+
+    assert cache.get("user", 0, [1.0, 0.0]) is None
+    assert cache.get("user", 0, [1.0, 2.0]) == "2"
+    time.sleep(0.1)
+    assert cache.get("user", 0, [1.0, 2.0]) is None
+
+
+def test_corpus_versions_are_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "corpus_version.db")
+    versions = CorpusVersions(path)
+
+    assert versions.get("user") == 0
+    versions.bump("user")
+    versions.bump("user")
+
+    assert CorpusVersions(path).get("user") == 2
+    assert versions.get("other") == 0
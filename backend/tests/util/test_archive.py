@@ -0,0 +1,80 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from app.util import archive as archive_util
+from app.util.archive import (
+    ArchiveLimitError,
+    get_archive_type,
+    iter_archive_members,
+)
+
+
+def build_tar(files: dict[str, bytes], mode: str = "w:gz") -> io.BytesIO:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as tf:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+def build_zip(files: dict[str, bytes]) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def test_get_archive_type():
+    assert get_archive_type(build_zip({"a.txt": b"a"})) == "zip"
+    assert get_archive_type(build_tar({"a.txt": b"a"})) == "tar"
+    assert get_archive_type(build_tar({"a.txt": b"a"}, mode="w")) == "tar"
+    assert get_archive_type(io.BytesIO(b"plain text document")) is None
+    docx = build_zip({"[Content_Types].xml": b"<Types/>"})
+    assert get_archive_type(docx) is None
+    assert docx.tell() == 0
+
+
+@pytest.mark.parametrize("archive_type", ["zip", "tar"])
+def test_iter_archive_members_streams_regular_files(archive_type):
+    files = {
+        "docs/a.txt": b"A" * 10,
+        "docs/.hidden": b"hidden",
+        "__MACOSX/docs/._a.txt": b"meta",
+        "b.md": b"# B",
+    }
+    fileobj = build_zip(files) if archive_type == "zip" else build_tar(files)
+
+    members = [
+        (name, member.read())
+        for name, member in iter_archive_members(fileobj, archive_type)
+    ]
+
+    assert members == [("docs/a.txt", b"A" * 10), ("b.md", b"# B")]
+
+
+def test_iter_archive_members_enforces_limits(monkeypatch):
+    fileobj = build_tar({"a.txt": b"A" * 100, "b.txt": b"B" * 100})
+    monkeypatch.setattr(archive_util, "BULK_UPLOAD_MAX_EXTRACTED_BYTES", 150)
+
+    with pytest.raises(ArchiveLimitError):
+        for _, member in iter_archive_members(fileobj, "tar"):
+            member.read()
+
+
+def test_upload_budget_is_shared_across_archives(monkeypatch):
+    monkeypatch.setattr(archive_util, "BULK_UPLOAD_MAX_FILES", 3)
+    budget = archive_util.UploadBudget()
+    first = build_zip({"a.txt": b"A", "b.txt": b"B"})
+    second = build_zip({"c.txt": b"C", "d.txt": b"D"})
+
+    assert len(list(iter_archive_members(first, "zip", budget))) == 2
+    with pytest.raises(ArchiveLimitError):
+        list(iter_archive_members(second, "zip", budget))
@@ -0,0 +1,184 @@
+import io
+import threading
+
+import pytest
+import zstandard
+
+from app.util.blob_store import (
+    BlobNotFoundError,
+    BlobStore,
+    LocalBlobBackend,
+    S3BlobBackend,
+    blob_name,
+)
+
+TEXT = "".join(f"{i:04d} 문서 블록입니다.\n" for i in range(500))
+
+
+class FakeS3Client:
+    """put/get/head/delete/list만 구현한 S3 호환 서버 대역"""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+        class ClientError(Exception):
+            pass
+
+    def __init__(self):
+        self.objects = {}
+        self.ranges = []
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[Key] = Body if isinstance(Body, bytes) else Body.read()
+
+    def get_object(self, Bucket, Key, Range=None):
+        if Key not in self.objects:
+            raise self.exceptions.NoSuchKey(Key)
+        data = self.objects[Key]
+        if Range is not None:
+            self.ranges.append(Range)
+            start, end = Range.removeprefix("bytes=").split("-")
+            data = data[int(start) : int(end) + 1]
+        return {"Body": io.BytesIO(data)}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self.exceptions.ClientError(Key)
+        return {"ContentLength": len(self.objects[Key])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def list_objects_v2(self, Bucket, Prefix, **kwargs):
+        return {
+            "Contents": [
+                {"Key": key} for key in self.objects if key.startswith(Prefix)
+            ],
+            "IsTruncated": False,
+        }
+
+
+def test_local_blob_store_creates_directories_on_first_write(tmp_path):
+    root = tmp_path / "store"
+    store = BlobStore(LocalBlobBackend(str(root)), temp_dir=str(root / "tmp"))
+
+    assert not root.exists()
+    assert store.resolve("missing") is None
+    assert not root.exists()
+
+    key = store.write_text([TEXT])
+    assert store.read_text(key) == TEXT
+
+
+def test_local_blob_store_reads_spans_across_frames(tmp_path):
+    store = BlobStore(
+        LocalBlobBackend(str(tmp_path)),
+        frame_chars=100,
+        temp_dir=str(tmp_path / "tmp"),
+    )
+
+    key = store.write_text(TEXT[i : i + 37] for i in range(0, len(TEXT), 37))
+
+    assert store.read_text(key) == TEXT
+    assert "".join(store.iter_text(key)) == TEXT
+    assert store.read_text(key, 95, 205) == TEXT[95:205]
+    assert store.read_text(key, len(TEXT) - 5, len(TEXT) + 10) == TEXT[-5:]
+    assert store.size(key) == len(TEXT.encode("utf-8"))
+    assert store.backend.size(blob_name(key)) < store.size(key)
+    # 일반 zstd 디코더로도 전체 내용을 읽을 수 있다
+    with open(tmp_path / "objects" / key[:2] / key[2:], "rb") as f:
+        reader = zstandard.ZstdDecompressor().stream_reader(f)
+        assert reader.read().decode("utf-8") == TEXT
+
+
+def test_blob_store_refs_share_content(tmp_path):
+    store = BlobStore(
+        LocalBlobBackend(str(tmp_path)), temp_dir=str(tmp_path / "tmp")
+    )
+
+    key = store.write_text(["same content"])
+    assert store.write_text(["same ", "content"]) == key
+    store.link("user/a", key)
+    store.link("user/b", key)
+
+    store.unlink("user/a")
+    assert store.resolve("user/a") is None
+    assert store.read_text(store.resolve("user/b")) == "same content"
+
+    # 다른 내용으로 바꾸면 참조가 없어진 이전 blob은 삭제된다
+    store.link("user/b", store.write_text(["new content"]))
+    assert not store.backend.exists(blob_name(key))
+
+
+class PausingBackend(LocalBlobBackend):
+    """마지막 연결을 지운 뒤 blob을 삭제하기 전에 멈추는 백엔드"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.unlinking = threading.Event()
+        self.written = threading.Event()
+
+    def list(self, prefix):
+        names = super().list(prefix)
+        if prefix.startswith("links/") and not self.unlinking.is_set():
+            self.unlinking.set()
+            self.written.wait(timeout=0.5)
+        return names
+
+
+def test_blob_store_write_waits_for_concurrent_unlink(tmp_path):
+    backend = PausingBackend(str(tmp_path))
+    store = BlobStore(backend, temp_dir=str(tmp_path / "tmp"))
+    store.write_text(["shared content"], ref="user/a")
+
+    unlink = threading.Thread(target=store.unlink, args=("user/a",))
+    unlink.start()
+    assert backend.unlinking.wait(timeout=5)
+
+    def write():
+        store.write_text(["shared content"], ref="user/b")
+        backend.written.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    unlink.join()
+    writer.join()
+
+    # 같은 내용을 다시 저장하는 쪽은 삭제가 끝난 뒤 blob을 다시 올린다
+    key = store.resolve("user/b")
+    assert store.read_text(key) == "shared content"
+    assert store.resolve("user/a") is None
+
+
+def test_blob_store_link_requires_blob(tmp_path):
+    store = BlobStore(
+        LocalBlobBackend(str(tmp_path)), temp_dir=str(tmp_path / "tmp")
+    )
+
+    with pytest.raises(BlobNotFoundError):
+        store.link("user/a", "0" * 64)
+    assert store.resolve("user/a") is None
+
+
+def test_s3_blob_store_uses_range_reads(tmp_path):
+    client = FakeS3Client()
+    store = BlobStore(
+        S3BlobBackend("bucket", prefix="docs", client=client),
+        frame_chars=100,
+        temp_dir=str(tmp_path),
+    )
+
+    key = store.write_text([TEXT])
+    store.link("user/doc", key)
+    client.ranges.clear()
+
+    assert (
+        store.read_text(store.resolve("user/doc"), 250, 260) == TEXT[250:260]
+    )
+    # header, footer, seek table, 프레임 하나만 읽는다
+    assert len(client.ranges) == 4
+    assert f"docs/{blob_name(key)}" in client.objects
+
+    store.unlink("user/doc")
+    assert not any(key.startswith("docs/objects") for key in client.objects)
@@ -0,0 +1,74 @@
+from app.util.chunker import Chunker
+
+
+def make_document(words: int = 2000) -> str:
+    paragraphs = []
+    for start in range(0, words, 40):
+        paragraphs.append(
+            " ".join(f"word{i}" for i in range(start, start + 40))
+        )
+    return "\n\n".join(paragraphs)
+
+
+def split_blocks(text: str, size: int = 37) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_chunker_character_mode_streams_small_blocks():
+    text = make_document()
+    chunker = Chunker(chunk_size=50, chunk_overlap=10)
+
+    chunks = list(chunker.iter_chunks(split_blocks(text)))
+
+    assert all(len(chunk.text) <= 50 for chunk in chunks)
+    assert [chunk.seq for chunk in chunks] == list(range(len(chunks)))
+    assert all(
+        text[chunk.start_char : chunk.end_char] == chunk.text
+        for chunk in chunks
+    )
+    streamed_words = {word for chunk in chunks for word in chunk.text.split()}
+    assert streamed_words == set(text.split())
+
+
+def test_chunker_token_mode_respects_token_budget():
+    text = make_document()
+    chunker = Chunker(
+        mode="token",
+        chunk_size=64,
+        chunk_overlap=16,
+        encoding_model="text-embedding-3-small",
+    )
+
+    chunks = list(chunker.iter_chunks(split_blocks(text, 500)))
+
+    assert all(chunker.count_tokens(chunk.text) <= 64 for chunk in chunks)
+    assert all(
+        text[chunk.start_char : chunk.end_char] == chunk.text
+        for chunk in chunks
+    )
+    assert chunks[0].start_token == 0
+    assert chunks[1].start_token == 48
+    assert chunks[-1].end_char == len(text)
+
+
+def test_chunker_process_pool_keeps_document_offsets():
+    text = make_document(words=6000)
+    chunker = Chunker(
+        chunk_size=200,
+        chunk_overlap=20,
+        process_workers=2,
+        process_pool_threshold=1,
+        segment_size=5000,
+    )
+    try:
+        chunks = chunker.chunk_text(text)
+    finally:
+        chunker.close()
+
+    assert [chunk.seq for chunk in chunks] == list(range(len(chunks)))
+    assert all(
+        text[chunk.start_char : chunk.end_char] == chunk.text
+        for chunk in chunks
+    )
+    streamed_words = {word for chunk in chunks for word in chunk.text.split()}
+    assert streamed_words == set(text.split())
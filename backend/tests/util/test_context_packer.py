@@ -0,0 +1,118 @@
+from langchain_core.documents import Document
+
+from app.util.context_packer import (
+    get_token_count,
+    merge_adjacent_chunks,
+    pack_context,
+)
+
+
+def make_document(name, token_count, score=None):
+    metadata = {"token_count": token_count}
+    if score is not None:
+        metadata["score"] = score
+    return Document(id=name, page_content=name, metadata=metadata)
+
+
+def test_pack_context_fills_budget_in_rank_order():
+    documents = [
+        make_document("a", 40),
+        make_document("b", 100),
+        make_document("c", 30),
+        make_document("d", 30),
+    ]
+
+    # b는 예산을 넘으므로 건너뛰고 뒤의 짧은 청크를 담는다
+    packed = pack_context(documents, max_tokens=72)
+    assert [d.id for d in packed] == ["a", "c"]
+
+    packed = pack_context(documents, max_tokens=1000, max_chunks=3)
+    assert [d.id for d in packed] == ["a", "b", "c"]
+    assert pack_context(documents, max_tokens=10) == []
+
+
+def test_pack_context_drops_chunks_below_min_score():
+    documents = [
+        make_document("a", 10, score=0.8),
+        make_document("b", 10, score=0.1),
+        make_document("c", 10),
+    ]
+
+    packed = pack_context(documents, max_tokens=100, min_score=0.2)
+    assert [d.id for d in packed] == ["a", "c"]
+
+
+def test_get_token_count_falls_back_to_length():
+    document = Document(page_content="legacy chunk")
+
+    assert get_token_count(document) == len("legacy chunk")
+    assert get_token_count(make_document("x", 3)) == 3
+
+
+CONTENTS = {
+    document_id: "".join(f"{document_id}{i:03d}|" for i in range(120))
+    for document_id in ("a", "b")
+}
+
+
+def make_chunk(document_id, seq, start_char, end_char):
+    return Document(
+        id=f"{document_id}:{seq}",
+        page_content=CONTENTS[document_id][start_char:end_char],
+        metadata={
+            "document_id": document_id,
+            "seq": seq,
+            "start_char": start_char,
+            "end_char": end_char,
+            "token_count": 10,
+        },
+    )
+
+
+def test_merge_adjacent_chunks_reads_each_span_once():
+    reads = []
+
+    def read_span(document_id, start_char, end_char):
+        reads.append((document_id, start_char, end_char))
+        return CONTENTS[document_id][start_char:end_char]
+
+    documents = [
+        make_chunk("a", 3, 240, 340),
+        make_chunk("b", 0, 0, 100),
+        make_chunk("a", 1, 80, 180),
+        make_chunk("a", 2, 162, 260),
+        make_chunk("a", 5, 400, 500),
+        Document(id="legacy", page_content="legacy", metadata={}),
+    ]
+
+    merged = merge_adjacent_chunks(documents, read_span)
+
+    assert [d.page_content for d in merged] == [
+        CONTENTS["a"][80:340],
+        documents[1].page_content,
+        documents[4].page_content,
+        "legacy",
+    ]
+    assert reads == [("a", 80, 340)]
+    assert merged[0].metadata["seq"] == 1
+    assert merged[0].metadata["chunk_ids"] == ["a:1", "a:2", "a:3"]
+    assert "token_count" not in merged[0].metadata
+
+
+def test_merge_adjacent_chunks_keeps_chunks_when_read_fails():
+    def read_span(document_id, start_char, end_char):
+        raise FileNotFoundError(document_id)
+
+    documents = [make_chunk("a", 0, 0, 100), make_chunk("a", 1, 80, 180)]
+
+    assert merge_adjacent_chunks(documents, read_span) == documents
+
+
+def test_merge_adjacent_chunks_keeps_chunks_when_span_does_not_match():
+    # 문서를 수정하는 중에는 청크 위치와 원문이 다를 수 있다
+    def read_span(document_id, start_char, end_char):
+        return CONTENTS["b"][start_char:end_char]
+
+    documents = [make_chunk("a", 0, 0, 100), make_chunk("a", 1, 80, 180)]
+
+    assert merge_adjacent_chunks(documents, read_span) == documents
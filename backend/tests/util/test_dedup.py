@@ -0,0 +1,90 @@
+import sqlite3
+
+from app.util.dedup import (
+    NearDuplicateIndex,
+    hamming_distance,
+    simhash,
+)
+
+DISCLAIMER = (
+    "This message and any attachments are confidential and intended "
+    "solely for the addressee. If you received it in error, please "
+    "notify the sender and delete it immediately."
+)
+
+
+def test_simhash_is_close_for_near_duplicates():
+    reformatted = DISCLAIMER.upper().replace(" ", "\n  ")
+    edited = DISCLAIMER.replace("immediately", "right away")
+    unrelated = (
+        "Quarterly revenue grew by ten percent, driven by strong demand "
+        "for the enterprise plan in the European market."
+    )
+
+    assert simhash(reformatted) == simhash(DISCLAIMER)
+    assert hamming_distance(simhash(edited), simhash(DISCLAIMER)) <= 12
+    assert hamming_distance(simhash(unrelated), simhash(DISCLAIMER)) > 3
+
+
+def test_near_duplicate_index_is_per_user(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "dedup.db"))
+    fingerprint = simhash(DISCLAIMER)
+    index.add("user-a", "doc-1", [("doc-1:chunk", fingerprint)])
+
+    # 3bit 이내의 차이는 밴드 중 하나가 반드시 일치하여 검색된다
+    assert index.find("user-a", fingerprint ^ 0b1000_0000_0001_0001) == (
+        "doc-1:chunk"
+    )
+    assert index.find("user-a", fingerprint ^ 0b1111) is None
+    assert index.find("user-b", fingerprint) is None
+
+
+def test_near_duplicate_index_references(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "dedup.db"))
+    fingerprint = simhash(DISCLAIMER)
+    index.add("user", "doc-1", [("doc-1:c", fingerprint)])
+    index.add_references(
+        "user", "doc-2", "two.txt", [("doc-2:c", "doc-1:c", 0, 0, 10)]
+    )
+    index.add_references(
+        "user", "doc-3", "three.txt", [("doc-3:c", "doc-1:c", 2, 40, 50)]
+    )
+
+    assert index.get_reference_ids("doc-2") == {"doc-2:c"}
+    assert [row[1] for row in index.get_referrers(["doc-1:c"])] == [
+        "doc-2:c",
+        "doc-3:c",
+    ]
+    assert index.has_document("user", "doc-3")
+    index.update_positions([("doc-3:c", 1, 20, 30)])
+    assert index.get_referrers(["doc-1:c"])[1][5:] == (1, 20, 30)
+
+    index.repoint_references("doc-1:c", "doc-2:c")
+    index.remove_chunks(["doc-2:c"])
+    assert [row[1] for row in index.get_referrers(["doc-2:c"])] == ["doc-3:c"]
+
+    index.remove_document("doc-3")
+    assert index.get_reference_documents("user") == []
+
+
+def test_near_duplicate_index_adds_position_columns(tmp_path):
+    path = str(tmp_path / "dedup.db")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE chunk_reference (chunk_id TEXT PRIMARY KEY, "
+        "user_id TEXT NOT NULL, document_id TEXT NOT NULL, "
+        "document_name TEXT NOT NULL, canonical_chunk_id TEXT NOT NULL)"
+    )
+    connection.execute(
+        "INSERT INTO chunk_reference "
+        "VALUES ('doc-2:c', 'user', 'doc-2', 'two.txt', 'doc-1:c')"
+    )
+    connection.commit()
+    connection.close()
+
+    index = NearDuplicateIndex(path)
+
+    # 이전 참조는 위치 없이 남는다
+    assert index.get_referrers(["doc-1:c"]) == [
+        ("doc-1:c", "doc-2:c", "user", "doc-2", "two.txt", None, None, None)
+    ]
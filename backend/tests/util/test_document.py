@@ -0,0 +1,415 @@
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+from langchain_core.embeddings import Embeddings
+
+from app.util import document as document_util
+from app.util import extractor as extractor_util
+from app.util.blob_store import BlobStore, LocalBlobBackend
+from app.util.chunker import Chunker
+from app.util.dedup import NearDuplicateIndex
+from app.util.lexical_index import LexicalIndex
+from app.util.vector_shard import VectorStoreShards
+
+
+@pytest.fixture
+def document_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_util, "BLOB_STORE_PATH", str(tmp_path))
+    store = BlobStore(
+        LocalBlobBackend(str(tmp_path / "blobs")),
+        frame_chars=16,
+        temp_dir=str(tmp_path / "tmp"),
+    )
+    monkeypatch.setattr(document_util, "blob_store", store)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def lexical_index(tmp_path, monkeypatch):
+    index = LexicalIndex(str(tmp_path / "lexical"))
+    monkeypatch.setattr(document_util, "lexical_index", index)
+    return index
+
+
+@pytest.mark.asyncio
+async def test_save_user_document_stream_to_file_splits_multibyte(
+    tmp_path, monkeypatch, document_store
+):
+    monkeypatch.setattr(document_util, "UPLOAD_BLOCK_SIZE", 3)
+    monkeypatch.setattr(extractor_util, "EXTRACT_BLOCK_SIZE", 3)
+    monkeypatch.setattr(
+        document_util, "document_extractor", extractor_util.DocumentExtractor()
+    )
+    content = "안녕하세요, world! 문서 업로드 테스트"
+    upload = UploadFile(
+        file=io.BytesIO(content.encode("utf-8")), filename="test.txt"
+    )
+
+    size = await document_util.save_user_document_stream_to_file(
+        "user", "doc", upload
+    )
+    document_util.extract_user_document("user", "doc")
+
+    assert size == len(content.encode("utf-8"))
+    assert document_util.read_user_document_from_file("user", "doc") == content
+    assert not (tmp_path / "staging" / "user" / "doc.src").exists()
+
+
+@pytest.mark.asyncio
+async def test_save_user_document_stream_to_file_rejects_binary(
+    tmp_path, monkeypatch, document_store
+):
+    upload = UploadFile(
+        file=io.BytesIO(b"\x89PNG\r\n\x1a\n\x00\x00"), filename="a.txt"
+    )
+
+    with pytest.raises(extractor_util.UnsupportedDocumentError):
+        await document_util.save_user_document_stream_to_file(
+            "user", "doc", upload
+        )
+
+    assert not (tmp_path / "staging" / "user" / "doc.src").exists()
+
+
+class RecordingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+def test_update_document_only_embeds_changed_chunks(
+    tmp_path, monkeypatch, document_store
+):
+    embeddings = RecordingEmbeddings()
+    shards = VectorStoreShards("test", embeddings, [str(tmp_path)])
+    monkeypatch.setattr(document_util, "vector_shards", shards)
+    monkeypatch.setattr(
+        document_util, "chunker", Chunker(chunk_size=40, chunk_overlap=0)
+    )
+    monkeypatch.setattr(
+        document_util,
+        "near_duplicate_index",
+        NearDuplicateIndex(str(tmp_path / "dedup.db")),
+    )
+    paragraphs = [f"Paragraph number {i} of the document." for i in range(10)]
+
+    document_util.save_user_document_to_file(
+        "user", "doc", "\n\n".join(paragraphs)
+    )
+    document_util.insert_document_to_vector_store("user", "doc", "doc.txt")
+    assert len(embeddings.embedded) == 10
+
+    embeddings.embedded.clear()
+    paragraphs[3] = "This paragraph was edited."
+    del paragraphs[7]
+    document_util.save_user_document_to_file(
+        "user", "doc", "\n\n".join(paragraphs)
+    )
+    result = document_util.update_document_in_vector_store(
+        "user", "doc", "doc.txt"
+    )
+
+    assert embeddings.embedded == ["This paragraph was edited."]
+    assert result == {
+        "added": 1,
+        "duplicates": 0,
+        "removed": 2,
+        "unchanged": 8,
+    }
+    with shards.open("user") as store:
+        stored = store.get(where={"document_id": "doc"})
+    assert sorted(d.page_content for d in stored) == sorted(paragraphs)
+    assert all(
+        d.metadata["token_count"]
+        == document_util.prompt_tokenizer.count_tokens(d.page_content)
+        for d in stored
+    )
+    # 유지된 청크의 위치도 수정된 문서 기준으로 갱신된다
+    content = "\n\n".join(paragraphs)
+    assert sorted(d.metadata["seq"] for d in stored) == list(range(9))
+    assert all(
+        content[d.metadata["start_char"] : d.metadata["end_char"]]
+        == d.page_content
+        for d in stored
+    )
+
+
+def test_update_document_switches_blob_after_chunk_positions(
+    tmp_path, monkeypatch, document_store
+):
+    shards = VectorStoreShards("test", RecordingEmbeddings(), [str(tmp_path)])
+    monkeypatch.setattr(document_util, "vector_shards", shards)
+    monkeypatch.setattr(
+        document_util, "chunker", Chunker(chunk_size=40, chunk_overlap=0)
+    )
+    monkeypatch.setattr(document_util, "near_duplicate_index", None)
+    monkeypatch.setattr(
+        document_util, "document_extractor", extractor_util.DocumentExtractor()
+    )
+    paragraphs = [f"Paragraph number {i} of the document." for i in range(6)]
+    old_content = "\n\n".join(paragraphs)
+    document_util.save_user_document_to_file("user", "doc", old_content)
+    document_util.insert_document_to_vector_store("user", "doc", "doc.txt")
+    old_key = document_util.get_user_document_blob_key("user", "doc")
+
+    new_content = "A new first paragraph.\n\n" + old_content
+    source_path = document_util.get_user_document_source_path("user", "doc")
+    (tmp_path / "staging" / "user").mkdir(parents=True)
+    with open(source_path, "w", encoding="utf-8") as f:
+        f.write(new_content)
+
+    during_job = []
+
+    def on_progress(chunks_done):
+        # 유지된 청크의 위치를 갱신하기 전에는 이전 내용을 읽는다
+        with shards.open("user") as store:
+            chunk = store.get(ids=["doc:" + sha256(paragraphs[2]) + ":0"])[0]
+        during_job.append(
+            document_util.read_user_document_span(
+                "user",
+                "doc",
+                chunk.metadata["start_char"],
+                chunk.metadata["end_char"],
+            )
+        )
+
+    document_util.update_document_in_vector_store(
+        "user", "doc", "doc.txt", on_progress
+    )
+
+    assert during_job == [paragraphs[2]]
+    assert (
+        document_util.read_user_document_from_file("user", "doc")
+        == new_content
+    )
+    with shards.open("user") as store:
+        for chunk in store.get(where={"document_id": "doc"}):
+            assert (
+                document_util.read_user_document_span(
+                    "user",
+                    "doc",
+                    chunk.metadata["start_char"],
+                    chunk.metadata["end_char"],
+                )
+                == chunk.page_content
+            )
+    assert document_store.resolve("user/doc.pending") is None
+    assert not document_store.backend.exists(
+        f"objects/{old_key[:2]}/{old_key[2:]}"
+    )
+
+
+def sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def test_insert_document_stores_near_duplicates_as_references(
+    tmp_path, monkeypatch, document_store
+):
+    embeddings = RecordingEmbeddings()
+    shards = VectorStoreShards("test", embeddings, [str(tmp_path)])
+    monkeypatch.setattr(document_util, "vector_shards", shards)
+    monkeypatch.setattr(
+        document_util, "chunker", Chunker(chunk_size=120, chunk_overlap=0)
+    )
+    monkeypatch.setattr(
+        document_util,
+        "near_duplicate_index",
+        NearDuplicateIndex(str(tmp_path / "dedup.db")),
+    )
+    footer = (
+        "Confidential. This document is intended only for the named "
+        "recipient and must not be distributed."
+    )
+    document_util.save_user_document_to_file(
+        "user", "a", f"Quarterly revenue grew by ten percent.\n\n{footer}"
+    )
+    document_util.save_user_document_to_file(
+        "user",
+        "b",
+        f"Hiring plan for the next year.\n\n{footer.upper()}\n\n{footer}",
+    )
+
+    result_a = document_util.insert_document_to_vector_store("user", "a", "a")
+    result_b = document_util.insert_document_to_vector_store("user", "b", "b")
+
+    assert result_a == {"chunks": 2, "duplicates": 0}
+    assert result_b == {"chunks": 3, "duplicates": 2}
+    assert embeddings.embedded.count(footer) == 1
+    with shards.open("user") as store:
+        assert len(store.get()) == 3
+
+    # 원본 청크가 삭제되면 첫 번째 참조가 자신의 원문으로 다시 저장되고
+    # 나머지 참조는 그 청크를 가리킨다
+    document_util.delete_document_from_vector_store("user", "a")
+    with shards.open("user") as store:
+        stored = store.get(where={"document_id": "b"})
+    assert sorted(d.page_content for d in stored) == sorted(
+        ["Hiring plan for the next year.", footer.upper()]
+    )
+    assert document_util.document_exists_in_vector_store("user", "b")
+    # 다시 저장된 참조 청크도 BM25 색인에서 검색된다
+    assert [
+        document.page_content
+        for document in document_util.search_user_documents_lexical(
+            "user", "confidential recipient", k=4
+        )
+    ] == [footer.upper()]
+
+
+def test_near_duplicate_keeps_its_own_text_when_canonical_is_deleted(
+    tmp_path, monkeypatch, document_store
+):
+    shards = VectorStoreShards("test", RecordingEmbeddings(), [str(tmp_path)])
+    monkeypatch.setattr(document_util, "vector_shards", shards)
+    monkeypatch.setattr(
+        document_util, "chunker", Chunker(chunk_size=380, chunk_overlap=0)
+    )
+    monkeypatch.setattr(
+        document_util,
+        "near_duplicate_index",
+        NearDuplicateIndex(str(tmp_path / "dedup.db"), max_distance=3),
+    )
+    policy = (
+        "Refunds are issued within {} business days after the returned "
+        "item has been received and inspected by the warehouse team, and "
+        "the customer is notified by email once the payment provider "
+        "confirms the transfer to the original card. Partial refunds apply "
+        "to opened items and shipping fees are not refunded unless the "
+        "item arrived damaged or the wrong item was sent by mistake."
+    )
+    document_util.save_user_document_to_file(
+        "user", "a", "Store policy.\n\n" + policy.format(1)
+    )
+    document_util.save_user_document_to_file(
+        "user", "b", "Partner policy.\n\n" + policy.format(34)
+    )
+    document_util.insert_document_to_vector_store("user", "a", "a")
+    result = document_util.insert_document_to_vector_store("user", "b", "b")
+    assert result == {"chunks": 2, "duplicates": 1}
+
+    document_util.delete_document_from_vector_store("user", "a")
+
+    with shards.open("user") as store:
+        stored = sorted(
+            store.get(where={"document_id": "b"}),
+            key=lambda d: d.metadata["seq"],
+        )
+    assert [d.page_content for d in stored] == [
+        "Partner policy.",
+        policy.format(34),
+    ]
+    # 자신의 위치로 다시 저장되므로 이웃 청크와 병합할 수 있다
+    assert stored[1].metadata["chunk_hash"] == sha256(policy.format(34))
+    merged = document_util.merge_retrieved_chunks("user", stored)
+    assert merged[0].page_content == "Partner policy.\n\n" + policy.format(34)
+
+
+def test_user_document_blob_is_shared_and_read_by_span(document_store):
+    content = "같은 내용의 문서는 한 번만 저장된다. " * 10
+
+    document_util.save_user_document_to_file("user", "a", content)
+    document_util.save_user_document_to_file("user", "b", content)
+
+    key = document_util.get_user_document_blob_key("user", "a")
+    assert document_util.get_user_document_blob_key("user", "b") == key
+    assert (
+        document_util.read_user_document_span("user", "b", 30, 75)
+        == (content[30:75])
+    )
+    assert document_util.get_user_document_size("user", "a") == len(
+        content.encode("utf-8")
+    )
+    assert document_util.get_user_document_info("user", "a") == {
+        "size": len(content.encode("utf-8")),
+        "content_hash": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+    }
+
+    document_util.delete_user_document_file("user", "a")
+    assert document_util.read_user_document_from_file("user", "b") == content
+
+    document_util.delete_user_document_file("user", "b")
+    assert not document_store.backend.exists(f"objects/{key[:2]}/{key[2:]}")
+
+
+def test_lexical_search_follows_inserts_and_deletes(
+    tmp_path, monkeypatch, document_store
+):
+    shards = VectorStoreShards("test", RecordingEmbeddings(), [str(tmp_path)])
+    monkeypatch.setattr(document_util, "vector_shards", shards)
+    monkeypatch.setattr(
+        document_util, "chunker", Chunker(chunk_size=60, chunk_overlap=0)
+    )
+    monkeypatch.setattr(document_util, "near_duplicate_index", None)
+    document_util.save_user_document_to_file(
+        "user",
+        "a",
+        "Deploys fail with ERR-4012 when the disk is full.\n\n"
+        "Restart the worker after clearing the cache.",
+    )
+    document_util.save_user_document_to_file(
+        "user", "b", "The quarterly report covers hiring and revenue."
+    )
+    document_util.insert_document_to_vector_store("user", "a", "a")
+    document_util.insert_document_to_vector_store("user", "b", "b")
+
+    results = document_util.search_user_documents_lexical(
+        "user", "what is err-4012?", k=2
+    )
+    assert [document.page_content for document in results] == [
+        "Deploys fail with ERR-4012 when the disk is full."
+    ]
+    assert document_util.search_user_documents_lexical("other", "err") == []
+
+    assert document_util.get_user_document_chunks_from_vector_store(
+        "user", "b"
+    ) == ["The quarterly report covers hiring and revenue."]
+
+    document_util.delete_document_from_vector_store("user", "a")
+    assert (
+        document_util.search_user_documents_lexical("user", "ERR-4012") == []
+    )
+
+
+def test_retrieved_neighbour_chunks_are_merged_from_the_document(
+    tmp_path, monkeypatch, document_store
+):
+    shards = VectorStoreShards("test", RecordingEmbeddings(), [str(tmp_path)])
+    monkeypatch.setattr(document_util, "vector_shards", shards)
+    monkeypatch.setattr(
+        document_util, "chunker", Chunker(chunk_size=40, chunk_overlap=15)
+    )
+    monkeypatch.setattr(document_util, "near_duplicate_index", None)
+    content = " ".join(f"word{i:02d}" for i in range(30))
+    document_util.save_user_document_to_file("user", "doc", content)
+    document_util.insert_document_to_vector_store("user", "doc", "doc.txt")
+
+    with shards.open("user") as store:
+        chunks = sorted(
+            store.get(where={"document_id": "doc"}),
+            key=lambda d: d.metadata["seq"],
+        )
+    for chunk in chunks:
+        metadata = chunk.metadata
+        assert (
+            content[metadata["start_char"] : metadata["end_char"]]
+            == chunk.page_content
+        )
+    assert chunks[0].metadata["end_char"] > chunks[1].metadata["start_char"]
+
+    merged = document_util.merge_retrieved_chunks(
+        "user", [chunks[1], chunks[4], chunks[0]]
+    )
+    assert [d.page_content for d in merged] == [
+        content[: chunks[1].metadata["end_char"]],
+        chunks[4].page_content,
+    ]
+    assert merged[0].metadata["chunk_ids"] == [chunks[0].id, chunks[1].id]
@@ -0,0 +1,50 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.util.document_catalog import (
+    decode_cursor,
+    encode_cursor,
+    list_document_records,
+)
+
+
+def make_record(i):
+    return SimpleNamespace(id=f"doc-{i}", created_at=datetime(2025, 1, i))
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(make_record(3))
+
+    assert decode_cursor(cursor) == (datetime(2025, 1, 3), "doc-3")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_list_document_records_returns_next_cursor():
+    records = [make_record(i) for i in (5, 4, 3)]
+    crud_list = AsyncMock(side_effect=[records, records[2:]])
+
+    with (
+        patch("app.util.document_catalog.get_async_db_session"),
+        patch(
+            "app.util.document_catalog.document_crud.list_document_records",
+            crud_list,
+        ),
+    ):
+        page, cursor = await list_document_records("user", 2)
+        last_page, last_cursor = await list_document_records("user", 2, cursor)
+
+    # 한 개 더 조회하여 다음 페이지가 있는지 확인
+    assert page == records[:2]
+    assert decode_cursor(cursor) == (datetime(2025, 1, 4), "doc-4")
+    assert crud_list.await_args_list[0].args[2:] == (3, None)
+    assert crud_list.await_args_list[1].args[2:] == (
+        3,
+        (datetime(2025, 1, 4), "doc-4"),
+    )
+    assert last_page == records[2:]
+    assert last_cursor is None
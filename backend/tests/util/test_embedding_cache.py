@@ -0,0 +1,64 @@
+from app.services.embedding import CachedEmbeddings
+from app.util.embedding_cache import EmbeddingCache
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 0.5] for text in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return [float(len(text)), 0.5]
+
+
+def test_embedding_cache_counts_hits_and_misses(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), model="test-model")
+    cache.put_many(["hello"], [[1.0, 2.0]])
+
+    assert cache.get_many(["hello", "world"]) == [[1.0, 2.0], None]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_embedding_cache_is_scoped_to_model_and_dimensions(tmp_path):
+    path = str(tmp_path / "cache.db")
+    EmbeddingCache(path, model="test-model").put_many(["hello"], [[1.0]])
+
+    assert EmbeddingCache(path, model="other-model").get_many(["hello"]) == [
+        None
+    ]
+    assert EmbeddingCache(path, model="test-model", dimensions=256).get_many(
+        ["hello"]
+    ) == [None]
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    # 벡터 하나는 float32 2개 = 8 bytes
+    cache = EmbeddingCache(
+        str(tmp_path / "cache.db"), model="test-model", max_bytes=20
+    )
+    cache.put_many(["a"], [[1.0, 1.0]])
+    cache.put_many(["b"], [[2.0, 2.0]])
+    cache.get_many(["a"])
+    cache.put_many(["c"], [[3.0, 3.0]])
+
+    assert cache.get_many(["a", "b", "c"]) == [[1.0, 1.0], None, [3.0, 3.0]]
+    assert cache.stats()["size_bytes"] <= 20
+
+
+def test_cached_embeddings_only_embeds_misses(tmp_path):
+    upstream = CountingEmbeddings()
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), model="test-model")
+    embeddings = CachedEmbeddings(upstream, cache)
+
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    second = embeddings.embed_documents(["beta", "gamma"])
+    embeddings.embed_query("alpha")
+
+    assert first == [[5.0, 0.5], [4.0, 0.5], [5.0, 0.5]]
+    assert second == [[4.0, 0.5], [5.0, 0.5]]
+    assert upstream.embedded == ["alpha", "beta", "gamma"]
@@ -0,0 +1,13 @@
+from app.util.etag import etag_matches, make_etag
+
+
+def test_etag_matches_if_none_match_header():
+    etag = make_etag("content")
+
+    assert etag == make_etag("content")
+    assert etag != make_etag("other")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"x", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(make_etag("other"), etag)
@@ -0,0 +1,179 @@
+import io
+import time
+import zipfile
+
+import pytest
+
+from app.util import extractor as extractor_util
+from app.util.extractor import (
+    DocumentExtractor,
+    ExtractionTimeoutError,
+    UnsupportedDocumentError,
+    extract_document_to_file,
+    sniff_document_format,
+)
+
+DOCX_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+    'wordprocessingml/2006/main"><w:body>'
+    "<w:p><w:r><w:t>첫 번째</w:t></w:r><w:r><w:tab/><w:t>문단</w:t></w:r></w:p>"
+    "<w:p><w:r><w:t>Second paragraph</w:t></w:r></w:p>"
+    "</w:body></w:document>"
+)
+
+
+def build_docx() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("[Content_Types].xml", "<Types/>")
+        zf.writestr("word/document.xml", DOCX_XML)
+    return buffer.getvalue()
+
+
+def build_pdf(pages: list[str]) -> bytes:
+    """텍스트 페이지로 최소한의 PDF 생성"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (len(objects))
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = (
+        f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+    ).encode()
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += (
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (
+            len(objects) + 1,
+            xref,
+        )
+    )
+    return output
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        ("# 제목\n\n본문".encode("utf-8"), "text"),
+        (b"\xef\xbb\xbfplain text with BOM", "text"),
+        (b"  <!DOCTYPE html><html><body>hi</body></html>", "html"),
+        (b"<!-- comment -->\n<html><body>hi</body></html>", "html"),
+        (build_docx(), "docx"),
+        (build_pdf(["Hello"]), "pdf"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00", None),
+        (b"\xff\xfe\x00h\x00i", None),
+    ],
+)
+def test_sniff_document_format(tmp_path, content, expected):
+    path = tmp_path / "upload.bin"
+    path.write_bytes(content)
+
+    assert sniff_document_format(str(path)) == expected
+
+
+def test_extract_docx_paragraphs(tmp_path):
+    path = tmp_path / "upload.bin"
+    path.write_bytes(build_docx())
+
+    pages = list(extractor_util.extract_docx(str(path)))
+
+    assert pages == ["첫 번째\t문단\n", "Second paragraph\n"]
+
+
+def test_extract_html_skips_scripts(tmp_path, monkeypatch):
+    monkeypatch.setattr(extractor_util, "EXTRACT_BLOCK_SIZE", 16)
+    path = tmp_path / "upload.bin"
+    path.write_text(
+        "<html><head><title>t</title><style>p {}</style></head><body>"
+        "<p>첫 문단 &amp; 엔티티</p><script>alert(1)</script><p>둘째</p>"
+        "</body></html>",
+        encoding="utf-8",
+    )
+
+    text = "".join(extractor_util.extract_html(str(path)))
+
+    assert "alert" not in text and "p {}" not in text
+    assert [line for line in text.split("\n") if line] == [
+        "첫 문단 & 엔티티",
+        "둘째",
+    ]
+
+
+def test_extract_document_to_file_writes_pdf_pages(tmp_path):
+    source = tmp_path / "upload.src"
+    target = tmp_path / "upload.txt"
+    source.write_bytes(build_pdf(["First page", "Second page"]))
+
+    pages = extract_document_to_file(str(source), str(target), "pdf")
+
+    assert pages == 2
+    text = target.read_text(encoding="utf-8")
+    assert text.index("First page") < text.index("Second page")
+
+
+def test_extract_document_to_file_time_limit(tmp_path, monkeypatch):
+    def slow_extract(path):
+        yield "partial"
+        time.sleep(5)
+        yield "never"
+
+    monkeypatch.setitem(
+        extractor_util.EXTRACTORS,
+        "slow",
+        extractor_util.Extractor("slow", lambda h, p: False, slow_extract),
+    )
+    source = tmp_path / "upload.src"
+    target = tmp_path / "upload.txt"
+    source.write_text("content")
+    target.write_text("previous")
+
+    with pytest.raises(ExtractionTimeoutError):
+        extract_document_to_file(str(source), str(target), "slow", 0.1)
+
+    assert target.read_text() == "previous"
+    assert not (tmp_path / "upload.txt.part").exists()
+
+
+def test_document_extractor_process_pool(tmp_path):
+    source = tmp_path / "upload.src"
+    target = tmp_path / "upload.txt"
+    source.write_bytes(build_docx())
+    document_extractor = DocumentExtractor(
+        process_workers=1, memory_limit=2 * 1024**3, timeout=30
+    )
+    try:
+        assert document_extractor.extract(str(source), str(target)) == 2
+    finally:
+        document_extractor.close()
+
+    assert target.read_text(encoding="utf-8") == (
+        "첫 번째\t문단\nSecond paragraph\n"
+    )
+
+
+def test_document_extractor_rejects_unsupported(tmp_path):
+    source = tmp_path / "upload.src"
+    source.write_bytes(b"\x00\x01\x02binary")
+
+    with pytest.raises(UnsupportedDocumentError):
+        DocumentExtractor().extract(str(source), str(tmp_path / "out.txt"))
@@ -0,0 +1,113 @@
+import threading
+from unittest.mock import patch
+
+from langchain_core.documents import Document
+
+from app.util import lexical_index as lexical_util
+from app.util.lexical_index import LexicalIndex, tokenize
+
+
+def make_documents(document_id, texts):
+    return [
+        Document(
+            id=f"{document_id}:{i}",
+            page_content=text,
+            metadata={"document_id": document_id},
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_tokenize_keeps_identifiers_and_korean_bigrams():
+    assert tokenize("Error E_1234 in v2") == ["error", "e_1234", "in", "v2"]
+    assert tokenize("문서를 검색") == ["문서를", "문서", "서를", "검색"]
+
+
+def test_search_ranks_by_bm25(tmp_path):
+    index = LexicalIndex(str(tmp_path))
+    index.add(
+        "user",
+        make_documents(
+            "a",
+            [
+                "timeout timeout while calling the payment api",
+                "the payment api returned an error",
+                "weekly meeting notes",
+            ],
+        ),
+    )
+
+    results = index.search("user", "payment timeout", k=2)
+
+    assert [chunk_id for chunk_id, _ in results] == ["a:0", "a:1"]
+    assert results[0][1] > results[1][1] > 0
+    assert index.search("user", "unrelated words", k=2) == []
+    assert index.search("other-user", "payment", k=2) == []
+
+
+def test_deletes_and_merges_persist(tmp_path, monkeypatch):
+    monkeypatch.setattr(lexical_util, "MAX_SEGMENTS", 3)
+    monkeypatch.setattr(lexical_util, "MERGE_SEGMENTS", 2)
+    index = LexicalIndex(str(tmp_path))
+    for i in range(6):
+        index.add(
+            "user", make_documents(f"doc{i}", [f"shared term{i}", "shared"])
+        )
+    index.delete_document("user", "doc1")
+    index.delete_chunks("user", ["doc2:0"])
+    index.add("user", make_documents("doc6", ["shared term6"]))
+
+    user_index = index._open("user")
+    assert len(user_index.segments) <= 3
+
+    # 다시 열어도 같은 결과, 삭제된 청크는 검색되지 않는다
+    reopened = LexicalIndex(str(tmp_path))
+    results = {
+        chunk_id for chunk_id, _ in reopened.search("user", "shared", k=20)
+    }
+    assert "doc1:0" not in results and "doc1:1" not in results
+    assert "doc2:0" not in results and "doc2:1" in results
+    assert len(results) == 10
+    assert [
+        chunk_id for chunk_id, _ in reopened.search("user", "term3", k=5)
+    ] == ["doc3:0"]
+
+
+def test_close_releases_segment_memory_maps(tmp_path):
+    index = LexicalIndex(str(tmp_path))
+    index.add("user", make_documents("a", ["payment api timeout"]))
+    user_index = index._open("user")
+    mapped = user_index.segments[0].terms._mmap
+    scoring = threading.Event()
+    resume = threading.Event()
+    score = user_index._score
+    results = []
+
+    def slow_score(*args):
+        scoring.set()
+        resume.wait(5)
+        return score(*args)
+
+    with patch.object(user_index, "_score", slow_score):
+        search = threading.Thread(
+            target=lambda: results.extend(index.search("user", "payment"))
+        )
+        search.start()
+        scoring.wait(5)
+
+        # 검색 중에 닫으면 검색이 끝난 뒤 해제한다
+        index.close()
+        assert not mapped.closed
+        resume.set()
+        search.join(5)
+
+    assert [chunk_id for chunk_id, _ in results] == ["a:0"]
+    assert mapped.closed
+    assert user_index.segments == []
+
+    # 다시 열면 파일에서 그대로 읽는다
+    reopened = LexicalIndex(str(tmp_path))
+    assert [
+        chunk_id for chunk_id, _ in reopened.search("user", "payment", k=1)
+    ] == ["a:0"]
+    reopened.close()
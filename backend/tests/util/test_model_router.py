@@ -0,0 +1,209 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from pydantic import SecretStr
+
+from app.core.config import settings
+from app.util import model_router
+from app.util.model_router import (
+    BackendStats,
+    ModelRouter,
+    create_chat_model,
+    percentile,
+)
+
+
+class FakeProvider(Runnable):
+    """
+    지연 시간과 실패를 조절할 수 있는 로컬 채팅 모델
+    """
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    def invoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        return AIMessage(content=self.name)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        return AIMessage(content=self.name)
+
+    async def astream(self, input, config=None, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError(f"{self.name} failed")
+            for token in [self.name, "!"]:
+                yield AIMessageChunk(content=token)
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled += 1
+            raise
+
+
+def make_router(*providers, **kwargs):
+    return ModelRouter(
+        [(provider.name, provider) for provider in providers],
+        min_samples=3,
+        **kwargs,
+    )
+
+
+def test_backend_stats_percentiles_and_error_window():
+    stats = BackendStats(window=4, error_window=60)
+    for latency in [0.4, 0.1, 0.2, 0.3, 0.5]:
+        stats.record("invoke", latency)
+    stats.record("invoke", None)
+
+    # 최근 4개만 남는다
+    assert stats.samples("invoke") == 4
+    assert stats.latency("invoke", 0.5) == 0.3
+    assert stats.latency("stream", 0.5) is None
+    assert stats.error_rate() == (0.25, 4)
+    assert percentile([3, 1, 2], 0.95) == 3
+
+    stats.error_window = 0
+    assert stats.error_rate() == (0.0, 0)
+
+
+@pytest.mark.asyncio
+async def test_requests_go_to_the_fastest_backend():
+    slow = FakeProvider("slow", delay=0.03)
+    fast = FakeProvider("fast", delay=0.005)
+    router = make_router(slow, fast)
+
+    answers = [(await router.ainvoke("hi")).content for _ in range(6)]
+
+    # 두 백엔드를 한 번씩 측정한 뒤에는 빠른 백엔드만 사용한다
+    assert answers[:2] == ["slow", "fast"]
+    assert answers[2:] == ["fast"] * 4
+    assert [backend.name for backend in router.rank("invoke")] == [
+        "fast",
+        "slow",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_errors_fail_over_and_mark_the_backend_unhealthy():
+    broken = FakeProvider("broken", fail=True)
+    backup = FakeProvider("backup", delay=0.01)
+    router = make_router(broken, backup)
+
+    for _ in range(3):
+        broken.delay = 0.0
+        assert (await router.ainvoke("hi")).content == "backup"
+        # 측정되지 않은 것처럼 앞에 두어 실패를 누적한다
+        router.backends[1].stats._latencies.clear()
+
+    assert broken.calls == 3
+    assert not router.is_healthy(router.backends[0])
+    assert (await router.ainvoke("hi")).content == "backup"
+    assert broken.calls == 3
+
+    broken_stats = router.stats()[0]
+    assert broken_stats["healthy"] is False
+    assert broken_stats["error_rate"] == 1.0
+
+    with pytest.raises(RuntimeError):
+        await make_router(FakeProvider("a", fail=True)).ainvoke("hi")
+    assert router.invoke("hi").content == "backup"
+
+
+@pytest.mark.asyncio
+async def test_slow_requests_are_hedged_after_p95():
+    primary = FakeProvider("primary", delay=0.01)
+    secondary = FakeProvider("secondary", delay=0.01)
+    router = make_router(primary, secondary)
+    for _ in range(3):
+        router.backends[0].stats.record("invoke", 0.01)
+        router.backends[1].stats.record("invoke", 0.02)
+
+    primary.delay = 1.0
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    answer = await router.ainvoke("hi")
+    elapsed = loop.time() - start
+
+    assert answer.content == "secondary"
+    assert elapsed < 0.2
+    # 늦은 요청은 취소된다
+    await asyncio.sleep(0.01)
+    assert primary.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_streams_are_hedged_on_time_to_first_chunk():
+    primary = FakeProvider("primary", delay=1.0)
+    secondary = FakeProvider("secondary", delay=0.01)
+    router = make_router(primary, secondary, hedge_delay=0.02)
+
+    chunks = [chunk.content async for chunk in router.astream("hi")]
+
+    assert chunks == ["secondary", "!"]
+    await asyncio.sleep(0.01)
+    assert primary.cancelled == 1
+    assert router.backends[1].stats.samples("stream") == 1
+
+    primary.delay, primary.fail = 0.0, True
+    chunks = [chunk.content async for chunk in router.astream("hi")]
+    assert chunks == ["secondary", "!"]
+
+
+@pytest.mark.asyncio
+async def test_router_is_a_drop_in_chat_model_in_a_chain():
+    router = make_router(FakeProvider("model"))
+    chain = ChatPromptTemplate.from_messages([("user", "{question}")]) | router
+
+    assert (await chain.ainvoke({"question": "q"})).content == "model"
+    assert [
+        chunk.content async for chunk in chain.astream({"question": "q"})
+    ] == ["model", "!"]
+
+
+@pytest.mark.asyncio
+async def test_router_without_backends_raises_a_clear_error():
+    router = make_router(FakeProvider("model"))
+    router.backends.clear()
+
+    with pytest.raises(RuntimeError, match="No chat model backend"):
+        router.invoke("hi")
+    with pytest.raises(RuntimeError, match="No chat model backend"):
+        await router.ainvoke("hi")
+
+
+def test_optional_providers_use_a_default_model():
+    class FakeChatModel:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+
+    with (
+        patch.object(model_router, "ChatAnthropic", FakeChatModel),
+        patch.object(settings, "ANTHROPIC_API_KEY", SecretStr("key")),
+    ):
+        chat_model = create_chat_model("anthropic")
+        assert chat_model.kwargs["model"] == settings.ANTHROPIC_MODEL
+        assert create_chat_model("anthropic", "other").kwargs["model"] == (
+            "other"
+        )
+
+    with patch.object(model_router, "ChatGoogleGenerativeAI", None):
+        with pytest.raises(ImportError, match="langchain-google-genai"):
+            create_chat_model("google")
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from app.util.query_cache import QueryEmbeddingCache, normalize_query
+
+
+class FakeSharedStore:
+    def __init__(self, fail=False):
+        self.vectors = {}
+        self.fail = fail
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        return self.vectors.get(key)
+
+    async def put(self, key, vector, ttl):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        self.vectors[key] = vector
+
+
+def test_normalize_query():
+    assert normalize_query("  Hello\tWORLD \n") == "hello world"
+    assert normalize_query("ＡＢＣ") == "abc"
+
+
+def test_cache_keys_are_normalized_and_namespaced():
+    cache = QueryEmbeddingCache("model-a", dimensions=256)
+
+    assert cache.key("Hello") == cache.key(" hello ")
+    assert cache.key("Hello") != QueryEmbeddingCache("model-a").key("Hello")
+    assert cache.key("Hello") != QueryEmbeddingCache("model-b", 256).key(
+        "Hello"
+    )
+
+
+def test_cache_is_bounded_and_expires():
+    cache = QueryEmbeddingCache("model", maxsize=2, ttl=0.05)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.put("c", [3.0])
+
+    assert cache.get("a") is None
+    assert cache.get("C") == [3.0]
+    time.sleep(0.1)
+    assert cache.get("c") is None
+    assert cache.stats() == {
+        "hits": 1,
+        "shared_hits": 0,
+        "misses": 2,
+        "hit_rate": 1 / 3,
+        "size": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_shared_store_is_used_across_processes():
+    shared = FakeSharedStore()
+    writer = QueryEmbeddingCache("model", shared=shared)
+    reader = QueryEmbeddingCache("model", shared=shared)
+
+    await writer.aput("Hello", [1.0, 2.0])
+
+    assert await reader.aget("hello") == [1.0, 2.0]
+    assert await reader.aget("hello") == [1.0, 2.0]
+    assert await reader.aget("other") is None
+    stats = reader.stats()
+    assert (stats["hits"], stats["shared_hits"], stats["misses"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_shared_store_errors_are_cache_misses():
+    cache = QueryEmbeddingCache("model", shared=FakeSharedStore(fail=True))
+
+    await cache.aput("hello", [1.0])
+    assert await cache.aget("hello") == [1.0]
+    assert await cache.aget("other") is None
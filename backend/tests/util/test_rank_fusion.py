@@ -0,0 +1,17 @@
+from langchain_core.documents import Document
+
+from app.util.rank_fusion import reciprocal_rank_fusion
+
+
+def make_documents(ids):
+    return [Document(id=i, page_content=i) for i in ids]
+
+
+def test_reciprocal_rank_fusion_prefers_documents_found_by_both():
+    vector = make_documents(["a", "b", "c"])
+    lexical = make_documents(["c", "d"])
+
+    fused = reciprocal_rank_fusion([vector, lexical], limit=3)
+
+    assert [document.id for document in fused] == ["c", "a", "b"]
+    assert reciprocal_rank_fusion([[], []], limit=3) == []
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from app.util.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return f"result {key}"
+
+    results = await asyncio.gather(
+        *[flight.do(key, lambda key=key: fetch(key)) for key in "aaab"]
+    )
+
+    assert results == ["result a"] * 3 + ["result b"]
+    assert calls == ["a", "b"]
+    assert flight.stats() == {"calls": 2, "shared": 2, "in_flight": 0}
+
+    # 끝난 호출의 결과는 저장하지 않는다
+    assert await flight.do("a", lambda: fetch("a")) == "result a"
+    assert calls == ["a", "b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_with_all_waiters():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    results = await asyncio.gather(
+        flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [ValueError] * 2
+
+
+@pytest.mark.asyncio
+async def test_upstream_is_cancelled_only_when_all_waiters_leave():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(0.1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", slow))
+    second = asyncio.create_task(flight.do("k", slow))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "done"
+    assert not cancelled.is_set()
+
+    waiters = [asyncio.create_task(flight.do("k", slow)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_is_fanned_out_to_late_joiners():
+    flight = SingleFlight()
+    started = 0
+
+    async def tokens():
+        nonlocal started
+        started += 1
+        for token in ["a", "b", "c"]:
+            await asyncio.sleep(0.02)
+            yield token
+
+    async def collect(delay):
+        await asyncio.sleep(delay)
+        return [token async for token in flight.stream("k", tokens)]
+
+    results = await asyncio.gather(collect(0), collect(0.03))
+
+    assert results == [["a", "b", "c"]] * 2
+    assert started == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_is_cancelled_when_all_readers_close():
+    flight = SingleFlight()
+    closed = asyncio.Event()
+
+    async def tokens():
+        try:
+            for i in range(100):
+                await asyncio.sleep(0.01)
+                yield i
+        finally:
+            closed.set()
+
+    readers = [flight.stream("k", tokens) for _ in range(2)]
+    assert [await anext(reader) for reader in readers] == [0, 0]
+
+    await readers[0].aclose()
+    assert await anext(readers[1]) == 1
+    assert not closed.is_set()
+
+    await readers[1].aclose()
+    await asyncio.wait_for(closed.wait(), 1)
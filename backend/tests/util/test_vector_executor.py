@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.util.vector_executor import (
+    VectorStoreBusyError,
+    VectorStoreExecutor,
+)
+
+
+@pytest.mark.asyncio
+async def test_vector_store_executor_runs_off_event_loop():
+    executor = VectorStoreExecutor(max_workers=2)
+
+    thread_name = await executor.run(lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("vector-store")
+    assert executor.stats()["completed"] == 1
+    executor.close()
+
+
+@pytest.mark.asyncio
+async def test_vector_store_executor_rejects_when_queue_is_full():
+    executor = VectorStoreExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    running = asyncio.create_task(executor.run(blocking))
+    await asyncio.to_thread(started.wait, 5)
+    queued = asyncio.create_task(executor.run(lambda: None))
+    await asyncio.sleep(0)
+
+    with pytest.raises(VectorStoreBusyError):
+        await executor.run(lambda: None)
+    stats = executor.stats()
+    assert (stats["running"], stats["queued"], stats["rejected"]) == (1, 1, 1)
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert executor.stats()["completed"] == 2
+    executor.close()
@@ -0,0 +1,124 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.util.vector_shard import VectorStoreShards
+
+
+class LengthEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+def add_user_document(shards, user_id, text):
+    with shards.open(user_id) as store:
+        store.add_documents(
+            [Document(page_content=text, metadata={"user_id": user_id})]
+        )
+
+
+def test_users_are_routed_to_separate_shards(tmp_path):
+    shards = VectorStoreShards(
+        "test",
+        LengthEmbeddings(),
+        [str(tmp_path / "disk-a"), str(tmp_path / "disk-b")],
+    )
+
+    add_user_document(shards, "user-a", "document of user a")
+    add_user_document(shards, "user-b", "document of user b")
+
+    with shards.open("user-a") as store:
+        assert [d.page_content for d in store.get()] == ["document of user a"]
+    assert shards.get_shard_id("user-a") != shards.get_shard_id("user-b")
+    shards.close()
+
+
+def test_idle_shards_are_evicted_and_reopened(tmp_path):
+    shards = VectorStoreShards(
+        "test", LengthEmbeddings(), [str(tmp_path)], max_open=1
+    )
+
+    add_user_document(shards, "user-a", "document of user a")
+    with shards.open("user-a"):
+        # 사용 중인 샤드는 밀려나도 요청이 끝날 때까지 닫히지 않는다
+        add_user_document(shards, "user-b", "document of user b")
+        assert shards.open_shard_ids() == [shards.get_shard_id("user-b")]
+
+    with shards.open("user-a") as store:
+        assert [d.page_content for d in store.get()] == ["document of user a"]
+    shards.close()
+
+
+def test_bucket_shards_group_users(tmp_path):
+    shards = VectorStoreShards(
+        "test", LengthEmbeddings(), [str(tmp_path)], buckets=1
+    )
+
+    add_user_document(shards, "user-a", "document of user a")
+    add_user_document(shards, "user-b", "document of user b")
+
+    with shards.open("user-a") as store:
+        assert len(store.get()) == 2
+        assert [
+            d.page_content for d in store.get(where={"user_id": "user-a"})
+        ] == ["document of user a"]
+    shards.close()
+
+
+def test_evicted_shard_in_use_is_reused(tmp_path):
+    shards = VectorStoreShards(
+        "test", LengthEmbeddings(), [str(tmp_path)], max_open=1
+    )
+
+    with shards.open("user-a") as store:
+        add_user_document(shards, "user-b", "document of user b")
+        # 사용 중인 샤드를 다시 열면 같은 디렉터리를 새로 열지 않는다
+        with shards.open("user-a") as reopened:
+            assert reopened is store
+    shards.close()
+
+
+def test_slow_shard_open_does_not_block_other_shards(tmp_path):
+    shards = VectorStoreShards("test", LengthEmbeddings(), [str(tmp_path)])
+    slow_path = shards.get_shard_path(shards.get_shard_id("user-slow"))
+    release = threading.Event()
+    created = []
+
+    def fake_create(backend, path, *args, **kwargs):
+        created.append(path)
+        if path == slow_path:
+            # 클라이언트 시작이나 인덱스 복구처럼 오래 걸린다
+            release.wait(5)
+        return MagicMock()
+
+    stores = []
+
+    def open_slow():
+        with shards.open("user-slow") as store:
+            stores.append(store)
+
+    with patch("app.util.vector_shard.create_vector_store", fake_create):
+        threads = [threading.Thread(target=open_slow) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while slow_path not in created:
+            threading.Event().wait(0.01)
+
+        # 다른 샤드는 느린 샤드가 열리기를 기다리지 않는다
+        with shards.open("user-fast"):
+            pass
+        assert not stores
+
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    # 같은 샤드를 동시에 열어도 한 번만 만든다
+    assert created.count(slow_path) == 1
+    assert len(stores) == 2 and stores[0] is stores[1]
+    assert shards.get_shard_id("user-slow") in shards.open_shard_ids()
@@ -0,0 +1,286 @@
+import os
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.util.vectorstore.factory import create_vector_store
+from app.util.vectorstore.flat import FlatVectorStore
+from app.util.vectorstore.hnsw import HnswVectorStore
+from app.util.vectorstore.local import exact_search, normalize, rescore
+from app.util.vectorstore.quantization import VectorCodec
+
+
+class LengthEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0, float(text.count("a"))]
+
+
+def make_documents(user_id, document_id, texts):
+    return [
+        Document(
+            id=f"{document_id}:{i}",
+            page_content=text,
+            metadata={"user_id": user_id, "document_id": document_id},
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+@pytest.fixture(params=["flat", "hnsw"])
+def backend(request):
+    return request.param
+
+
+def test_get_update_and_delete(tmp_path, backend):
+    store = create_vector_store(
+        backend, str(tmp_path), "test", LengthEmbeddings()
+    )
+    store.add_documents(make_documents("user-a", "a", ["one", "two"]))
+    store.add_documents(make_documents("user-b", "b", ["three"]))
+
+    assert len(store.get()) == 3
+    assert [d.page_content for d in store.get(ids=["a:1"])] == ["two"]
+    assert [
+        d.id
+        for d in store.get(where={"user_id": "user-b", "document_id": "b"})
+    ] == ["b:0"]
+    assert store.get(where={"user_id": "user-b", "document_id": "a"}) == []
+
+    store.update_metadatas(
+        ["a:0"], [{"user_id": "user-a", "document_id": "a", "name": "x"}]
+    )
+    assert store.get(ids=["a:0"])[0].metadata["name"] == "x"
+
+    store.delete(where={"document_id": "a"})
+    assert [d.id for d in store.get()] == ["b:0"]
+
+    # 삭제된 행은 새 청크에 재사용된다
+    store.add_documents(make_documents("user-a", "c", ["four", "five"]))
+    assert store.records.row_count() == 3
+    results = store.similarity_search("four", k=1, where={"user_id": "user-a"})
+    assert [d.page_content for d in results] == ["four"]
+    store.close()
+
+
+def test_data_persists_after_reopen(tmp_path, backend):
+    store = create_vector_store(
+        backend, str(tmp_path), "test", LengthEmbeddings()
+    )
+    store.add_documents(make_documents("user", "a", ["aaaa", "bb", "cccccc"]))
+    store.close()
+
+    store = create_vector_store(
+        backend, str(tmp_path), "test", LengthEmbeddings()
+    )
+    assert sorted(d.page_content for d in store.get()) == [
+        "aaaa",
+        "bb",
+        "cccccc",
+    ]
+    assert store.similarity_search("aaaa", k=1)[0].page_content == "aaaa"
+    store.close()
+
+
+def test_search_results_have_cosine_scores(tmp_path, backend):
+    store = create_vector_store(
+        backend, str(tmp_path), "test", LengthEmbeddings()
+    )
+    store.add_documents(make_documents("user", "a", ["aaaa", "bb", "cccccc"]))
+
+    results = store.similarity_search("aaaa", k=3)
+    scores = [d.metadata["score"] for d in results]
+    assert results[0].page_content == "aaaa"
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert scores == sorted(scores, reverse=True)
+    assert all("score" not in d.metadata for d in store.get())
+    store.close()
+
+
+def test_hnsw_index_is_rebuilt_when_not_saved(tmp_path):
+    path = str(tmp_path / "hnsw")
+    store = HnswVectorStore(path, LengthEmbeddings())
+    store.add_documents(make_documents("user", "a", ["aaaa", "bb"]))
+    store.close()
+
+    # 저장 후 추가된 청크는 그래프 파일에 없으므로 열 때 다시 구축한다
+    store = HnswVectorStore(path, LengthEmbeddings())
+    store.add_documents(make_documents("user", "b", ["aaaaaaaa"]))
+    store.records.close()
+    store = HnswVectorStore(path, LengthEmbeddings())
+
+    assert store._index.get_current_count() == 3
+    result = store.similarity_search("aaaaaaaa", k=1)
+    assert result[0].id == "b:0"
+    store.close()
+    assert os.path.exists(f"{path}/hnsw.bin")
+
+
+def test_hnsw_search_matches_exact_search(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = normalize(rng.standard_normal((5000, 16)).astype(np.float32))
+    documents = [
+        Document(
+            id=str(i),
+            page_content=str(i),
+            metadata={"user_id": f"user-{i % 2}"},
+        )
+        for i in range(len(vectors))
+    ]
+    flat = FlatVectorStore(str(tmp_path / "flat"), LengthEmbeddings())
+    hnsw = HnswVectorStore(str(tmp_path / "hnsw"), LengthEmbeddings())
+    flat.add_embeddings(documents, vectors.tolist())
+    hnsw.add_embeddings(documents, vectors.tolist())
+
+    queries = vectors[:20].tolist()
+    for where in (None, {"user_id": "user-1"}):
+        expected = flat.similarity_search_by_vectors(queries, k=5, where=where)
+        actual = hnsw.similarity_search_by_vectors(queries, k=5, where=where)
+        recall = np.mean(
+            [
+                len({d.id for d in a} & {d.id for d in e}) / 5
+                for a, e in zip(actual, expected)
+            ]
+        )
+        assert recall >= 0.9
+    flat.close()
+    hnsw.close()
+
+
+def test_exact_search_returns_live_rows_in_score_order():
+    matrix = normalize(
+        np.array([[1, 0], [0, 1], [1, 1], [1, 0.1]], dtype=np.float32)
+    )
+    live = np.array([True, True, True, False])
+
+    assert exact_search(matrix, live, np.array([[1, 0]], np.float32), 2) == [
+        [0, 2]
+    ]
+    assert exact_search(
+        matrix, live, np.array([[1, 0]], np.float32), 5, np.array([1, 2])
+    ) == [[2, 1]]
+    assert exact_search(matrix, live, np.array([[1, 0]], np.float32), 0) == [
+        []
+    ]
+
+
+def make_clustered_vectors(count, dimensions, seed=0, matryoshka=True):
+    centers = np.random.default_rng(0).standard_normal((32, dimensions))
+    rng = np.random.default_rng(seed)
+    vectors = centers[rng.integers(0, 32, count)]
+    vectors += 0.5 * rng.standard_normal((count, dimensions))
+    if matryoshka:
+        # 앞쪽 차원일수록 분산이 큰 Matryoshka 방식 임베딩
+        vectors /= np.sqrt(np.arange(1, dimensions + 1))
+    return normalize(vectors.astype(np.float32))
+
+
+def test_vector_codec_sizes_and_scores():
+    vectors = make_clustered_vectors(100, 64)
+
+    for quantization, dimensions, size in [
+        ("none", 16, 64),
+        ("int8", None, 68),
+        ("binary", None, 8),
+        ("binary", 20, 3),
+    ]:
+        codec = VectorCodec(quantization, dimensions)
+        codes = codec.encode(vectors)
+        assert codes.nbytes == 100 * size
+        assert codec.code_size(64) == size
+        scores = codec.scores(codec.encode_queries(vectors[:3]), codes)
+        assert scores.shape == (3, 100)
+        assert scores.argmax(axis=1).tolist() == [0, 1, 2]
+
+    codec = VectorCodec("int8")
+    scores = codec.scores(vectors[:5], codec.encode(vectors))
+    assert np.allclose(scores, vectors[:5] @ vectors.T, atol=0.02)
+
+    with pytest.raises(ValueError):
+        VectorCodec("int4")
+
+
+@pytest.mark.parametrize(
+    "backend, quantization, dimensions, matryoshka, rescore_factor",
+    [
+        ("flat", "int8", None, True, 4),
+        # 1비트 코드는 군집 안의 순위를 잘 구분하지 못해 후보를 더 많이 본다
+        ("flat", "binary", None, False, 40),
+        ("flat", "int8", 32, True, 4),
+        ("flat", "none", 32, True, 10),
+        ("hnsw", "none", 32, True, 10),
+    ],
+)
+def test_compressed_search_is_rescored_with_full_vectors(
+    tmp_path, backend, quantization, dimensions, matryoshka, rescore_factor
+):
+    vectors = make_clustered_vectors(3000, 128, matryoshka=matryoshka)
+    documents = [
+        Document(id=str(i), page_content=str(i), metadata={"user_id": "u"})
+        for i in range(len(vectors))
+    ]
+    flat = FlatVectorStore(str(tmp_path / "flat"), LengthEmbeddings())
+    store = create_vector_store(
+        backend,
+        str(tmp_path),
+        backend,
+        LengthEmbeddings(),
+        quantization=quantization,
+        truncate_dimensions=dimensions,
+        rescore_factor=rescore_factor,
+    )
+    flat.add_embeddings(documents, vectors.tolist())
+    store.add_embeddings(documents, vectors.tolist())
+
+    queries = make_clustered_vectors(
+        20, 128, seed=1, matryoshka=matryoshka
+    ).tolist()
+    expected = flat.similarity_search_by_vectors(queries, k=4)
+    actual = store.similarity_search_by_vectors(queries, k=4)
+    recall = np.mean(
+        [
+            len({d.id for d in a} & {d.id for d in e}) / 4
+            for a, e in zip(actual, expected)
+        ]
+    )
+    assert recall >= 0.9
+    flat.close()
+    store.close()
+
+    # 압축 벡터는 열 때 원본 벡터로 다시 만든다
+    store = create_vector_store(
+        backend,
+        str(tmp_path),
+        backend,
+        LengthEmbeddings(),
+        quantization=quantization,
+        truncate_dimensions=dimensions,
+        rescore_factor=rescore_factor,
+    )
+    assert [
+        [d.id for d in result]
+        for result in store.similarity_search_by_vectors(queries, k=4)
+    ] == [[d.id for d in result] for result in actual]
+    store.close()
+
+
+def test_codecs_are_validated_per_backend(tmp_path):
+    with pytest.raises(ValueError):
+        create_vector_store(
+            "hnsw", str(tmp_path), "test", LengthEmbeddings(), "int8"
+        )
+    with pytest.raises(ValueError):
+        create_vector_store(
+            "chroma", str(tmp_path), "test", LengthEmbeddings(), "binary"
+        )
+
+
+def test_rescore_orders_candidates_by_full_vectors():
+    matrix = normalize(np.array([[1, 0], [0, 1], [1, 1]], dtype=np.float32))
+    queries = normalize(np.array([[1, 0.2], [0, 1]], dtype=np.float32))
+
+    assert rescore(matrix, queries, [[1, 2, 0], []], 2) == [[0, 2], []]
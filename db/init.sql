@@ -17,4 +17,43 @@ CREATE TABLE IF NOT EXISTS session_id (
 	email VARCHAR(100) PRIMARY KEY,
 	session_id VARCHAR(100),
 	FOREIGN KEY (email) REFERENCES google_oauth(email)
-);
\ No newline at end of file
+);
+
+CREATE TABLE IF NOT EXISTS ingest_job (
+	id VARCHAR(36) PRIMARY KEY,
+	user_id VARCHAR(100),
+	document_id VARCHAR(36),
+	document_name VARCHAR(255),
+	operation VARCHAR(20) DEFAULT 'insert',
+	status VARCHAR(20),
+	chunks_done INTEGER DEFAULT 0,
+	chunks_duplicate INTEGER DEFAULT 0,
+	error text,
+	created_at TIMESTAMP,
+	updated_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ingest_job_user_id_idx ON ingest_job (user_id);
+
+CREATE INDEX IF NOT EXISTS ingest_job_status_idx ON ingest_job (status);
+
+CREATE TABLE IF NOT EXISTS query_embedding (
+	key VARCHAR(64) PRIMARY KEY,
+	vector BYTEA NOT NULL,
+	expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS query_embedding_expires_at_idx ON query_embedding (expires_at);
+
+CREATE TABLE IF NOT EXISTS documents (
+	id VARCHAR(36) PRIMARY KEY,
+	user_id VARCHAR(100) NOT NULL,
+	name VARCHAR(255) NOT NULL,
+	size BIGINT NOT NULL,
+	chunk_count INTEGER NOT NULL,
+	content_hash VARCHAR(64) NOT NULL,
+	created_at TIMESTAMP NOT NULL,
+	updated_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS documents_user_id_created_at_idx ON documents (user_id, created_at, id);
@@ -1,5 +1,5 @@
 import React, { useEffect, useRef, useState } from 'react';
-import { chat } from '../services';
+import { chatStream } from '../services';
 import '../styles/ChatPage.css';
 import '../styles/ChatBubble.css';
 
@@ -45,11 +45,18 @@ const ChatPage: React.FC = () => {
     const userMsg: Message = { sender: 'user', text: input };
     setMessages(msgs => [...msgs, userMsg]);
     setLoading(true);
+    // Append an empty bot message and grow it as deltas arrive.
+    setMessages(msgs => [...msgs, { sender: 'bot', text: '' } as Message]);
+    const setBotText = (update: (text: string) => string) =>
+      setMessages(msgs => {
+        const last = msgs[msgs.length - 1];
+        return [...msgs.slice(0, -1), { ...last, text: update(last.text) }];
+      });
     try {
-      const data = await chat(input);
-      setMessages(msgs => [...msgs, { sender: 'bot', text: data.answer } as Message]);
+      const answer = await chatStream(input, delta => setBotText(text => text + delta));
+      setBotText(() => answer);
     } catch {
-      setMessages(msgs => [...msgs, { sender: 'bot', text: 'Error: Could not get response.' } as Message]);
+      setBotText(() => 'Error: Could not get response.');
     } finally {
       setLoading(false);
       setInput('');
@@ -1,11 +1,11 @@
 import React, { useState, useEffect } from 'react';
-import { getDocuments, deleteDocument } from '../services';
+import { getDocuments, getDocumentContent, deleteDocument } from '../services';
 import '../styles/DocumentsPage.css';
 
 interface DocumentItem {
   document_name: string;
-  document_contents: string[][];
   document_id: string;
+  chunk_count: number;
 }
 
 const DocumentsPage: React.FC = () => {
@@ -15,6 +15,7 @@ const DocumentsPage: React.FC = () => {
   const [error, setError] = useState<string>('');
   const [searchTerm, setSearchTerm] = useState<string>('');
   const [selectedChunkIndex, setSelectedChunkIndex] = useState<number>(0);
+  const [selectedContents, setSelectedContents] = useState<string[]>([]);
 
   useEffect(() => {
     fetchDocuments();
@@ -25,26 +26,19 @@ const DocumentsPage: React.FC = () => {
       setLoading(true);
       setError('');
       const response = await getDocuments();
-      // Expecting backend to return a list like: [{ document_name, document_contents }]
-      const rawList: any[] = Array.isArray(response) ? response : (response?.documents || []);
-      const list: DocumentItem[] = rawList.map((item: any) => {
-        const contents = item?.document_contents ?? [];
-        const normalizedContents = Array.isArray(contents) && contents.length > 0 && Array.isArray(contents[0])
-          ? contents
-          : [Array.isArray(contents) ? contents : []];
-        return {
-          document_name: item.document_name,
-          document_contents: normalizedContents,
-          document_id: item.document_id,
-        } as DocumentItem;
-      });
+      // The list only carries metadata; chunk contents are loaded per document
+      const rawList: any[] = response?.documents || [];
+      const list: DocumentItem[] = rawList.map((item: any) => ({
+        document_name: item.document_name,
+        document_id: item.document_id,
+        chunk_count: item.chunk_count ?? 0,
+      }));
       setDocuments(list);
       if (list.length > 0) {
-        setSelectedDocument(list[0]);
-        // reset chunk selection
-        setSelectedChunkIndex(0);
+        await selectDocument(list[0]);
       } else {
         setSelectedDocument(null);
+        setSelectedContents([]);
         setSelectedChunkIndex(0);
       }
     } catch (err) {
@@ -69,10 +63,22 @@ const DocumentsPage: React.FC = () => {
     }
   };
 
-  const handleDocumentClick = (document: DocumentItem) => {
+  const selectDocument = async (document: DocumentItem) => {
     setSelectedDocument(document);
     // reset chunk selection on new doc
     setSelectedChunkIndex(0);
+    setSelectedContents([]);
+    try {
+      const response = await getDocumentContent(document.document_id);
+      setSelectedContents(response?.document_contents || []);
+    } catch (err) {
+      setError('Failed to load document content. Please try again.');
+      console.error('Error fetching document content:', err);
+    }
+  };
+
+  const handleDocumentClick = (document: DocumentItem) => {
+    selectDocument(document);
   };
 
   const filteredDocuments = documents.filter(doc =>
@@ -82,11 +88,9 @@ const DocumentsPage: React.FC = () => {
   const clearError = () => setError('');
 
   const getSelectedChunkText = () => {
-    if (!selectedDocument || !Array.isArray(selectedDocument.document_contents)) return '';
-    const flatChunks = selectedDocument.document_contents.flat();
-    if (flatChunks.length === 0) return '';
-    const safeIndex = Math.min(Math.max(selectedChunkIndex, 0), flatChunks.length - 1);
-    return flatChunks[safeIndex] || '';
+    if (!selectedDocument || selectedContents.length === 0) return '';
+    const safeIndex = Math.min(Math.max(selectedChunkIndex, 0), selectedContents.length - 1);
+    return selectedContents[safeIndex] || '';
   };
 
   if (loading) {
@@ -160,7 +164,7 @@ const DocumentsPage: React.FC = () => {
                       {doc.document_name}
                     </h3>
                     <div className="document-meta">
-                      <span>{Array.isArray(doc.document_contents) ? doc.document_contents.length : 0} chunks</span>
+                      <span>{doc.chunk_count} chunks</span>
                     </div>
                   </div>
                   <button
@@ -196,11 +200,11 @@ const DocumentsPage: React.FC = () => {
               </button>
             </div>
             <div className="content-body">
-              {Array.isArray(selectedDocument.document_contents) && selectedDocument.document_contents.flat().length > 0 ? (
+              {selectedContents.length > 0 ? (
                 <div className="chunks-view">
                   <div className="chunks-sidebar">
                     <div className="chunk-list">
-                      {selectedDocument.document_contents.flat().map((_, idx) => {
+                      {selectedContents.map((_, idx) => {
                         const active = idx === selectedChunkIndex;
                         return (
                           <button
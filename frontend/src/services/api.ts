@@ -1,4 +1,5 @@
 import axiosInstance  from '../hooks/interceptor';
+import { getAccessToken } from './token_service';
 
 export const chat = async (message: string) => {
   const response = await axiosInstance.post(
@@ -8,6 +9,56 @@ export const chat = async (message: string) => {
   return response.data;
 };
 
+// Streams the answer over Server-Sent Events, calling onDelta for each
+// piece, and resolves with the full answer once the server sends `done`.
+export const chatStream = async (
+  message: string,
+  onDelta: (delta: string) => void,
+  signal?: AbortSignal,
+) => {
+  const token = getAccessToken();
+  const response = await fetch(`${axiosInstance.defaults.baseURL}/api/v1/chatbot/chat/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    credentials: 'include',
+    body: JSON.stringify({ message }),
+    signal,
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Chat stream failed: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      const payload = data ? JSON.parse(data) : {};
+      if (event === 'token') onDelta(payload.delta);
+      else if (event === 'done') return payload.answer as string;
+      else if (event === 'error') throw new Error(payload.detail);
+    }
+  }
+  throw new Error('Chat stream ended before the answer was complete');
+};
+
 export const uploadDocument = async (document: File) => {
   const formData = new FormData();
   formData.append('document', document);
@@ -21,8 +72,17 @@ export const uploadDocument = async (document: File) => {
 };
 
 export const getDocuments = async () => {
-  const response = await axiosInstance.get('/api/v1/documents/user');
-  return response.data;
+  // The list is paginated; follow next_cursor until the last page.
+  const documents: any[] = [];
+  let cursor: string | null = null;
+  do {
+    const response: any = await axiosInstance.get('/api/v1/documents/user', {
+      params: cursor ? { cursor } : {},
+    });
+    documents.push(...(response.data?.documents || []));
+    cursor = response.data?.next_cursor ?? null;
+  } while (cursor);
+  return { documents };
 };
 
 export const getDocumentContent = async (documentId: string) => {